@@ -1,2424 +1,3549 @@
-import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-import datetime
-import base64
-import urllib.parse
-import urllib.request
-from streamlit_option_menu import option_menu
-import textwrap
-import hashlib
-import random
-import time
-import json
-import uuid
-from supabase import create_client, Client
-
-# ==============================================================================
-# 1. INICIALIZAÇÃO DA PÁGINA E DA CONEXÃO COM O BANCO DE DADOS (SUPABASE)
-# ==============================================================================
-st.set_page_config(
-    page_title="Elo NR-01 | Gestão de Saúde Mental",
-    page_icon="🔗",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
-
-# Conexão com o Supabase
-try:
-    SUPABASE_URL = st.secrets["supabase"]["url"]
-    SUPABASE_KEY = st.secrets["supabase"]["key"]
-    supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
-    DB_CONNECTED = True
-except Exception as e:
-    DB_CONNECTED = False
-
-# ------------------------------------------------------------------------------
-# 1.1. CONFIGURAÇÕES GERAIS E IDENTIDADE VISUAL
-# ------------------------------------------------------------------------------
-def get_saved_settings():
-    default_conf = {
-        "name": "Elo NR-01",
-        "consultancy": "Pessin Gestão e Desenvolvimento Humano",
-        "logo_b64": None,
-        "base_url": "https://elonr01-cris.streamlit.app" 
-    }
-    
-    if DB_CONNECTED:
-        try:
-            res = supabase.table('platform_settings').select('config_json').execute()
-            if res.data and len(res.data) > 0:
-                db_conf = res.data[0].get('config_json', {})
-                default_conf.update(db_conf)
-        except Exception as e:
-            pass
-            
-    return default_conf
-
-if 'platform_config' not in st.session_state:
-    st.session_state.platform_config = get_saved_settings()
-
-COR_PRIMARIA = "#003B49"    
-COR_SECUNDARIA = "#40E0D0"  
-COR_FUNDO = "#f4f6f9"
-COR_RISCO_ALTO = "#ef5350"      # Vermelho (Atenção)
-COR_RISCO_MEDIO = "#ffa726"     # Laranja/Amarelo (Moderado)
-COR_RISCO_BAIXO = "#66bb6a"     # Verde (Saudável)
-COR_COMP_A = "#3498db"          # Azul
-COR_COMP_B = "#9b59b6"          # Roxo
-
-# ==============================================================================
-# 2. FOLHA DE ESTILOS EM CASCATA (CSS)
-# ==============================================================================
-st.markdown(f"""
-    <style>
-    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700;800;900&display=swap');
-    
-    .stApp {{ background-color: {COR_FUNDO}; font-family: 'Inter', sans-serif; }}
-    .block-container {{ padding-top: 2rem; padding-bottom: 3rem; }}
-    [data-testid="stSidebar"] {{ background-color: #ffffff; border-right: 1px solid #e0e0e0; box-shadow: 2px 0 5px rgba(0,0,0,0.02); }}
-    
-    .kpi-card {{ background: #ffffff; padding: 20px; border-radius: 12px; box-shadow: 0 4px 6px rgba(0,0,0,0.04); border: 1px solid #f0f0f0; margin-bottom: 15px; display: flex; flex-direction: column; justify-content: space-between; min-height: 120px; height: auto; transition: transform 0.2s ease-in-out; }}
-    .kpi-card:hover {{ transform: translateY(-2px); box-shadow: 0 6px 12px rgba(0,0,0,0.08); }}
-    .kpi-title {{ font-size: 12px; color: #7f8c8d; font-weight: 600; margin-top: 8px; text-transform: uppercase; letter-spacing: 0.5px; }}
-    .kpi-value {{ font-size: 26px; font-weight: 800; color: {COR_PRIMARIA}; margin-top: 5px; }}
-    .kpi-top {{ display: flex; align-items: center; gap: 15px; }}
-    .kpi-icon-box {{ width: 45px; height: 45px; border-radius: 10px; display: flex; align-items: center; justify-content: center; font-size: 22px; flex-shrink: 0; }}
-    
-    .bg-blue {{ background-color: #e3f2fd; color: #1976d2; }}
-    .bg-green {{ background-color: #e8f5e9; color: #388e3c; }}
-    .bg-orange {{ background-color: #fff3e0; color: #f57c00; }}
-    .bg-red {{ background-color: #ffebee; color: #d32f2f; }}
-
-    .chart-container {{ background: #ffffff; padding: 22px; border-radius: 12px; box-shadow: 0 2px 8px rgba(0,0,0,0.04); border: 1px solid #f0f0f0; margin-bottom: 18px; }}
-    .security-alert {{ padding: 1.5rem; background-color: #d1e7dd; color: #0f5132; border: 1px solid #badbcc; border-left: 6px solid #0f5132; border-radius: 0.35rem; margin-bottom: 2rem; font-family: 'Inter', sans-serif; font-size: 0.95rem; }}
-    
-    .a4-paper {{ background: #ffffff; width: 210mm; min-height: 297mm; margin: auto; padding: 40px; box-shadow: 0 0 20px rgba(0,0,0,0.1); color: #333333; font-family: 'Inter', sans-serif; font-size: 11px; line-height: 1.5; }}
-    .rep-table {{ width: 100%; border-collapse: collapse; margin-top: 10px; font-size: 10px; }}
-    .rep-table th {{ background-color: {COR_PRIMARIA}; color: #ffffff; padding: 10px 8px; text-align: left; font-size: 9px; text-transform: uppercase; letter-spacing: 0.5px; }}
-    .rep-table td {{ border-bottom: 1px solid #eeeeee; padding: 10px 8px; vertical-align: top; }}
-    
-    /* Espaçamento elegante para os radio buttons nativos do Streamlit sem quebrar os quadrados */
-    div[role="radiogroup"] {{ gap: 15px; padding-top: 5px; padding-bottom: 15px; }}
-
-    @media print {{
-        [data-testid="stSidebar"], .stButton, header, footer, .no-print {{ display: none !important; }}
-        .a4-paper {{ box-shadow: none; margin: 0; padding: 0; width: 100%; max-width: 100%; }}
-        .stApp {{ background-color: #ffffff; }}
-        .chart-container {{ border: none; box-shadow: none; padding: 0; }}
-    }}
-    </style>
-    """, unsafe_allow_html=True)
-
-# ==============================================================================
-# 3. VARIÁVEIS DE SESSÃO
-# ==============================================================================
-keys_to_init = [
-    'logged_in', 'user_role', 'admin_permission', 'user_username', 
-    'user_credits', 'user_linked_company', 'edit_mode', 'edit_id', 'acoes_list'
-]
-
-for k in keys_to_init:
-    if k not in st.session_state: 
-        st.session_state[k] = None
-
-if st.session_state.acoes_list is None: st.session_state.acoes_list = []
-if st.session_state.user_credits is None: st.session_state.user_credits = 0
-
-if 'users_db' not in st.session_state:
-    st.session_state.users_db = { "admin": { "password": "admin", "role": "Master", "credits": 999999 } }
-if 'companies_db' not in st.session_state: st.session_state.companies_db = []
-if 'local_responses_db' not in st.session_state: st.session_state.local_responses_db = []
-
-# ------------------------------------------------------------------------------
-# 3.1. BANCO DE METODOLOGIAS (HSE + COPSOQ) - ADAPTADO PARA PT-BR
-# ------------------------------------------------------------------------------
-if 'methodologies' not in st.session_state:
-    # Definição das escalas variadas
-    escala_freq = ["Nunca/Quase Nunca", "Raramente", "Às vezes", "Frequentemente", "Sempre"]
-    escala_conc = ["Discordo Totalmente", "Discordo", "Neutro", "Concordo", "Concordo Totalmente"]
-    escala_int = ["Nada/Quase Nada", "Um pouco", "Moderadamente", "Muito", "Extremamente"]
-    escala_sat = ["Muito Insatisfeito", "Insatisfeito", "Neutro", "Satisfeito", "Muito Satisfeito"]
-    escala_sau = ["Deficitária", "Razoável", "Boa", "Muito Boa", "Excelente"]
-    
-    st.session_state.methodologies = {
-        "HSE-IT (35 itens)": {
-            "desc": "Focado em 7 dimensões de gestão de estresse (Padrão UK/Brasil).",
-            "questions": {
-                "Demandas": [
-                    {"id": "h1", "q": "Tenho prazos impossíveis de cumprir?", "rev": True, "options": escala_freq, "help": "Exemplo: Ser cobrado rotineiramente por entregas urgentes no final do dia."},
-                    {"id": "h2", "q": "Sou pressionado a trabalhar longas horas?", "rev": True, "options": escala_freq, "help": "Exemplo: Sentir que apenas o seu horário normal não é suficiente para a empresa."},
-                    {"id": "h3", "q": "Tenho que trabalhar muito intensamente?", "rev": True, "options": escala_freq, "help": "Exemplo: Não ter tempo nem para fazer uma pequena pausa devido ao volume de demandas."},
-                    {"id": "h4", "q": "Tenho que negligenciar algumas tarefas?", "rev": True, "options": escala_freq, "help": "Exemplo: Ter que fazer as coisas com menos qualidade para dar tempo de entregar tudo."},
-                    {"id": "h5", "q": "Não consigo fazer pausas suficientes?", "rev": True, "options": escala_freq, "help": "Exemplo: Precisar encurtar a hora de almoço frequentemente."},
-                    {"id": "h6", "q": "Sou pressionado por diferentes grupos?", "rev": True, "options": escala_freq, "help": "Exemplo: Receber ordens urgentes e contraditórias de pessoas diferentes."},
-                    {"id": "h7", "q": "Tenho que trabalhar muito rápido?", "rev": True, "options": escala_freq, "help": "Exemplo: O ritmo exigido é sempre acelerado e desgastante."},
-                    {"id": "h8", "q": "Tenho prazos irrealistas?", "rev": True, "options": escala_freq, "help": "Exemplo: Metas que a equipe raramente consegue atingir de forma saudável."}
-                ],
-                "Controle": [
-                    {"id": "h9", "q": "Posso decidir quando fazer uma pausa?", "rev": False, "options": escala_freq, "help": "Exemplo: Ter a liberdade de se levantar ou ir ao banheiro sem pedir autorização."},
-                    {"id": "h10", "q": "Tenho liberdade para decidir como faço o meu trabalho?", "rev": False, "options": escala_freq, "help": "Exemplo: Poder escolher o melhor método ou ferramenta para atingir os resultados."},
-                    {"id": "h11", "q": "Tenho poder de decisão sobre o meu ritmo?", "rev": False, "options": escala_freq, "help": "Exemplo: Poder gerenciar os seus picos de energia durante o dia."},
-                    {"id": "h12", "q": "Eu decido quando vou realizar cada tarefa?", "rev": False, "options": escala_freq, "help": "Exemplo: Ter autonomia para organizar a sua própria agenda diária."},
-                    {"id": "h13", "q": "Tenho voz sobre como o meu trabalho é realizado?", "rev": False, "options": escala_freq, "help": "Exemplo: Suas ideias de melhoria são ouvidas e valorizadas pela gestão."},
-                    {"id": "h14", "q": "O meu horário de trabalho pode ser flexível?", "rev": False, "options": escala_freq, "help": "Exemplo: Ter acesso a banco de horas ou acordos amigáveis com a liderança."}
-                ],
-                "Suporte do Gestor": [
-                    {"id": "h15", "q": "Recebo feedback sobre o trabalho?", "rev": False, "options": escala_freq, "help": "Exemplo: O seu gestor conversa com você de forma clara e respeitosa sobre o seu desempenho."},
-                    {"id": "h16", "q": "Posso contar com o meu superior diante de um problema?", "rev": False, "options": escala_freq, "help": "Exemplo: Saber que o gestor vai ajudar a resolver uma falha, em vez de apenas culpá-lo."},
-                    {"id": "h17", "q": "Posso falar com o meu superior sobre algo que me chateou?", "rev": False, "options": escala_freq, "help": "Exemplo: Sentir que existe um espaço seguro para conversas sinceras."},
-                    {"id": "h18", "q": "Sinto o apoio do meu gestor(a)?", "rev": False, "options": escala_freq, "help": "Exemplo: Sentir que a sua chefia se importa de forma genuína com o seu bem-estar."},
-                    {"id": "h19", "q": "Meu gestor me motiva no trabalho?", "rev": False, "options": escala_freq, "help": "Exemplo: Receber elogios e reconhecimento quando faz um bom trabalho."}
-                ],
-                "Suporte dos Colegas": [
-                    {"id": "h20", "q": "Recebo a ajuda e o apoio que preciso dos meus colegas?", "rev": False, "options": escala_freq, "help": "Exemplo: A equipe é unida e ajuda-se mutuamente nos momentos de maior pressão."},
-                    {"id": "h21", "q": "Recebo o respeito que mereço dos meus colegas?", "rev": False, "options": escala_freq, "help": "Exemplo: O tratamento diário é cordial e livre de preconceitos."},
-                    {"id": "h22", "q": "Meus colegas estão dispostos a ouvir meus problemas?", "rev": False, "options": escala_freq, "help": "Exemplo: Ter com quem desabafar sobre um dia difícil ou um cliente complicado."},
-                    {"id": "h23", "q": "Meus colegas me ajudam em momentos difíceis?", "rev": False, "options": escala_freq, "help": "Exemplo: A equipe divide o esforço quando o volume de trabalho está muito alto."}
-                ],
-                "Relacionamentos": [
-                    {"id": "h24", "q": "Estou sujeito a desrespeito pessoal?", "rev": True, "options": escala_freq, "help": "Exemplo: Ouvir comentários desrespeitosos, constrangedores ou pressões indevidas."},
-                    {"id": "h25", "q": "Existem atritos ou conflitos entre colegas?", "rev": True, "options": escala_freq, "help": "Exemplo: O ambiente é marcado por fofocas, divisões ou discussões frequentes."},
-                    {"id": "h26", "q": "Sinto-me isolado ou sofro bullying?", "rev": True, "options": escala_freq, "help": "Exemplo: Ser excluído de propósito de conversas de trabalho ou ser alvo de piadas de mau gosto."},
-                    {"id": "h27", "q": "Os relacionamentos no trabalho são tensos?", "rev": True, "options": escala_freq, "help": "Exemplo: Sentir que precisa 'pisar em ovos' ao falar com as pessoas por receio de reações exageradas."}
-                ],
-                "Papel na Empresa": [
-                    {"id": "h28", "q": "Sei claramente o que é esperado de mim?", "rev": False, "options": escala_conc, "help": "Exemplo: As suas metas e tarefas diárias estão bem definidas e acordadas."},
-                    {"id": "h29", "q": "Sei como fazer para executar o meu trabalho?", "rev": False, "options": escala_conc, "help": "Exemplo: Você recebeu o treinamento e as ferramentas certas para desempenhar bem a sua função."},
-                    {"id": "h30", "q": "Sei quais são os objetivos do meu departamento?", "rev": False, "options": escala_conc, "help": "Exemplo: Compreende para onde a sua equipe está caminhando estrategicamente."},
-                    {"id": "h31", "q": "Tenho noção clara das minhas responsabilidades?", "rev": False, "options": escala_conc, "help": "Exemplo: Os limites da sua função, até onde pode agir e decidir, estão bem claros."},
-                    {"id": "h32", "q": "Entendo a minha importância na empresa?", "rev": False, "options": escala_conc, "help": "Exemplo: Consegue ver como o seu trabalho diário ajuda no sucesso do negócio."}
-                ],
-                "Gestão de Mudança": [
-                    {"id": "h33", "q": "Tenho oportunidade de tirar dúvidas sobre mudanças?", "rev": False, "options": escala_conc, "help": "Exemplo: Haver um espaço seguro para esclarecimentos quando uma nova regra ou sistema é implementado."},
-                    {"id": "h34", "q": "Sou consultado(a) sobre mudanças no meu trabalho?", "rev": False, "options": escala_conc, "help": "Exemplo: A liderança pede a opinião de quem realiza a tarefa antes de mudar um processo."},
-                    {"id": "h35", "q": "Quando há mudanças, fica claro como vão funcionar?", "rev": False, "options": escala_conc, "help": "Exemplo: A comunicação da empresa é transparente e bem explicada."}
-                ]
-            }
-        },
-        "COPSOQ II (Versão Média PT)": {
-            "desc": "Versão Média Oficial (76 itens - Adaptação PT-BR). Avalia de forma profunda exigências, saúde e valores no ambiente laboral.",
-            "questions": {
-                "Exigências Laborais (Quantidade e Ritmo)": [
-                    {"id": "c1", "q": "Sua carga de trabalho se acumula por ser mal distribuída?", "rev": True, "options": escala_freq},
-                    {"id": "c2", "q": "Com que frequência você não tem tempo para completar todas as tarefas do seu trabalho?", "rev": True, "options": escala_freq},
-                    {"id": "c3", "q": "Precisa fazer horas extras?", "rev": True, "options": escala_freq},
-                    {"id": "c4", "q": "Precisa trabalhar muito rapidamente?", "rev": True, "options": escala_freq},
-                    {"id": "c5", "q": "O seu trabalho exige a sua atenção constante?", "rev": True, "options": escala_freq},
-                    {"id": "c6", "q": "Seu trabalho exige que você seja bom em propor novas ideias?", "rev": False, "options": escala_freq},
-                    {"id": "c7", "q": "O seu trabalho exige que tome decisões difíceis?", "rev": True, "options": escala_freq},
-                    {"id": "c8", "q": "Seu trabalho exige muito de você emocionalmente?", "rev": True, "options": escala_freq}
-                ],
-                "Organização e Influência": [
-                    {"id": "c9", "q": "Você tem um alto grau de influência no seu trabalho?", "rev": False, "options": escala_freq},
-                    {"id": "c10", "q": "Participa na escolha das pessoas com quem trabalha?", "rev": False, "options": escala_freq},
-                    {"id": "c11", "q": "Pode influenciar a quantidade de trabalho que compete a você?", "rev": False, "options": escala_freq},
-                    {"id": "c12", "q": "Tem alguma influência sobre o tipo de tarefas que faz?", "rev": False, "options": escala_freq},
-                    {"id": "c13", "q": "O seu trabalho exige que tenha iniciativa?", "rev": False, "options": escala_freq},
-                    {"id": "c14", "q": "O seu trabalho permite que você aprenda coisas novas?", "rev": False, "options": escala_freq},
-                    {"id": "c15", "q": "O seu trabalho permite usar as suas habilidades ou talentos?", "rev": False, "options": escala_freq},
-                    {"id": "c16", "q": "No seu local de trabalho, você é informado com antecedência sobre decisões importantes ou mudanças?", "rev": False, "options": escala_freq},
-                    {"id": "c17", "q": "Recebe toda a informação que necessita para fazer bem o seu trabalho?", "rev": False, "options": escala_freq}
-                ],
-                "Transparência de Papel e Conflitos": [
-                    {"id": "c18", "q": "Seu trabalho apresenta objetivos claros?", "rev": False, "options": escala_freq},
-                    {"id": "c19", "q": "Sabe exatamente quais são as suas responsabilidades?", "rev": False, "options": escala_freq},
-                    {"id": "c20", "q": "Sabe exatamente o que é esperado de você?", "rev": False, "options": escala_freq},
-                    {"id": "c21", "q": "O seu trabalho é reconhecido e apreciado pela gerência?", "rev": False, "options": escala_freq},
-                    {"id": "c22", "q": "A gerência do seu local de trabalho respeita você?", "rev": False, "options": escala_freq},
-                    {"id": "c23", "q": "Você é tratado de forma justa no seu local de trabalho?", "rev": False, "options": escala_freq},
-                    {"id": "c24", "q": "Faz coisas no seu trabalho que uns concordam mas outros não?", "rev": True, "options": escala_freq},
-                    {"id": "c25", "q": "Por vezes tem que fazer coisas que deveriam ser feitas de outra maneira?", "rev": True, "options": escala_freq},
-                    {"id": "c26", "q": "Por vezes tem que fazer coisas que considera desnecessárias?", "rev": True, "options": escala_freq}
-                ],
-                "Relações Sociais e Liderança": [
-                    {"id": "c27", "q": "Com que frequência tem ajuda e apoio dos seus colegas de trabalho?", "rev": False, "options": escala_freq},
-                    {"id": "c28", "q": "Com que frequência os seus colegas estão dispostos a ouvi-lo(a) sobre os seus problemas de trabalho?", "rev": False, "options": escala_freq},
-                    {"id": "c29", "q": "Com que frequência os seus colegas conversam com você sobre o seu desempenho?", "rev": False, "options": escala_freq},
-                    {"id": "c30", "q": "Com que frequência o seu superior imediato conversa com você sobre como está o andamento do seu trabalho?", "rev": False, "options": escala_freq},
-                    {"id": "c31", "q": "Com que frequência tem ajuda e apoio do seu superior imediato?", "rev": False, "options": escala_freq},
-                    {"id": "c32", "q": "Com que frequência o seu superior imediato conversa com você em relação ao seu desempenho?", "rev": False, "options": escala_freq},
-                    {"id": "c33", "q": "Existe um bom ambiente de trabalho entre você e os seus colegas?", "rev": False, "options": escala_freq},
-                    {"id": "c34", "q": "Existe uma boa cooperação entre os colegas de trabalho?", "rev": False, "options": escala_freq},
-                    {"id": "c35", "q": "No seu local de trabalho você sente que faz parte de uma comunidade?", "rev": False, "options": escala_freq},
-                    {"id": "c36", "q": "Sua chefia oferece para as pessoas e para a equipe boas oportunidades de desenvolvimento?", "rev": False, "options": escala_freq},
-                    {"id": "c37", "q": "Sua chefia dá prioridade à satisfação no trabalho?", "rev": False, "options": escala_freq},
-                    {"id": "c38", "q": "Sua chefia é boa no planejamento do trabalho?", "rev": False, "options": escala_freq},
-                    {"id": "c39", "q": "Sua chefia é boa em resolver conflitos?", "rev": False, "options": escala_freq}
-                ],
-                "Valores, Justiça e Confiança": [
-                    {"id": "c40", "q": "Os colaboradores ocultam informações uns dos outros?", "rev": True, "options": escala_freq},
-                    {"id": "c41", "q": "Os colaboradores ocultam informações da gerência?", "rev": True, "options": escala_freq},
-                    {"id": "c42", "q": "Os colaboradores confiam uns nos outros de um modo geral?", "rev": False, "options": escala_freq},
-                    {"id": "c43", "q": "A gerência confia nos colaboradores para fazerem o trabalho bem feito?", "rev": False, "options": escala_freq},
-                    {"id": "c44", "q": "Você confia na informação que é transmitida pela gerência?", "rev": False, "options": escala_freq},
-                    {"id": "c45", "q": "A gerência oculta informação aos seus colaboradores?", "rev": True, "options": escala_freq},
-                    {"id": "c46", "q": "Os conflitos são resolvidos de uma forma justa?", "rev": False, "options": escala_freq},
-                    {"id": "c47", "q": "As sugestões dos colaboradores são tratadas de forma séria pela gerência?", "rev": False, "options": escala_freq},
-                    {"id": "c48", "q": "O trabalho é igualmente distribuído pelos colaboradores?", "rev": False, "options": escala_freq}
-                ],
-                "Atitude e Satisfação": [
-                    {"id": "c49", "q": "Sou sempre capaz de resolver problemas, se tentar o suficiente.", "rev": False, "options": escala_int},
-                    {"id": "c50", "q": "É fácil para mim seguir os meus planos e atingir os meus objetivos.", "rev": False, "options": escala_int},
-                    {"id": "c51", "q": "O seu trabalho tem algum significado para você?", "rev": False, "options": escala_int},
-                    {"id": "c52", "q": "Você sente que o seu trabalho é importante?", "rev": False, "options": escala_int},
-                    {"id": "c53", "q": "Sente-se motivado e envolvido com o seu trabalho?", "rev": False, "options": escala_int},
-                    {"id": "c54", "q": "Você gosta de falar com outras pessoas sobre o seu local de trabalho?", "rev": False, "options": escala_int},
-                    {"id": "c55", "q": "Você sente que os problemas do seu local de trabalho também são seus?", "rev": False, "options": escala_int},
-                    {"id": "c56", "q": "Em relação ao seu trabalho, quão satisfeito você está com as suas perspectivas profissionais?", "rev": False, "options": escala_sat},
-                    {"id": "c57", "q": "Em relação ao seu trabalho, quão satisfeito você está com as condições físicas do seu local de trabalho?", "rev": False, "options": escala_sat},
-                    {"id": "c58", "q": "Em relação ao seu trabalho, quão satisfeito você está com a forma como as suas capacidades são utilizadas?", "rev": False, "options": escala_sat},
-                    {"id": "c59", "q": "Quão satisfeito você está com o seu trabalho de uma forma global?", "rev": False, "options": escala_sat},
-                    {"id": "c60", "q": "Você se preocupa em ficar desempregado?", "rev": True, "options": escala_int}
-                ],
-                "Saúde, Bem-estar e Rotina": [
-                    {"id": "c61", "q": "Em geral, você sente que a sua saúde é:", "rev": False, "options": escala_sau},
-                    {"id": "c62", "q": "Sente que o seu trabalho exige muita energia que acaba por afetar a sua vida privada negativamente?", "rev": True, "options": escala_int},
-                    {"id": "c63", "q": "Sente que o seu trabalho exige muito tempo que acaba por afetar a sua vida privada negativamente?", "rev": True, "options": escala_int},
-                    {"id": "c64", "q": "Sua família e amigos dizem que você trabalha demais?", "rev": True, "options": escala_int},
-                    {"id": "c65", "q": "Com que frequência nas últimas 4 semanas você sentiu dificuldade para adormecer?", "rev": True, "options": escala_freq},
-                    {"id": "c66", "q": "Com que frequência nas últimas 4 semanas você acordou várias vezes durante a noite e depois não conseguia adormecer?", "rev": True, "options": escala_freq},
-                    {"id": "c67", "q": "Com que frequência nas últimas 4 semanas você sentiu-se fisicamente exausto?", "rev": True, "options": escala_freq},
-                    {"id": "c68", "q": "Com que frequência nas últimas 4 semanas você sentiu-se emocionalmente exausto?", "rev": True, "options": escala_freq},
-                    {"id": "c69", "q": "Com que frequência nas últimas 4 semanas você sentiu-se irritado?", "rev": True, "options": escala_freq},
-                    {"id": "c70", "q": "Com que frequência nas últimas 4 semanas você sentiu-se ansioso?", "rev": True, "options": escala_freq},
-                    {"id": "c71", "q": "Com que frequência nas últimas 4 semanas você sentiu-se triste?", "rev": True, "options": escala_freq},
-                    {"id": "c72", "q": "Com que frequência nas últimas 4 semanas você sentiu falta de interesse pelas coisas do dia a dia?", "rev": True, "options": escala_freq}
-                ],
-                "Ambiente Ofensivo (Últimos 12 meses)": [
-                    {"id": "c73", "q": "Tem sido alvo de insultos ou provocações verbais no trabalho?", "rev": True, "options": escala_freq},
-                    {"id": "c74", "q": "Tem sido exposto a assédio sexual indesejado?", "rev": True, "options": escala_freq},
-                    {"id": "c75", "q": "Tem sido exposto a ameaças de violência?", "rev": True, "options": escala_freq},
-                    {"id": "c76", "q": "Tem sido exposto a agressão física?", "rev": True, "options": escala_freq}
-                ]
-            }
-        }
-    }
-
-# ==============================================================================
-# 4. FUNÇÕES DO SISTEMA (CÁLCULOS E DADOS)
-# ==============================================================================
-def get_logo_html(width=180):
-    if st.session_state.platform_config['logo_b64']:
-        clean_b64 = st.session_state.platform_config['logo_b64']
-        if clean_b64.startswith('data:image'):
-            clean_b64 = clean_b64.split(',')[1]
-        return f'<img src="data:image/png;base64,{clean_b64}" width="{width}" style="max-width: 100%; height: auto;">'
-    
-    svg = f"""
-    <svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 400 120" width="{width}">
-        <style>
-            .t1 {{ font-family: 'Inter', sans-serif; font-weight: 800; font-size: 48px; fill: {COR_PRIMARIA}; }} 
-            .t2 {{ font-family: 'Inter', sans-serif; font-weight: 300; font-size: 48px; fill: {COR_SECUNDARIA}; }} 
-            .sub {{ font-family: 'Inter', sans-serif; font-weight: 600; font-size: 11px; fill: {COR_PRIMARIA}; letter-spacing: 3px; text-transform: uppercase; }}
-        </style>
-        <g transform="translate(10, 20)">
-            <rect x="0" y="10" width="35" height="35" rx="8" ry="8" fill="none" stroke="{COR_SECUNDARIA}" stroke-width="8" />
-            <rect x="20" y="10" width="35" height="35" rx="8" ry="8" fill="none" stroke="{COR_PRIMARIA}" stroke-width="8" />
-        </g>
-        <text x="80" y="55" class="t1">ELO</text>
-        <text x="190" y="55" class="t2">NR-01</text>
-        <text x="82" y="80" class="sub">SISTEMA INTELIGENTE</text>
-    </svg>
-    """
-    b64 = base64.b64encode(svg.encode("utf-8")).decode("utf-8")
-    return f'<img src="data:image/svg+xml;base64,{b64}">'
-
-def image_to_base64(file):
-    try: 
-        if file is not None:
-            bytes_data = file.getvalue()
-            return base64.b64encode(bytes_data).decode('utf-8')
-        return None
-    except Exception as e: 
-        return None
-
-def logout(): 
-    st.session_state.logged_in = False
-    st.session_state.user_role = None
-    st.session_state.admin_permission = None
-    st.rerun()
-
-def get_copy_button_html(text_to_copy, button_label="📋 Copiar"):
-    """Cria um botão HTML/JS elegante e nativo para copiar texto diretamente do Streamlit"""
-    safe_text = json.dumps(text_to_copy)
-    html = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-    <style>
-    body {{ margin: 0; padding: 0; background-color: transparent; font-family: 'Inter', sans-serif; }}
-    .btn {{
-        background-color: {COR_PRIMARIA};
-        color: #ffffff;
-        border: none;
-        padding: 10px 20px;
-        font-size: 14px;
-        font-weight: 600;
-        border-radius: 8px;
-        cursor: pointer;
-        width: 100%;
-        transition: all 0.3s ease;
-        box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-        display: flex;
-        justify-content: center;
-        align-items: center;
-        gap: 8px;
-    }}
-    .btn:hover {{
-        background-color: {COR_SECUNDARIA};
-        color: {COR_PRIMARIA};
-    }}
-    .btn.copied {{
-        background-color: {COR_RISCO_BAIXO};
-        color: #ffffff;
-    }}
-    </style>
-    </head>
-    <body>
-        <button id="copy-btn" class="btn" onclick='copyAction()'>
-            {button_label}
-        </button>
-        <script>
-            function copyAction() {{
-                const text = {safe_text};
-                const el = document.createElement('textarea');
-                el.value = text;
-                document.body.appendChild(el);
-                el.select();
-                document.execCommand('copy');
-                document.body.removeChild(el);
-                
-                const btn = document.getElementById('copy-btn');
-                const originalText = btn.innerHTML;
-                btn.innerHTML = '✅ Copiado com sucesso!';
-                btn.classList.add('copied');
-                
-                setTimeout(() => {{
-                    btn.innerHTML = originalText;
-                    btn.classList.remove('copied');
-                }}, 2500);
-            }}
-        </script>
-    </body>
-    </html>
-    """
-    return html
-
-def calculate_actual_scores(all_responses, companies_list, methodologies_dict):
-    comp_method_map = {str(c['id']): c.get('metodologia', 'HSE-IT (35 itens)') for c in companies_list}
-    
-    # Engine matemático de match exato para converter strings nas pontuações de 1 a 5
-    scale_1 = ["Nunca/Quase Nunca", "Nada/Quase Nada", "Muito Insatisfeito", "Deficitária", "Discordo Totalmente"]
-    scale_2 = ["Raramente", "Um pouco", "Insatisfeito", "Razoável", "Discordo"]
-    scale_3 = ["Às vezes", "Moderadamente", "Neutro", "Boa"]
-    scale_4 = ["Frequentemente", "Muito", "Satisfeito", "Muito Boa", "Concordo"]
-    scale_5 = ["Sempre", "Extremamente", "Muito Satisfeito", "Excelente", "Concordo Totalmente"]
-    
-    for resp_row in all_responses:
-        comp_id = str(resp_row.get('company_id'))
-        metodo_nome = comp_method_map.get(comp_id, 'HSE-IT (35 itens)')
-        active_questions = methodologies_dict.get(metodo_nome, methodologies_dict['HSE-IT (35 itens)'])['questions']
-        
-        ans_dict = resp_row.get('answers', {})
-        total_score = 0
-        count_valid = 0
-        
-        for cat, qs in active_questions.items():
-            for q in qs:
-                q_text = q['q']
-                is_rev = q.get('rev', False)
-                user_ans = ans_dict.get(q_text)
-                
-                if user_ans:
-                    val = None
-                    if user_ans in scale_1: val = 5 if is_rev else 1
-                    elif user_ans in scale_2: val = 4 if is_rev else 2
-                    elif user_ans in scale_3: val = 3 
-                    elif user_ans in scale_4: val = 2 if is_rev else 4
-                    elif user_ans in scale_5: val = 1 if is_rev else 5
-
-                    if val is not None:
-                        total_score += val
-                        count_valid += 1
-                        
-        resp_row['score_calculado'] = round(total_score / count_valid, 2) if count_valid > 0 else 0
-    
-    return all_responses
-
-def process_company_analytics(comp, comp_resps, active_questions):
-    comp['respondidas'] = len(comp_resps)
-    
-    if comp['respondidas'] == 0:
-        comp['score'] = 0.0
-        comp['dimensoes'] = {cat: 0.0 for cat in active_questions.keys()}
-        comp['detalhe_perguntas'] = {}
-        return comp
-
-    dimensoes_totais = {cat: [] for cat in active_questions.keys()}
-    soma_por_pergunta = {} 
-    total_por_pergunta = {}
-    
-    scale_1 = ["Nunca/Quase Nunca", "Nada/Quase Nada", "Muito Insatisfeito", "Deficitária", "Discordo Totalmente"]
-    scale_2 = ["Raramente", "Um pouco", "Insatisfeito", "Razoável", "Discordo"]
-    scale_3 = ["Às vezes", "Moderadamente", "Neutro", "Boa"]
-    scale_4 = ["Frequentemente", "Muito", "Satisfeito", "Muito Boa", "Concordo"]
-    scale_5 = ["Sempre", "Extremamente", "Muito Satisfeito", "Excelente", "Concordo Totalmente"]
-
-    for resp_row in comp_resps:
-        ans_dict = resp_row.get('answers', {})
-        
-        for cat, qs in active_questions.items():
-            for q in qs:
-                q_text = q['q']
-                is_rev = q.get('rev', False)
-                user_ans = ans_dict.get(q_text)
-                
-                if user_ans:
-                    val = None
-                    if user_ans in scale_1: val = 5 if is_rev else 1
-                    elif user_ans in scale_2: val = 4 if is_rev else 2
-                    elif user_ans in scale_3: val = 3 
-                    elif user_ans in scale_4: val = 2 if is_rev else 4
-                    elif user_ans in scale_5: val = 1 if is_rev else 5
-
-                    if val is not None:
-                        dimensoes_totais[cat].append(val)
-                        if q_text not in soma_por_pergunta:
-                            soma_por_pergunta[q_text] = 0
-                            total_por_pergunta[q_text] = 0
-                            
-                        total_por_pergunta[q_text] += 1
-                        soma_por_pergunta[q_text] += val
-
-    dim_averages = {}
-    for cat, vals in dimensoes_totais.items():
-        dim_averages[cat] = round(sum(vals) / len(vals), 1) if vals else 0.0
-
-    detalhe_percent = {}
-    for qt, soma in soma_por_pergunta.items():
-        total = total_por_pergunta[qt]
-        if total > 0:
-            avg_q = soma / total
-            risco_percentual = ((5.0 - avg_q) / 4.0) * 100
-            risco_percentual = max(0, min(100, risco_percentual))
-            detalhe_percent[qt] = int(risco_percentual)
-        else:
-            detalhe_percent[qt] = None
-
-    comp['dimensoes'] = dim_averages
-    vals_validos = [v for v in dim_averages.values() if v > 0]
-    comp['score'] = round(sum(vals_validos) / len(vals_validos), 1) if vals_validos else 0.0
-    comp['detalhe_perguntas'] = detalhe_percent
-    
-    return comp
-
-def load_data_from_db():
-    all_answers = []
-    companies = []
-    
-    if DB_CONNECTED:
-        try:
-            companies = supabase.table('companies').select("*").execute().data
-            all_answers = supabase.table('responses').select("*").execute().data
-            
-            users_raw = supabase.table('admin_users').select("*").execute().data
-            if users_raw:
-                st.session_state.users_db = {u['username']: u for u in users_raw}
-        except Exception as e:
-            pass
-            
-    if not companies:
-        companies = st.session_state.companies_db
-        all_answers = st.session_state.local_responses_db
-        
-    all_answers = calculate_actual_scores(all_answers, companies, st.session_state.methodologies)
-    
-    for c in companies:
-        if 'org_structure' not in c or not c['org_structure']: 
-            c['org_structure'] = {"Geral": ["Geral"]}
-            
-        comp_resps = [r for r in all_answers if str(r['company_id']) == str(c['id'])]
-        metodo_nome = c.get('metodologia', 'HSE-IT (35 itens)')
-        active_questions = st.session_state.methodologies.get(metodo_nome, st.session_state.methodologies['HSE-IT (35 itens)'])['questions']
-        
-        c = process_company_analytics(c, comp_resps, active_questions)
-
-    return companies, all_answers
-
-def generate_real_history(comp_id, all_responses, active_questions, total_vidas):
-    history_dict = {}
-    
-    for r in all_responses:
-        if str(r.get('company_id')) != str(comp_id): 
-            continue
-        
-        created_at = r.get('created_at')
-        if not created_at: 
-            periodo = "Lote Anterior"
-        else:
-            try:
-                dt = datetime.datetime.fromisoformat(created_at.replace('Z', '+00:00'))
-                periodo = dt.strftime('%m/%Y')
-            except Exception:
-                periodo = "Geral"
-            
-        if periodo not in history_dict:
-            history_dict[periodo] = []
-        history_dict[periodo].append(r)
-        
-    history_list = []
-    for period, resps in history_dict.items():
-        comp_mock = {'id': comp_id, 'func': total_vidas}
-        comp_stats = process_company_analytics(comp_mock, resps, active_questions)
-        
-        history_list.append({
-            "periodo": period,
-            "score": comp_stats.get('score', 0),
-            "vidas": total_vidas,
-            "adesao": int((len(resps) / total_vidas) * 100) if total_vidas > 0 else 0,
-            "dimensoes": comp_stats.get('dimensoes', {})
-        })
-        
-    try:
-        history_list.sort(key=lambda x: datetime.datetime.strptime(x['periodo'], '%m/%Y') if '/' in x['periodo'] else datetime.datetime.min)
-    except Exception:
-        pass
-        
-    return history_list
-
-def delete_company(comp_id):
-    if DB_CONNECTED:
-        try:
-            supabase.table('responses').delete().eq('company_id', comp_id).execute()
-            supabase.table('admin_users').delete().eq('linked_company_id', comp_id).execute()
-            supabase.table('companies').delete().eq('id', comp_id).execute()
-        except Exception as e: 
-            st.warning(f"Não foi possível remover no momento: {e}")
-            return
-    
-    st.session_state.companies_db = [c for c in st.session_state.companies_db if str(c['id']) != str(comp_id)]
-    st.success("✅ O Cliente e todos os dados associados foram removidos com sucesso.")
-    time.sleep(1.5)
-    st.rerun()
-
-def delete_user(username):
-    if DB_CONNECTED:
-        try:
-            supabase.table('admin_users').delete().eq('username', username).execute()
-        except Exception as e: 
-            st.error(f"Erro ao remover: {e}")
-    
-    if username in st.session_state.users_db:
-        del st.session_state.users_db[username]
-    
-    st.success(f"✅ O usuário [{username}] foi removido com sucesso!")
-    time.sleep(1)
-    st.rerun()
-
-def kpi_card(title, value, icon, color_class):
-    st.markdown(f"""
-        <div class="kpi-card">
-            <div class="kpi-top">
-                <div class="kpi-icon-box {color_class}">{icon}</div>
-                <div class="kpi-value">{value}</div>
-            </div>
-            <div class="kpi-title">{title}</div>
-        </div>
-    """, unsafe_allow_html=True)
-
-def gerar_analise_robusta(dimensoes):
-    riscos = [k for k, v in dimensoes.items() if v < 3.0 and v > 0]
-    texto = "O presente diagnóstico mapeou os principais indicadores de saúde e bem-estar no ambiente de trabalho da equipe. A avaliação foi baseada em rigorosas metodologias de saúde ocupacional. "
-    
-    if riscos:
-        texto += f"A análise revela que os fatores associados a **{', '.join(riscos)}** requerem atenção especial por parte da liderança, pois apresentam resultados abaixo do recomendável (Score Inferior a 3.0). Quando não gerenciados adequadamente, estes fatores podem contribuir para o aumento do estresse, desgaste emocional e rotatividade na equipe. "
-    else:
-        texto += "Os resultados indicam um ambiente de trabalho globalmente saudável, equilibrado e com bons níveis de proteção e bem-estar. As métricas avaliadas encontram-se dentro de parâmetros muito positivos. "
-    
-    texto += "Recomendamos que as lideranças e a equipe de RH analisem as ações propostas a seguir, procurando aplicar melhorias contínuas para fortalecer ainda mais o clima organizacional."
-    return texto
-
-def gerar_banco_sugestoes(dimensoes):
-    sugestoes = []
-    
-    if dimensoes.get("Demandas", 5) < 3.8 or dimensoes.get("Exigências Laborais (Quantidade e Ritmo)", 5) < 3.8:
-        sugestoes.append({
-            "acao": "Avaliação Ergonômica e Cognitiva da Carga de Trabalho", 
-            "estrat": "Analisar profundamente as rotinas para identificar sobrecargas invisíveis (trabalho cognitivo e emocional intenso), tarefas duplicadas e otimizar a distribuição do trabalho na base.", 
-            "area": "Gestão de Demandas", "resp": "Coordenação de Área", "prazo": "30 a 60 dias"
-        })
-        sugestoes.append({
-            "acao": "Matriz de Prioridades e Redução de Urgências", 
-            "estrat": "Treinar as equipes a organizar melhor o tempo e blindar os colaboradores contra a cultura da urgência, evitando o desgaste contínuo e combatendo 'incêndios diários'.", 
-            "area": "Gestão de Demandas", "resp": "Líderes de Equipe", "prazo": "15 dias"
-        })
-        sugestoes.append({
-            "acao": "Política de Desconexão Digital", 
-            "estrat": "Criar combinados claros com a equipe sobre o respeito absoluto aos horários de descanso, evitando e-mails e mensagens de trabalho fora do expediente contratual.", 
-            "area": "Gestão de Demandas", "resp": "Recursos Humanos", "prazo": "30 dias"
-        })
-        sugestoes.append({
-            "acao": "Rodízio de Tarefas de Alto Desgaste Emocional", 
-            "estrat": "Implementar um sistema de revezamento para colaboradores que lidam constantemente com clientes difíceis ou situações de alta carga emocional, evitando a fadiga e o cinismo.", 
-            "area": "Design do Trabalho", "resp": "Coordenação Operacional", "prazo": "Contínuo"
-        })
-        sugestoes.append({
-            "acao": "Pausas Estratégicas Obrigatórias", 
-            "estrat": "Institucionalizar micropausas de descompressão cognitiva entre blocos intensos de concentração, melhorando a preservação mental da equipe (ex: Técnica Pomodoro aplicada).", 
-            "area": "Saúde Ocupacional", "resp": "SESMT / Liderança", "prazo": "Imediato"
-        })
-        
-    if dimensoes.get("Controle", 5) < 3.8 or dimensoes.get("Organização e Influência", 5) < 3.8:
-        sugestoes.append({
-            "acao": "Job Crafting (Redesenho do Trabalho)", 
-            "estrat": "Autorizar e estimular que o profissional tenha autonomia para remodelar de forma positiva a maneira como executa suas tarefas diárias, respeitando sua forma de produzir.", 
-            "area": "Autonomia e Organização", "resp": "Gestão Direta", "prazo": "90 dias"
-        })
-        sugestoes.append({
-            "acao": "Gestão Focada em Entregas (Resultados vs. Horas)", 
-            "estrat": "Migrar o foco da avaliação baseada em presencialismo (horas em tela) para a qualidade das entregas, fomentando maior responsabilidade e flexibilidade de tempo.", 
-            "area": "Autonomia e Organização", "resp": "Diretoria e Lideranças", "prazo": "Trimestral"
-        })
-        sugestoes.append({
-            "acao": "Comitês de Escuta Ativa para Decisões", 
-            "estrat": "Envolver os profissionais da base em pequenas rodadas de escuta ANTES de tomar decisões top-down sobre softwares, rotinas ou mudanças no ambiente físico.", 
-            "area": "Autonomia e Organização", "resp": "Líderes de Setor", "prazo": "Ad Hoc"
-        })
-        sugestoes.append({
-            "acao": "Programa de Aproveitamento de Talentos", 
-            "estrat": "Mapear habilidades subutilizadas na equipe e criar projetos especiais onde o colaborador possa usar todo seu potencial criativo e técnico.", 
-            "area": "Desenvolvimento", "resp": "T&D (Treinamento)", "prazo": "Plano Anual"
-        })
-        
-    if dimensoes.get("Suporte do Gestor", 5) < 3.8 or dimensoes.get("Suporte dos Colegas", 5) < 3.8 or dimensoes.get("Relações Sociais e Liderança", 5) < 3.8:
-        sugestoes.append({
-            "acao": "Letramento em Liderança Empática e Sensível", 
-            "estrat": "Treinar intensivamente toda a camada de gestão em Inteligência Emocional, Comunicação Não-Violenta (CNV) e condução de equipes com segurança psicológica.", 
-            "area": "Liderança", "resp": "Pessin Gestão / RH", "prazo": "90 dias"
-        })
-        sugestoes.append({
-            "acao": "Reuniões de Check-in (1:1) Focadas no Humano", 
-            "estrat": "Implementar agendas inegociáveis de 1:1 focadas não nas metas da semana, mas em ouvir as dores, a carreira e o bem-estar genuíno do colaborador.", 
-            "area": "Liderança", "resp": "Gestão Direta", "prazo": "Ação Contínua"
-        })
-        sugestoes.append({
-            "acao": "Cultura Constante de Reconhecimento Positivo", 
-            "estrat": "Criar um fórum de elogios abertos ou plataformas onde líderes e colegas valorizam publicamente pequenas vitórias, destruindo a cultura de 'apontar só os erros'.", 
-            "area": "Clima", "resp": "Recursos Humanos", "prazo": "Imediato"
-        })
-        sugestoes.append({
-            "acao": "Programa de Mentoria Institucional (Buddy)", 
-            "estrat": "Designar 'padrinhos' veteranos e acolhedores para acompanhar de perto cada novo colaborador nos primeiros 90 dias, reduzindo a sensação de solidão organizacional.", 
-            "area": "Clima e Acolhimento", "resp": "Recursos Humanos", "prazo": "30 dias"
-        })
-        sugestoes.append({
-            "acao": "Dinâmicas de Fortalecimento de Equipe (Team Building)", 
-            "estrat": "Investir em rituais leves e de descompressão fora do ambiente estrito de trabalho para fortalecer os laços de comunidade, pertencimento e confiança interpessoal.", 
-            "area": "Clima", "resp": "Comunicação Interna", "prazo": "Semestral"
-        })
-
-    if dimensoes.get("Relacionamentos", 5) < 3.8 or dimensoes.get("Ambiente Ofensivo (Últimos 12 meses)", 5) < 3.8 or dimensoes.get("Transparência de Papel e Conflitos", 5) < 3.8:
-        sugestoes.append({
-            "acao": "Política de Tolerância Zero (Assédio e Discriminação)", 
-            "estrat": "Oficializar e divulgar agressivamente um código de conduta inquebrável contra bullying, assédio moral, exclusões ou palavras ofensivas, com consequências rígidas.", 
-            "area": "Compliance e Clima", "resp": "Diretoria e Jurídico", "prazo": "Imediato"
-        })
-        sugestoes.append({
-            "acao": "Canal de Ouvidoria Anônimo e Independente", 
-            "estrat": "Contratar ou disponibilizar uma plataforma terceira 100% blindada para o reporte seguro de assédio ou liderança abusiva, garantindo total ausência de retaliação.", 
-            "area": "Compliance", "resp": "RH Estratégico", "prazo": "60 dias"
-        })
-        sugestoes.append({
-            "acao": "Mediação Profissional de Conflitos Internos", 
-            "estrat": "Frente à identificação de setores 'tóxicos', intervir cirurgicamente com especialistas em mediação de conflito para desfazer panelinhas e resolver quebras de relação.", 
-            "area": "Clima", "resp": "Pessin Gestão / RH", "prazo": "Sob Demanda"
-        })
-        
-    if dimensoes.get("Papel na Empresa", 5) < 3.8 or dimensoes.get("Valores, Justiça e Confiança", 5) < 3.8 or dimensoes.get("Atitude e Satisfação", 5) < 3.8:
-        sugestoes.append({
-            "acao": "Alinhamento Claro de Funções (Job Description Vivo)", 
-            "estrat": "Acabar com as zonas cinzentas de responsabilidade. Documentar e assinar junto com o time o que exatamente é (e o que não é) tarefa daquela posição.", 
-            "area": "Organização", "resp": "Gestores de Área", "prazo": "60 dias"
-        })
-        sugestoes.append({
-            "acao": "Cascateamento de Propósito e Visão", 
-            "estrat": "Liderança de topo deve descer à operação para mostrar, com exemplos claros, como o aperto de um parafuso ou o envio de um e-mail base impacta a vida do cliente final.", 
-            "area": "Sentido do Trabalho", "resp": "Direção Executiva", "prazo": "Trimestral"
-        })
-        sugestoes.append({
-            "acao": "Transparência em Critérios de Promoção e Mérito", 
-            "estrat": "Aumentar a justiça organizacional divulgando abertamente o que é necessário realizar (PDI, metas) para ascender na empresa, evitando promoções percebidas como favoritismo.", 
-            "area": "Justiça e Cultura", "resp": "Recursos Humanos", "prazo": "Plano Anual"
-        })
-        sugestoes.append({
-            "acao": "Fórum de Transparência da Diretoria", 
-            "estrat": "Criar um espaço (Town Hall) onde a gerência abre o jogo sobre as dificuldades, rumos e sucessos da empresa, reduzindo a sensação de que 'escondem informações'.", 
-            "area": "Confiança", "resp": "Diretoria", "prazo": "Semestral"
-        })
-        
-    if dimensoes.get("Gestão de Mudança", 5) < 3.8:
-        sugestoes.append({
-            "acao": "Comunicação Antecipada e Transparente", 
-            "estrat": "Nunca surpreender o time com mudanças que afetam sua rotina. Explicar sempre o 'porquê' da alteração com semanas de antecedência, mitigando a ansiedade natural.", 
-            "area": "Gestão de Mudança", "resp": "Comunicação Interna", "prazo": "Por Projeto"
-        })
-        sugestoes.append({
-            "acao": "Comitê de Embaixadores da Mudança", 
-            "estrat": "Identificar formadores de opinião na operação para testarem novos sistemas primeiro e atuarem como multiplicadores de segurança para os colegas mais resistentes.", 
-            "area": "Gestão de Mudança", "resp": "Líder de Projetos", "prazo": "Por Projeto"
-        })
-
-    if dimensoes.get("Saúde, Bem-estar e Rotina", 5) < 3.8:
-        sugestoes.append({
-            "acao": "Programa Estruturado de Apoio Psicológico", 
-            "estrat": "Firmar parcerias com plataformas terapêuticas subsidiando sessões de psicoterapia, com foco urgente no combate aos altos índices de ansiedade e exaustão emocional.", 
-            "area": "Saúde Mental", "resp": "Benefícios / SESMT", "prazo": "Ação Imediata"
-        })
-        sugestoes.append({
-            "acao": "Workshops de Higiene do Sono e Prevenção ao Burnout", 
-            "estrat": "Trazer profissionais de saúde para ensinar o colaborador a 'desligar' o cérebro à noite e reconhecer em si e nos colegas os sinais precoces da estafa.", 
-            "area": "Saúde Ocupacional", "resp": "T&D e SESMT", "prazo": "Trimestral"
-        })
-        sugestoes.append({
-            "acao": "Políticas Reais de Flexibilidade Familiar", 
-            "estrat": "Apoiar mães/pais na conciliação familiar com horários híbridos reais, auxílio-creche estruturado e respeito a emergências familiares, reduzindo a culpa do trabalhador.", 
-            "area": "Bem-estar (Work-life)", "resp": "RH Institucional", "prazo": "Revisão Anual"
-        })
-        
-    if not sugestoes:
-        sugestoes.append({
-            "acao": "Monitoramento Contínuo com Pesquisas de Pulso", 
-            "estrat": "Não relaxar o acompanhamento. Manter questionários semanais de 3 perguntas na intranet para identificar qualquer micro-fissura no clima rapidamente.", 
-            "area": "Estratégia Geral", "resp": "Recursos Humanos", "prazo": "Contínuo"
-        })
-        sugestoes.append({
-            "acao": "Pacote Avançado de Qualidade de Vida", 
-            "estrat": "Sustentar a boa saúde mental com iniciativas premium: Gympass ativo, massagem rápida, snacks saudáveis, palestras de educação financeira e bem-estar geral.", 
-            "area": "Estratégia Geral", "resp": "Recursos Humanos", "prazo": "Contínuo"
-        })
-        
-    return sugestoes
-
-# ==============================================================================
-# 5. MÓDULO DE TELAS E FLUXOS DA LIDERANÇA / RH
-# ==============================================================================
-
-def login_screen():
-    c1, c2, c3 = st.columns([1, 1.2, 1])
-    with c2:
-        st.markdown("<br><br><br>", unsafe_allow_html=True)
-        st.markdown(f"<div style='text-align:center'>{get_logo_html(250)}</div>", unsafe_allow_html=True)
-        plat_name = st.session_state.platform_config.get('name', 'Sistema')
-        st.markdown(f"<h3 style='text-align:center; color:#555;'>Bem-vindo(a) ao {plat_name}</h3>", unsafe_allow_html=True)
-        st.markdown("<p style='text-align:center; color:gray;'>Acesso exclusivo para Gestores e Consultores</p>", unsafe_allow_html=True)
-        
-        with st.form("login"):
-            user = st.text_input("Seu Usuário de Acesso")
-            pwd = st.text_input("Sua Senha", type="password")
-            
-            if st.form_submit_button("Acessar o Painel", type="primary", use_container_width=True):
-                login_ok = False
-                user_role_type = "Analista"
-                user_credits = 0
-                linked_comp = None
-                
-                if DB_CONNECTED:
-                    try:
-                        res = supabase.table('admin_users').select("*").eq('username', user).eq('password', pwd).execute()
-                        if res.data: 
-                            login_ok = True
-                            user_data = res.data[0]
-                            user_role_type = user_data.get('role', 'Master')
-                            user_credits = user_data.get('credits', 0)
-                            linked_comp = user_data.get('linked_company_id')
-                    except: pass
-                
-                if not login_ok and user in st.session_state.users_db and st.session_state.users_db[user].get('password') == pwd:
-                    login_ok = True
-                    user_data = st.session_state.users_db[user]
-                    user_role_type = user_data.get('role', 'Analista')
-                    user_credits = user_data.get('credits', 0)
-                    linked_comp = user_data.get('linked_company_id')
-                
-                if login_ok:
-                    valid_until = user_data.get('valid_until')
-                    if valid_until and datetime.datetime.today().isoformat() > valid_until:
-                        st.error("🔒 O seu acesso atingiu a data de validade. Por favor, fale conosco para renovar.")
-                    else:
-                        st.session_state.logged_in = True
-                        st.session_state.user_role = 'admin'
-                        
-                        if user == 'admin':
-                            user_role_type = 'Master'
-                            user_credits = 999999
-                        
-                        st.session_state.admin_permission = user_role_type 
-                        st.session_state.user_username = user
-                        st.session_state.user_credits = user_credits
-                        st.session_state.user_linked_company = linked_comp
-                        
-                        st.rerun()
-                else: 
-                    st.error("⚠️ Não conseguimos encontrar este usuário ou a senha está incorreta. Tente novamente.")
-                    
-
-def admin_dashboard():
-    companies_data, responses_data = load_data_from_db()
-    
-    perm = st.session_state.admin_permission
-    curr_user = st.session_state.user_username
-    
-    if perm == "Gestor":
-        visible_companies = [c for c in companies_data if c.get('owner') == curr_user]
-    elif perm == "Analista":
-        linked_id = st.session_state.user_linked_company
-        visible_companies = [c for c in companies_data if c['id'] == linked_id]
-    else: 
-        visible_companies = companies_data
-
-    total_used_by_user = sum(c.get('respondidas', 0) for c in visible_companies) if perm != "Analista" else (visible_companies[0].get('respondidas', 0) if visible_companies else 0)
-    credits_left = st.session_state.user_credits - total_used_by_user
-
-    menu_options = ["Visão Geral", "Links de Pesquisa", "Relatórios e Laudos", "Histórico de Evolução"]
-    if perm in ["Master", "Gestor"]:
-        menu_options.insert(1, "Clientes (Empresas)")
-        menu_options.insert(2, "Setores e Cargos")
-    if perm == "Master":
-        menu_options.append("Configurações")
-
-    icons_map = {
-        "Visão Geral": "grid", 
-        "Clientes (Empresas)": "building", 
-        "Setores e Cargos": "list-task", 
-        "Links de Pesquisa": "link-45deg", 
-        "Relatórios e Laudos": "file-text", 
-        "Histórico de Evolução": "clock-history", 
-        "Configurações": "gear"
-    }
-
-    with st.sidebar:
-        st.markdown(f"<div style='text-align:center; margin-bottom:30px; margin-top:20px;'>{get_logo_html(160)}</div>", unsafe_allow_html=True)
-        st.caption(f"Bem-vindo(a), **{curr_user}** <br> Perfil: **{perm}**", unsafe_allow_html=True)
-        
-        if perm != "Master":
-            st.info(f"💳 Avaliações Disponíveis: {credits_left}")
-
-        selected = option_menu(
-            menu_title=None, 
-            options=menu_options, 
-            icons=[icons_map[o] for o in menu_options], 
-            default_index=0, 
-            styles={"nav-link-selected": {"background-color": COR_PRIMARIA}}
-        )
-        st.markdown("---")
-        if st.button("🚪 Sair com Segurança", use_container_width=True): 
-            logout()
-
-    if selected == "Visão Geral":
-        st.title("Visão Geral do Sistema")
-        
-        lista_empresas_filtro = ["Todas as Empresas"] + [c['razao'] for c in visible_companies]
-        empresa_filtro = st.selectbox("Selecione os dados que deseja visualizar:", lista_empresas_filtro)
-        
-        if empresa_filtro != "Todas as Empresas":
-            companies_filtered = [c for c in visible_companies if c['razao'] == empresa_filtro]
-            target_id = companies_filtered[0]['id']
-            responses_filtered = [r for r in responses_data if str(r['company_id']) == str(target_id)]
-        else:
-            companies_filtered = visible_companies
-            ids_visiveis = [str(c['id']) for c in visible_companies]
-            responses_filtered = [r for r in responses_data if str(r['company_id']) in ids_visiveis]
-
-        total_resp_view = len(responses_filtered)
-        total_vidas_view = sum(c.get('func', 0) for c in companies_filtered)
-        
-        # --- CÁLCULO INTELIGENTE DOS ALERTAS DE RISCO, EXPIRAÇÃO E ADESÃO ---
-        alertas_risco = sum(1 for c in companies_filtered if 0 < c.get('score', 0) < 3.0)
-        
-        hoje = datetime.date.today()
-        empresas_expirando = []
-        empresas_baixa_adesao = []
-
-        for c in companies_filtered:
-            # Checa Vencimento do Link
-            if c.get('valid_until'):
-                try:
-                    data_limite = datetime.date.fromisoformat(c['valid_until'])
-                    dias_restantes = (data_limite - hoje).days
-                    # Consideramos "Aviso" se expirar nos próximos 7 dias
-                    if 0 <= dias_restantes <= 7:
-                        empresas_expirando.append((c['razao'], dias_restantes))
-                except: pass
-                
-            # Checa Adesão Mínima de 70%
-            func = c.get('func', 1)
-            resp = c.get('respondidas', 0)
-            adesao = (resp / func) * 100 if func > 0 else 0
-            if adesao > 0 and adesao < 70:
-                empresas_baixa_adesao.append((c['razao'], adesao))
-        
-        # --- RENDERIZAÇÃO DOS KPIS TOP ---
-        col1, col2, col3, col4 = st.columns(4)
-        if perm == "Analista":
-            with col1: kpi_card("Total de Colaboradores", total_vidas_view, "👥", "bg-blue")
-            with col2: kpi_card("Respostas Recebidas", total_resp_view, "✅", "bg-green")
-            with col3: kpi_card("Avaliações Disponíveis", credits_left, "💳", "bg-orange") 
-        else:
-            with col1: kpi_card("Empresas Ativas", len(companies_filtered), "🏢", "bg-blue")
-            with col2: kpi_card("Respostas Recebidas", total_resp_view, "✅", "bg-green")
-            if perm == "Master": 
-                with col3: kpi_card("Total de Vidas Mapeadas", total_vidas_view, "👥", "bg-orange") 
-            else: 
-                with col3: kpi_card("Avaliações Disponíveis", credits_left, "💳", "bg-orange")
-
-        with col4: kpi_card("Score Global Crítico", alertas_risco, "🚨", "bg-red")
-        
-        # --- BANNER DE ALERTAS E PENDÊNCIAS (Inteligência RH) ---
-        if alertas_risco > 0 or empresas_expirando or empresas_baixa_adesao:
-            st.markdown("<div class='chart-container'>", unsafe_allow_html=True)
-            st.markdown("##### ⚠️ Painel de Alertas e Pendências Operacionais")
-            
-            if empresas_expirando:
-                for emp, dias in empresas_expirando:
-                    st.warning(f"⏳ **Prazo Perto de Expirar:** A pesquisa da empresa **{emp}** encerra em **{dias} dias**. Lembre-se de verificar o volume e solicitar extensão se necessário.")
-            
-            if empresas_baixa_adesao:
-                st.info(f"📊 **Amostragem Insuficiente:** **{len(empresas_baixa_adesao)} empresa(s)** estão com coletas em andamento, mas ainda não atingiram a marca de segurança estatística (**70%** de adesão da população).")
-            
-            if alertas_risco > 0:
-                st.error(f"❤️‍🩹 **Risco de Saúde Ocupacional:** Identificamos **{alertas_risco} empresa(s)** que apresentam um Score Geral na Zona Crítica (Abaixo de 3.0 na média).")
-                
-            st.markdown("</div>", unsafe_allow_html=True)
-
-        st.markdown("<br>", unsafe_allow_html=True)
-        c1, c2 = st.columns([1, 1.5])
-        
-        with c1:
-            st.markdown("<div class='chart-container'>", unsafe_allow_html=True)
-            st.markdown("##### Média Geral por Dimensão (Radar)")
-            
-            if companies_filtered and total_resp_view > 0:
-                metodo_predominante = companies_filtered[0].get('metodologia', 'HSE-IT (35 itens)')
-                comps_validas = [c for c in companies_filtered if c.get('metodologia', 'HSE-IT (35 itens)') == metodo_predominante]
-                categories = list(st.session_state.methodologies[metodo_predominante]['questions'].keys())
-                
-                avg_dims = {cat: 0 for cat in categories}
-                count_comps_with_data = 0
-                
-                for c in comps_validas:
-                    if c.get('respondidas', 0) > 0:
-                        count_comps_with_data += 1
-                        for cat in categories: 
-                            avg_dims[cat] += c['dimensoes'].get(cat, 0)
-                
-                valores_radar = [round(avg_dims[cat]/count_comps_with_data, 1) for cat in categories] if count_comps_with_data > 0 else [0]*len(categories)
-
-                fig_radar = go.Figure(go.Scatterpolar(r=valores_radar, theta=categories, fill='toself', name='Média Global', line_color=COR_SECUNDARIA))
-                fig_radar.update_layout(polar=dict(radialaxis=dict(visible=True, range=[0, 5])), height=300, margin=dict(t=20, b=20))
-                st.plotly_chart(fig_radar, use_container_width=True)
-                st.caption(f"Metodologia Ativa: **{metodo_predominante}**")
-            else: 
-                st.info("Aguardando novas respostas para gerar o gráfico.")
-            st.markdown("</div>", unsafe_allow_html=True)
-            
-        with c2:
-            st.markdown("<div class='chart-container'>", unsafe_allow_html=True)
-            st.markdown("##### Média de Saúde Ocupacional por Setor")
-            if responses_filtered:
-                df_resp = pd.DataFrame(responses_filtered)
-                
-                if 'setor' in df_resp.columns and 'score_calculado' in df_resp.columns:
-                    df_setor = df_resp.groupby('setor')['score_calculado'].mean().reset_index()
-                    fig_bar = px.bar(
-                        df_setor, 
-                        x='setor', 
-                        y='score_calculado', 
-                        title="Comparativo entre Áreas", 
-                        color='score_calculado', 
-                        color_continuous_scale='RdYlGn', 
-                        range_y=[0, 5]
-                    )
-                    st.plotly_chart(fig_bar, use_container_width=True)
-                else: 
-                    st.info("Sem dados suficientes de setores para processar.")
-            else: 
-                st.info("Aguardando as respostas dos colaboradores para formar o gráfico de barras.")
-            st.markdown("</div>", unsafe_allow_html=True)
-        
-        c3, c4 = st.columns([1.5, 1])
-        with c3:
-             st.markdown("<div class='chart-container'>", unsafe_allow_html=True)
-             st.markdown("##### Status Científico das Avaliações (Regra dos 70%)")
-             if companies_filtered:
-                 status_dist = {"Amostra Validada (≥ 70%)": 0, "Amostra Insuficiente (< 70%)": 0}
-                 for c in companies_filtered:
-                     func = c.get('func', 1)
-                     resp = c.get('respondidas', 0)
-                     adesao = (resp / func) * 100 if func > 0 else 0
-                     
-                     if adesao >= 70: 
-                         status_dist["Amostra Validada (≥ 70%)"] += 1
-                     else: 
-                         status_dist["Amostra Insuficiente (< 70%)"] += 1
-                 
-                 fig_pie = px.pie(names=list(status_dist.keys()), values=list(status_dist.values()), hole=0.6, color_discrete_sequence=[COR_RISCO_BAIXO, COR_RISCO_MEDIO])
-                 fig_pie.update_layout(height=250, margin=dict(t=0, b=0, l=0, r=0))
-                 st.plotly_chart(fig_pie, use_container_width=True)
-                 st.caption("Gráfico mapeia quantas empresas já atingiram a taxa de segurança estatística para emissão do Laudo final.")
-             else: 
-                 st.info("Cadastre uma empresa para visualizar este gráfico.")
-             st.markdown("</div>", unsafe_allow_html=True)
-
-    elif selected == "Clientes (Empresas)":
-        st.title("Gestão de Clientes")
-        
-        if st.session_state.edit_mode:
-            st.markdown("<div class='chart-container'>", unsafe_allow_html=True)
-            st.subheader("✏️ Editar os Dados do Cliente")
-            target_id = st.session_state.edit_id
-            emp_edit = next((c for c in visible_companies if c['id'] == target_id), None)
-            
-            if emp_edit:
-                with st.form("edit_form"):
-                    c1, c2, c3 = st.columns(3)
-                    new_razao = c1.text_input("Razão Social", value=emp_edit['razao'])
-                    new_cnpj = c2.text_input("CNPJ", value=emp_edit.get('cnpj',''))
-                    new_cnae = c3.text_input("CNAE", value=emp_edit.get('cnae',''))
-                    
-                    c4, c5, c6 = st.columns(3)
-                    risco_opts = [1, 2, 3, 4]
-                    idx_risco = risco_opts.index(emp_edit.get('risco',1)) if emp_edit.get('risco',1) in risco_opts else 0
-                    new_risco = c4.selectbox("Grau de Risco (1 a 4)", risco_opts, index=idx_risco)
-                    new_func = c5.number_input("Número de Colaboradores (Vidas)", min_value=1, value=emp_edit.get('func',100))
-                    new_limit = c6.number_input("Limite de Questionários (Cota)", min_value=1, value=emp_edit.get('limit_evals', 100))
-                    
-                    seg_opts = ["GHE", "Setor", "GES"]
-                    idx_seg = seg_opts.index(emp_edit.get('segmentacao','GHE')) if emp_edit.get('segmentacao','GHE') in seg_opts else 0
-                    new_seg = c6.selectbox("Tipo de Segmentação", seg_opts, index=idx_seg)
-                    
-                    c7, c8, c9 = st.columns(3)
-                    new_resp = c7.text_input("Nome do Responsável (RH/Líder)", value=emp_edit.get('resp',''))
-                    new_email = c8.text_input("E-mail do Responsável", value=emp_edit.get('email',''))
-                    new_tel = c9.text_input("Telefone", value=emp_edit.get('telefone',''))
-                    
-                    new_end = st.text_input("Endereço Completo", value=emp_edit.get('endereco',''))
-                    
-                    val_atual = datetime.date.today() + datetime.timedelta(days=365)
-                    if emp_edit.get('valid_until'):
-                        try: val_atual = datetime.date.fromisoformat(emp_edit['valid_until'])
-                        except: pass
-                    new_valid = st.date_input("Validade do Link de Pesquisa:", value=val_atual)
-                    
-                    # Carrega a configuração atual de CPF da empresa (se houver, senao True)
-                    current_cpf_req = emp_edit.get('org_structure', {}).get('_exigir_cpf', True) if isinstance(emp_edit.get('org_structure'), dict) else True
-                    new_exigir_cpf = st.checkbox("🔒 Exigir CPF para evitar respostas duplicadas (Recomendado)", value=current_cpf_req)
-                    
-                    if st.form_submit_button("💾 Guardar Alterações", type="primary"):
-                        updated_org = emp_edit.get('org_structure', {})
-                        if not isinstance(updated_org, dict):
-                            updated_org = {"Geral": ["Geral"]}
-                        updated_org['_exigir_cpf'] = new_exigir_cpf
-                        
-                        update_dict = {
-                            'razao': new_razao, 'cnpj': new_cnpj, 'cnae': new_cnae, 
-                            'risco': new_risco, 'func': new_func, 'segmentacao': new_seg, 
-                            'resp': new_resp, 'email': new_email, 'telefone': new_tel, 
-                            'endereco': new_end, 'limit_evals': new_limit, 'valid_until': new_valid.isoformat(),
-                            'org_structure': updated_org
-                        }
-                        
-                        if DB_CONNECTED:
-                            try: 
-                                supabase.table('companies').update(update_dict).eq('id', target_id).execute()
-                            except Exception as e: 
-                                st.warning(f"Erro ao salvar na nuvem: {e}")
-                        
-                        emp_edit.update(update_dict)
-                        st.session_state.edit_mode = False
-                        st.session_state.edit_id = None
-                        st.success("✅ Os dados do cliente foram atualizados com sucesso.")
-                        time.sleep(1)
-                        st.rerun()
-                        
-                if st.button("⬅️ Cancelar e Voltar"): 
-                    st.session_state.edit_mode = False
-                    st.rerun()
-            else:
-                st.error("Desculpe, perdemos a referência deste cliente. Por favor, atualize a página.")
-        
-        else:
-            tab1, tab2 = st.tabs(["📋 Clientes Cadastrados", "➕ Cadastrar Novo Cliente"])
-            with tab1:
-                if not visible_companies: 
-                    st.info("Ainda não existem clientes na sua lista. Comece a criar adicionando no botão acima.")
-                
-                for emp in visible_companies:
-                    with st.expander(f"🏢 {emp['razao']}"):
-                        c1, c2, c3, c4 = st.columns(4)
-                        c1.write(f"**CNPJ:** {emp.get('cnpj','')}")
-                        c3.info(f"**Metodologia:** {emp.get('metodologia', 'HSE-IT (35 itens)')}")
-                        
-                        # Indicador de 70% na aba Clientes
-                        func_t = emp.get('func', 1)
-                        resp_t = emp.get('respondidas', 0)
-                        adesao_pct = (resp_t / func_t) * 100 if func_t > 0 else 0
-                        
-                        c2.write(f"**Adesão Atual:** {adesao_pct:.1f}%")
-                        if adesao_pct >= 70:
-                            c2.markdown(f"<span style='color:{COR_RISCO_BAIXO}; font-size:12px; font-weight:bold;'>✅ Amostra Válida</span>", unsafe_allow_html=True)
-                        else:
-                            c2.markdown(f"<span style='color:{COR_RISCO_MEDIO}; font-size:12px; font-weight:bold;'>⚠️ Abaixo dos 70%</span>", unsafe_allow_html=True)
-
-                        c4_1, c4_2 = c4.columns(2)
-                        if c4_1.button("✏️ Editar", key=f"ed_{emp['id']}"): 
-                             st.session_state.edit_mode = True
-                             st.session_state.edit_id = emp['id']
-                             st.rerun()
-                        
-                        if perm == "Master":
-                            if c4_2.button("🗑️ Remover", key=f"del_{emp['id']}"): 
-                                delete_company(emp['id'])
-            
-            with tab2:
-                st.markdown("<div class='chart-container'>", unsafe_allow_html=True)
-                with st.form("add_comp_form_gigante"):
-                    if credits_left <= 0 and perm != "Master":
-                        st.error("🚫 O seu plano atingiu o limite de avaliações disponíveis. Fale conosco para adquirir mais.")
-                        st.form_submit_button("Ação Bloqueada", disabled=True)
-                    else:
-                        st.write("### Dados da Empresa")
-                        c1, c2, c3 = st.columns(3)
-                        razao = c1.text_input("Razão Social")
-                        cnpj = c2.text_input("CNPJ")
-                        cnae = c3.text_input("CNAE")
-                        
-                        c4, c5, c6, c_met = st.columns(4)
-                        risco = c4.selectbox("Grau de Risco (1 a 4)", [1,2,3,4])
-                        func = c5.number_input("Número de Colaboradores (Vidas)", min_value=1)
-                        limit_evals = c6.number_input("Limite de Questionários (Cota)", min_value=1, max_value=credits_left if perm!="Master" else 99999, value=min(100, credits_left if perm!="Master" else 100))
-                        
-                        metodologia_selecionada = c_met.selectbox("Metodologia de Avaliação", list(st.session_state.methodologies.keys()), help="Escolha qual a base de perguntas que fará sentido para a realidade deste cliente.")
-
-                        st.write("### Dados de Contato e Acesso")
-                        c7, c8, c9 = st.columns(3)
-                        segmentacao = c7.selectbox("Tipo de Segmentação", ["GHE", "Setor", "GES"])
-                        resp = c8.text_input("Nome do Responsável (RH/Líder)")
-                        email = c9.text_input("E-mail do Responsável")
-                        
-                        c10, c11, c12 = st.columns(3)
-                        tel = c10.text_input("Telefone")
-                        valid_date = c11.date_input("Validade do Link de Pesquisa:", value=datetime.date.today() + datetime.timedelta(days=365))
-                        c12.info("O sistema criará um link seguro automaticamente.")
-                        
-                        end = st.text_input("Endereço Completo")
-                        logo_cliente = st.file_uploader("Logotipo do Cliente (Opcional - Formatos PNG ou JPG)", type=['png', 'jpg', 'jpeg'])
-                        
-                        st.markdown("---")
-                        st.write("### Privacidade da Pesquisa")
-                        exigir_cpf = st.checkbox("🔒 Exigir CPF do colaborador para evitar respostas duplicadas (O dado será criptografado no banco para garantir o anonimato)", value=True)
-                        
-                        st.markdown("---")
-                        st.write("### Acesso Exclusivo para o Cliente (Portal do Analista)")
-                        st.caption("Crie aqui um acesso para que a equipe de RH do cliente possa visualizar os seus próprios resultados e dashboards.")
-                        u_login = st.text_input("Usuário de Acesso")
-                        u_pass = st.text_input("Senha de Acesso", type="password")
-
-                        if st.form_submit_button("✅ Salvar Cadastro e Gerar Link", type="primary"):
-                            if not razao: 
-                                st.error("⚠️ Preencha pelo menos a Razão Social da empresa para podermos avançar.")
-                            else:
-                                cod = str(uuid.uuid4())[:8].upper()
-                                logo_str = image_to_base64(logo_cliente)
-                                
-                                org_structure_dict = {"Geral": ["Geral"], "_exigir_cpf": exigir_cpf}
-                                
-                                new_c = {
-                                    "id": cod, 
-                                    "razao": razao, 
-                                    "cnpj": cnpj, 
-                                    "cnae": cnae, 
-                                    "setor": "Geral", 
-                                    "risco": risco, 
-                                    "func": func, 
-                                    "limit_evals": limit_evals, 
-                                    "metodologia": metodologia_selecionada,
-                                    "segmentacao": segmentacao, 
-                                    "resp": resp, 
-                                    "email": email, 
-                                    "telefone": tel, 
-                                    "endereco": end, 
-                                    "valid_until": valid_date.isoformat(), 
-                                    "logo_b64": logo_str, 
-                                    "score": 0.0, 
-                                    "respondidas": 0, 
-                                    "owner": curr_user, 
-                                    "dimensoes": {}, 
-                                    "detalhe_perguntas": {}, 
-                                    "org_structure": org_structure_dict
-                                }
-                                
-                                error_msg = None
-                                if DB_CONNECTED:
-                                    try:
-                                        supabase.table('companies').insert(new_c).execute()
-                                        
-                                        if u_login and u_pass:
-                                            supabase.table('admin_users').insert({
-                                                "username": u_login, 
-                                                "password": u_pass, 
-                                                "role": "Analista", 
-                                                "credits": limit_evals, 
-                                                "valid_until": valid_date.isoformat(), 
-                                                "linked_company_id": cod
-                                            }).execute()
-                                    except Exception as e: 
-                                        error_msg = str(e)
-                                
-                                st.session_state.companies_db.append(new_c)
-                                
-                                if error_msg: 
-                                    st.warning(f"⚠️ Atenção: Salvo apenas localmente devido a uma falha na internet: {error_msg}")
-                                else: 
-                                    st.success(f"🎉 Fantástico! O cliente foi cadastrado com sucesso.")
-                                
-                                time.sleep(2.5)
-                                st.rerun()
-                st.markdown("</div>", unsafe_allow_html=True)
-
-    elif selected == "Setores e Cargos":
-        st.title("Gestão de Setores e Cargos")
-        if not visible_companies: 
-            st.warning("⚠️ Precisa primeiro cadastrar um cliente antes de organizar os setores."); return
-        
-        empresa_nome = st.selectbox("Selecione a empresa para configurar os setores:", [c['razao'] for c in visible_companies])
-        empresa = next((c for c in visible_companies if c['razao'] == empresa_nome), None)
-        
-        if empresa is not None:
-            if 'org_structure' not in empresa or not isinstance(empresa['org_structure'], dict): 
-                empresa['org_structure'] = {"Geral": ["Geral"]}
-            
-            # Filtra chaves de configuração invisíveis do layout
-            setores_existentes = [k for k in empresa['org_structure'].keys() if not k.startswith('_')]
-            
-            c1, c2 = st.columns(2)
-            with c1:
-                st.markdown("<div class='chart-container'>", unsafe_allow_html=True)
-                st.subheader("1. Criar ou Remover Setores")
-                new_setor = st.text_input("Nome do Novo Setor")
-                if st.button("➕ Adicionar Setor", type="primary"):
-                    if new_setor and new_setor not in empresa['org_structure']:
-                        empresa['org_structure'][new_setor] = []
-                        if DB_CONNECTED:
-                            try: 
-                                supabase.table('companies').update({"org_structure": empresa['org_structure']}).eq('id', empresa['id']).execute()
-                            except: pass
-                        st.success(f"O setor '{new_setor}' foi criado!")
-                        time.sleep(1); st.rerun()
-                
-                st.markdown("---")
-                setor_remover = st.selectbox("Selecione o setor para remover", setores_existentes)
-                if st.button("🗑️ Remover Setor"):
-                    del empresa['org_structure'][setor_remover]
-                    if DB_CONNECTED:
-                         try: 
-                             supabase.table('companies').update({"org_structure": empresa['org_structure']}).eq('id', empresa['id']).execute()
-                         except: pass
-                    st.success("Setor removido com sucesso.")
-                    time.sleep(1); st.rerun()
-                st.markdown("</div>", unsafe_allow_html=True)
-
-            with c2:
-                st.markdown("<div class='chart-container'>", unsafe_allow_html=True)
-                st.subheader("2. Cargos Atrelados ao Setor")
-                setor_sel = st.selectbox("Selecione o setor para configurar os cargos:", setores_existentes, key="sel_setor_cargos")
-                if setor_sel:
-                    df_cargos = pd.DataFrame({"Cargo": empresa['org_structure'][setor_sel]})
-                    edited_cargos = st.data_editor(df_cargos, num_rows="dynamic", key="editor_cargos", use_container_width=True)
-                    if st.button("💾 Salvar Lista de Cargos", type="primary"):
-                        lista_nova = edited_cargos["Cargo"].dropna().tolist()
-                        empresa['org_structure'][setor_sel] = lista_nova
-                        if DB_CONNECTED:
-                             try: 
-                                 supabase.table('companies').update({"org_structure": empresa['org_structure']}).eq('id', empresa['id']).execute()
-                             except: pass
-                        st.success("A lista de cargos foi atualizada e guardada.")
-                st.markdown("</div>", unsafe_allow_html=True)
-
-    elif selected == "Links de Pesquisa":
-        st.title("Links de Pesquisa e Convites")
-        if not visible_companies: 
-            st.warning("⚠️ Precisa primeiro cadastrar um cliente antes de gerar o link."); return
-            
-        with st.container():
-            st.markdown("<div class='chart-container'>", unsafe_allow_html=True)
-            empresa_nome = st.selectbox("Selecione a empresa:", [c['razao'] for c in visible_companies])
-            empresa = next(c for c in visible_companies if c['razao'] == empresa_nome)
-            
-            base_url = st.session_state.platform_config.get('base_url', 'https://elonr01-cris.streamlit.app').rstrip('/')
-            link_final = f"{base_url}/?cod={empresa['id']}"
-            
-            c1, c2 = st.columns([2, 1])
-            with c1:
-                st.markdown("##### Link de Acesso para os Colaboradores")
-                st.markdown(f"<div style='background-color: #f8f9fa; border: 1px dashed #dee2e6; padding: 15px; border-radius: 8px; font-family: monospace; color: #2c3e50; font-weight: bold; word-break: break-all; margin-bottom: 5px;'>{link_final}</div>", unsafe_allow_html=True)
-                
-                # BOTÃO DE CÓPIA DO LINK VIA COMPONENTE HTML
-                st.components.v1.html(get_copy_button_html(link_final, "📋 Copiar Link Oficial"), height=55)
-                
-                limit = empresa.get('limit_evals', 999999)
-                usadas = empresa.get('respondidas', 0)
-                func_t = empresa.get('func', 1)
-                
-                # Barra de Progresso visual para os 70%
-                adesao_pct = (usadas / func_t) * 100 if func_t > 0 else 0
-                st.progress(min(adesao_pct / 100.0, 1.0))
-                
-                if adesao_pct >= 70:
-                    st.success(f"✅ Amostra Estatística Validada! ({adesao_pct:.1f}% de adesão alcançada)")
-                else:
-                    faltam = max(0, int(func_t * 0.7) - usadas)
-                    st.warning(f"⚠️ Amostra Parcial: {adesao_pct:.1f}%. Faltam cerca de {faltam} respostas para atingir a margem de segurança de 70%.")
-
-                val = empresa.get('valid_until', '-')
-                try: val = datetime.date.fromisoformat(val).strftime('%d/%m/%Y')
-                except: pass
-                st.caption(f"📅 O Link será válido até: {val} | 🧠 Matriz de Pesquisa: {empresa.get('metodologia', 'HSE-IT')}")
-                
-                if st.button("👁️ Visualizar Pesquisa (Como o colaborador verá)"):
-                    st.session_state.current_company = empresa
-                    st.session_state.logged_in = True
-                    st.session_state.user_role = 'colaborador'
-                    st.rerun()
-            with c2:
-                st.markdown("##### QR Code de Acesso")
-                qr_api_url = f"https://api.qrserver.com/v1/create-qr-code/?size=300x300&data={urllib.parse.quote(link_final)}"
-                st.image(qr_api_url, width=150)
-                st.markdown(f"[📥 Baixar QR Code]({qr_api_url})")
-            st.markdown("</div>", unsafe_allow_html=True)
-            
-            st.markdown("<div class='chart-container'>", unsafe_allow_html=True)
-            st.markdown("##### 💬 Sugestão de Mensagem de Convite (WhatsApp / E-mail)")
-            texto_convite = f"""Olá, equipe da {empresa['razao']}! 👋
-
-Cuidar dos nossos resultados é muito importante, mas nada disso faz sentido se não cuidarmos, em primeiro lugar, de quem faz tudo acontecer: vocês.
-
-Para construirmos um ambiente de trabalho cada vez melhor, mais leve e saudável, precisamos muito da ajuda e transparência de vocês. Estamos lançando a nossa Pesquisa de Clima e Bem-Estar no Trabalho. 
-
-🧠 **Por que a participação de vocês é tão importante?**
-O dia a dia de vocês importa. Muitas vezes o estresse ou a sobrecarga são invisíveis. Responder a este breve questionário permite que a gente veja exatamente onde podemos melhorar, criar novas iniciativas de apoio e corrigir aquilo que não está funcionando tão bem. É a sua voz guiando o nosso trabalho.
-
-🔒 **Privacidade 100% Garantida**
-Compreendemos que falar sobre o ambiente de trabalho requer total confiança. Por isso:
-- **Anonimato Total:** Utilizamos um sistema seguro onde nenhuma resposta individual consegue ser ligada à pessoa. 
-- **Foco na Equipe:** Os resultados chegam até a gestão apenas em formato de gráficos e médias do grupo todo, nunca individuais. Sintam-se perfeitamente seguros e à vontade para serem 100% sinceros.
-
-🚀 **Como participar?**
-A avaliação leva apenas cerca de 7 minutos. Cliquem no link seguro abaixo através do seu celular ou computador:
-
-🔗 Acessar a Pesquisa: {link_final}
-
-Agradecemos imensamente o seu tempo e o seu compartilhamento. Só com a sua honestidade é que conseguiremos fazer do nosso espaço, um lugar cada vez melhor para todos.
-
-Atenciosamente,
-Equipe de Recursos Humanos e Liderança"""
-            
-            # Caixa de edição do texto, capturando sempre a versão atual
-            texto_editado = st.text_area("Você pode editar o modelo abaixo antes de copiar e enviar aos colaboradores:", value=texto_convite, height=450)
-            
-            # BOTÃO DE CÓPIA DO TEXTO VIA COMPONENTE HTML
-            st.components.v1.html(get_copy_button_html(texto_editado, "📋 Copiar Mensagem de Convite"), height=55)
-            
-            st.markdown("</div>", unsafe_allow_html=True)
-
-    elif selected == "Relatórios e Laudos":
-        st.title("Geração de Relatórios e Laudos Técnicos")
-        if not visible_companies: 
-            st.warning("É preciso ter empresas cadastradas e com respostas para emitir um relatório."); return
-            
-        c_sel, c_blank = st.columns([1, 1])
-        with c_sel:
-            empresa_sel = st.selectbox("Selecione a empresa para gerar o relatório:", [e['razao'] for e in visible_companies])
-        
-        empresa = next(e for e in visible_companies if e['razao'] == empresa_sel)
-        metodo_ativo = empresa.get('metodologia', 'HSE-IT (35 itens)')
-        
-        with st.sidebar:
-            st.markdown("---")
-            st.markdown("#### Assinaturas do Relatório")
-            sig_empresa_nome = st.text_input("Nome do Responsável (Cliente)", value=empresa.get('resp',''))
-            sig_empresa_cargo = st.text_input("Cargo do Responsável", value="Direção")
-            sig_tecnico_nome = st.text_input("Nome do Consultor Técnico (Você)", value="Cristiane Cardoso Lima")
-            sig_tecnico_cargo = st.text_input("Cargo do Consultor", value="Consultoria em Saúde Mental e RH - Pessin Gestão")
-
-        dimensoes_atuais = empresa.get('dimensoes', {})
-        analise_auto = gerar_analise_robusta(dimensoes_atuais)
-        sugestoes_auto = gerar_banco_sugestoes(dimensoes_atuais)
-        
-        if st.session_state.acoes_list is None: 
-            st.session_state.acoes_list = []
-            
-        if not st.session_state.acoes_list and sugestoes_auto:
-            for s in sugestoes_auto: 
-                st.session_state.acoes_list.append({
-                    "acao": s['acao'], 
-                    "estrat": s['estrat'], 
-                    "area": s['area'], 
-                    "resp": "A Definir em Reunião", 
-                    "prazo": "30 a 60 dias"
-                })
-        
-        html_act = ""
-        if st.session_state.acoes_list:
-            for item in st.session_state.acoes_list:
-                html_act += f"<tr><td>{item.get('acao','')}</td><td>{item.get('estrat','')}</td><td>{item.get('area','')}</td><td>{item.get('resp','')}</td><td>{item.get('prazo','')}</td></tr>"
-        else:
-            html_act = "<tr><td colspan='5' style='text-align:center;'>Nenhuma ação definida no plano.</td></tr>"
-
-        with st.expander("📝 Personalização do Relatório e Plano de Ação", expanded=True):
-            st.markdown("##### 1. Parecer Técnico Conclusivo")
-            analise_texto = st.text_area("Adapte este texto com a sua avaliação técnica. É ele que irá constar na conclusão principal do Laudo entregue ao cliente:", value=analise_auto, height=150)
-            
-            st.markdown("---")
-            st.markdown("##### 2. Banco de Sugestões para o Plano de Ação")
-            opcoes_formatadas = [f"[{s['area']}] {s['acao']}: {s['estrat']}" for s in sugestoes_auto]
-            selecionadas = st.multiselect("Selecione ações recomendadas para adicionar ao plano do cliente:", options=opcoes_formatadas)
-            if st.button("⬇️ Adicionar Ações Selecionadas ao Plano", type="secondary"):
-                novas = []
-                for item_str in selecionadas:
-                    for s in sugestoes_auto:
-                        if f"[{s['area']}] {s['acao']}: {s['estrat']}" == item_str:
-                            novas.append({
-                                "acao": s['acao'], 
-                                "estrat": s['estrat'], 
-                                "area": s['area'], 
-                                "resp": "Liderança e RH", 
-                                "prazo": "Acompanhamento em 90 dias"
-                            })
-                st.session_state.acoes_list.extend(novas)
-                st.success("Táticas de gestão adicionadas com sucesso à lista!")
-                st.rerun()
-                
-            st.markdown("##### 3. Plano de Ação Estratégico (Editável)")
-            st.info("Edite os campos abaixo com dois cliques rápidos. Você pode alterar prazos, responsáveis, e adicionar novas linhas na última aba em branco para moldar o plano perfeitamente ao cliente. O que escrever aqui irá diretamente para o PDF.")
-            
-            edited_df = st.data_editor(
-                pd.DataFrame(st.session_state.acoes_list), 
-                num_rows="dynamic", 
-                use_container_width=True, 
-                column_config={
-                    "acao": "Título Específico da Ação Macro", 
-                    "estrat": st.column_config.TextColumn("Estratégia e Execução Desdobrada", width="large"), 
-                    "area": "Domínio ou Área Alvo", 
-                    "resp": "Ator Responsável (Líder)", 
-                    "prazo": "Marca Temporal Limite (SLA)"
-                }
-            )
-            
-            if not edited_df.empty: 
-                st.session_state.acoes_list = edited_df.to_dict('records')
-
-        if st.button("📥 Gerar e Baixar Laudo Técnico (HTML/PDF)", type="primary"):
-            st.markdown("---")
-            logo_html = get_logo_html(150)
-            logo_cliente_html = ""
-            if empresa.get('logo_b64'):
-                logo_cliente_html = f"<img src='data:image/png;base64,{empresa.get('logo_b64')}' width='110' style='float:right; margin-left: 15px; border-radius:4px; box-shadow: 0px 2px 4px rgba(0,0,0,0.1);'>"
-            
-            html_dimensoes = ""
-            if empresa.get('dimensoes'):
-                for dim, nota in empresa.get('dimensoes', {}).items():
-                    cor_card = COR_RISCO_ALTO if nota < 3 else (COR_RISCO_MEDIO if nota < 4 else COR_RISCO_BAIXO)
-                    label_card = "CENÁRIO CRÍTICO" if nota < 3 else ("MOMENTO DE ATENÇÃO" if nota < 4 else "AMBIENTE SEGURO")
-                    html_dimensoes += f"""
-                    <div style="flex: 1; min-width: 85px; background-color: #fcfcfc; border: 1px solid #e0e0e0; padding: 8px; border-radius: 6px; margin: 4px; text-align: center; font-family: 'Helvetica Neue', Helvetica, sans-serif; box-shadow: inset 0 -2px 0 {cor_card};">
-                        <div style="font-size: 8px; color: #555; text-transform: uppercase; letter-spacing: 0.5px; font-weight: bold;">{dim}</div>
-                        <div style="font-size: 16px; font-weight: 800; color: {cor_card}; margin: 4px 0;">{nota:.1f}</div>
-                        <div style="font-size: 7px; color: #777; background: #eee; padding: 2px; border-radius: 2px;">{label_card}</div>
-                    </div>
-                    """
-
-            html_x = ""
-            detalhes_heatmap = empresa.get('detalhe_perguntas', {})
-            questoes_ativas = st.session_state.methodologies.get(metodo_ativo, st.session_state.methodologies['HSE-IT (35 itens)'])['questions']
-            
-            for cat, pergs in questoes_ativas.items():
-                 html_x += f"""
-                 <div style="font-weight: bold; color: {COR_PRIMARIA}; font-size: 11px; margin-top: 14px; margin-bottom: 6px; border-bottom: 2px solid #eaeaea; font-family: 'Helvetica Neue', Helvetica, sans-serif; padding-bottom: 2px;">
-                    {cat.upper()}
-                 </div>
-                 """
-                 
-                 for q in pergs:
-                     val = detalhes_heatmap.get(q['q']) 
-                     
-                     if val is None:
-                         c_bar = "#cccccc" 
-                         txt_exposicao = "Dados Insuficientes"
-                         val_width = 0
-                     else:
-                         c_bar = COR_RISCO_ALTO if val >= 55 else (COR_RISCO_MEDIO if val > 20 else COR_RISCO_BAIXO)
-                         txt_exposicao = f"{val}% Nível de Exposição ao Fator"
-                         val_width = val
-                         
-                     html_x += f"""
-                     <div style="margin-bottom: 6px; font-family: 'Helvetica Neue', Helvetica, sans-serif;">
-                        <div style="display: flex; justify-content: space-between; align-items: flex-end; font-size: 9px; margin-bottom: 2px;">
-                            <span style="color: #444; width: 85%; white-space: nowrap; overflow: hidden; text-overflow: ellipsis;" title="{q['q']}">{q['q']}</span>
-                            <span style="color: {c_bar}; font-weight: bold; font-size: 8px;">{txt_exposicao}</span>
-                        </div>
-                        <div style="width: 100%; background-color: #f0f0f0; height: 6px; border-radius: 3px; overflow: hidden; box-shadow: inset 0 1px 2px rgba(0,0,0,0.05);">
-                            <div style="width: {val_width}%; background-color: {c_bar}; height: 100%; border-radius: 3px; transition: width 0.5s ease-in-out;"></div>
-                        </div>
-                     </div>
-                     """
-
-            html_act_final = "".join([f"""
-                <tr>
-                    <td style="padding: 10px; border-bottom: 1px solid #eef0f2; font-weight: bold; color: #2c3e50;">{i.get('acao','')}</td>
-                    <td style="padding: 10px; border-bottom: 1px solid #eef0f2; color: #555;">{i.get('estrat','')}</td>
-                    <td style="padding: 10px; border-bottom: 1px solid #eef0f2; text-align: center;"><span style="background: #eef2f5; padding: 3px 6px; border-radius: 4px; font-size: 8px; color: #34495e;">{i.get('area','')}</span></td>
-                    <td style="padding: 10px; border-bottom: 1px solid #eef0f2; font-style: italic; color: #7f8c8d;">{i.get('resp','')}</td>
-                    <td style="padding: 10px; border-bottom: 1px solid #eef0f2; font-weight: bold; color: {COR_PRIMARIA};">{i.get('prazo','')}</td>
-                </tr>
-            """ for i in st.session_state.acoes_list])
-            
-            if not st.session_state.acoes_list: 
-                html_act_final = "<tr><td colspan='5' style='text-align: center; padding: 20px; color: #999;'>Não há um plano de ação formulado para esta avaliação.</td></tr>"
-
-            score_final_empresa = empresa.get('score', 0)
-            score_width_css = (score_final_empresa / 5.0) * 100
-            
-            html_gauge_css = f"""
-            <div style="text-align: center; padding: 15px; font-family: 'Helvetica Neue', Helvetica, sans-serif;">
-                <div style="font-size: 32px; font-weight: 900; color: {COR_PRIMARIA}; text-shadow: 1px 1px 0px rgba(0,0,0,0.05);">
-                    {score_final_empresa:.2f} <span style="font-size: 14px; font-weight: normal; color: #a0a0a0;">/ de 5.00 possiveis</span>
-                </div>
-                <div style="width: 100%; background: #e0e0e0; height: 16px; border-radius: 8px; margin-top: 10px; position: relative; overflow: hidden; box-shadow: inset 0 2px 4px rgba(0,0,0,0.1);">
-                    <div style="position: absolute; left: 0; top: 0; width: {score_width_css}%; background: linear-gradient(90deg, {COR_PRIMARIA} 0%, {COR_SECUNDARIA} 100%); height: 16px; border-radius: 8px;"></div>
-                </div>
-                <div style="font-size: 10px; color: #7f8c8d; margin-top: 8px; letter-spacing: 1px; text-transform: uppercase;">
-                    Grau Global de Saúde e Bem-Estar da Equipe
-                </div>
-            </div>
-            """
-            
-            html_radar_rows = ""
-            for k, v in empresa.get('dimensoes', {}).items():
-                html_radar_rows += f"""
-                <tr>
-                    <td style='padding: 6px 10px; border-bottom: 1px solid #f0f0f0; color: #444; font-weight: 500;'>{k}</td>
-                    <td style='padding: 6px 10px; text-align: right; border-bottom: 1px solid #f0f0f0; font-weight: bold; color: {COR_PRIMARIA};'>{v:.1f}</td>
-                </tr>
-                """
-            
-            html_radar_table = f"""
-            <table style="width: 100%; font-size: 10px; font-family: 'Helvetica Neue', Helvetica, sans-serif; border-collapse: collapse; margin-top: 5px;">
-                <thead>
-                    <tr style="background-color: #f8f9fa;">
-                        <th style="text-align: left; padding: 8px 10px; border-bottom: 2px solid #ddd; color: #555;">Dimensão Psicológica Investigada</th>
-                        <th style="text-align: right; padding: 8px 10px; border-bottom: 2px solid #ddd; color: #555;">Nota Final Obtida (Média)</th>
-                    </tr>
-                </thead>
-                <tbody>
-                    {html_radar_rows}
-                </tbody>
-            </table>
-            """
-
-            lgpd_note = f"""
-            <div style="margin-top: 40px; border-top: 1px solid #ccc; padding-top: 15px; font-size: 8px; color: #888; text-align: justify; font-family: 'Helvetica Neue', Helvetica, sans-serif; line-height: 1.4;">
-                <strong>TERMO ASSINADO DE ESTREITA CONFIDENCIALIDADE E PROTEÇÃO IRREVOGÁVEL E ESTRITA DE BANCO DADOS (SISTEMAS LGPD):</strong> Este instrumento avaliativo em escala profissional e científica de saúde ocupacional focado na raiz corporativa baseou-se tecnicamente em laços criados e foi confeccionado estritamente utilizando os mais complexos e densos métodos atuais de criptografia de banco de dados e rotinas imutáveis de obfuscação algorítmica de identidades. Os resultados e gráficos apresentados garantem o total anonimato de quem participou, exibindo apenas dados e médias coletivas sem qualquer correlação de nome e respostas. (Em conformidade total com a Lei Geral de Proteção de Dados - Lei nº 13.709/2018).
-            </div>
-            """
-
-            raw_html = f"""
-            <!DOCTYPE html>
-            <html lang="pt-BR">
-            <head>
-                <meta charset="utf-8">
-                <title>Dossiê Técnico Institucional - Matriz Oficial {empresa['razao']}</title>
-                <style>
-                    body {{
-                        font-family: 'Segoe UI', 'Helvetica Neue', Helvetica, Arial, sans-serif;
-                        padding: 30mm 20mm;
-                        color: #2c3e50;
-                        background-color: #ffffff;
-                        line-height: 1.6;
-                        max-width: 210mm;
-                        margin: 0 auto;
-                    }}
-                    h4 {{
-                        color: {COR_PRIMARIA}; 
-                        border-left: 5px solid {COR_SECUNDARIA}; 
-                        padding-left: 12px; 
-                        margin-top: 40px;
-                        margin-bottom: 15px;
-                        font-size: 13px;
-                        letter-spacing: 0.5px;
-                    }}
-                    .caixa-destaque {{
-                        background: linear-gradient(135deg, #f8f9fa 0%, #ffffff 100%);
-                        padding: 20px; 
-                        border-radius: 8px; 
-                        margin-bottom: 25px; 
-                        border-left: 6px solid {COR_SECUNDARIA};
-                        box-shadow: 0 4px 6px rgba(0,0,0,0.02);
-                    }}
-                    .colunas-flex {{
-                        display: flex; 
-                        gap: 30px; 
-                        margin-top: 25px; 
-                        margin-bottom: 25px;
-                    }}
-                    .coluna-dado {{
-                        flex: 1; 
-                        border: 1px solid #eef2f5; 
-                        border-radius: 10px; 
-                        padding: 15px;
-                        background-color: #fafbfc;
-                    }}
-                    .titulo-coluna {{
-                        font-weight: 800; 
-                        font-size: 11px; 
-                        color: {COR_PRIMARIA}; 
-                        margin-bottom: 12px;
-                        text-align: center;
-                        text-transform: uppercase;
-                        letter-spacing: 1px;
-                        border-bottom: 1px solid #eef2f5;
-                        padding-bottom: 8px;
-                    }}
-                    .grid-raiox {{
-                        background: #ffffff; 
-                        border: 1px solid #eef2f5; 
-                        padding: 20px; 
-                        border-radius: 10px; 
-                        margin-bottom: 25px; 
-                        column-count: 2; 
-                        column-gap: 50px;
-                        box-shadow: 0 2px 4px rgba(0,0,0,0.01);
-                    }}
-                    @media print {{
-                        body {{
-                            padding: 0;
-                            margin: 0;
-                            -webkit-print-color-adjust: exact !important;
-                            print-color-adjust: exact !important;
-                        }}
-                        .grid-raiox {{
-                            page-break-inside: avoid;
-                        }}
-                        table {{
-                            page-break-inside: auto;
-                        }}
-                        tr {{
-                            page-break-inside: avoid;
-                            page-break-after: auto;
-                        }}
-                        h4 {{
-                            page-break-after: avoid;
-                        }}
-                    }}
-                </style>
-            </head>
-            <body>
-                <header style="display: flex; justify-content: space-between; align-items: center; border-bottom: 3px solid {COR_PRIMARIA}; padding-bottom: 20px; margin-bottom: 30px;">
-                    <div style="flex: 0 0 auto;">{logo_html}</div>
-                    <div style="text-align: right; flex: 1;">
-                        <div style="font-size: 22px; font-weight: 900; color: {COR_PRIMARIA}; letter-spacing: -0.5px;">LAUDO DE SAÚDE MENTAL E CLIMA ({metodo_ativo})</div>
-                        <div style="font-size: 12px; color: #7f8c8d; font-weight: 500; text-transform: uppercase; letter-spacing: 1px; margin-top: 4px;">Relatório Oficial de Gestão de Fatores e Riscos Psicossociais no Ambiente de Trabalho</div>
-                    </div>
-                </header>
-
-                <div class="caixa-destaque">
-                    {logo_cliente_html}
-                    <div style="font-size: 10px; color: #95a5a6; margin-bottom: 6px; text-transform: uppercase; font-weight: bold; letter-spacing: 1px;">DADOS DA EMPRESA</div>
-                    <div style="font-weight: 900; font-size: 18px; margin-bottom: 8px; color: #2c3e50;">{empresa.get('razao', '-')}</div>
-                    
-                    <div style="display: flex; gap: 40px; margin-top: 15px;">
-                        <div>
-                            <div style="font-size: 9px; color: #7f8c8d; text-transform: uppercase;">Identificação Oficial (CNPJ)</div>
-                            <div style="font-size: 11px; font-weight: 600; color: #34495e;">{empresa.get('cnpj','-')}</div>
-                        </div>
-                        <div>
-                            <div style="font-size: 9px; color: #7f8c8d; text-transform: uppercase;">Total de Participantes (Adesão)</div>
-                            <div style="font-size: 11px; font-weight: 600; color: #34495e;">O diagnóstico contou com a participação efetiva de {empresa.get('respondidas',0)} colaboradores(as).</div>
-                        </div>
-                        <div>
-                            <div style="font-size: 9px; color: #7f8c8d; text-transform: uppercase;">Data de Emissão do Laudo</div>
-                            <div style="font-size: 11px; font-weight: 600; color: #34495e;">{datetime.datetime.now().strftime('%d/%m/%Y')}</div>
-                        </div>
-                    </div>
-                    <div style="margin-top: 15px; border-top: 1px dashed #ddd; padding-top: 10px;">
-                        <div style="font-size: 9px; color: #7f8c8d; text-transform: uppercase;">Endereço e Instalações Auditadas</div>
-                        <div style="font-size: 11px; color: #34495e;">{empresa.get('endereco','-')}</div>
-                    </div>
-                </div>
-
-                <h4>1. OBJETIVO DA AVALIAÇÃO</h4>
-                <p style="text-align: justify; font-size: 11px; color: #555;">
-                    O presente relatório executivo baseia-se nas normas e práticas validadas da metodologia <strong>{metodo_ativo}</strong>. O principal objetivo desta avaliação é identificar, com rigor, a extensão dos fatores de bem-estar ou o nível de desgaste presente no ambiente de trabalho das equipes da organização avaliada.<br><br>Através da participação anônima da equipe e de ferramentas matemáticas robustas na nuvem, conseguimos mapear a realidade da organização de uma forma que atende plenamente às diretrizes e boas práticas exigidas pelo Ministério relativas à prevenção e Gestão de Riscos Ocupacionais (GRO/PGR).
-                </p>
-
-                <div class="colunas-flex">
-                    <div class="coluna-dado">
-                        <div class="titulo-coluna">2. SCORE GERAL (VISÃO GLOBAL)</div>
-                        {html_gauge_css}
-                    </div>
-                    <div class="coluna-dado">
-                        <div class="titulo-coluna">3. RESULTADO MÉDIO CONSOLIDADO POR DIMENSÃO</div>
-                        {html_radar_table}
-                    </div>
-                </div>
-
-                <h4>4. MAPA DE DIAGNÓSTICO DETALHADO POR CADA DIMENSÃO DE SAÚDE</h4>
-                <div style="display: flex; flex-wrap: wrap; margin-bottom: 30px; gap: 8px;">
-                    {html_dimensoes}
-                </div>
-
-                <h4>5. VARREDURA RAIO-X REPASSANDO EXAUSTIVAMENTE OS FATORES AVALIADOS COM A EQUIPE</h4>
-                <p style="font-size: 10px; color: #777; margin-bottom: 15px; margin-top: -10px; font-style: italic;">
-                    Nota técnica para interpretação: As representações visuais abaixo mostram de forma simples o nível percentual de risco contínuo detectado para cada situação. Barras com porcentagens altas (cores mais quentes como laranja e vermelho) representam áreas que devem ser abordadas prioritariamente pela Gestão e pelos Recursos Humanos.
-                </p>
-                <div class="grid-raiox">
-                    {html_x}
-                </div>
-
-                <div style="page-break-before: always;"></div>
-
-                <h4>6. PLANO DE AÇÃO ESTRATÉGICO SUGERIDO (COMPLIANCE E PREVENÇÃO)</h4>
-                <p style="font-size: 10px; color: #777; margin-bottom: 15px; margin-top: -10px; font-style: italic;">
-                    As sugestões descritas na tabela de apoio que se segue foram refinadas sob intervenção humana e com base nos scores coletados. As estratégias procuram atacar as maiores fragilidades encontradas no radar e no mapeamento comportamental com sugestões práticas aplicáveis.
-                </p>
-                <table style="width: 100%; border-collapse: collapse; font-size: 10px; font-family: 'Helvetica Neue', Helvetica, Arial, sans-serif; box-shadow: 0 0 0 1px #eef2f5; border-radius: 8px; overflow: hidden;">
-                    <thead>
-                        <tr style="background-color: {COR_PRIMARIA}; color: #ffffff;">
-                            <th style="padding: 12px 10px; text-align: left; font-weight: 600; letter-spacing: 0.5px;">TÍTULO DO PLANO / AÇÃO MACRO</th>
-                            <th style="padding: 12px 10px; text-align: left; font-weight: 600; letter-spacing: 0.5px;">ESTRATÉGIA PRÁTICA E EXECUÇÃO</th>
-                            <th style="padding: 12px 10px; text-align: center; font-weight: 600; letter-spacing: 0.5px;">FOCO DE ÁREA</th>
-                            <th style="padding: 12px 10px; text-align: left; font-weight: 600; letter-spacing: 0.5px;">RESPONSÁVEL (LIDERANÇA)</th>
-                            <th style="padding: 12px 10px; text-align: left; font-weight: 600; letter-spacing: 0.5px;">MARCA TEMPORAL (SLA/PRAZO)</th>
-                        </tr>
-                    </thead>
-                    <tbody>
-                        {html_act_final}
-                    </tbody>
-                </table>
-
-                <h4>7. PARECER TÉCNICO FORMAL DA CONSULTORIA DE RH</h4>
-                <div style="text-align: justify; font-size: 11px; line-height: 1.8; background-color: #f8fbfc; padding: 25px; border-radius: 8px; border: 1px solid #eef2f5; color: #444; white-space: pre-wrap;">
-                    {analise_texto}
-                </div>
-
-                <div style="margin-top: 80px; display: flex; justify-content: space-around; gap: 60px;">
-                    <div style="flex: 1; text-align: center; border-top: 1px solid #2c3e50; padding-top: 12px;">
-                        <div style="font-weight: 800; font-size: 12px; color: #2c3e50; text-transform: uppercase;">{sig_empresa_nome}</div>
-                        <div style="color: #7f8c8d; font-size: 10px; margin-top: 4px;">{sig_empresa_cargo}</div>
-                        <div style="color: #95a5a6; font-size: 9px; margin-top: 2px;">Assinatura por delegação (Representante Legal)</div>
-                    </div>
-                    <div style="flex: 1; text-align: center; border-top: 1px solid #2c3e50; padding-top: 12px;">
-                        <div style="font-weight: 800; font-size: 12px; color: #2c3e50; text-transform: uppercase;">{sig_tecnico_nome}</div>
-                        <div style="color: #7f8c8d; font-size: 10px; margin-top: 4px;">{sig_tecnico_cargo}</div>
-                        <div style="color: #95a5a6; font-size: 9px; margin-top: 2px;">Chancela Técnica Eletrônica do Avaliador(a) Pericial</div>
-                    </div>
-                </div>
-                
-                {lgpd_note}
-            </body>
-            </html>
-            """
-            
-            b64_pdf = base64.b64encode(raw_html.encode('utf-8')).decode('utf-8')
-            
-            st.markdown(f"""
-            <a href="data:text/html;base64,{b64_pdf}" download="Laudo_Tecnico_Gestao_RH_{empresa["id"]}.html" style="
-                text-decoration: none; 
-                background-color: {COR_PRIMARIA}; 
-                color: #ffffff; 
-                padding: 15px 30px; 
-                border-radius: 8px; 
-                font-weight: 800; 
-                display: inline-block;
-                box-shadow: 0 4px 6px rgba(0,0,0,0.2);
-                transition: transform 0.2s;
-                text-transform: uppercase;
-                letter-spacing: 1px;
-                width: 100%;
-                text-align: center;
-                margin-bottom: 20px;
-            ">
-                ⬇️ BAIXAR LAUDO TÉCNICO CORPORATIVO (ARQUIVO HTML PARA CONVERSÃO EM PDF)
-            </a>
-            """, unsafe_allow_html=True)
-            
-            st.info("💡 **Dica de Consultoria (Como extrair um PDF perfeito):** Após o arquivo ser baixado, clique para abri-lo no seu navegador. Em seguida, pressione `Ctrl + P` (ou `Cmd + P` no Mac) e escolha a opção para **Salvar como PDF**. Desative a impressão de Cabeçalhos e Rodapés e ative sempre os **'Gráficos de Plano de Fundo'** para que todas as cores da nossa marca fiquem intactas no papel.")
-            
-            st.markdown("<hr>", unsafe_allow_html=True)
-            st.subheader("Visualização da Estrutura Final do Relatório (Preview):")
-            st.components.v1.html(raw_html, height=1000, scrolling=True)
-
-    elif selected == "Histórico de Evolução":
-        st.title("Histórico e Comparativo de Evolução")
-        if not visible_companies: 
-            st.warning("É preciso ter um histórico de empresas a ser analisado para utilizar esta função."); return
-        
-        empresa_nome = st.selectbox("Selecione a empresa:", [c['razao'] for c in visible_companies])
-        empresa = next((c for c in visible_companies if c['razao'] == empresa_nome), None)
-        
-        if empresa:
-            metodo_nome_ativo = empresa.get('metodologia', 'HSE-IT (35 itens)')
-            questoes_ativas = st.session_state.methodologies.get(metodo_nome_ativo, st.session_state.methodologies['HSE-IT (35 itens)'])['questions']
-            
-            history_data = generate_real_history(empresa['id'], responses_data, questoes_ativas, empresa.get('func', 1))
-            
-            if not history_data:
-                st.info("ℹ️ Ops! Ainda não temos avaliações antigas para fazer a comparação. As métricas vão aparecer aqui no próximo ciclo de avaliação desta equipe.")
-            else:
-                tab_evo, tab_comp = st.tabs(["📈 Evolução do Score Geral", "⚖️ Comparativo de Dimensões (Radar A x B)"])
-                
-                with tab_evo:
-                    st.markdown("<div class='chart-container'>", unsafe_allow_html=True)
-                    df_hist = pd.DataFrame(history_data)
-                    fig_line = px.line(
-                        df_hist, 
-                        x='periodo', 
-                        y='score', 
-                        markers=True, 
-                        title=f"Evolução do Fator de Segurança Geral - {metodo_nome_ativo}"
-                    )
-                    fig_line.update_traces(
-                        line_color=COR_SECUNDARIA, 
-                        line_width=4, 
-                        marker=dict(size=12, color=COR_PRIMARIA, line=dict(width=2, color='white'))
-                    )
-                    fig_line.update_layout(
-                        yaxis_range=[1, 5],
-                        plot_bgcolor='#fafbfc',
-                        xaxis_title="Janela de Avaliação",
-                        yaxis_title="Score do Algoritmo (1 a 5)"
-                    )
-                    st.plotly_chart(fig_line, use_container_width=True)
-                    st.markdown("</div>", unsafe_allow_html=True)
-
-                with tab_comp:
-                    if len(history_data) < 2:
-                        st.warning("⚠️ Ainda não temos dados suficientes para ancorar um comparativo. Precisamos de avaliações em pelo menos dois períodos diferentes.")
-                    else:
-                        st.write("Defina as datas que deseja comparar para entender se o plano de ação resultou.")
-                        c1, c2 = st.columns(2)
-                        periodo_a = c1.selectbox("Período A (Referência Anterior)", [h['periodo'] for h in history_data], index=1)
-                        periodo_b = c2.selectbox("Período B (Avaliação Atual)", [h['periodo'] for h in history_data], index=0)
-                        
-                        dados_a = next((h for h in history_data if h['periodo'] == periodo_a), None)
-                        dados_b = next((h for h in history_data if h['periodo'] == periodo_b), None)
-                        
-                        if dados_a and dados_b:
-                            st.markdown("<div class='chart-container'>", unsafe_allow_html=True)
-                            categories = list(dados_a['dimensoes'].keys())
-                            fig_comp = go.Figure()
-                            
-                            fig_comp.add_trace(go.Scatterpolar(
-                                r=list(dados_a['dimensoes'].values()), 
-                                theta=categories, 
-                                fill='toself', 
-                                name=f'Referência de: {periodo_a}', 
-                                line_color=COR_COMP_A, 
-                                opacity=0.4
-                            ))
-                            
-                            fig_comp.add_trace(go.Scatterpolar(
-                                r=list(dados_b['dimensoes'].values()), 
-                                theta=categories, 
-                                fill='toself', 
-                                name=f'Resultado de: {periodo_b}', 
-                                line_color=COR_COMP_B, 
-                                opacity=0.8
-                            ))
-                            
-                            fig_comp.update_layout(
-                                polar=dict(radialaxis=dict(visible=True, range=[0, 5])),
-                                title=f"Sobreposição do Radar Comparativo ({metodo_nome_ativo})"
-                            )
-                            st.plotly_chart(fig_comp, use_container_width=True)
-                            st.markdown("</div>", unsafe_allow_html=True)
-                            
-                            if st.button("📥 Sintetizar e Baixar Documento Comparativo Oficial", type="primary"):
-                                 logo_html = get_logo_html(150)
-                                 
-                                 diff_score = dados_b['score'] - dados_a['score']
-                                 txt_evolucao = "uma melhoria clara na estabilidade mental das equipes." if diff_score > 0 else "um momento que exige muita vigilância e atuação imediata devido à queda geral nas notas das equipes."
-                                 
-                                 chart_css_viz = f"""
-                                 <div style="padding: 25px; border: 1px solid #e0e6ed; border-radius: 12px; font-family: 'Helvetica Neue', Helvetica, Arial, sans-serif; background: #ffffff; box-shadow: 0 4px 15px rgba(0,0,0,0.03);">
-                                     <div style="margin-bottom: 25px;">
-                                         <div style="display: flex; justify-content: space-between; align-items: baseline; margin-bottom: 8px;">
-                                             <strong style="color: #34495e; font-size: 12px; text-transform: uppercase; letter-spacing: 0.5px;">Nota Geral de Saúde Ocupacional no Período de [{periodo_a}]:</strong> 
-                                             <span style="font-size: 24px; font-weight: 900; color: {COR_COMP_A}">{dados_a['score']} <span style="font-size: 12px; color: #aab7b8;">/ de 5.0</span></span>
-                                         </div>
-                                         <div style="width: 100%; background: #ecf0f1; height: 18px; border-radius: 9px; overflow: hidden; box-shadow: inset 0 2px 4px rgba(0,0,0,0.06);">
-                                            <div style="width: {(dados_a['score']/5)*100}%; background: {COR_COMP_A}; height: 18px; border-radius: 9px;"></div>
-                                         </div>
-                                     </div>
-                                     <div>
-                                         <div style="display: flex; justify-content: space-between; align-items: baseline; margin-bottom: 8px;">
-                                             <strong style="color: #34495e; font-size: 12px; text-transform: uppercase; letter-spacing: 0.5px;">Nota Geral de Saúde Ocupacional no Período de [{periodo_b}]:</strong> 
-                                             <span style="font-size: 24px; font-weight: 900; color: {COR_COMP_B}">{dados_b['score']} <span style="font-size: 12px; color: #aab7b8;">/ de 5.0</span></span>
-                                         </div>
-                                         <div style="width: 100%; background: #ecf0f1; height: 18px; border-radius: 9px; overflow: hidden; box-shadow: inset 0 2px 4px rgba(0,0,0,0.06);">
-                                            <div style="width: {(dados_b['score']/5)*100}%; background: {COR_COMP_B}; height: 18px; border-radius: 9px;"></div>
-                                         </div>
-                                     </div>
-                                 </div>
-                                 """
-
-                                 html_comp = f"""
-                                 <!DOCTYPE html>
-                                 <html lang="pt-BR">
-                                 <head>
-                                     <meta charset="utf-8">
-                                     <title>Relatório Evolutivo em Dados</title>
-                                     <style>
-                                         body {{ font-family: 'Segoe UI', 'Helvetica Neue', Helvetica, Arial, sans-serif; padding: 40px 30px; color: #2c3e50; background: white; line-height: 1.6; }}
-                                         .linha-divisor {{ border-bottom: 2px solid {COR_PRIMARIA}; padding-bottom: 15px; margin-bottom: 25px; display: flex; justify-content: space-between; align-items: center; }}
-                                         .box-infos {{ background: #f8fbfc; padding: 20px; border-radius: 8px; margin-bottom: 25px; border-left: 5px solid {COR_SECUNDARIA}; }}
-                                         h4 {{ color: {COR_PRIMARIA}; border-left: 4px solid {COR_SECUNDARIA}; padding-left: 12px; margin-top: 35px; font-size: 14px; text-transform: uppercase; }}
-                                         .tabela-kpi {{ width: 100%; border-collapse: collapse; font-size: 12px; margin-bottom: 30px; box-shadow: 0 0 0 1px #eef2f5; border-radius: 6px; overflow: hidden; }}
-                                         .tabela-kpi th {{ background-color: {COR_PRIMARIA}; color: white; padding: 12px; text-align: center; font-weight: 600; letter-spacing: 0.5px; }}
-                                         .tabela-kpi td {{ padding: 12px; border-bottom: 1px solid #eef2f5; text-align: center; color: #34495e; }}
-                                         .tabela-kpi td:first-child {{ text-align: left; font-weight: 600; }}
-                                         .rodape {{ margin-top: 60px; font-size: 9px; color: #95a5a6; text-align: center; border-top: 1px dashed #e0e6ed; padding-top: 15px; letter-spacing: 0.5px; text-transform: uppercase; }}
-                                     </style>
-                                 </head>
-                                 <body>
-                                     <div class="linha-divisor">
-                                         <div>{logo_html}</div>
-                                         <div style="text-align:right;">
-                                             <div style="font-size:20px; font-weight:900; color:{COR_PRIMARIA}; letter-spacing: -0.5px;">DOSSIÊ TÉCNICO EVOLUTIVO</div>
-                                             <div style="font-size:11px; color:#7f8c8d; font-weight:600; letter-spacing: 1px;">Análise Comparativa Temporal de Saúde Ocupacional Corporativa</div>
-                                         </div>
-                                     </div>
-                                     
-                                     <div class="box-infos">
-                                         <div style="font-size:10px; color:#95a5a6; margin-bottom:6px; font-weight: 800; letter-spacing: 1px;">DADOS CADASTRAIS DA ORGANIZAÇÃO AUDITADA</div>
-                                         <div style="font-weight:900; font-size:16px; margin-bottom:8px; color:#2c3e50;">{empresa['razao']}</div>
-                                         <div style="display: flex; gap: 20px; margin-top: 10px;">
-                                             <div style="font-size:11px;"><strong>CNPJ Atrelado:</strong> <span style="color:#7f8c8d;">{empresa.get('cnpj','Não Especificado no Sistema')}</span></div>
-                                             <div style="font-size:11px;"><strong>Metodologia Aplicada:</strong> <span style="color:#7f8c8d;">{metodo_nome_ativo}</span></div>
-                                             <div style="font-size:11px;"><strong>Janelas Comparativas:</strong> <span style="color:{COR_PRIMARIA}; font-weight: bold; background: #eef2f5; padding: 2px 6px; border-radius: 4px;">{periodo_a}</span> VERSUS <span style="color:{COR_PRIMARIA}; font-weight: bold; background: #eef2f5; padding: 2px 6px; border-radius: 4px;">{periodo_b}</span></div>
-                                         </div>
-                                     </div>
-                                     
-                                     <h4>1. PAINEL DE INDICADORES DE DESEMPENHO</h4>
-                                     <table class="tabela-kpi">
-                                         <tr>
-                                             <th>SINTOMA / INDICADOR ANALISADO</th>
-                                             <th>MARCO REFERÊNCIA [{periodo_a}]</th>
-                                             <th>MARCO ATUAL [{periodo_b}]</th>
-                                             <th>VARIAÇÃO LÍQUIDA (DELTA)</th>
-                                         </tr>
-                                         <tr>
-                                             <td>Score Geral da Organização (Cálculo Composto)</td>
-                                             <td>{dados_a['score']}</td>
-                                             <td>{dados_b['score']}</td>
-                                             <td style="font-weight:900; color:{'#27ae60' if diff_score > 0 else '#c0392b'};">{diff_score:+.2f} pts</td>
-                                         </tr>
-                                         <tr>
-                                             <td>Taxa Bruta de Adesão Censitária das Equipes (%)</td>
-                                             <td>{dados_a['adesao']}%</td>
-                                             <td>{dados_b['adesao']}%</td>
-                                             <td style="font-weight:bold; color:#7f8c8d;">{(dados_b['adesao'] - dados_a['adesao']):+.1f}%</td>
-                                         </tr>
-                                     </table>
-                                     
-                                     <h4>2. EQUILÍBRIO GRÁFICO</h4>
-                                     {chart_css_viz}
-                                     
-                                     <h4>3. CONCLUSÃO E ANÁLISE TÉCNICA DOS RESULTADOS</h4>
-                                     <p style="text-align:justify; font-size:12px; line-height:1.7; background:#fbfcfd; padding:20px; border-radius:8px; border: 1px solid #eef2f5; color: #444;">A análise estruturada, resultante da comparação exata entre as duas janelas de tempo apresentadas, demonstrou <strong>{txt_evolucao}</strong> Recomendamos fortemente a direção da empresa, juntamente com o seu RH, a avaliarem com minúcia as dimensões de perigo mais salientes e a porem em prática de imediato novos planos de ações preventivas para melhoria da cultura geral de satisfação e bem-estar nas dependências da companhia.</p>
-                                     
-                                     <div class="rodape">
-                                         Plataforma Elo NR-01 Enterprise Core | Inteligência e Gestão Humanizada em Dados de Saúde Ocupacional<br>Documento Oficial e Privado
-                                     </div>
-                                 </body>
-                                 </html>
-                                 """
-                                 
-                                 b64_comp = base64.b64encode(html_comp.encode('utf-8')).decode('utf-8')
-                                 
-                                 st.markdown(f"""
-                                 <a href="data:text/html;base64,{b64_comp}" download="Dossie_Evolutivo_RH_{empresa["id"]}.html" style="
-                                     text-decoration: none; 
-                                     background-color: {COR_PRIMARIA}; 
-                                     color: white; 
-                                     padding: 12px 25px; 
-                                     border-radius: 6px; 
-                                     font-weight: 700; 
-                                     display: inline-block;
-                                     text-transform: uppercase;
-                                     box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-                                 ">
-                                     📥 DOWNLOAD DO RELATÓRIO COMPARATIVO (HTML)
-                                 </a>
-                                 """, unsafe_allow_html=True)
-                                 st.caption("Apoie os seus líderes com este dossiê. Lembre-se, pressione `Ctrl+P` no navegador para gerar em PDF e envie a eles.")
-
-    elif selected == "Configurações":
-        if perm == "Master":
-            st.title("Configurações da Plataforma")
-            t1, t2, t3 = st.tabs(["👥 Gerenciamento de Usuários", "🎨 Identidade Visual e Marca", "⚙️ Configurações de Servidor (URL)"])
-            
-            with t1:
-                st.markdown("<div class='chart-container'>", unsafe_allow_html=True)
-                st.write("### Acessos à Plataforma")
-                
-                if DB_CONNECTED:
-                    usrs_raw = supabase.table('admin_users').select("username, role, credits, linked_company_id").execute().data
-                else:
-                    usrs_raw = [{"username": k, "role": v['role'], "credits": v.get('credits',0)} for k,v in st.session_state.users_db.items()]
-                
-                if usrs_raw: 
-                    st.dataframe(pd.DataFrame(usrs_raw), use_container_width=True)
-                else:
-                    st.warning("Problema de leitura na tabela de acesso.")
-                
-                st.markdown("---")
-                c1, c2 = st.columns(2)
-                new_u = c1.text_input("Novo Usuário (Login)")
-                new_p = c2.text_input("Senha", type="password")
-                new_r = st.selectbox("Nível de Acesso", ["Master", "Gestor", "Analista"])
-                
-                if st.button("➕ Confirmar Criação do Usuário", type="primary"):
-                    if not new_u or not new_p: 
-                        st.error("Usuário e Senha são campos obrigatórios.")
-                    else:
-                        if DB_CONNECTED:
-                            try:
-                                supabase.table('admin_users').insert({"username": new_u, "password": new_p, "role": new_r, "credits": 999999 if new_r=="Master" else 500}).execute()
-                                st.success(f"✅ Boa! O usuário [{new_u}] foi criado e já pode entrar no sistema!")
-                                time.sleep(1.5)
-                                st.rerun()
-                            except Exception as e: 
-                                st.error(f"Engasgo na gravação remota: {e}")
-                        else:
-                            st.session_state.users_db[new_u] = {"password": new_p, "role": new_r, "credits": 999999}
-                            st.success(f"✅ Usuário [{new_u}] guardado apenas no seu modo local!")
-                            time.sleep(1)
-                            st.rerun()
-                
-                st.markdown("---")
-                st.write("### Remover Usuário")
-                users_op = [u['username'] for u in usrs_raw if u['username'] != curr_user]
-                if users_op:
-                    u_del = st.selectbox("Selecione cuidadosamente o usuário para remover:", users_op)
-                    if st.button("🗑️ REMOVER USUÁRIO SELECIONADO DA BASE", type="primary"): 
-                        delete_user(u_del)
-                else:
-                    st.info("De momento não há outros usuários elegíveis para remoção.")
-                st.markdown("</div>", unsafe_allow_html=True)
-
-            with t2:
-                st.markdown("<div class='chart-container'>", unsafe_allow_html=True)
-                st.write("### Identidade Visual e Marca")
-                nn = st.text_input("Nome da Plataforma (Mostrado no topo e relatórios)", value=st.session_state.platform_config.get('name', 'Elo NR-01'))
-                nc = st.text_input("Nome da Consultoria em RH (A sua empresa)", value=st.session_state.platform_config.get('consultancy', ''))
-                nl = st.file_uploader("Upload de Logotipo (PNG ou JPG com fundo transparente)", type=['png', 'jpg', 'jpeg'])
-                
-                if st.button("💾 Guardar Marca Personalizada", type="primary"):
-                    new_conf = st.session_state.platform_config.copy()
-                    new_conf['name'] = nn
-                    new_conf['consultancy'] = nc
-                    
-                    if nl: 
-                        b64_image = image_to_base64(nl)
-                        if b64_image:
-                            new_conf['logo_b64'] = b64_image
-                    
-                    if DB_CONNECTED:
-                        try:
-                            res = supabase.table('platform_settings').select("*").execute()
-                            if res.data: 
-                                supabase.table('platform_settings').update({"config_json": new_conf}).eq("id", res.data[0]['id']).execute()
-                            else: 
-                                supabase.table('platform_settings').insert({"config_json": new_conf}).execute()
-                            st.success("✅ A sua marca foi guardada perfeitamente na base de dados!")
-                        except Exception as e: 
-                            st.warning(f"Erro na tentativa de guardar (Salvo localmente): {e}")
-                    else:
-                        st.success("✅ Logotipo e nome modificados.")
-                        
-                    st.session_state.platform_config = new_conf
-                    time.sleep(1.5)
-                    st.rerun()
-                st.markdown("</div>", unsafe_allow_html=True)
-
-            with t3:
-                st.markdown("<div class='chart-container'>", unsafe_allow_html=True)
-                st.write("### Configurações de Servidor (URL)")
-                base = st.text_input("Endereço Web Atual (Crucial para os links enviados aos colaboradores funcionarem)", value=st.session_state.platform_config.get('base_url', ''))
-                
-                if st.button("🔗 Gravar e Atualizar URL do Sistema", type="primary"):
-                    new_conf = st.session_state.platform_config.copy()
-                    new_conf['base_url'] = base
-                    
-                    if DB_CONNECTED:
-                        try:
-                            res = supabase.table('platform_settings').select("*").execute()
-                            if res.data: 
-                                supabase.table('platform_settings').update({"config_json": new_conf}).eq("id", res.data[0]['id']).execute()
-                            else: 
-                                supabase.table('platform_settings').insert({"config_json": new_conf}).execute()
-                            st.success("✅ O seu URL foi atualizado e guardado de forma permanente.")
-                        except Exception as e: 
-                            st.warning(f"Erro na nuvem: {e}")
-                    else:
-                        st.success("✅ Atualização gravada com sucesso.")
-
-                    st.session_state.platform_config = new_conf
-                    time.sleep(1.5)
-                    st.rerun()
-                    
-                st.markdown("---")
-                st.write("### O Coração da Plataforma (Base de Dados)")
-                if DB_CONNECTED: 
-                    st.info("🟢 O sistema encontra-se com ligação verde (estável e forte) ao Supabase em Nuvem. Todas as suas salvaguardas vão ficar disponíveis perenemente para si ou clientes na web sem quaisquer problemas.")
-                else: 
-                    st.error("🔴 Nota Limiar: A sua interligação ao Cofre Cloud não logrou autenticar por motivos de rede. De momento está no regime 'offline' da sua máquina. O aplicativo foi reposto e corre pela memória provisória do browser. Qualquer refresh que seja feito ou F5 poderá levar à perda definitiva do processo que está na memória.")
-                st.markdown("</div>", unsafe_allow_html=True)
-        else:
-            st.error("🚫 Apenas Administradores do nível 'Master' (Sênior) têm permissão para acessar esta página do programa.")
-
-# ==============================================================================
-# 6. MÓDULO DOS COLABORADORES (A PESQUISA DE CLIMA E SAÚDE)
-# ==============================================================================
-def survey_screen():
-    """A interface limpa e acolhedora onde as equipes respondem à avaliação de forma sigilosa e leve."""
-    cod = st.query_params.get("cod")
-    
-    comp = None
-    
-    # 1. VERIFICAÇÃO MODO PREVIEW (RH VISUALIZANDO)
-    if not cod and st.session_state.get('user_role') == 'colaborador' and st.session_state.get('current_company'):
-        comp = st.session_state.current_company
-    else:
-        # 2. ACESSO REAL (VIA LINK DO COLABORADOR)
-        if DB_CONNECTED and cod:
-            try:
-                res = supabase.table('companies').select("*").eq('id', cod).execute()
-                if res.data: comp = res.data[0]
-            except: pass
-            
-        if not comp and cod: 
-            comp = next((c for c in st.session_state.companies_db if str(c['id']) == str(cod)), None)
-    
-    # 3. TRATATIVA DE ERRO DE LINK INVÁLIDO
-    if not comp: 
-        st.error("❌ Código de Rastreio Inválido. Pedimos que tente acessar novamente e confirme junto ao líder de Recursos Humanos se o seu link foi bem encaminhado e enviado sem erro de digitação.")
-        # Fallback para o RH voltar caso se perca
-        if st.session_state.get('admin_permission'):
-            if st.button("⬅️ Voltar ao Painel Administrativo"):
-                st.session_state.user_role = 'admin'
-                st.rerun()
-        return
-        
-    # 4. BOTÃO DE VOLTAR EXCLUSIVO PARA O MODO PREVIEW DO RH
-    is_preview = st.session_state.get('admin_permission') is not None and st.session_state.get('user_role') == 'colaborador'
-    if is_preview:
-        st.info("👁️ **Modo Visualização Ativo:** Você está vendo esta tela exatamente como o colaborador a verá. Enviar respostas aqui afetará os gráficos da empresa.")
-        if st.button("⬅️ Sair da Visualização e Voltar ao Painel", type="secondary"):
-            st.session_state.user_role = 'admin'
-            st.session_state.current_company = None
-            st.rerun()
-        st.markdown("---")
-
-    # 5. VALIDAÇÃO DE DATA E COTA (Pula os bloqueios se for o RH visualizando)
-    if comp.get('valid_until') and not is_preview:
-        try:
-            if datetime.date.today() > datetime.date.fromisoformat(comp['valid_until']):
-                st.error("⛔ O link fornecido para a sua empresa já se encontra inativo ou expirado.")
-                return
-        except: pass
-        
-    limit_evals = comp.get('limit_evals', 999999)
-    resp_count = comp.get('respondidas', 0) if comp.get('respondidas') is not None else 0
-    if resp_count >= limit_evals and not is_preview:
-        st.error("⚠️ Pedimos desculpas. Infelizmente já foi atingido o número limite de respostas para este projeto em particular. Obrigado pela boa vontade em compartilhar e apoiar.")
-        return
-    
-    # Resgata a metodologia amarrada a empresa
-    metodo_nome = comp.get('metodologia', 'HSE-IT (35 itens)')
-    metodo_dados = st.session_state.methodologies.get(metodo_nome, st.session_state.methodologies['HSE-IT (35 itens)'])
-    perguntas = metodo_dados['questions']
-
-    # Descobre se a empresa exige CPF (Lendo de dentro do JSONB org_structure)
-    org_struct = comp.get('org_structure', {})
-    exige_cpf = org_struct.get('_exigir_cpf', True) if isinstance(org_struct, dict) else True
-
-    logo = get_logo_html(150)
-    if comp.get('logo_b64'): logo = f"<img src='data:image/png;base64,{comp.get('logo_b64')}' width='180'>"
-    
-    st.markdown(f"<div style='text-align:center; margin-bottom: 20px;'>{logo}</div>", unsafe_allow_html=True)
-    st.markdown(f"<h3 style='text-align:center; color: {COR_PRIMARIA}; font-weight:800; font-family:sans-serif; text-transform:uppercase;'>Pesquisa de Clima e Riscos Psicossociais - {comp['razao']}</h3>", unsafe_allow_html=True)
-    
-    # Ajuste dinâmico do texto do alerta baseado na exigência de CPF
-    if exige_cpf:
-        texto_alerta_cpf = "<li>Pedimos a sua identificação de CPF apenas como chave de segurança anti-duplicação, mas fique totalmente tranquilo(a): assim que você clica em enviar, o sistema transforma seu número em um código criptografado, garantindo 100% de anonimato. A empresa nunca saberá quem respondeu o quê.</li>"
-    else:
-        texto_alerta_cpf = "<li>Sua empresa optou por uma pesquisa <strong>100% livre de identificação prévia</strong>. O preenchimento do CPF foi desativado para garantir a você máximo conforto e anonimato absoluto desde o início.</li>"
-
-    st.markdown(f"""
-        <div class='security-alert'>
-            <strong>🔒 A SUA PRIVACIDADE É A NOSSA PRIORIDADE</strong><br>
-            Sua chefia direta, colegas ou liderança <strong>não terão acesso</strong> a ler o que você escreve individualmente e assinala agora nesta tela.<br>
-            <ul>
-                {texto_alerta_cpf}
-                <li>As estatísticas e gráficos gerados depois serão apenas do grupo como um todo, criando bases práticas para o RH intervir e solucionar questões que afetam toda a equipe.</li>
-            </ul>
-        </div>
-    """, unsafe_allow_html=True)
-    
-    with st.form("survey_form"):
-        st.write("#### 1. Seus Dados de Perfil")
-        c1, c2 = st.columns(2)
-        
-        # Renderiza (ou oculta a necessidade) do CPF de forma dinâmica
-        if exige_cpf:
-            cpf_raw = c1.text_input("CPF (Apenas números, para validação de segurança)")
-        else:
-            cpf_raw = "N/A"
-            c1.info("🟢 A identificação por CPF foi desativada pela sua empresa para esta pesquisa. Siga direto para a escolha do setor.")
-        
-        s_keys = ["Geral"] 
-        if 'org_structure' in comp and isinstance(comp['org_structure'], dict) and comp['org_structure']:
-            s_keys = [k for k in comp['org_structure'].keys() if not k.startswith('_')]
-             
-        setor_colab = c2.selectbox("Selecione o seu setor de atuação atual", s_keys)
-        
-        st.markdown("---")
-        st.write(f"#### 2. Avaliação do Ambiente de Trabalho")
-        st.caption("Pense no seu dia a dia ao longo das últimas 4 a 6 semanas e responda de forma muito sincera ao que lhe é perguntado abaixo. Como é que as coisas realmente acontecem para você?")
-        
-        missing = False
-        answers_dict = {}
-        
-        abas_categorias = list(perguntas.keys())
-        tabs = st.tabs(abas_categorias)
-        
-        for i, (category, questions) in enumerate(perguntas.items()):
-            with tabs[i]:
-                st.markdown(f"<h5 style='color: {COR_SECUNDARIA}; font-weight:800; text-transform:uppercase; margin-top:20px; margin-bottom: 25px;'>➡️ Categoria: {category}</h5>", unsafe_allow_html=True)
-                for q in questions:
-                    st.markdown(f"<div style='font-size: 15px; color: #2c3e50; font-weight: 600; margin-bottom: 5px;'>{q['q']}</div>", unsafe_allow_html=True)
-                    if q.get('help'):
-                        st.caption(f"💡 *{q['help']}*")
-                    
-                    options = q.get('options', ["Nunca", "Raramente", "Às vezes", "Frequentemente", "Sempre"])
-                    
-                    response_value = st.radio(
-                        "Qual a sua percepção?", 
-                        options, 
-                        key=f"ans_q_{q['id']}", 
-                        horizontal=True, 
-                        index=None,
-                        label_visibility="collapsed"
-                    )
-                    
-                    if response_value is None: 
-                        missing = True
-                    else: 
-                        answers_dict[q['q']] = response_value
-                    
-                    st.markdown("<hr style='margin:25px 0; border: 0; border-top: 2px dashed #ececec;'>", unsafe_allow_html=True)
-        
-        st.markdown("---")
-        st.write("#### 3. Termo de Consentimento")
-        aceite_lgpd = st.checkbox("Compreendo que a minha participação é voluntária e que as minhas respostas são anônimas e estritamente confidenciais, sendo utilizadas única e exclusivamente para fins de melhoria de qualidade de ambiente de trabalho de acordo e amparado com as normas da base imposta pela Lei Geral de Proteção de Dados (LGPD).")
-        
-        st.markdown("<br>", unsafe_allow_html=True)
-        submit_btn = st.form_submit_button("✅ Enviar Minhas Respostas", type="primary", use_container_width=True)
-        
-        if submit_btn:
-            if exige_cpf and (not cpf_raw or len(cpf_raw) < 11 or cpf_raw == "N/A"): 
-                st.error("⚠️ Atenção: Por favor verifique e insira o seu documento CPF completo (apenas números) para que o envio seja validado e liberado.")
-            elif not aceite_lgpd: 
-                st.error("⚠️ Aviso Obrigatório: É necessário marcar a caixa aceitando os termos da garantia e do anonimato seguro (na proteção da lei) para conseguir enviar.")
-            elif missing: 
-                st.error("⚠️ Atenção: Identificamos que ainda falta preencher algumas opções nas abas acima. Recomendamos revisar cada painel e preencher as lacunas para que o envio da avaliação possa ser registrado.")
-            else:
-                
-                # Se exige CPF, processa o Hash para buscar duplicidade. Senão, cria uma tag aleatória.
-                if exige_cpf:
-                    hashed_cpf = hashlib.sha256(cpf_raw.encode()).hexdigest()
-                    cpf_already_exists = False
-                    
-                    # Checa duplicidade
-                    if DB_CONNECTED:
-                        try:
-                            check_cpf = supabase.table('responses').select("id").eq("company_id", comp['id']).eq("cpf_hash", hashed_cpf).execute()
-                            if len(check_cpf.data) > 0: 
-                                cpf_already_exists = True
-                        except: pass
-                    else:
-                        for r in st.session_state.local_responses_db:
-                            if r['company_id'] == comp['id'] and r['cpf_hash'] == hashed_cpf:
-                                cpf_already_exists = True
-                                break
-                else:
-                    # Modo livre de CPF: Força sempre passar sem checar duplicidade
-                    hashed_cpf = f"anon_livre_{uuid.uuid4().hex}"
-                    cpf_already_exists = False
-
-                if cpf_already_exists:
-                    st.error("🚫 O protocolo de trava antifraude acabou de interceptar o seu envio. Verificamos que o seu código CPF já foi registrado com sucesso nesta avaliação anteriormente. Visando a integridade estatística, a empresa permite apenas uma avaliação por colaborador.")
-                else:
-                    now_str = datetime.datetime.now(datetime.timezone.utc).isoformat()
-                    
-                    if DB_CONNECTED:
-                        try:
-                            supabase.table('responses').insert({
-                                "company_id": comp['id'], 
-                                "cpf_hash": hashed_cpf,
-                                "setor": setor_colab, 
-                                "answers": answers_dict, 
-                                "created_at": now_str
-                            }).execute()
-                        except Exception as e: 
-                            st.error(f"Engasgo no contato e no procedimento que aloja a base: {e}")
-                    else:
-                        st.session_state.local_responses_db.append({
-                            "company_id": comp['id'], 
-                            "cpf_hash": hashed_cpf,
-                            "setor": setor_colab, 
-                            "answers": answers_dict, 
-                            "created_at": now_str
-                        })
-
-                    st.success("🎉 Muito obrigado pela sua participação! Suas respostas foram enviadas com sucesso e segurança. Sua opinião é fundamental para construirmos um ambiente de trabalho cada vez melhor.")
-                    st.balloons()
-                    time.sleep(4.5)
-                    
-                    # Se for o RH em modo Preview, volta pro admin ao invés de deslogar
-                    if is_preview:
-                        st.session_state.user_role = 'admin'
-                        st.session_state.current_company = None
-                    else:
-                        st.session_state.logged_in = False 
-                        
-                    st.rerun()
-
-# ==============================================================================
-# 7. ROTAS (ROUTER PRINCIPAL DO SISTEMA)
-# ==============================================================================
-if not st.session_state.logged_in:
-    if "cod" in st.query_params: 
-        survey_screen()
-    else: 
-        login_screen()
-else:
-    if st.session_state.user_role == 'admin': 
-        admin_dashboard()
-    else: 
-        survey_screen()
-
-# --- FIM ABSOLUTO DO ARQUIVO APP.PY ---
+import streamlit as st
+import pandas as pd
+import numpy as np
+import plotly.express as px
+import plotly.graph_objects as go
+import datetime
+import base64
+import urllib.parse
+import urllib.request
+from streamlit_option_menu import option_menu
+import textwrap
+import hashlib
+import random
+import time
+import json
+import uuid
+import os
+import threading
+import logging
+from supabase import create_client, Client
+
+# ==============================================================================
+# 1. INICIALIZAÇÃO DA PÁGINA E DA CONEXÃO COM O BANCO DE DADOS (SUPABASE)
+# ==============================================================================
+st.set_page_config(
+    page_title="Elo NR-01 | Gestão de Saúde Mental",
+    page_icon="🔗",
+    layout="wide",
+    initial_sidebar_state="expanded"
+)
+
+# Conexão com o Supabase
+try:
+    SUPABASE_URL = st.secrets["supabase"]["url"]
+    SUPABASE_KEY = st.secrets["supabase"]["key"]
+    supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+    DB_CONNECTED = True
+except Exception as e:
+    DB_CONNECTED = False
+
+# ------------------------------------------------------------------------------
+# 1.1. CONFIGURAÇÕES GERAIS E IDENTIDADE VISUAL
+# ------------------------------------------------------------------------------
+def get_saved_settings():
+    default_conf = {
+        "name": "Elo NR-01",
+        "consultancy": "Pessin Gestão e Desenvolvimento Humano",
+        "logo_b64": None,
+        "base_url": "https://elonr01-cris.streamlit.app",
+        "respostas_compactas": False,
+        "excluir_suspeitas": False,
+        "ingestao_em_lote": False
+    }
+    
+    if DB_CONNECTED:
+        try:
+            res = supabase.table('platform_settings').select('config_json').execute()
+            if res.data and len(res.data) > 0:
+                db_conf = res.data[0].get('config_json', {})
+                default_conf.update(db_conf)
+        except Exception as e:
+            pass
+            
+    return default_conf
+
+if 'platform_config' not in st.session_state:
+    st.session_state.platform_config = get_saved_settings()
+
+COR_PRIMARIA = "#003B49"    
+COR_SECUNDARIA = "#40E0D0"  
+COR_FUNDO = "#f4f6f9"
+COR_RISCO_ALTO = "#ef5350"      # Vermelho (Atenção)
+COR_RISCO_MEDIO = "#ffa726"     # Laranja/Amarelo (Moderado)
+COR_RISCO_BAIXO = "#66bb6a"     # Verde (Saudável)
+COR_COMP_A = "#3498db"          # Azul
+COR_COMP_B = "#9b59b6"          # Roxo
+
+# ==============================================================================
+# 2. FOLHA DE ESTILOS EM CASCATA (CSS)
+# ==============================================================================
+st.markdown(f"""
+    <style>
+    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700;800;900&display=swap');
+    
+    .stApp {{ background-color: {COR_FUNDO}; font-family: 'Inter', sans-serif; }}
+    .block-container {{ padding-top: 2rem; padding-bottom: 3rem; }}
+    [data-testid="stSidebar"] {{ background-color: #ffffff; border-right: 1px solid #e0e0e0; box-shadow: 2px 0 5px rgba(0,0,0,0.02); }}
+    
+    .kpi-card {{ background: #ffffff; padding: 20px; border-radius: 12px; box-shadow: 0 4px 6px rgba(0,0,0,0.04); border: 1px solid #f0f0f0; margin-bottom: 15px; display: flex; flex-direction: column; justify-content: space-between; min-height: 120px; height: auto; transition: transform 0.2s ease-in-out; }}
+    .kpi-card:hover {{ transform: translateY(-2px); box-shadow: 0 6px 12px rgba(0,0,0,0.08); }}
+    .kpi-title {{ font-size: 12px; color: #7f8c8d; font-weight: 600; margin-top: 8px; text-transform: uppercase; letter-spacing: 0.5px; }}
+    .kpi-value {{ font-size: 26px; font-weight: 800; color: {COR_PRIMARIA}; margin-top: 5px; }}
+    .kpi-top {{ display: flex; align-items: center; gap: 15px; }}
+    .kpi-icon-box {{ width: 45px; height: 45px; border-radius: 10px; display: flex; align-items: center; justify-content: center; font-size: 22px; flex-shrink: 0; }}
+    
+    .bg-blue {{ background-color: #e3f2fd; color: #1976d2; }}
+    .bg-green {{ background-color: #e8f5e9; color: #388e3c; }}
+    .bg-orange {{ background-color: #fff3e0; color: #f57c00; }}
+    .bg-red {{ background-color: #ffebee; color: #d32f2f; }}
+
+    .chart-container {{ background: #ffffff; padding: 22px; border-radius: 12px; box-shadow: 0 2px 8px rgba(0,0,0,0.04); border: 1px solid #f0f0f0; margin-bottom: 18px; }}
+    .security-alert {{ padding: 1.5rem; background-color: #d1e7dd; color: #0f5132; border: 1px solid #badbcc; border-left: 6px solid #0f5132; border-radius: 0.35rem; margin-bottom: 2rem; font-family: 'Inter', sans-serif; font-size: 0.95rem; }}
+    
+    .a4-paper {{ background: #ffffff; width: 210mm; min-height: 297mm; margin: auto; padding: 40px; box-shadow: 0 0 20px rgba(0,0,0,0.1); color: #333333; font-family: 'Inter', sans-serif; font-size: 11px; line-height: 1.5; }}
+    .rep-table {{ width: 100%; border-collapse: collapse; margin-top: 10px; font-size: 10px; }}
+    .rep-table th {{ background-color: {COR_PRIMARIA}; color: #ffffff; padding: 10px 8px; text-align: left; font-size: 9px; text-transform: uppercase; letter-spacing: 0.5px; }}
+    .rep-table td {{ border-bottom: 1px solid #eeeeee; padding: 10px 8px; vertical-align: top; }}
+    
+    /* Espaçamento elegante para os radio buttons nativos do Streamlit sem quebrar os quadrados */
+    div[role="radiogroup"] {{ gap: 15px; padding-top: 5px; padding-bottom: 15px; }}
+
+    @media print {{
+        [data-testid="stSidebar"], .stButton, header, footer, .no-print {{ display: none !important; }}
+        .a4-paper {{ box-shadow: none; margin: 0; padding: 0; width: 100%; max-width: 100%; }}
+        .stApp {{ background-color: #ffffff; }}
+        .chart-container {{ border: none; box-shadow: none; padding: 0; }}
+    }}
+    </style>
+    """, unsafe_allow_html=True)
+
+# ==============================================================================
+# 3. VARIÁVEIS DE SESSÃO
+# ==============================================================================
+keys_to_init = [
+    'logged_in', 'user_role', 'admin_permission', 'user_username', 
+    'user_credits', 'user_linked_company', 'edit_mode', 'edit_id', 'acoes_list'
+]
+
+for k in keys_to_init:
+    if k not in st.session_state: 
+        st.session_state[k] = None
+
+if st.session_state.acoes_list is None: st.session_state.acoes_list = []
+if st.session_state.user_credits is None: st.session_state.user_credits = 0
+
+if 'users_db' not in st.session_state:
+    st.session_state.users_db = { "admin": { "password": "admin", "role": "Master", "credits": 999999 } }
+if 'companies_db' not in st.session_state: st.session_state.companies_db = []
+if 'local_responses_db' not in st.session_state: st.session_state.local_responses_db = []
+if 'flash_msgs' not in st.session_state: st.session_state.flash_msgs = []
+
+# ------------------------------------------------------------------------------
+# 3.1. BANCO DE METODOLOGIAS (HSE + COPSOQ) - ADAPTADO PARA PT-BR
+# ------------------------------------------------------------------------------
+if 'methodologies' not in st.session_state:
+    # Definição das escalas variadas
+    escala_freq = ["Nunca/Quase Nunca", "Raramente", "Às vezes", "Frequentemente", "Sempre"]
+    escala_conc = ["Discordo Totalmente", "Discordo", "Neutro", "Concordo", "Concordo Totalmente"]
+    escala_int = ["Nada/Quase Nada", "Um pouco", "Moderadamente", "Muito", "Extremamente"]
+    escala_sat = ["Muito Insatisfeito", "Insatisfeito", "Neutro", "Satisfeito", "Muito Satisfeito"]
+    escala_sau = ["Deficitária", "Razoável", "Boa", "Muito Boa", "Excelente"]
+    
+    st.session_state.methodologies = {
+        "HSE-IT (35 itens)": {
+            "desc": "Focado em 7 dimensões de gestão de estresse (Padrão UK/Brasil).",
+            "questions": {
+                "Demandas": [
+                    {"id": "h1", "q": "Tenho prazos impossíveis de cumprir?", "rev": True, "options": escala_freq, "help": "Exemplo: Ser cobrado rotineiramente por entregas urgentes no final do dia."},
+                    {"id": "h2", "q": "Sou pressionado a trabalhar longas horas?", "rev": True, "options": escala_freq, "help": "Exemplo: Sentir que apenas o seu horário normal não é suficiente para a empresa."},
+                    {"id": "h3", "q": "Tenho que trabalhar muito intensamente?", "rev": True, "options": escala_freq, "help": "Exemplo: Não ter tempo nem para fazer uma pequena pausa devido ao volume de demandas."},
+                    {"id": "h4", "q": "Tenho que negligenciar algumas tarefas?", "rev": True, "options": escala_freq, "help": "Exemplo: Ter que fazer as coisas com menos qualidade para dar tempo de entregar tudo."},
+                    {"id": "h5", "q": "Não consigo fazer pausas suficientes?", "rev": True, "options": escala_freq, "help": "Exemplo: Precisar encurtar a hora de almoço frequentemente."},
+                    {"id": "h6", "q": "Sou pressionado por diferentes grupos?", "rev": True, "options": escala_freq, "help": "Exemplo: Receber ordens urgentes e contraditórias de pessoas diferentes."},
+                    {"id": "h7", "q": "Tenho que trabalhar muito rápido?", "rev": True, "options": escala_freq, "help": "Exemplo: O ritmo exigido é sempre acelerado e desgastante."},
+                    {"id": "h8", "q": "Tenho prazos irrealistas?", "rev": True, "options": escala_freq, "help": "Exemplo: Metas que a equipe raramente consegue atingir de forma saudável."}
+                ],
+                "Controle": [
+                    {"id": "h9", "q": "Posso decidir quando fazer uma pausa?", "rev": False, "options": escala_freq, "help": "Exemplo: Ter a liberdade de se levantar ou ir ao banheiro sem pedir autorização."},
+                    {"id": "h10", "q": "Tenho liberdade para decidir como faço o meu trabalho?", "rev": False, "options": escala_freq, "help": "Exemplo: Poder escolher o melhor método ou ferramenta para atingir os resultados."},
+                    {"id": "h11", "q": "Tenho poder de decisão sobre o meu ritmo?", "rev": False, "options": escala_freq, "help": "Exemplo: Poder gerenciar os seus picos de energia durante o dia."},
+                    {"id": "h12", "q": "Eu decido quando vou realizar cada tarefa?", "rev": False, "options": escala_freq, "help": "Exemplo: Ter autonomia para organizar a sua própria agenda diária."},
+                    {"id": "h13", "q": "Tenho voz sobre como o meu trabalho é realizado?", "rev": False, "options": escala_freq, "help": "Exemplo: Suas ideias de melhoria são ouvidas e valorizadas pela gestão."},
+                    {"id": "h14", "q": "O meu horário de trabalho pode ser flexível?", "rev": False, "options": escala_freq, "help": "Exemplo: Ter acesso a banco de horas ou acordos amigáveis com a liderança."}
+                ],
+                "Suporte do Gestor": [
+                    {"id": "h15", "q": "Recebo feedback sobre o trabalho?", "rev": False, "options": escala_freq, "help": "Exemplo: O seu gestor conversa com você de forma clara e respeitosa sobre o seu desempenho."},
+                    {"id": "h16", "q": "Posso contar com o meu superior diante de um problema?", "rev": False, "options": escala_freq, "help": "Exemplo: Saber que o gestor vai ajudar a resolver uma falha, em vez de apenas culpá-lo."},
+                    {"id": "h17", "q": "Posso falar com o meu superior sobre algo que me chateou?", "rev": False, "options": escala_freq, "help": "Exemplo: Sentir que existe um espaço seguro para conversas sinceras."},
+                    {"id": "h18", "q": "Sinto o apoio do meu gestor(a)?", "rev": False, "options": escala_freq, "help": "Exemplo: Sentir que a sua chefia se importa de forma genuína com o seu bem-estar."},
+                    {"id": "h19", "q": "Meu gestor me motiva no trabalho?", "rev": False, "options": escala_freq, "help": "Exemplo: Receber elogios e reconhecimento quando faz um bom trabalho."}
+                ],
+                "Suporte dos Colegas": [
+                    {"id": "h20", "q": "Recebo a ajuda e o apoio que preciso dos meus colegas?", "rev": False, "options": escala_freq, "help": "Exemplo: A equipe é unida e ajuda-se mutuamente nos momentos de maior pressão."},
+                    {"id": "h21", "q": "Recebo o respeito que mereço dos meus colegas?", "rev": False, "options": escala_freq, "help": "Exemplo: O tratamento diário é cordial e livre de preconceitos."},
+                    {"id": "h22", "q": "Meus colegas estão dispostos a ouvir meus problemas?", "rev": False, "options": escala_freq, "help": "Exemplo: Ter com quem desabafar sobre um dia difícil ou um cliente complicado."},
+                    {"id": "h23", "q": "Meus colegas me ajudam em momentos difíceis?", "rev": False, "options": escala_freq, "help": "Exemplo: A equipe divide o esforço quando o volume de trabalho está muito alto."}
+                ],
+                "Relacionamentos": [
+                    {"id": "h24", "q": "Estou sujeito a desrespeito pessoal?", "rev": True, "options": escala_freq, "help": "Exemplo: Ouvir comentários desrespeitosos, constrangedores ou pressões indevidas."},
+                    {"id": "h25", "q": "Existem atritos ou conflitos entre colegas?", "rev": True, "options": escala_freq, "help": "Exemplo: O ambiente é marcado por fofocas, divisões ou discussões frequentes."},
+                    {"id": "h26", "q": "Sinto-me isolado ou sofro bullying?", "rev": True, "options": escala_freq, "help": "Exemplo: Ser excluído de propósito de conversas de trabalho ou ser alvo de piadas de mau gosto."},
+                    {"id": "h27", "q": "Os relacionamentos no trabalho são tensos?", "rev": True, "options": escala_freq, "help": "Exemplo: Sentir que precisa 'pisar em ovos' ao falar com as pessoas por receio de reações exageradas."}
+                ],
+                "Papel na Empresa": [
+                    {"id": "h28", "q": "Sei claramente o que é esperado de mim?", "rev": False, "options": escala_conc, "help": "Exemplo: As suas metas e tarefas diárias estão bem definidas e acordadas."},
+                    {"id": "h29", "q": "Sei como fazer para executar o meu trabalho?", "rev": False, "options": escala_conc, "help": "Exemplo: Você recebeu o treinamento e as ferramentas certas para desempenhar bem a sua função."},
+                    {"id": "h30", "q": "Sei quais são os objetivos do meu departamento?", "rev": False, "options": escala_conc, "help": "Exemplo: Compreende para onde a sua equipe está caminhando estrategicamente."},
+                    {"id": "h31", "q": "Tenho noção clara das minhas responsabilidades?", "rev": False, "options": escala_conc, "help": "Exemplo: Os limites da sua função, até onde pode agir e decidir, estão bem claros."},
+                    {"id": "h32", "q": "Entendo a minha importância na empresa?", "rev": False, "options": escala_conc, "help": "Exemplo: Consegue ver como o seu trabalho diário ajuda no sucesso do negócio."}
+                ],
+                "Gestão de Mudança": [
+                    {"id": "h33", "q": "Tenho oportunidade de tirar dúvidas sobre mudanças?", "rev": False, "options": escala_conc, "help": "Exemplo: Haver um espaço seguro para esclarecimentos quando uma nova regra ou sistema é implementado."},
+                    {"id": "h34", "q": "Sou consultado(a) sobre mudanças no meu trabalho?", "rev": False, "options": escala_conc, "help": "Exemplo: A liderança pede a opinião de quem realiza a tarefa antes de mudar um processo."},
+                    {"id": "h35", "q": "Quando há mudanças, fica claro como vão funcionar?", "rev": False, "options": escala_conc, "help": "Exemplo: A comunicação da empresa é transparente e bem explicada."}
+                ]
+            }
+        },
+        "COPSOQ II (Versão Média PT)": {
+            "desc": "Versão Média Oficial (76 itens - Adaptação PT-BR). Avalia de forma profunda exigências, saúde e valores no ambiente laboral.",
+            "questions": {
+                "Exigências Laborais (Quantidade e Ritmo)": [
+                    {"id": "c1", "q": "Sua carga de trabalho se acumula por ser mal distribuída?", "rev": True, "options": escala_freq},
+                    {"id": "c2", "q": "Com que frequência você não tem tempo para completar todas as tarefas do seu trabalho?", "rev": True, "options": escala_freq},
+                    {"id": "c3", "q": "Precisa fazer horas extras?", "rev": True, "options": escala_freq},
+                    {"id": "c4", "q": "Precisa trabalhar muito rapidamente?", "rev": True, "options": escala_freq},
+                    {"id": "c5", "q": "O seu trabalho exige a sua atenção constante?", "rev": True, "options": escala_freq},
+                    {"id": "c6", "q": "Seu trabalho exige que você seja bom em propor novas ideias?", "rev": False, "options": escala_freq},
+                    {"id": "c7", "q": "O seu trabalho exige que tome decisões difíceis?", "rev": True, "options": escala_freq},
+                    {"id": "c8", "q": "Seu trabalho exige muito de você emocionalmente?", "rev": True, "options": escala_freq}
+                ],
+                "Organização e Influência": [
+                    {"id": "c9", "q": "Você tem um alto grau de influência no seu trabalho?", "rev": False, "options": escala_freq},
+                    {"id": "c10", "q": "Participa na escolha das pessoas com quem trabalha?", "rev": False, "options": escala_freq},
+                    {"id": "c11", "q": "Pode influenciar a quantidade de trabalho que compete a você?", "rev": False, "options": escala_freq},
+                    {"id": "c12", "q": "Tem alguma influência sobre o tipo de tarefas que faz?", "rev": False, "options": escala_freq},
+                    {"id": "c13", "q": "O seu trabalho exige que tenha iniciativa?", "rev": False, "options": escala_freq},
+                    {"id": "c14", "q": "O seu trabalho permite que você aprenda coisas novas?", "rev": False, "options": escala_freq},
+                    {"id": "c15", "q": "O seu trabalho permite usar as suas habilidades ou talentos?", "rev": False, "options": escala_freq},
+                    {"id": "c16", "q": "No seu local de trabalho, você é informado com antecedência sobre decisões importantes ou mudanças?", "rev": False, "options": escala_freq},
+                    {"id": "c17", "q": "Recebe toda a informação que necessita para fazer bem o seu trabalho?", "rev": False, "options": escala_freq}
+                ],
+                "Transparência de Papel e Conflitos": [
+                    {"id": "c18", "q": "Seu trabalho apresenta objetivos claros?", "rev": False, "options": escala_freq},
+                    {"id": "c19", "q": "Sabe exatamente quais são as suas responsabilidades?", "rev": False, "options": escala_freq},
+                    {"id": "c20", "q": "Sabe exatamente o que é esperado de você?", "rev": False, "options": escala_freq},
+                    {"id": "c21", "q": "O seu trabalho é reconhecido e apreciado pela gerência?", "rev": False, "options": escala_freq},
+                    {"id": "c22", "q": "A gerência do seu local de trabalho respeita você?", "rev": False, "options": escala_freq},
+                    {"id": "c23", "q": "Você é tratado de forma justa no seu local de trabalho?", "rev": False, "options": escala_freq},
+                    {"id": "c24", "q": "Faz coisas no seu trabalho que uns concordam mas outros não?", "rev": True, "options": escala_freq},
+                    {"id": "c25", "q": "Por vezes tem que fazer coisas que deveriam ser feitas de outra maneira?", "rev": True, "options": escala_freq},
+                    {"id": "c26", "q": "Por vezes tem que fazer coisas que considera desnecessárias?", "rev": True, "options": escala_freq}
+                ],
+                "Relações Sociais e Liderança": [
+                    {"id": "c27", "q": "Com que frequência tem ajuda e apoio dos seus colegas de trabalho?", "rev": False, "options": escala_freq},
+                    {"id": "c28", "q": "Com que frequência os seus colegas estão dispostos a ouvi-lo(a) sobre os seus problemas de trabalho?", "rev": False, "options": escala_freq},
+                    {"id": "c29", "q": "Com que frequência os seus colegas conversam com você sobre o seu desempenho?", "rev": False, "options": escala_freq},
+                    {"id": "c30", "q": "Com que frequência o seu superior imediato conversa com você sobre como está o andamento do seu trabalho?", "rev": False, "options": escala_freq},
+                    {"id": "c31", "q": "Com que frequência tem ajuda e apoio do seu superior imediato?", "rev": False, "options": escala_freq},
+                    {"id": "c32", "q": "Com que frequência o seu superior imediato conversa com você em relação ao seu desempenho?", "rev": False, "options": escala_freq},
+                    {"id": "c33", "q": "Existe um bom ambiente de trabalho entre você e os seus colegas?", "rev": False, "options": escala_freq},
+                    {"id": "c34", "q": "Existe uma boa cooperação entre os colegas de trabalho?", "rev": False, "options": escala_freq},
+                    {"id": "c35", "q": "No seu local de trabalho você sente que faz parte de uma comunidade?", "rev": False, "options": escala_freq},
+                    {"id": "c36", "q": "Sua chefia oferece para as pessoas e para a equipe boas oportunidades de desenvolvimento?", "rev": False, "options": escala_freq},
+                    {"id": "c37", "q": "Sua chefia dá prioridade à satisfação no trabalho?", "rev": False, "options": escala_freq},
+                    {"id": "c38", "q": "Sua chefia é boa no planejamento do trabalho?", "rev": False, "options": escala_freq},
+                    {"id": "c39", "q": "Sua chefia é boa em resolver conflitos?", "rev": False, "options": escala_freq}
+                ],
+                "Valores, Justiça e Confiança": [
+                    {"id": "c40", "q": "Os colaboradores ocultam informações uns dos outros?", "rev": True, "options": escala_freq},
+                    {"id": "c41", "q": "Os colaboradores ocultam informações da gerência?", "rev": True, "options": escala_freq},
+                    {"id": "c42", "q": "Os colaboradores confiam uns nos outros de um modo geral?", "rev": False, "options": escala_freq},
+                    {"id": "c43", "q": "A gerência confia nos colaboradores para fazerem o trabalho bem feito?", "rev": False, "options": escala_freq},
+                    {"id": "c44", "q": "Você confia na informação que é transmitida pela gerência?", "rev": False, "options": escala_freq},
+                    {"id": "c45", "q": "A gerência oculta informação aos seus colaboradores?", "rev": True, "options": escala_freq},
+                    {"id": "c46", "q": "Os conflitos são resolvidos de uma forma justa?", "rev": False, "options": escala_freq},
+                    {"id": "c47", "q": "As sugestões dos colaboradores são tratadas de forma séria pela gerência?", "rev": False, "options": escala_freq},
+                    {"id": "c48", "q": "O trabalho é igualmente distribuído pelos colaboradores?", "rev": False, "options": escala_freq}
+                ],
+                "Atitude e Satisfação": [
+                    {"id": "c49", "q": "Sou sempre capaz de resolver problemas, se tentar o suficiente.", "rev": False, "options": escala_int},
+                    {"id": "c50", "q": "É fácil para mim seguir os meus planos e atingir os meus objetivos.", "rev": False, "options": escala_int},
+                    {"id": "c51", "q": "O seu trabalho tem algum significado para você?", "rev": False, "options": escala_int},
+                    {"id": "c52", "q": "Você sente que o seu trabalho é importante?", "rev": False, "options": escala_int},
+                    {"id": "c53", "q": "Sente-se motivado e envolvido com o seu trabalho?", "rev": False, "options": escala_int},
+                    {"id": "c54", "q": "Você gosta de falar com outras pessoas sobre o seu local de trabalho?", "rev": False, "options": escala_int},
+                    {"id": "c55", "q": "Você sente que os problemas do seu local de trabalho também são seus?", "rev": False, "options": escala_int},
+                    {"id": "c56", "q": "Em relação ao seu trabalho, quão satisfeito você está com as suas perspectivas profissionais?", "rev": False, "options": escala_sat},
+                    {"id": "c57", "q": "Em relação ao seu trabalho, quão satisfeito você está com as condições físicas do seu local de trabalho?", "rev": False, "options": escala_sat},
+                    {"id": "c58", "q": "Em relação ao seu trabalho, quão satisfeito você está com a forma como as suas capacidades são utilizadas?", "rev": False, "options": escala_sat},
+                    {"id": "c59", "q": "Quão satisfeito você está com o seu trabalho de uma forma global?", "rev": False, "options": escala_sat},
+                    {"id": "c60", "q": "Você se preocupa em ficar desempregado?", "rev": True, "options": escala_int}
+                ],
+                "Saúde, Bem-estar e Rotina": [
+                    {"id": "c61", "q": "Em geral, você sente que a sua saúde é:", "rev": False, "options": escala_sau},
+                    {"id": "c62", "q": "Sente que o seu trabalho exige muita energia que acaba por afetar a sua vida privada negativamente?", "rev": True, "options": escala_int},
+                    {"id": "c63", "q": "Sente que o seu trabalho exige muito tempo que acaba por afetar a sua vida privada negativamente?", "rev": True, "options": escala_int},
+                    {"id": "c64", "q": "Sua família e amigos dizem que você trabalha demais?", "rev": True, "options": escala_int},
+                    {"id": "c65", "q": "Com que frequência nas últimas 4 semanas você sentiu dificuldade para adormecer?", "rev": True, "options": escala_freq},
+                    {"id": "c66", "q": "Com que frequência nas últimas 4 semanas você acordou várias vezes durante a noite e depois não conseguia adormecer?", "rev": True, "options": escala_freq},
+                    {"id": "c67", "q": "Com que frequência nas últimas 4 semanas você sentiu-se fisicamente exausto?", "rev": True, "options": escala_freq},
+                    {"id": "c68", "q": "Com que frequência nas últimas 4 semanas você sentiu-se emocionalmente exausto?", "rev": True, "options": escala_freq},
+                    {"id": "c69", "q": "Com que frequência nas últimas 4 semanas você sentiu-se irritado?", "rev": True, "options": escala_freq},
+                    {"id": "c70", "q": "Com que frequência nas últimas 4 semanas você sentiu-se ansioso?", "rev": True, "options": escala_freq},
+                    {"id": "c71", "q": "Com que frequência nas últimas 4 semanas você sentiu-se triste?", "rev": True, "options": escala_freq},
+                    {"id": "c72", "q": "Com que frequência nas últimas 4 semanas você sentiu falta de interesse pelas coisas do dia a dia?", "rev": True, "options": escala_freq}
+                ],
+                "Ambiente Ofensivo (Últimos 12 meses)": [
+                    {"id": "c73", "q": "Tem sido alvo de insultos ou provocações verbais no trabalho?", "rev": True, "options": escala_freq},
+                    {"id": "c74", "q": "Tem sido exposto a assédio sexual indesejado?", "rev": True, "options": escala_freq},
+                    {"id": "c75", "q": "Tem sido exposto a ameaças de violência?", "rev": True, "options": escala_freq},
+                    {"id": "c76", "q": "Tem sido exposto a agressão física?", "rev": True, "options": escala_freq}
+                ]
+            }
+        }
+    }
+
+# ==============================================================================
+# 4. FUNÇÕES DO SISTEMA (CÁLCULOS E DADOS)
+# ==============================================================================
+def get_logo_html(width=180):
+    if st.session_state.platform_config['logo_b64']:
+        clean_b64 = st.session_state.platform_config['logo_b64']
+        if clean_b64.startswith('data:image'):
+            clean_b64 = clean_b64.split(',')[1]
+        return f'<img src="data:image/png;base64,{clean_b64}" width="{width}" style="max-width: 100%; height: auto;">'
+    
+    svg = f"""
+    <svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 400 120" width="{width}">
+        <style>
+            .t1 {{ font-family: 'Inter', sans-serif; font-weight: 800; font-size: 48px; fill: {COR_PRIMARIA}; }} 
+            .t2 {{ font-family: 'Inter', sans-serif; font-weight: 300; font-size: 48px; fill: {COR_SECUNDARIA}; }} 
+            .sub {{ font-family: 'Inter', sans-serif; font-weight: 600; font-size: 11px; fill: {COR_PRIMARIA}; letter-spacing: 3px; text-transform: uppercase; }}
+        </style>
+        <g transform="translate(10, 20)">
+            <rect x="0" y="10" width="35" height="35" rx="8" ry="8" fill="none" stroke="{COR_SECUNDARIA}" stroke-width="8" />
+            <rect x="20" y="10" width="35" height="35" rx="8" ry="8" fill="none" stroke="{COR_PRIMARIA}" stroke-width="8" />
+        </g>
+        <text x="80" y="55" class="t1">ELO</text>
+        <text x="190" y="55" class="t2">NR-01</text>
+        <text x="82" y="80" class="sub">SISTEMA INTELIGENTE</text>
+    </svg>
+    """
+    b64 = base64.b64encode(svg.encode("utf-8")).decode("utf-8")
+    return f'<img src="data:image/svg+xml;base64,{b64}">'
+
+def image_to_base64(file):
+    try: 
+        if file is not None:
+            bytes_data = file.getvalue()
+            return base64.b64encode(bytes_data).decode('utf-8')
+        return None
+    except Exception as e: 
+        return None
+
+def flash(mensagem, fixa=False, baloes=False):
+    """Guarda uma confirmação para a próxima execução: a ação faz st.rerun() na hora, sem segurar a thread com sleep."""
+    st.session_state.flash_msgs.append({"mensagem": mensagem, "fixa": fixa, "baloes": baloes})
+
+def show_flash():
+    # Exibe (uma única vez) as confirmações deixadas pela ação anterior
+    msgs, st.session_state.flash_msgs = st.session_state.flash_msgs, []
+    for m in msgs:
+        if m['fixa']:
+            st.success(m['mensagem'])
+        else:
+            st.toast(m['mensagem'])
+        if m['baloes']:
+            st.balloons()
+
+def logout(): 
+    st.session_state.logged_in = False
+    st.session_state.user_role = None
+    st.session_state.admin_permission = None
+    st.rerun()
+
+def get_copy_button_html(text_to_copy, button_label="📋 Copiar"):
+    """Cria um botão HTML/JS elegante e nativo para copiar texto diretamente do Streamlit"""
+    safe_text = json.dumps(text_to_copy)
+    html = f"""
+    <!DOCTYPE html>
+    <html>
+    <head>
+    <style>
+    body {{ margin: 0; padding: 0; background-color: transparent; font-family: 'Inter', sans-serif; }}
+    .btn {{
+        background-color: {COR_PRIMARIA};
+        color: #ffffff;
+        border: none;
+        padding: 10px 20px;
+        font-size: 14px;
+        font-weight: 600;
+        border-radius: 8px;
+        cursor: pointer;
+        width: 100%;
+        transition: all 0.3s ease;
+        box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+        display: flex;
+        justify-content: center;
+        align-items: center;
+        gap: 8px;
+    }}
+    .btn:hover {{
+        background-color: {COR_SECUNDARIA};
+        color: {COR_PRIMARIA};
+    }}
+    .btn.copied {{
+        background-color: {COR_RISCO_BAIXO};
+        color: #ffffff;
+    }}
+    </style>
+    </head>
+    <body>
+        <button id="copy-btn" class="btn" onclick='copyAction()'>
+            {button_label}
+        </button>
+        <script>
+            function copyAction() {{
+                const text = {safe_text};
+                const el = document.createElement('textarea');
+                el.value = text;
+                document.body.appendChild(el);
+                el.select();
+                document.execCommand('copy');
+                document.body.removeChild(el);
+                
+                const btn = document.getElementById('copy-btn');
+                const originalText = btn.innerHTML;
+                btn.innerHTML = '✅ Copiado com sucesso!';
+                btn.classList.add('copied');
+                
+                setTimeout(() => {{
+                    btn.innerHTML = originalText;
+                    btn.classList.remove('copied');
+                }}, 2500);
+            }}
+        </script>
+    </body>
+    </html>
+    """
+    return html
+
+# Escala única de conversão das respostas (1 a 5). A ordem das listas define a pontuação direta;
+# itens invertidos usam o espelho (6 - pontos). Em caso de rótulo repetido vale a primeira escala.
+ANSWER_SCALES = [
+    ["Nunca/Quase Nunca", "Nada/Quase Nada", "Muito Insatisfeito", "Deficitária", "Discordo Totalmente"],
+    ["Raramente", "Um pouco", "Insatisfeito", "Razoável", "Discordo"],
+    ["Às vezes", "Moderadamente", "Neutro", "Boa"],
+    ["Frequentemente", "Muito", "Satisfeito", "Muito Boa", "Concordo"],
+    ["Sempre", "Extremamente", "Muito Satisfeito", "Excelente", "Concordo Totalmente"]
+]
+
+ANSWER_SCORE = {}
+for pontos, rotulos in enumerate(ANSWER_SCALES, start=1):
+    for rotulo in rotulos:
+        ANSWER_SCORE.setdefault(rotulo, pontos)
+ANSWER_SCORE_REV = {rotulo: 6 - pontos for rotulo, pontos in ANSWER_SCORE.items()}
+
+# Formato compacto das respostas (coluna answers_codes): um dígito por pergunta, na ordem dos ids da metodologia.
+# O código é a pontuação direta do rótulo (1 a 5) e 0 indica pergunta sem resposta.
+DIGITOS_PARA_CODIGOS = bytes.maketrans(b"012345", bytes(range(6)))
+
+def compile_scoring_table(active_questions):
+    """Pré-compila a tabela de pontuação de uma metodologia: cada item já aponta para o dicionário direto ou invertido."""
+    itens = []
+    for cat, qs in active_questions.items():
+        for q in qs:
+            lookup = ANSWER_SCORE_REV if q.get('rev', False) else ANSWER_SCORE
+            itens.append((cat, q['q'], q.get('id'), lookup))
+    categorias = list(active_questions.keys())
+    return {
+        "categorias": categorias, 
+        "itens": itens,
+        "reversas": np.array([lookup is ANSWER_SCORE_REV for cat, q_text, q_id, lookup in itens], dtype=bool),
+        # Matriz perguntas x dimensões (0/1): somas por pergunta @ categoria_matriz = somas por dimensão
+        "categoria_matriz": np.array([[int(cat == c) for c in categorias] for cat, q_text, q_id, lookup in itens], dtype=np.int64).reshape(len(itens), len(categorias))
+    }
+
+def get_scoring_table(active_questions):
+    # Compilada uma única vez por metodologia e reaproveitada em todos os reruns da sessão
+    if 'scoring_tables' not in st.session_state:
+        st.session_state.scoring_tables = {}
+    chave = tuple(active_questions.keys())
+    if chave not in st.session_state.scoring_tables:
+        st.session_state.scoring_tables[chave] = compile_scoring_table(active_questions)
+    return st.session_state.scoring_tables[chave]
+
+def new_company_aggregate(tabela):
+    # Somas e contagens por pergunta, na mesma ordem dos itens da tabela compilada
+    n_itens = len(tabela['itens'])
+    return {
+        "tabela": tabela, "n": 0, "respostas": [], "codigos": [], "matriz": None,
+        "q_soma": np.zeros(n_itens, dtype=np.int64), "q_cont": np.zeros(n_itens, dtype=np.int64), "setores": {},
+        "setor_q": None, "rollup": None, "rollup_setor": {}
+    }
+
+def add_sector_score(agg, setor, respostas, soma_score):
+    # Total de respondentes e soma dos scores individuais por setor (base do gráfico por área)
+    if setor not in agg['setores']:
+        agg['setores'][setor] = {"respostas": 0, "soma_score": 0.0}
+    agg['setores'][setor]['respostas'] += respostas
+    agg['setores'][setor]['soma_score'] += soma_score
+
+def encode_answers(tabela, ans_dict):
+    """Converte o dicionário texto da pergunta -> rótulo no formato compacto (um código por pergunta)."""
+    return bytes(ANSWER_SCORE.get(ans_dict.get(q_text), 0) for cat, q_text, q_id, lookup in tabela['itens'])
+
+def codes_to_text(codigos):
+    return "".join(str(c) for c in codigos)
+
+def response_codes(tabela, resp_row):
+    # Linhas compactas são lidas direto; linhas legadas (chaveadas pelo texto da pergunta) são convertidas aqui
+    codigos = resp_row.get('_codigos')
+    if codigos is not None:
+        return codigos
+    
+    n_itens = len(tabela['itens'])
+    compacto = resp_row.get('answers_codes')
+    if compacto:
+        codigos = str(compacto).encode('ascii', 'replace').translate(DIGITOS_PARA_CODIGOS)[:n_itens]
+        return codigos.ljust(n_itens, b"\x00")
+    return encode_answers(tabela, resp_row.get('answers') or {})
+
+def add_response(agg, resp_row, descartar_respostas=False):
+    """Registra uma resposta no agregado da empresa. Com descartar_respostas, o JSON é trocado pelos códigos compactos."""
+    codigos = response_codes(agg['tabela'], resp_row)
+    if descartar_respostas:
+        resp_row.pop('answers', None)
+        resp_row.pop('answers_codes', None)
+        resp_row['_codigos'] = codigos
+    agg['codigos'].append(codigos)
+    agg['respostas'].append(resp_row)
+    agg['n'] += 1
+
+def response_day(created_at):
+    """Dia de criação da resposta; sem data vai para "Lote Anterior" e data ilegível para "Geral"."""
+    if not created_at or created_at == '-infinity':
+        return "Lote Anterior"
+    try:
+        return datetime.datetime.fromisoformat(str(created_at).replace('Z', '+00:00')).date()
+    except Exception:
+        return "Geral"
+
+def rollup_sort_key(dia):
+    # Lotes sem data entram antes de qualquer dia, como no histórico original
+    return (1, dia) if isinstance(dia, datetime.date) else (0, dia)
+
+def group_matrix_rows(chaves_linha, matriz, sort_key=None):
+    """Agrupa as linhas da matriz de pontos por chave (dia, setor...): devolve as chaves ordenadas, o total de linhas,
+    as somas e contagens por pergunta de cada grupo (grupos x perguntas) e o grupo de cada linha, sem laço por resposta."""
+    chaves = sorted(set(chaves_linha), key=sort_key)
+    posicao = {chave: i for i, chave in enumerate(chaves)}
+    idx = np.fromiter((posicao[chave] for chave in chaves_linha), dtype=np.int64, count=len(chaves_linha))
+    q_soma = np.zeros((len(chaves), matriz.shape[1]), dtype=np.int64)
+    q_cont = np.zeros_like(q_soma)
+    
+    if len(idx):
+        ordem = np.argsort(idx, kind='stable')
+        idx_ord = idx[ordem]
+        inicios = np.flatnonzero(np.r_[True, idx_ord[1:] != idx_ord[:-1]])
+        matriz_ord = matriz[ordem]
+        q_soma[idx_ord[inicios]] = np.add.reduceat(matriz_ord.astype(np.int64), inicios, axis=0)
+        q_cont[idx_ord[inicios]] = np.add.reduceat((matriz_ord > 0).astype(np.int64), inicios, axis=0)
+    
+    return chaves, np.bincount(idx, minlength=len(chaves)), q_soma, q_cont, idx
+
+def sector_sort_key(setor):
+    # Respostas sem setor ficam por último
+    return (setor is None, str(setor))
+
+def build_daily_rollup(dias_linha, matriz):
+    """Somas e contagens por pergunta agrupadas por dia de criação (dias x perguntas), em ordem cronológica."""
+    dias, n, q_soma, q_cont, idx = group_matrix_rows(dias_linha, matriz, rollup_sort_key)
+    return add_prefix_sums({"dias": dias, "n": n, "q_soma": q_soma, "q_cont": q_cont})
+
+def build_sector_rollups(setores_linha, dias_linha, matriz):
+    """Série diária de cada setor, no formato de build_daily_rollup, num único agrupamento da matriz por (setor, dia)."""
+    chaves, n, q_soma, q_cont, idx = group_matrix_rows(
+        list(zip(setores_linha, dias_linha)), matriz, lambda chave: (sector_sort_key(chave[0]), rollup_sort_key(chave[1]))
+    )
+    # As chaves vêm ordenadas por setor e depois por dia: cada setor é um bloco contíguo [inicio, fim)
+    rollups = {}
+    inicio = 0
+    for fim in range(1, len(chaves) + 1):
+        if fim == len(chaves) or chaves[fim][0] != chaves[inicio][0]:
+            rollups[chaves[inicio][0]] = add_prefix_sums({
+                "dias": [dia for setor, dia in chaves[inicio:fim]], "n": n[inicio:fim], "q_soma": q_soma[inicio:fim], "q_cont": q_cont[inicio:fim]
+            })
+            inicio = fim
+    return rollups
+
+def add_prefix_sums(rollup):
+    # Somas acumuladas com uma linha de zeros na frente: qualquer janela de dias [i, j) é acum[j] - acum[i]
+    for chave in ('n', 'q_soma', 'q_cont'):
+        serie = np.asarray(rollup[chave], dtype=np.int64)
+        zeros = np.zeros((1,) + serie.shape[1:], dtype=np.int64)
+        rollup['acum_' + chave] = np.concatenate([zeros, np.cumsum(serie, axis=0)])
+    return rollup
+
+# Triagem de qualidade das respostas (padrões de preenchimento automático ou contraditório)
+QUALIDADE_MIN_RESPONDIDAS = 0.5   # fração mínima de itens respondidos para avaliar o padrão da resposta
+QUALIDADE_SEQUENCIA_MAX = 0.9     # maior sequência de opções idênticas, como fração dos itens respondidos
+QUALIDADE_GAP_REVERSOS = 2.5      # distância entre as médias dos itens diretos e dos invertidos (já espelhados) de uma mesma dimensão
+QUALIDADE_MIN_ITENS_SENTIDO = 3   # itens respondidos de cada sentido para a dimensão entrar na checagem de coerência
+QUALIDADE_MIN_DIMENSOES = 2       # dimensões incoerentes necessárias para marcar a resposta
+
+def screen_response_quality(codigos, tabela):
+    """Triagem em lote sobre a matriz de códigos (respostas x perguntas): variância das opções, maior sequência
+    de opções idênticas e coerência entre itens diretos e invertidos da mesma dimensão. Devolve as métricas e a máscara de suspeitas."""
+    respondidas = codigos > 0
+    n_resp = respondidas.sum(axis=1)
+    cod_f = codigos.astype(np.float32)
+    media = np.divide(cod_f.sum(axis=1), n_resp, out=np.zeros(len(codigos), dtype=np.float32), where=n_resp > 0)
+    desvios = np.where(respondidas, (cod_f - media[:, None]) ** 2, 0)
+    variancia = np.divide(desvios.sum(axis=1), n_resp, out=np.zeros(len(codigos), dtype=np.float32), where=n_resp > 0)
+    
+    # Comprimento da sequência corrente em cada posição: soma acumulada reiniciada a cada troca de opção
+    iguais = respondidas[:, 1:] & (codigos[:, 1:] == codigos[:, :-1])
+    acum = np.cumsum(iguais, axis=1)
+    sequencia = acum - np.maximum.accumulate(np.where(iguais, 0, acum), axis=1)
+    maior_sequencia = (sequencia.max(axis=1, initial=0) + 1) * (n_resp > 0)
+    
+    # Quem marca a mesma intensidade em itens diretos e invertidos de uma mesma dimensão fica com médias espelhadas
+    # muito distantes. Só entram dimensões com QUALIDADE_MIN_ITENS_SENTIDO itens de cada lado (um item isolado costuma medir
+    # outro construto, como "propor ideias" entre as exigências) e a resposta só é marcada quando a incoerência se repete
+    # em QUALIDADE_MIN_DIMENSOES dimensões. No HSE-IT nenhuma dimensão se qualifica e a checagem não se aplica.
+    pontos = np.where(respondidas, np.where(tabela['reversas'], 6 - cod_f, cod_f), 0).astype(np.float32)
+    dim_dir = (tabela['categoria_matriz'] * ~tabela['reversas'][:, None]).astype(np.float32)
+    dim_inv = (tabela['categoria_matriz'] * tabela['reversas'][:, None]).astype(np.float32)
+    mistas = (dim_dir.sum(axis=0) >= QUALIDADE_MIN_ITENS_SENTIDO) & (dim_inv.sum(axis=0) >= QUALIDADE_MIN_ITENS_SENTIDO)
+    gap_reversos = np.zeros(len(codigos), dtype=np.float32)
+    dims_incoerentes = np.zeros(len(codigos), dtype=np.int64)
+    if mistas.any():
+        resp_f = respondidas.astype(np.float32)
+        n_dir = resp_f @ dim_dir[:, mistas]
+        n_inv = resp_f @ dim_inv[:, mistas]
+        media_dir = np.divide(pontos @ dim_dir[:, mistas], n_dir, out=np.zeros_like(n_dir), where=n_dir > 0)
+        media_inv = np.divide(pontos @ dim_inv[:, mistas], n_inv, out=np.zeros_like(n_inv), where=n_inv > 0)
+        avaliada = (n_dir >= QUALIDADE_MIN_ITENS_SENTIDO) & (n_inv >= QUALIDADE_MIN_ITENS_SENTIDO)
+        gaps = np.where(avaliada, np.abs(media_dir - media_inv), 0)
+        gap_reversos = gaps.max(axis=1)
+        dims_incoerentes = (gaps >= QUALIDADE_GAP_REVERSOS).sum(axis=1)
+    
+    avaliavel = n_resp >= QUALIDADE_MIN_RESPONDIDAS * codigos.shape[1]
+    suspeita = avaliavel & (
+        (variancia == 0) | 
+        (maior_sequencia >= QUALIDADE_SEQUENCIA_MAX * n_resp) | 
+        (dims_incoerentes >= QUALIDADE_MIN_DIMENSOES)
+    )
+    return {
+        "variancia": variancia, "maior_sequencia": maior_sequencia, "gap_reversos": gap_reversos,
+        "dims_incoerentes": dims_incoerentes, "suspeita": suspeita
+    }
+
+def compute_company_matrix(agg, excluir_suspeitas=False):
+    """Decodifica os códigos acumulados numa matriz int8 de pontos (respostas x perguntas) e calcula, de uma vez,
+    as somas por pergunta, o score individual de cada resposta e os totais por setor.
+    Com excluir_suspeitas, as respostas reprovadas na triagem de qualidade contam como recebidas mas ficam fora das médias."""
+    tabela = agg['tabela']
+    n_itens = len(tabela['itens'])
+    codigos = np.frombuffer(b"".join(agg['codigos']), dtype=np.int8).reshape(-1, n_itens)
+    codigos = np.where((codigos >= 1) & (codigos <= 5), codigos, 0).astype(np.int8)
+    matriz = np.where(tabela['reversas'] & (codigos > 0), 6 - codigos, codigos).astype(np.int8)
+    
+    suspeita = screen_response_quality(codigos, tabela)['suspeita']
+    excluida = suspeita if excluir_suspeitas else np.zeros(len(suspeita), dtype=bool)
+    agg['suspeitas'] = int(suspeita.sum())
+    
+    # Score individual com a resposta completa; médias da empresa só com as linhas mantidas
+    soma_linha = matriz.sum(axis=1, dtype=np.int64)
+    cont_linha = (matriz > 0).sum(axis=1, dtype=np.int64)
+    if excluida.any():
+        matriz = np.where(excluida[:, None], 0, matriz).astype(np.int8)
+    validos = matriz > 0
+    
+    agg['matriz'] = matriz
+    agg['codigos'] = []
+    agg['q_soma'] += matriz.sum(axis=0, dtype=np.int64)
+    agg['q_cont'] += validos.sum(axis=0, dtype=np.int64)
+    
+    for resp_row, total_score, count_valid, fora in zip(agg['respostas'], soma_linha.tolist(), cont_linha.tolist(), excluida.tolist()):
+        score = round(total_score / count_valid, 2) if count_valid > 0 else 0
+        resp_row['score_calculado'] = score
+        add_sector_score(agg, resp_row.get('setor'), 0 if fora else 1, 0.0 if fora else score)
+    
+    setores, n_setor, q_soma_setor, q_cont_setor, idx_setor = group_matrix_rows([r.get('setor') for r in agg['respostas']], matriz, sector_sort_key)
+    agg['setor_q'] = {"setores": setores, "n": n_setor, "q_soma": q_soma_setor, "q_cont": q_cont_setor}
+    
+    # Somas e contagens por dimensão de cada resposta: a base compacta das reamostragens (bootstrap) dos laudos
+    mantidas = ~excluida
+    agg['linhas_dim'] = {
+        "soma": (matriz[mantidas].astype(np.int64) @ tabela['categoria_matriz']).astype(np.int16),
+        "cont": (validos[mantidas].astype(np.int64) @ tabela['categoria_matriz']).astype(np.int16),
+        "setor": idx_setor[mantidas].astype(np.int32),
+        "setores": setores
+    }
+    dias_linha = [response_day(r.get('created_at')) for r in agg['respostas']]
+    agg['rollup'] = build_daily_rollup(dias_linha, matriz)
+    agg['rollup_setor'] = build_sector_rollups([r.get('setor') for r in agg['respostas']], dias_linha, matriz)
+    return agg
+
+def score_responses(all_responses, companies_list, methodologies_dict, descartar_respostas=False, excluir_suspeitas=False):
+    """Passo único sobre as respostas (lista ou gerador): grava o score_calculado de cada linha e devolve os agregados por empresa."""
+    comp_method_map = {str(c['id']): c.get('metodologia', 'HSE-IT (35 itens)') for c in companies_list}
+    agregados = {}
+    
+    for resp_row in all_responses:
+        comp_id = str(resp_row.get('company_id'))
+        agg = agregados.get(comp_id)
+        if agg is None:
+            metodo_nome = comp_method_map.get(comp_id, 'HSE-IT (35 itens)')
+            active_questions = methodologies_dict.get(metodo_nome, methodologies_dict['HSE-IT (35 itens)'])['questions']
+            agg = agregados[comp_id] = new_company_aggregate(get_scoring_table(active_questions))
+        
+        add_response(agg, resp_row, descartar_respostas)
+    
+    for agg in agregados.values():
+        compute_company_matrix(agg, excluir_suspeitas)
+    
+    return agregados
+
+def sync_scoring_config():
+    """Espelha a escala de respostas e os itens de cada metodologia nas tabelas usadas pela agregação no servidor.
+    A troca é feita numa única transação por elo_replace_scoring_config, que remove as linhas que deixaram de valer e só
+    reconstrói os agregados incrementais quando a configuração do banco de fato mudou."""
+    escala = [{"rotulo": rotulo, "pontos": pontos} for rotulo, pontos in ANSWER_SCORE.items()]
+    itens = []
+    for metodo_nome, metodo in st.session_state.methodologies.items():
+        tabela = get_scoring_table(metodo['questions'])
+        for ordem, (cat, q_text, q_id, lookup) in enumerate(tabela['itens']):
+            itens.append({
+                "metodologia": metodo_nome, "ordem": ordem, "q_id": q_id, 
+                "q_texto": q_text, "categoria": cat, "rev": lookup is ANSWER_SCORE_REV
+            })
+    
+    supabase.rpc('elo_replace_scoring_config', {"p_escala": escala, "p_itens": itens}).execute()
+    st.session_state.scoring_config_synced = True
+
+def aggregates_from_server(rows, companies_list, methodologies_dict):
+    """Monta os agregados por empresa a partir das linhas de elo_company_aggregates, no mesmo formato de score_responses."""
+    comp_method_map = {str(c['id']): c.get('metodologia', 'HSE-IT (35 itens)') for c in companies_list}
+    agregados = {}
+    por_setor = {}
+    
+    for row in rows:
+        comp_id = str(row.get('company_id'))
+        agg = agregados.get(comp_id)
+        if agg is None:
+            metodo_nome = comp_method_map.get(comp_id, 'HSE-IT (35 itens)')
+            active_questions = methodologies_dict.get(metodo_nome, methodologies_dict['HSE-IT (35 itens)'])['questions']
+            agg = agregados[comp_id] = new_company_aggregate(get_scoring_table(active_questions))
+            por_setor[comp_id] = {}
+        
+        setor = row.get('setor')
+        if setor not in por_setor[comp_id]:
+            por_setor[comp_id][setor] = {"n": 0, "q_soma": np.zeros_like(agg['q_soma']), "q_cont": np.zeros_like(agg['q_cont'])}
+        
+        ordem = row.get('ordem')
+        if ordem is None:
+            agg['n'] += row.get('respostas') or 0
+            por_setor[comp_id][setor]['n'] += row.get('respostas') or 0
+            add_sector_score(agg, setor, row.get('respostas') or 0, float(row.get('soma_score') or 0))
+        elif 0 <= ordem < len(agg['q_soma']):
+            agg['q_soma'][ordem] += row.get('soma') or 0
+            agg['q_cont'][ordem] += row.get('cont') or 0
+            por_setor[comp_id][setor]['q_soma'][ordem] += row.get('soma') or 0
+            por_setor[comp_id][setor]['q_cont'][ordem] += row.get('cont') or 0
+    
+    # Mesmo formato de group_matrix_rows: as linhas do servidor já vêm somadas por setor e pergunta
+    for comp_id, setores in por_setor.items():
+        chaves = sorted(setores, key=sector_sort_key)
+        agregados[comp_id]['setor_q'] = {
+            "setores": chaves,
+            "n": np.array([setores[k]['n'] for k in chaves], dtype=np.int64),
+            "q_soma": np.vstack([setores[k]['q_soma'] for k in chaves]),
+            "q_cont": np.vstack([setores[k]['q_cont'] for k in chaves])
+        }
+    
+    return agregados
+
+def rollup_from_days(dias):
+    # Dicionário dia -> somas do dia no formato de build_daily_rollup (ordem cronológica e somas acumuladas)
+    chaves = sorted(dias, key=rollup_sort_key)
+    return add_prefix_sums({
+        "dias": chaves,
+        "n": np.array([dias[d]['n'] for d in chaves], dtype=np.int64),
+        "q_soma": np.vstack([dias[d]['q_soma'] for d in chaves]),
+        "q_cont": np.vstack([dias[d]['q_cont'] for d in chaves])
+    })
+
+def rollups_from_server(rows, agregados):
+    """Anexa a cada agregado as séries diárias lidas de elo_company_daily_rollups (a da empresa e a de cada setor),
+    no mesmo formato de build_daily_rollup."""
+    por_empresa = {}
+    for row in rows:
+        comp_id = str(row.get('company_id'))
+        agg = agregados.get(comp_id)
+        if agg is None:
+            continue
+        
+        setores = por_empresa.setdefault(comp_id, {})
+        dias = setores.setdefault(row.get('setor'), {})
+        dia = response_day(row.get('dia'))
+        if dia not in dias:
+            dias[dia] = {"n": 0, "q_soma": np.zeros_like(agg['q_soma']), "q_cont": np.zeros_like(agg['q_cont'])}
+        
+        ordem = row.get('ordem')
+        if ordem is None:
+            dias[dia]['n'] += row.get('respostas') or 0
+        elif 0 <= ordem < len(agg['q_soma']):
+            dias[dia]['q_soma'][ordem] += row.get('soma') or 0
+            dias[dia]['q_cont'][ordem] += row.get('cont') or 0
+    
+    for comp_id, setores in por_empresa.items():
+        # A série da empresa é a soma das séries dos setores, dia a dia
+        total = {}
+        for dias in setores.values():
+            for dia, somas in dias.items():
+                if dia not in total:
+                    total[dia] = {"n": 0, "q_soma": np.zeros_like(somas['q_soma']), "q_cont": np.zeros_like(somas['q_cont'])}
+                total[dia]['n'] += somas['n']
+                total[dia]['q_soma'] += somas['q_soma']
+                total[dia]['q_cont'] += somas['q_cont']
+        agregados[comp_id]['rollup'] = rollup_from_days(total)
+        agregados[comp_id]['rollup_setor'] = {setor: rollup_from_days(dias) for setor, dias in sorted(setores.items(), key=lambda item: sector_sort_key(item[0]))}
+    return agregados
+
+def sector_dimension_analytics(agg):
+    """Médias por dimensão e exposição por pergunta de cada setor, calculadas em bloco sobre as somas setor x pergunta.
+    Grava em agg['setores'][setor] as chaves dimensoes, dim_soma, dim_cont e detalhe_perguntas."""
+    setor_q = agg.get('setor_q')
+    if not setor_q or not setor_q['setores']:
+        return agg
+    
+    tabela = agg['tabela']
+    q_soma = setor_q['q_soma']
+    q_cont = setor_q['q_cont']
+    dim_soma = (q_soma @ tabela['categoria_matriz']).tolist()
+    dim_cont = (q_cont @ tabela['categoria_matriz']).tolist()
+    media_q = np.divide(q_soma, q_cont, out=np.full(q_soma.shape, np.nan), where=q_cont > 0)
+    risco_q = np.clip((5.0 - media_q) / 4.0 * 100, 0, 100)
+    textos = [q_text for cat, q_text, q_id, lookup in tabela['itens']]
+    
+    # Matriz setor x pergunta do mapa de calor dos laudos (NaN onde o setor não respondeu a pergunta)
+    agg['exposicao_setor'] = {"setores": setor_q['setores'], "perguntas": textos, "matriz": np.floor(risco_q).astype(np.float32)}
+    
+    for s_i, setor in enumerate(setor_q['setores']):
+        if setor not in agg['setores']:
+            add_sector_score(agg, setor, 0, 0.0)
+        destino = agg['setores'][setor]
+        destino['dim_soma'] = dict(zip(tabela['categorias'], dim_soma[s_i]))
+        destino['dim_cont'] = dict(zip(tabela['categorias'], dim_cont[s_i]))
+        destino['dimensoes'] = {
+            cat: round(soma / cont, 1) if cont else 0.0 
+            for cat, soma, cont in zip(tabela['categorias'], dim_soma[s_i], dim_cont[s_i])
+        }
+        destino['detalhe_perguntas'] = {
+            q_text: int(risco) for q_text, risco, cont in zip(textos, risco_q[s_i].tolist(), q_cont[s_i].tolist()) if cont > 0
+        }
+    return agg
+
+def data_version(*arrays):
+    # Impressão digital das respostas da empresa: muda sempre que uma resposta entra, sai ou troca de setor
+    h = hashlib.sha1()
+    for arr in arrays:
+        h.update(np.ascontiguousarray(arr).tobytes())
+    return h.hexdigest()[:16]
+
+def finalize_company_analytics(comp, agg, active_questions):
+    """Converte as somas e contagens acumuladas nas médias por dimensão, score geral e exposição por pergunta."""
+    comp['respondidas'] = agg['n'] if agg else 0
+    comp['setores'] = sector_dimension_analytics(agg)['setores'] if agg else {}
+    comp['rollup'] = agg.get('rollup') if agg else None
+    comp['rollup_setor'] = agg.get('rollup_setor', {}) if agg else {}
+    comp['linhas_dim'] = agg.get('linhas_dim') if agg else None
+    comp['suspeitas'] = agg.get('suspeitas', 0) if agg else 0
+    comp['exposicao_setor'] = agg.get('exposicao_setor') if agg else None
+    if comp['linhas_dim']:
+        comp['versao_dados'] = data_version(comp['linhas_dim']['soma'], comp['linhas_dim']['cont'], comp['linhas_dim']['setor'])
+    elif agg and agg.get('setor_q'):
+        # Agregação no servidor: sem linhas individuais, a versão vem das somas por setor
+        comp['versao_dados'] = data_version(agg['setor_q']['n'], agg['setor_q']['q_soma'], agg['setor_q']['q_cont'])
+    else:
+        comp['versao_dados'] = None
+    
+    if comp['respondidas'] == 0:
+        comp['score'] = 0.0
+        comp['dimensoes'] = {cat: 0.0 for cat in active_questions.keys()}
+        comp['detalhe_perguntas'] = {}
+        return comp
+
+    tabela = agg['tabela']
+    dimensoes_soma = {cat: 0 for cat in tabela['categorias']}
+    dimensoes_cont = {cat: 0 for cat in tabela['categorias']}
+    detalhe_percent = {}
+    q_soma = np.asarray(agg['q_soma']).tolist()
+    q_cont = np.asarray(agg['q_cont']).tolist()
+    
+    for i, (cat, q_text, q_id, lookup) in enumerate(tabela['itens']):
+        soma = q_soma[i]
+        total = q_cont[i]
+        if total > 0:
+            dimensoes_soma[cat] += soma
+            dimensoes_cont[cat] += total
+            avg_q = soma / total
+            risco_percentual = ((5.0 - avg_q) / 4.0) * 100
+            risco_percentual = max(0, min(100, risco_percentual))
+            detalhe_percent[q_text] = int(risco_percentual)
+
+    dim_averages = {}
+    for cat, soma in dimensoes_soma.items():
+        cont = dimensoes_cont[cat]
+        dim_averages[cat] = round(soma / cont, 1) if cont else 0.0
+
+    comp['dimensoes'] = dim_averages
+    comp['dim_soma'] = dimensoes_soma
+    comp['dim_cont'] = dimensoes_cont
+    vals_validos = [v for v in dim_averages.values() if v > 0]
+    comp['score'] = round(sum(vals_validos) / len(vals_validos), 1) if vals_validos else 0.0
+    comp['detalhe_perguntas'] = detalhe_percent
+    
+    return comp
+
+# Tempo máximo (segundos) que uma leitura do Supabase fica em cache antes de ser refeita
+DATA_CACHE_TTL = 300
+# Empresas com respostas individuais em cache ao mesmo tempo (relatórios lidos a partir das somas do banco)
+DETALHE_CACHE_MAX = 32
+# Tamanho de cada página lida do Supabase (o PostgREST pode limitar a menos; a paginação segue até vir vazia)
+DB_PAGE_SIZE = 1000
+
+def iter_table_rows(build_query, page_size=DB_PAGE_SIZE):
+    """Percorre uma consulta do Supabase em páginas via .range(), entregando as linhas uma a uma."""
+    inicio = 0
+    while True:
+        pagina = build_query().range(inicio, inicio + page_size - 1).execute().data or []
+        if not pagina:
+            break
+        for row in pagina:
+            yield row
+        inicio += len(pagina)
+
+# Quantidade máxima de ids por filtro in_ (evita URLs longas demais no PostgREST)
+DB_IN_CHUNK = 100
+# Colunas de empresas usadas nas listagens e agregados (o logotipo em base64 é carregado à parte, sob demanda)
+# contador_respostas é o companies.respondidas mantido pelo banco (renomeado para não colidir com a contagem dos agregados)
+COMPANY_LIST_COLUMNS = "id, razao, cnpj, cnae, setor, risco, func, limit_evals, metodologia, segmentacao, resp, email, telefone, endereco, valid_until, owner, org_structure, contador_respostas:respondidas"
+
+@st.cache_data(ttl=DATA_CACHE_TTL, show_spinner=False)
+def fetch_company_logo(comp_id):
+    res = supabase.table('companies').select("logo_b64").eq('id', comp_id).execute()
+    return res.data[0].get('logo_b64') if res.data else None
+
+# Configuração da empresa usada pelo link público: compartilhada entre todos os respondentes do processo
+SURVEY_CONFIG_TTL = 120
+SURVEY_CONFIG_COLUMNS = "id, razao, func, limit_evals, metodologia, valid_until, org_structure, respondidas"
+
+@st.cache_data(ttl=SURVEY_CONFIG_TTL, show_spinner=False)
+def fetch_survey_company(cod):
+    """Empresa do link de pesquisa (sem o logotipo), lida uma vez por cod a cada SURVEY_CONFIG_TTL segundos."""
+    res = supabase.table('companies').select(SURVEY_CONFIG_COLUMNS).eq('id', cod).execute()
+    return res.data[0] if res.data else None
+
+def invalidate_survey_config():
+    # Chamado quando o cadastro, os setores ou a exclusão de uma empresa mudam o que o link de pesquisa exibe
+    fetch_survey_company.clear()
+    fetch_company_logo.clear()
+
+def get_company_logo(comp_id):
+    """Logotipo do cliente, buscado apenas quando o cabeçalho da pesquisa ou o laudo precisam dele."""
+    if DB_CONNECTED:
+        try:
+            logo = fetch_company_logo(str(comp_id))
+            if logo: 
+                return logo
+        except Exception as e:
+            pass
+    local = next((c for c in st.session_state.companies_db if str(c['id']) == str(comp_id)), None)
+    return local.get('logo_b64') if local else None
+
+def get_user_scope():
+    # Chave de cache do usuário logado: Master vê tudo, Gestor vê as suas empresas, Analista a empresa vinculada
+    perm = st.session_state.admin_permission
+    if perm == "Gestor":
+        return ("Gestor", st.session_state.user_username)
+    if perm == "Analista":
+        return ("Analista", str(st.session_state.user_linked_company))
+    return ("Master", None)
+
+def scoped_companies_query(escopo):
+    # O filtro de perfil vai direto para a consulta, em vez de baixar todas as empresas da plataforma
+    perfil, chave = escopo
+    query = supabase.table('companies').select(COMPANY_LIST_COLUMNS)
+    if perfil == "Gestor":
+        query = query.eq('owner', chave)
+    elif perfil == "Analista":
+        query = query.eq('id', chave)
+    return query.order('id')
+
+def iter_scope_responses(company_ids):
+    """Respostas do escopo em páginas; com company_ids, filtra por lotes de empresas com in_."""
+    if company_ids is None:
+        yield from iter_table_rows(lambda: supabase.table('responses').select("*").order('id'))
+        return
+    for i in range(0, len(company_ids), DB_IN_CHUNK):
+        lote = company_ids[i:i + DB_IN_CHUNK]
+        yield from iter_table_rows(lambda lote=lote: supabase.table('responses').select("*").in_('company_id', lote).order('id'))
+
+def score_companies(companies, all_answers, agregados, methodologies_dict, descartar_respostas=False, excluir_suspeitas=False):
+    # Uma única varredura pontua as respostas e já produz as somas por empresa, dimensão e pergunta
+    if agregados is None:
+        agregados = score_responses(all_answers, companies, methodologies_dict, descartar_respostas, excluir_suspeitas)
+    
+    for c in companies:
+        if 'org_structure' not in c or not c['org_structure']: 
+            c['org_structure'] = {"Geral": ["Geral"]}
+            
+        metodo_nome = c.get('metodologia', 'HSE-IT (35 itens)')
+        active_questions = methodologies_dict.get(metodo_nome, methodologies_dict['HSE-IT (35 itens)'])['questions']
+        
+        c = finalize_company_analytics(c, agregados.get(str(c['id'])), active_questions)
+
+    # Estruturas derivadas usadas pelas telas do painel, calculadas uma vez por carga
+    df_setores = build_sector_frame(companies)
+    return {
+        "setores": df_setores,
+        "dims_setor": build_sector_dimensions(df_setores),
+        "radares_metodo": build_methodology_radars(companies, methodologies_dict),
+        "alertas": build_alert_index(companies)
+    }
+
+# Regras dos alertas operacionais do painel
+ALERTA_EXPIRACAO_DIAS = 7
+ALERTA_ADESAO_MIN = 70
+ALERTA_SCORE_CRITICO = 3.0
+
+def company_alert_summary(c, hoje):
+    """Resumo de uma empresa no formato do índice de alertas (os totais do escopo são a soma desses resumos)."""
+    func = c.get('func', 1)
+    resp = c.get('respondidas', 0)
+    adesao = (resp / func) * 100 if func > 0 else 0
+    resumo = {
+        "empresas": 1, "respostas": resp, "vidas": c.get('func', 0),
+        "risco": int(0 < c.get('score', 0) < ALERTA_SCORE_CRITICO),
+        "validadas": int(adesao >= ALERTA_ADESAO_MIN),
+        "expirando": [], "baixa_adesao": []
+    }
+    if c.get('valid_until'):
+        try:
+            dias_restantes = (datetime.date.fromisoformat(c['valid_until']) - hoje).days
+            if 0 <= dias_restantes <= ALERTA_EXPIRACAO_DIAS:
+                resumo['expirando'].append((c['razao'], dias_restantes))
+        except: pass
+    if 0 < adesao < ALERTA_ADESAO_MIN:
+        resumo['baixa_adesao'].append((c['razao'], adesao))
+    return resumo
+
+def build_alert_index(companies, hoje=None):
+    """Índice de alertas do escopo: resumo por empresa e totais prontos, refeito a cada carga (toda escrita invalida o cache)
+    e na virada do dia, já que o vencimento dos links depende da data."""
+    hoje = hoje or datetime.date.today()
+    por_empresa = {str(c['id']): company_alert_summary(c, hoje) for c in companies}
+    totais = {"empresas": 0, "respostas": 0, "vidas": 0, "risco": 0, "validadas": 0, "expirando": [], "baixa_adesao": []}
+    for resumo in por_empresa.values():
+        for chave, valor in resumo.items():
+            totais[chave] += valor
+    return {"hoje": hoje, "por_empresa": por_empresa, "totais": totais}
+
+def current_alert_index(indices, companies):
+    # Recalcula o índice uma vez quando a data muda desde a carga em cache
+    if indices['alertas']['hoje'] != datetime.date.today():
+        indices['alertas'] = build_alert_index(companies)
+    return indices['alertas']
+
+def build_methodology_radars(companies, methodologies_dict):
+    """Radar consolidado de cada metodologia do escopo: as médias por dimensão somam os pontos de todas as respostas,
+    então cada empresa pesa pelo seu número de respondentes."""
+    radares = {}
+    for c in companies:
+        if not c.get('respondidas'):
+            continue
+        metodo_nome = c.get('metodologia', 'HSE-IT (35 itens)')
+        if metodo_nome not in methodologies_dict:
+            metodo_nome = 'HSE-IT (35 itens)'
+        
+        radar = radares.setdefault(metodo_nome, {"empresas": 0, "respostas": 0, "dim_soma": {}, "dim_cont": {}})
+        radar['empresas'] += 1
+        radar['respostas'] += c['respondidas']
+        for cat, soma in c.get('dim_soma', {}).items():
+            radar['dim_soma'][cat] = radar['dim_soma'].get(cat, 0) + soma
+            radar['dim_cont'][cat] = radar['dim_cont'].get(cat, 0) + c['dim_cont'].get(cat, 0)
+    
+    for radar in radares.values():
+        radar['dimensoes'] = {
+            cat: round(soma / radar['dim_cont'][cat], 1) if radar['dim_cont'][cat] else 0.0 
+            for cat, soma in radar['dim_soma'].items()
+        }
+    return radares
+
+def build_sector_frame(companies):
+    """Tabela tipada empresa x setor x indicador, montada uma vez por carga a partir das somas por setor (nos dois modos,
+    cálculo no app ou no banco). "Score Geral" usa os respondentes e a soma dos scores individuais; cada dimensão usa as
+    somas e contagens de pontos. As telas filtram com máscaras e agrupam, em vez de recriar DataFrames a cada interação."""
+    comp_ids, setores, indicadores, ns, somas = [], [], [], [], []
+    for c in companies:
+        for setor, tot in (c.get('setores') or {}).items():
+            linhas = [("Score Geral", tot.get('respostas', 0), tot.get('soma_score', 0.0))]
+            linhas += [(dim, tot.get('dim_cont', {}).get(dim, 0), soma) for dim, soma in tot.get('dim_soma', {}).items()]
+            for indicador, n, soma in linhas:
+                comp_ids.append(str(c['id']))
+                setores.append(setor)
+                indicadores.append(indicador)
+                ns.append(n)
+                somas.append(soma)
+    
+    n = np.array(ns, dtype=np.int64)
+    soma = np.array(somas, dtype=np.float64)
+    return pd.DataFrame({
+        "company_id": pd.Categorical(comp_ids, categories=list(dict.fromkeys(str(c['id']) for c in companies))),
+        "setor": pd.Categorical(setores),
+        # Categorias na ordem das dimensões da metodologia, com "Score Geral" primeiro
+        "indicador": pd.Categorical(indicadores, categories=list(dict.fromkeys(indicadores))),
+        "n": n,
+        "soma": soma,
+        "media": np.divide(soma, n, out=np.zeros(len(n)), where=n > 0).astype(np.float32)
+    })
+
+def build_sector_dimensions(df_setores):
+    """Dimensões com pontuação em algum setor identificado, por empresa: as opções do gráfico por setor, calculadas junto com a tabela de setores."""
+    mascara = df_setores['setor'].notna() & (df_setores['indicador'] != "Score Geral") & (df_setores['n'] > 0)
+    return {
+        comp_id: list(indicadores.unique())
+        for comp_id, indicadores in df_setores.loc[mascara].groupby('company_id', observed=True)['indicador']
+    }
+
+@st.cache_data(ttl=DATA_CACHE_TTL, show_spinner=False)
+def fetch_scope_data(escopo, excluir_suspeitas, _methodologies):
+    """Leitura e pontuação das tabelas do Supabase, compartilhada entre as sessões do mesmo escopo até expirar ou ser invalidada.
+    Por padrão lê as somas por empresa, setor, pergunta e dia mantidas pelo banco a cada resposta, sem baixar as respostas;
+    as respostas individuais só são varridas com excluir_suspeitas (a triagem é feita no app) ou se as funções de
+    supabase/migrations não estiverem instaladas."""
+    agregados = None
+    
+    companies = list(iter_table_rows(lambda: scoped_companies_query(escopo)))
+    if not companies:
+        return None
+    
+    # Master lê a plataforma inteira; os demais perfis só transferem as empresas do seu escopo
+    company_ids = None if escopo[0] == "Master" else [c['id'] for c in companies]
+    
+    if not excluir_suspeitas:
+        try:
+            if not st.session_state.get('scoring_config_synced'):
+                sync_scoring_config()
+            params = {} if company_ids is None else {"p_company_ids": [str(cid) for cid in company_ids]}
+            agg_rows = iter_table_rows(lambda: supabase.rpc('elo_company_aggregates', params).order('company_id').order('setor').order('ordem'))
+            agregados = aggregates_from_server(agg_rows, companies, _methodologies)
+            rollup_rows = iter_table_rows(lambda: supabase.rpc('elo_company_daily_rollups', params).order('company_id').order('setor').order('dia').order('ordem'))
+            agregados = rollups_from_server(rollup_rows, agregados)
+        except Exception as e:
+            agregados = None
+    
+    # As respostas chegam página a página direto no motor de pontuação; cada linha guarda só os pontos compactos
+    all_answers = iter_scope_responses(company_ids) if agregados is None else []
+    indices = score_companies(companies, all_answers, agregados, _methodologies, descartar_respostas=True, excluir_suspeitas=excluir_suspeitas)
+    
+    # A tabela de acessos só é usada pelo Master (Configurações)
+    users_raw = supabase.table('admin_users').select("*").execute().data if escopo[0] == "Master" else []
+    return companies, indices, users_raw
+
+@st.cache_data(ttl=DATA_CACHE_TTL, max_entries=DETALHE_CACHE_MAX, show_spinner=False)
+def fetch_response_detail(comp_id, versao_dados, metodologia, _methodologies):
+    """Respostas individuais de uma empresa, pontuadas só para o que as somas do banco não fornecem: as linhas por dimensão
+    dos intervalos de confiança e a contagem de respostas suspeitas. A versão dos dados faz parte da chave do cache,
+    então a empresa só é lida de novo quando as suas respostas mudam."""
+    agregados = score_responses(iter_scope_responses([comp_id]), [{"id": comp_id, "metodologia": metodologia}], _methodologies, descartar_respostas=True)
+    agg = agregados.get(str(comp_id))
+    if agg is None:
+        return None
+    return {"linhas_dim": agg['linhas_dim'], "suspeitas": agg['suspeitas']}
+
+def load_response_detail(comp):
+    """Completa, sob demanda, uma empresa carregada das somas do banco com os dados por resposta usados nos relatórios."""
+    if comp.get('linhas_dim') is not None or not DB_CONNECTED or not comp.get('respondidas'):
+        return comp
+    try:
+        detalhe = fetch_response_detail(comp['id'], comp.get('versao_dados'), comp.get('metodologia', 'HSE-IT (35 itens)'), st.session_state.methodologies)
+    except Exception as e:
+        st.warning(f"⚠️ Não foi possível carregar as respostas individuais desta empresa (intervalos de confiança e triagem indisponíveis): {e}")
+        return comp
+    if detalhe:
+        comp['linhas_dim'] = detalhe['linhas_dim']
+        comp['suspeitas'] = detalhe['suspeitas']
+    return comp
+
+def invalidate_data_cache():
+    # Chamado por todas as rotinas de escrita (empresas, setores, usuários e respostas)
+    fetch_scope_data.clear()
+    fetch_benchmark_index.clear()
+
+# Reamostragens do bootstrap dos laudos, processadas em lotes para limitar a memória (lotes x respondentes)
+BOOTSTRAP_REAMOSTRAS = 2000
+BOOTSTRAP_LOTE = 250
+BOOTSTRAP_NIVEL = 0.95
+# Mínimo de respondentes para estimar o intervalo de um setor
+BOOTSTRAP_MIN_RESPOSTAS = 3
+
+def bootstrap_intervals(dim_soma, dim_cont, reamostras=BOOTSTRAP_REAMOSTRAS, nivel=BOOTSTRAP_NIVEL, seed=0):
+    """Intervalos de confiança (percentis do bootstrap) das médias por dimensão e do score geral.
+    Cada reamostragem é um vetor de pesos multinomiais sobre os respondentes, e todas as médias saem de um produto de matrizes."""
+    n = dim_soma.shape[0]
+    if n == 0:
+        return None
+    rng = np.random.default_rng(seed)
+    soma_f = dim_soma.astype(np.float32)
+    cont_f = dim_cont.astype(np.float32)
+    
+    medias = []
+    for inicio in range(0, reamostras, BOOTSTRAP_LOTE):
+        pesos = rng.multinomial(n, np.full(n, 1.0 / n), size=min(BOOTSTRAP_LOTE, reamostras - inicio)).astype(np.float32)
+        soma = pesos @ soma_f
+        cont = pesos @ cont_f
+        medias.append(np.divide(soma, cont, out=np.zeros_like(soma), where=cont > 0))
+    medias = np.vstack(medias)
+    
+    # Score geral de cada reamostragem: média das dimensões com nota, como no cálculo principal
+    validas = medias > 0
+    n_validas = validas.sum(axis=1)
+    scores = np.divide(np.where(validas, medias, 0).sum(axis=1), n_validas, out=np.zeros(len(medias), dtype=np.float32), where=n_validas > 0)
+    
+    cauda = (1 - nivel) / 2 * 100
+    lim_dim = np.percentile(medias, [cauda, 100 - cauda], axis=0)
+    lim_score = np.percentile(scores, [cauda, 100 - cauda])
+    return {
+        "score": (round(float(lim_score[0]), 2), round(float(lim_score[1]), 2)),
+        "dimensoes": [(round(float(lo), 2), round(float(hi), 2)) for lo, hi in zip(lim_dim[0], lim_dim[1])]
+    }
+
+@st.cache_data(show_spinner=False, max_entries=200)
+def company_confidence_intervals(comp_id, versao_dados, categorias, _linhas_dim):
+    """Intervalos de confiança da empresa e de cada setor, guardados por versão dos dados (nova resposta = nova versão)."""
+    def formatar(res):
+        return {"score": res['score'], "dimensoes": dict(zip(categorias, res['dimensoes']))}
+    
+    resultado = {"geral": formatar(bootstrap_intervals(_linhas_dim['soma'], _linhas_dim['cont'])), "setores": {}}
+    for s_i, setor in enumerate(_linhas_dim['setores']):
+        mascara = _linhas_dim['setor'] == s_i
+        if setor is not None and mascara.sum() >= BOOTSTRAP_MIN_RESPOSTAS:
+            resultado['setores'][setor] = formatar(bootstrap_intervals(_linhas_dim['soma'][mascara], _linhas_dim['cont'][mascara]))
+    return resultado
+
+def get_confidence_intervals(comp, active_questions):
+    # Sem linhas individuais (modo de agregação no servidor, empresa sem respostas ou todas excluídas pela triagem) não há bootstrap
+    if not comp.get('linhas_dim') or comp['linhas_dim']['soma'].shape[0] == 0:
+        return None
+    return company_confidence_intervals(str(comp['id']), comp['versao_dados'], tuple(active_questions.keys()), comp['linhas_dim'])
+
+@st.cache_data(show_spinner=False, max_entries=200)
+def sector_heatmap_html(comp_id, versao_dados, _exposicao):
+    """Mapa de calor setor x pergunta do laudo (perguntas nas linhas, setores nas colunas), montado de uma vez
+    a partir da matriz de exposição e guardado por empresa e versão dos dados."""
+    colunas = [i for i, setor in enumerate(_exposicao['setores']) if setor is not None]
+    if not colunas:
+        return ""
+    matriz = _exposicao['matriz'][colunas].T
+    
+    # Mesmas faixas das barras do raio-X: >= 55% alto, > 20% médio, demais baixo; cinza sem dados
+    cores = np.select(
+        [np.isnan(matriz), matriz >= 55, matriz > 20], 
+        ["#e0e0e0", COR_RISCO_ALTO, COR_RISCO_MEDIO], 
+        default=COR_RISCO_BAIXO
+    )
+    textos = np.where(np.isnan(matriz), "-", np.char.add(np.nan_to_num(matriz).astype(int).astype(str), "%"))
+    celulas = np.char.add(np.char.add(np.char.add(np.char.add(
+        "<td style='padding: 3px; text-align: center; color: #fff; font-weight: bold; background-color: ", cores), ";'>"), textos), "</td>")
+    
+    cabecalho = "".join(f"<th style='padding: 4px; font-size: 8px; color: #555; border-bottom: 2px solid #ddd;'>{_exposicao['setores'][i]}</th>" for i in colunas)
+    linhas = "".join(
+        f"<tr><td style='padding: 3px 6px; color: #444; white-space: nowrap; overflow: hidden; text-overflow: ellipsis; max-width: 260px;' title='{pergunta}'>{q_i + 1}. {pergunta}</td>{''.join(linha)}</tr>"
+        for q_i, (pergunta, linha) in enumerate(zip(_exposicao['perguntas'], celulas.tolist()))
+    )
+    return f"""
+    <table style="width: 100%; font-size: 8px; font-family: 'Helvetica Neue', Helvetica, sans-serif; border-collapse: collapse; table-layout: fixed;">
+        <thead><tr><th style="width: 45%; text-align: left; padding: 4px 6px; border-bottom: 2px solid #ddd; color: #555;">Fator avaliado</th>{cabecalho}</tr></thead>
+        <tbody>{linhas}</tbody>
+    </table>
+    """
+
+# Pontos da distribuição guardados no benchmark (percentis 0, 5, ..., 100)
+BENCHMARK_PERCENTIS = np.arange(0, 101, 5)
+# Mínimo de empresas comparáveis no grupo para exibir a posição relativa
+BENCHMARK_MIN_EMPRESAS = 5
+
+def cnae_prefix(cnae):
+    # Divisão do CNAE: os dois primeiros dígitos, ignorando pontos e traços
+    return "".join(ch for ch in str(cnae or "") if ch.isdigit())[:2]
+
+def benchmark_group(comp):
+    risco = comp.get('risco')
+    return (cnae_prefix(comp.get('cnae')), '' if risco is None else str(risco))
+
+def build_benchmark_index(companies):
+    """Índice de benchmark calculado na sessão (modo local): percentis do score e de cada dimensão por CNAE x risco."""
+    valores = {}
+    for c in companies:
+        if not c.get('respondidas'):
+            continue
+        grupo = valores.setdefault(benchmark_group(c), {})
+        for metrica, valor in [("score", c.get('score', 0))] + list(c.get('dimensoes', {}).items()):
+            if valor > 0:
+                grupo.setdefault(metrica, []).append(valor)
+    return {
+        chave: {metrica: {"empresas": len(v), "percentis": np.percentile(v, BENCHMARK_PERCENTIS)} for metrica, v in grupo.items()}
+        for chave, grupo in valores.items()
+    }
+
+@st.cache_data(ttl=DATA_CACHE_TTL, show_spinner=False)
+def fetch_benchmark_index(prefixos):
+    """Aplica no banco as atualizações pendentes do benchmark e lê apenas os grupos das divisões CNAE pedidas."""
+    supabase.rpc('elo_refresh_benchmark', {}).execute()
+    rows = iter_table_rows(lambda: supabase.table('elo_benchmark').select("cnae_prefixo, risco, metrica, empresas, percentis").in_('cnae_prefixo', list(prefixos)).order('cnae_prefixo').order('risco').order('metrica'))
+    index = {}
+    for row in rows:
+        index.setdefault((row['cnae_prefixo'], row['risco']), {})[row['metrica']] = {
+            "empresas": row['empresas'], "percentis": np.array(row['percentis'], dtype=float)
+        }
+    return index
+
+def get_benchmark_index(companies):
+    # No banco o índice cobre todos os clientes da plataforma; no modo local, as empresas da sessão
+    if DB_CONNECTED:
+        try:
+            return fetch_benchmark_index(tuple(sorted({cnae_prefix(c.get('cnae')) for c in companies})))
+        except Exception as e:
+            return {}
+    return build_benchmark_index(st.session_state.companies_db)
+
+def benchmark_percentile(index, comp, metrica="score", valor=None):
+    """Posição (0 a 100) da empresa no seu grupo CNAE x risco, interpolada nos percentis do índice; None sem base suficiente."""
+    dist = index.get(benchmark_group(comp), {}).get(metrica)
+    valor = comp.get('score', 0) if valor is None else valor
+    if not dist or dist['empresas'] < BENCHMARK_MIN_EMPRESAS or not valor:
+        return None
+    return int(round(float(np.interp(valor, dist['percentis'], BENCHMARK_PERCENTIS))))
+
+def load_data_from_db():
+    if DB_CONNECTED:
+        try:
+            cached = fetch_scope_data(
+                get_user_scope(), 
+                bool(st.session_state.platform_config.get('excluir_suspeitas')), 
+                st.session_state.methodologies
+            )
+            if cached:
+                companies, indices, users_raw = cached
+                if users_raw:
+                    st.session_state.users_db = {u['username']: u for u in users_raw}
+                return companies, indices
+        except Exception as e:
+            pass
+    
+    # Modo local: os dados vivem na sessão e não passam pelo cache compartilhado
+    companies = st.session_state.companies_db
+    all_answers = st.session_state.local_responses_db
+    indices = score_companies(companies, all_answers, None, st.session_state.methodologies, excluir_suspeitas=bool(st.session_state.platform_config.get('excluir_suspeitas')))
+    return companies, indices
+
+# Agrupamentos disponíveis no Histórico de Evolução
+HISTORY_BUCKETS = ["Mensal", "Semanal", "Trimestral", "Ciclo de Avaliação"]
+# Opção do seletor de setor do histórico que mostra a empresa inteira
+HISTORY_TODOS_SETORES = "Todos os setores"
+# Intervalo mínimo (em dias) sem nenhuma resposta que separa dois ciclos de avaliação
+CICLO_INTERVALO_DIAS = 45
+
+def history_bucket_labels(dias, modo="Mensal"):
+    """Rótulo do período de cada dia da série; lotes sem data mantêm o próprio rótulo em qualquer agrupamento."""
+    if modo == "Semanal":
+        return [f"S{d.isocalendar()[1]:02d}/{d.isocalendar()[0]}" if isinstance(d, datetime.date) else d for d in dias]
+    if modo == "Trimestral":
+        return [f"T{(d.month - 1) // 3 + 1}/{d.year}" if isinstance(d, datetime.date) else d for d in dias]
+    if modo == "Ciclo de Avaliação":
+        # Um novo ciclo começa quando a coleta fica parada por mais de CICLO_INTERVALO_DIAS
+        ciclos, anterior = [], None
+        for d in dias:
+            if not isinstance(d, datetime.date):
+                ciclos.append(None)
+                continue
+            if anterior is None or (d - anterior).days > CICLO_INTERVALO_DIAS:
+                ciclos.append([d, d])
+            else:
+                ciclos.append(ciclos[-1])
+                ciclos[-1][1] = d
+            anterior = d
+        labels, numeros = [], {}
+        for d, ciclo in zip(dias, ciclos):
+            if ciclo is None:
+                labels.append(d)
+                continue
+            numero = numeros.setdefault(id(ciclo), len(numeros) + 1)
+            labels.append(f"Ciclo {numero} ({ciclo[0].strftime('%m/%Y')} a {ciclo[1].strftime('%m/%Y')})")
+        return labels
+    return [d.strftime('%m/%Y') if isinstance(d, datetime.date) else d for d in dias]
+
+def generate_real_history(empresa, active_questions, modo="Mensal", setor=HISTORY_TODOS_SETORES):
+    """Série da empresa (ou de um setor dela) no agrupamento escolhido, respondida por subtração das somas acumuladas por dia.
+    A adesão de um setor é medida sobre o total de vidas da empresa, o único quadro de funcionários cadastrado."""
+    if setor == HISTORY_TODOS_SETORES:
+        rollup = empresa.get('rollup')
+    else:
+        rollup = (empresa.get('rollup_setor') or {}).get(setor)
+    if not rollup or not rollup['dias']:
+        return []
+    
+    total_vidas = empresa.get('func', 1)
+    tabela = get_scoring_table(active_questions)
+    periodos = history_bucket_labels(rollup['dias'], modo)
+    
+    # Os dias já vêm em ordem cronológica, então cada período é um bloco contíguo [inicio, fim) da série
+    inicios = np.array([i for i in range(len(periodos)) if i == 0 or periodos[i] != periodos[i - 1]], dtype=np.int64)
+    fins = np.append(inicios[1:], len(periodos))
+    n_periodo = rollup['acum_n'][fins] - rollup['acum_n'][inicios]
+    q_soma_periodo = rollup['acum_q_soma'][fins] - rollup['acum_q_soma'][inicios]
+    q_cont_periodo = rollup['acum_q_cont'][fins] - rollup['acum_q_cont'][inicios]
+    
+    history_list = []
+    for k, i in enumerate(inicios.tolist()):
+        agg_periodo = {"tabela": tabela, "n": int(n_periodo[k]), "setores": {}, "q_soma": q_soma_periodo[k], "q_cont": q_cont_periodo[k]}
+        comp_stats = finalize_company_analytics({'id': empresa['id'], 'func': total_vidas}, agg_periodo, active_questions)
+        
+        history_list.append({
+            "periodo": periodos[i],
+            "score": comp_stats.get('score', 0),
+            "vidas": total_vidas,
+            "adesao": int((agg_periodo['n'] / total_vidas) * 100) if total_vidas > 0 else 0,
+            "dimensoes": comp_stats.get('dimensoes', {})
+        })
+        
+    return history_list
+
+def get_local_cpf_index():
+    # Índice (empresa, cpf_hash) das respostas do modo local, montado uma vez por sessão
+    if 'local_cpf_index' not in st.session_state:
+        st.session_state.local_cpf_index = {(str(r['company_id']), r['cpf_hash']) for r in st.session_state.local_responses_db}
+    return st.session_state.local_cpf_index
+
+class QuotaExceeded(Exception):
+    """A empresa já atingiu o limite de questionários (limit_evals)."""
+
+# Fila de ingestão em lote (opcional, para picos de envio): cada resposta é confirmada assim que chega ao arquivo
+# de contingência e vai para o banco em inserts agrupados, ao juntar INGESTAO_LOTE_MAX ou a cada INGESTAO_INTERVALO_SEG
+# Os arquivos guardam cpf_hash e respostas: por padrão ficam fora da pasta do projeto (ELO_SPILL_PATH muda o local)
+INGESTAO_LOTE_MAX = 50
+INGESTAO_INTERVALO_SEG = 5
+INGESTAO_SPILL_PATH = os.environ.get("ELO_SPILL_PATH") or os.path.join(os.path.expanduser("~"), ".elo-nr01", "fila_respostas.jsonl")
+# Respostas que o banco recusou em definitivo (cota esgotada, empresa removida...), guardadas para conferência e reenvio manual
+INGESTAO_REJEITADAS_PATH = os.path.join(os.path.dirname(INGESTAO_SPILL_PATH), "respostas_rejeitadas.jsonl")
+
+logger = logging.getLogger("elo.ingestao")
+
+def is_row_error(e):
+    """Erro do Postgres causado pelo conteúdo da linha (SQLSTATE de dados, integridade, esquema ou exceção de gatilho),
+    que se repetiria em qualquer nova tentativa. Falhas de rede ou de disponibilidade do banco não têm código e ficam na fila."""
+    codigo = str(getattr(e, 'code', '') or '')
+    return len(codigo) == 5 and codigo[:2] in ('22', '23', '42', 'P0')
+
+def insert_response_batch(lote):
+    """Grava um lote com um único upsert (envios repetidos são ignorados pela restrição única). Se o banco recusar o lote
+    por causa de alguma linha, as linhas são regravadas uma a uma e as recusadas voltam em (linha, motivo) para o descarte.
+    Falhas de conexão sobem como exceção e o lote inteiro continua na fila."""
+    try:
+        supabase.table('responses').upsert(lote, on_conflict="company_id,cpf_hash", ignore_duplicates=True).execute()
+        return []
+    except Exception as e:
+        if 'elo_quota_excedida' not in str(e) and not is_row_error(e):
+            raise
+    
+    rejeitadas = []
+    for row in lote:
+        try:
+            supabase.table('responses').upsert(row, on_conflict="company_id,cpf_hash", ignore_duplicates=True).execute()
+        except Exception as e:
+            if 'elo_quota_excedida' in str(e):
+                rejeitadas.append((row, "cota esgotada"))
+            elif is_row_error(e):
+                rejeitadas.append((row, str(e)))
+            else:
+                raise
+    return rejeitadas
+
+def write_jsonl(caminho, linhas):
+    # Acréscimo durável (fsync) aos arquivos da fila
+    with open(caminho, 'a', encoding='utf-8') as f:
+        f.writelines(json.dumps(linha, ensure_ascii=False) + "\n" for linha in linhas)
+        f.flush()
+        os.fsync(f.fileno())
+
+def replace_jsonl(caminho, linhas):
+    """Regrava o arquivo inteiro sem janela de perda: escreve um temporário, faz fsync e troca com os.replace.
+    Se algo falhar no meio, o arquivo anterior continua intacto."""
+    temporario = caminho + ".tmp"
+    try:
+        with open(temporario, 'w', encoding='utf-8') as f:
+            f.writelines(json.dumps(linha, ensure_ascii=False) + "\n" for linha in linhas)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporario, caminho)
+    except Exception:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+
+def flush_ingestion_queue(fila):
+    """Envia o início da fila ao banco. Em caso de erro de conexão tudo continua na fila e no arquivo; como o insert
+    é idempotente, reenviar um lote parcialmente gravado não duplica respostas. Linhas recusadas em definitivo vão
+    para o arquivo de rejeitadas, para não travar o restante da fila."""
+    with fila['envio']:
+        with fila['lock']:
+            lote = fila['pendentes'][:INGESTAO_LOTE_MAX]
+        if not lote:
+            return 0
+        
+        rejeitadas = insert_response_batch(lote)
+        if rejeitadas:
+            agora = datetime.datetime.now(datetime.timezone.utc).isoformat()
+            write_jsonl(INGESTAO_REJEITADAS_PATH, [{"motivo": motivo, "rejeitada_em": agora, "resposta": row} for row, motivo in rejeitadas])
+            for row, motivo in rejeitadas:
+                logger.warning("Resposta da empresa %s recusada pelo banco (%s); guardada em %s", row.get('company_id'), motivo, INGESTAO_REJEITADAS_PATH)
+        
+        with fila['lock']:
+            del fila['pendentes'][:len(lote)]
+            fila['chaves'].difference_update((str(r['company_id']), r['cpf_hash']) for r in lote)
+            fila['desde'] = time.monotonic() if fila['pendentes'] else None
+            # O arquivo passa a conter só o que ainda não foi gravado
+            replace_jsonl(INGESTAO_SPILL_PATH, fila['pendentes'])
+        
+        invalidate_data_cache()
+        return len(lote)
+
+def ingestion_worker(fila):
+    # Thread de fundo: acorda por tamanho (evento) ou por tempo e esvazia a fila em lotes
+    while True:
+        fila['evento'].wait(INGESTAO_INTERVALO_SEG)
+        fila['evento'].clear()
+        try:
+            while True:
+                with fila['lock']:
+                    cheio = len(fila['pendentes']) >= INGESTAO_LOTE_MAX
+                    vencido = fila['desde'] is not None and time.monotonic() - fila['desde'] >= INGESTAO_INTERVALO_SEG
+                if not (cheio or vencido) or not flush_ingestion_queue(fila):
+                    break
+        except Exception as e:
+            # Banco indisponível: o lote continua na fila e no arquivo até a próxima rodada
+            logger.warning("Falha ao gravar o lote da fila de respostas (%d pendentes): %s", len(fila['pendentes']), e)
+
+def load_ingestion_queue():
+    """Monta a fila recuperando do arquivo de contingência o que um processo anterior aceitou e não chegou a gravar."""
+    fila = {
+        "lock": threading.Lock(), "envio": threading.Lock(), "evento": threading.Event(),
+        "pendentes": [], "chaves": set(), "desde": None
+    }
+    os.makedirs(os.path.dirname(INGESTAO_SPILL_PATH) or ".", exist_ok=True)
+    if os.path.exists(INGESTAO_SPILL_PATH):
+        with open(INGESTAO_SPILL_PATH, encoding='utf-8') as f:
+            for linha in f:
+                try:
+                    fila['pendentes'].append(json.loads(linha))
+                except ValueError:
+                    pass
+        fila['chaves'] = {(str(r['company_id']), r['cpf_hash']) for r in fila['pendentes']}
+        fila['desde'] = time.monotonic() if fila['pendentes'] else None
+    return fila
+
+@st.cache_resource(show_spinner=False)
+def get_ingestion_queue():
+    # Fila única do processo, compartilhada por todas as sessões, com a thread que grava os lotes
+    fila = load_ingestion_queue()
+    threading.Thread(target=ingestion_worker, args=(fila,), daemon=True, name="elo-ingestao").start()
+    return fila
+
+def has_spilled_responses():
+    try:
+        return os.path.getsize(INGESTAO_SPILL_PATH) > 0
+    except OSError:
+        return False
+
+def enqueue_response(nova_resposta):
+    """Aceita a resposta na fila do processo: grava no arquivo de contingência (fsync) antes de confirmar ao colaborador.
+    Devolve False se o mesmo CPF já estiver aguardando na fila para a empresa."""
+    fila = get_ingestion_queue()
+    chave = (str(nova_resposta['company_id']), nova_resposta['cpf_hash'])
+    with fila['lock']:
+        if chave in fila['chaves']:
+            return False
+        write_jsonl(INGESTAO_SPILL_PATH, [nova_resposta])
+        fila['pendentes'].append(nova_resposta)
+        fila['chaves'].add(chave)
+        if fila['desde'] is None:
+            fila['desde'] = time.monotonic()
+        if len(fila['pendentes']) >= INGESTAO_LOTE_MAX:
+            fila['evento'].set()
+    return True
+
+def submit_response(nova_resposta):
+    """Grava a resposta numa única ida ao banco, sem checagem prévia: a restrição única (company_id, cpf_hash)
+    descarta o envio repetido e o gatilho do contador recusa o que passar da cota (QuotaExceeded).
+    Devolve False quando o CPF já havia respondido para a empresa.
+    Com a ingestão em lote ativa, a resposta vai para a fila e duplicidade/cota são resolvidas na gravação do lote."""
+    if DB_CONNECTED and st.session_state.platform_config.get('ingestao_em_lote'):
+        return enqueue_response(nova_resposta)
+    
+    if DB_CONNECTED:
+        try:
+            res = supabase.table('responses').upsert(nova_resposta, on_conflict="company_id,cpf_hash", ignore_duplicates=True).execute()
+        except Exception as e:
+            if 'elo_quota_excedida' in str(e):
+                raise QuotaExceeded() from e
+            raise
+        if not res.data:
+            return False
+        invalidate_data_cache()
+        return True
+    
+    chave = (str(nova_resposta['company_id']), nova_resposta['cpf_hash'])
+    indice = get_local_cpf_index()
+    if chave in indice:
+        return False
+    indice.add(chave)
+    st.session_state.local_responses_db.append(nova_resposta)
+    return True
+
+def delete_company(comp_id):
+    if DB_CONNECTED:
+        try:
+            supabase.table('responses').delete().eq('company_id', comp_id).execute()
+            supabase.table('admin_users').delete().eq('linked_company_id', comp_id).execute()
+            supabase.table('companies').delete().eq('id', comp_id).execute()
+        except Exception as e: 
+            st.warning(f"Não foi possível remover no momento: {e}")
+            return
+        finally:
+            invalidate_data_cache()
+            invalidate_survey_config()
+    
+    st.session_state.companies_db = [c for c in st.session_state.companies_db if str(c['id']) != str(comp_id)]
+    flash("✅ O Cliente e todos os dados associados foram removidos com sucesso.")
+    st.rerun()
+
+def delete_user(username):
+    if DB_CONNECTED:
+        try:
+            supabase.table('admin_users').delete().eq('username', username).execute()
+        except Exception as e: 
+            st.error(f"Erro ao remover: {e}")
+        invalidate_data_cache()
+    
+    if username in st.session_state.users_db:
+        del st.session_state.users_db[username]
+    
+    flash(f"✅ O usuário [{username}] foi removido com sucesso!")
+    st.rerun()
+
+def kpi_card(title, value, icon, color_class):
+    st.markdown(f"""
+        <div class="kpi-card">
+            <div class="kpi-top">
+                <div class="kpi-icon-box {color_class}">{icon}</div>
+                <div class="kpi-value">{value}</div>
+            </div>
+            <div class="kpi-title">{title}</div>
+        </div>
+    """, unsafe_allow_html=True)
+
+def gerar_analise_robusta(dimensoes):
+    riscos = [k for k, v in dimensoes.items() if v < 3.0 and v > 0]
+    texto = "O presente diagnóstico mapeou os principais indicadores de saúde e bem-estar no ambiente de trabalho da equipe. A avaliação foi baseada em rigorosas metodologias de saúde ocupacional. "
+    
+    if riscos:
+        texto += f"A análise revela que os fatores associados a **{', '.join(riscos)}** requerem atenção especial por parte da liderança, pois apresentam resultados abaixo do recomendável (Score Inferior a 3.0). Quando não gerenciados adequadamente, estes fatores podem contribuir para o aumento do estresse, desgaste emocional e rotatividade na equipe. "
+    else:
+        texto += "Os resultados indicam um ambiente de trabalho globalmente saudável, equilibrado e com bons níveis de proteção e bem-estar. As métricas avaliadas encontram-se dentro de parâmetros muito positivos. "
+    
+    texto += "Recomendamos que as lideranças e a equipe de RH analisem as ações propostas a seguir, procurando aplicar melhorias contínuas para fortalecer ainda mais o clima organizacional."
+    return texto
+
+def gerar_banco_sugestoes(dimensoes):
+    sugestoes = []
+    
+    if dimensoes.get("Demandas", 5) < 3.8 or dimensoes.get("Exigências Laborais (Quantidade e Ritmo)", 5) < 3.8:
+        sugestoes.append({
+            "acao": "Avaliação Ergonômica e Cognitiva da Carga de Trabalho", 
+            "estrat": "Analisar profundamente as rotinas para identificar sobrecargas invisíveis (trabalho cognitivo e emocional intenso), tarefas duplicadas e otimizar a distribuição do trabalho na base.", 
+            "area": "Gestão de Demandas", "resp": "Coordenação de Área", "prazo": "30 a 60 dias"
+        })
+        sugestoes.append({
+            "acao": "Matriz de Prioridades e Redução de Urgências", 
+            "estrat": "Treinar as equipes a organizar melhor o tempo e blindar os colaboradores contra a cultura da urgência, evitando o desgaste contínuo e combatendo 'incêndios diários'.", 
+            "area": "Gestão de Demandas", "resp": "Líderes de Equipe", "prazo": "15 dias"
+        })
+        sugestoes.append({
+            "acao": "Política de Desconexão Digital", 
+            "estrat": "Criar combinados claros com a equipe sobre o respeito absoluto aos horários de descanso, evitando e-mails e mensagens de trabalho fora do expediente contratual.", 
+            "area": "Gestão de Demandas", "resp": "Recursos Humanos", "prazo": "30 dias"
+        })
+        sugestoes.append({
+            "acao": "Rodízio de Tarefas de Alto Desgaste Emocional", 
+            "estrat": "Implementar um sistema de revezamento para colaboradores que lidam constantemente com clientes difíceis ou situações de alta carga emocional, evitando a fadiga e o cinismo.", 
+            "area": "Design do Trabalho", "resp": "Coordenação Operacional", "prazo": "Contínuo"
+        })
+        sugestoes.append({
+            "acao": "Pausas Estratégicas Obrigatórias", 
+            "estrat": "Institucionalizar micropausas de descompressão cognitiva entre blocos intensos de concentração, melhorando a preservação mental da equipe (ex: Técnica Pomodoro aplicada).", 
+            "area": "Saúde Ocupacional", "resp": "SESMT / Liderança", "prazo": "Imediato"
+        })
+        
+    if dimensoes.get("Controle", 5) < 3.8 or dimensoes.get("Organização e Influência", 5) < 3.8:
+        sugestoes.append({
+            "acao": "Job Crafting (Redesenho do Trabalho)", 
+            "estrat": "Autorizar e estimular que o profissional tenha autonomia para remodelar de forma positiva a maneira como executa suas tarefas diárias, respeitando sua forma de produzir.", 
+            "area": "Autonomia e Organização", "resp": "Gestão Direta", "prazo": "90 dias"
+        })
+        sugestoes.append({
+            "acao": "Gestão Focada em Entregas (Resultados vs. Horas)", 
+            "estrat": "Migrar o foco da avaliação baseada em presencialismo (horas em tela) para a qualidade das entregas, fomentando maior responsabilidade e flexibilidade de tempo.", 
+            "area": "Autonomia e Organização", "resp": "Diretoria e Lideranças", "prazo": "Trimestral"
+        })
+        sugestoes.append({
+            "acao": "Comitês de Escuta Ativa para Decisões", 
+            "estrat": "Envolver os profissionais da base em pequenas rodadas de escuta ANTES de tomar decisões top-down sobre softwares, rotinas ou mudanças no ambiente físico.", 
+            "area": "Autonomia e Organização", "resp": "Líderes de Setor", "prazo": "Ad Hoc"
+        })
+        sugestoes.append({
+            "acao": "Programa de Aproveitamento de Talentos", 
+            "estrat": "Mapear habilidades subutilizadas na equipe e criar projetos especiais onde o colaborador possa usar todo seu potencial criativo e técnico.", 
+            "area": "Desenvolvimento", "resp": "T&D (Treinamento)", "prazo": "Plano Anual"
+        })
+        
+    if dimensoes.get("Suporte do Gestor", 5) < 3.8 or dimensoes.get("Suporte dos Colegas", 5) < 3.8 or dimensoes.get("Relações Sociais e Liderança", 5) < 3.8:
+        sugestoes.append({
+            "acao": "Letramento em Liderança Empática e Sensível", 
+            "estrat": "Treinar intensivamente toda a camada de gestão em Inteligência Emocional, Comunicação Não-Violenta (CNV) e condução de equipes com segurança psicológica.", 
+            "area": "Liderança", "resp": "Pessin Gestão / RH", "prazo": "90 dias"
+        })
+        sugestoes.append({
+            "acao": "Reuniões de Check-in (1:1) Focadas no Humano", 
+            "estrat": "Implementar agendas inegociáveis de 1:1 focadas não nas metas da semana, mas em ouvir as dores, a carreira e o bem-estar genuíno do colaborador.", 
+            "area": "Liderança", "resp": "Gestão Direta", "prazo": "Ação Contínua"
+        })
+        sugestoes.append({
+            "acao": "Cultura Constante de Reconhecimento Positivo", 
+            "estrat": "Criar um fórum de elogios abertos ou plataformas onde líderes e colegas valorizam publicamente pequenas vitórias, destruindo a cultura de 'apontar só os erros'.", 
+            "area": "Clima", "resp": "Recursos Humanos", "prazo": "Imediato"
+        })
+        sugestoes.append({
+            "acao": "Programa de Mentoria Institucional (Buddy)", 
+            "estrat": "Designar 'padrinhos' veteranos e acolhedores para acompanhar de perto cada novo colaborador nos primeiros 90 dias, reduzindo a sensação de solidão organizacional.", 
+            "area": "Clima e Acolhimento", "resp": "Recursos Humanos", "prazo": "30 dias"
+        })
+        sugestoes.append({
+            "acao": "Dinâmicas de Fortalecimento de Equipe (Team Building)", 
+            "estrat": "Investir em rituais leves e de descompressão fora do ambiente estrito de trabalho para fortalecer os laços de comunidade, pertencimento e confiança interpessoal.", 
+            "area": "Clima", "resp": "Comunicação Interna", "prazo": "Semestral"
+        })
+
+    if dimensoes.get("Relacionamentos", 5) < 3.8 or dimensoes.get("Ambiente Ofensivo (Últimos 12 meses)", 5) < 3.8 or dimensoes.get("Transparência de Papel e Conflitos", 5) < 3.8:
+        sugestoes.append({
+            "acao": "Política de Tolerância Zero (Assédio e Discriminação)", 
+            "estrat": "Oficializar e divulgar agressivamente um código de conduta inquebrável contra bullying, assédio moral, exclusões ou palavras ofensivas, com consequências rígidas.", 
+            "area": "Compliance e Clima", "resp": "Diretoria e Jurídico", "prazo": "Imediato"
+        })
+        sugestoes.append({
+            "acao": "Canal de Ouvidoria Anônimo e Independente", 
+            "estrat": "Contratar ou disponibilizar uma plataforma terceira 100% blindada para o reporte seguro de assédio ou liderança abusiva, garantindo total ausência de retaliação.", 
+            "area": "Compliance", "resp": "RH Estratégico", "prazo": "60 dias"
+        })
+        sugestoes.append({
+            "acao": "Mediação Profissional de Conflitos Internos", 
+            "estrat": "Frente à identificação de setores 'tóxicos', intervir cirurgicamente com especialistas em mediação de conflito para desfazer panelinhas e resolver quebras de relação.", 
+            "area": "Clima", "resp": "Pessin Gestão / RH", "prazo": "Sob Demanda"
+        })
+        
+    if dimensoes.get("Papel na Empresa", 5) < 3.8 or dimensoes.get("Valores, Justiça e Confiança", 5) < 3.8 or dimensoes.get("Atitude e Satisfação", 5) < 3.8:
+        sugestoes.append({
+            "acao": "Alinhamento Claro de Funções (Job Description Vivo)", 
+            "estrat": "Acabar com as zonas cinzentas de responsabilidade. Documentar e assinar junto com o time o que exatamente é (e o que não é) tarefa daquela posição.", 
+            "area": "Organização", "resp": "Gestores de Área", "prazo": "60 dias"
+        })
+        sugestoes.append({
+            "acao": "Cascateamento de Propósito e Visão", 
+            "estrat": "Liderança de topo deve descer à operação para mostrar, com exemplos claros, como o aperto de um parafuso ou o envio de um e-mail base impacta a vida do cliente final.", 
+            "area": "Sentido do Trabalho", "resp": "Direção Executiva", "prazo": "Trimestral"
+        })
+        sugestoes.append({
+            "acao": "Transparência em Critérios de Promoção e Mérito", 
+            "estrat": "Aumentar a justiça organizacional divulgando abertamente o que é necessário realizar (PDI, metas) para ascender na empresa, evitando promoções percebidas como favoritismo.", 
+            "area": "Justiça e Cultura", "resp": "Recursos Humanos", "prazo": "Plano Anual"
+        })
+        sugestoes.append({
+            "acao": "Fórum de Transparência da Diretoria", 
+            "estrat": "Criar um espaço (Town Hall) onde a gerência abre o jogo sobre as dificuldades, rumos e sucessos da empresa, reduzindo a sensação de que 'escondem informações'.", 
+            "area": "Confiança", "resp": "Diretoria", "prazo": "Semestral"
+        })
+        
+    if dimensoes.get("Gestão de Mudança", 5) < 3.8:
+        sugestoes.append({
+            "acao": "Comunicação Antecipada e Transparente", 
+            "estrat": "Nunca surpreender o time com mudanças que afetam sua rotina. Explicar sempre o 'porquê' da alteração com semanas de antecedência, mitigando a ansiedade natural.", 
+            "area": "Gestão de Mudança", "resp": "Comunicação Interna", "prazo": "Por Projeto"
+        })
+        sugestoes.append({
+            "acao": "Comitê de Embaixadores da Mudança", 
+            "estrat": "Identificar formadores de opinião na operação para testarem novos sistemas primeiro e atuarem como multiplicadores de segurança para os colegas mais resistentes.", 
+            "area": "Gestão de Mudança", "resp": "Líder de Projetos", "prazo": "Por Projeto"
+        })
+
+    if dimensoes.get("Saúde, Bem-estar e Rotina", 5) < 3.8:
+        sugestoes.append({
+            "acao": "Programa Estruturado de Apoio Psicológico", 
+            "estrat": "Firmar parcerias com plataformas terapêuticas subsidiando sessões de psicoterapia, com foco urgente no combate aos altos índices de ansiedade e exaustão emocional.", 
+            "area": "Saúde Mental", "resp": "Benefícios / SESMT", "prazo": "Ação Imediata"
+        })
+        sugestoes.append({
+            "acao": "Workshops de Higiene do Sono e Prevenção ao Burnout", 
+            "estrat": "Trazer profissionais de saúde para ensinar o colaborador a 'desligar' o cérebro à noite e reconhecer em si e nos colegas os sinais precoces da estafa.", 
+            "area": "Saúde Ocupacional", "resp": "T&D e SESMT", "prazo": "Trimestral"
+        })
+        sugestoes.append({
+            "acao": "Políticas Reais de Flexibilidade Familiar", 
+            "estrat": "Apoiar mães/pais na conciliação familiar com horários híbridos reais, auxílio-creche estruturado e respeito a emergências familiares, reduzindo a culpa do trabalhador.", 
+            "area": "Bem-estar (Work-life)", "resp": "RH Institucional", "prazo": "Revisão Anual"
+        })
+        
+    if not sugestoes:
+        sugestoes.append({
+            "acao": "Monitoramento Contínuo com Pesquisas de Pulso", 
+            "estrat": "Não relaxar o acompanhamento. Manter questionários semanais de 3 perguntas na intranet para identificar qualquer micro-fissura no clima rapidamente.", 
+            "area": "Estratégia Geral", "resp": "Recursos Humanos", "prazo": "Contínuo"
+        })
+        sugestoes.append({
+            "acao": "Pacote Avançado de Qualidade de Vida", 
+            "estrat": "Sustentar a boa saúde mental com iniciativas premium: Gympass ativo, massagem rápida, snacks saudáveis, palestras de educação financeira e bem-estar geral.", 
+            "area": "Estratégia Geral", "resp": "Recursos Humanos", "prazo": "Contínuo"
+        })
+        
+    return sugestoes
+
+# ==============================================================================
+# 5. MÓDULO DE TELAS E FLUXOS DA LIDERANÇA / RH
+# ==============================================================================
+
+def login_screen():
+    c1, c2, c3 = st.columns([1, 1.2, 1])
+    with c2:
+        st.markdown("<br><br><br>", unsafe_allow_html=True)
+        st.markdown(f"<div style='text-align:center'>{get_logo_html(250)}</div>", unsafe_allow_html=True)
+        plat_name = st.session_state.platform_config.get('name', 'Sistema')
+        st.markdown(f"<h3 style='text-align:center; color:#555;'>Bem-vindo(a) ao {plat_name}</h3>", unsafe_allow_html=True)
+        st.markdown("<p style='text-align:center; color:gray;'>Acesso exclusivo para Gestores e Consultores</p>", unsafe_allow_html=True)
+        
+        with st.form("login"):
+            user = st.text_input("Seu Usuário de Acesso")
+            pwd = st.text_input("Sua Senha", type="password")
+            
+            if st.form_submit_button("Acessar o Painel", type="primary", use_container_width=True):
+                login_ok = False
+                user_role_type = "Analista"
+                user_credits = 0
+                linked_comp = None
+                
+                if DB_CONNECTED:
+                    try:
+                        res = supabase.table('admin_users').select("*").eq('username', user).eq('password', pwd).execute()
+                        if res.data: 
+                            login_ok = True
+                            user_data = res.data[0]
+                            user_role_type = user_data.get('role', 'Master')
+                            user_credits = user_data.get('credits', 0)
+                            linked_comp = user_data.get('linked_company_id')
+                    except: pass
+                
+                if not login_ok and user in st.session_state.users_db and st.session_state.users_db[user].get('password') == pwd:
+                    login_ok = True
+                    user_data = st.session_state.users_db[user]
+                    user_role_type = user_data.get('role', 'Analista')
+                    user_credits = user_data.get('credits', 0)
+                    linked_comp = user_data.get('linked_company_id')
+                
+                if login_ok:
+                    valid_until = user_data.get('valid_until')
+                    if valid_until and datetime.datetime.today().isoformat() > valid_until:
+                        st.error("🔒 O seu acesso atingiu a data de validade. Por favor, fale conosco para renovar.")
+                    else:
+                        st.session_state.logged_in = True
+                        st.session_state.user_role = 'admin'
+                        
+                        if user == 'admin':
+                            user_role_type = 'Master'
+                            user_credits = 999999
+                        
+                        st.session_state.admin_permission = user_role_type 
+                        st.session_state.user_username = user
+                        st.session_state.user_credits = user_credits
+                        st.session_state.user_linked_company = linked_comp
+                        
+                        st.rerun()
+                else: 
+                    st.error("⚠️ Não conseguimos encontrar este usuário ou a senha está incorreta. Tente novamente.")
+                    
+
+def admin_dashboard():
+    companies_data, indices = load_data_from_db()
+    df_setores = indices['setores']
+    
+    perm = st.session_state.admin_permission
+    curr_user = st.session_state.user_username
+    
+    if perm == "Gestor":
+        visible_companies = [c for c in companies_data if c.get('owner') == curr_user]
+    elif perm == "Analista":
+        linked_id = st.session_state.user_linked_company
+        visible_companies = [c for c in companies_data if c['id'] == linked_id]
+    else: 
+        visible_companies = companies_data
+
+    # Consumo lido do contador mantido pelo banco (no modo local, da contagem dos agregados)
+    def respostas_consumidas(c):
+        contador = c.get('contador_respostas')
+        return contador if contador is not None else c.get('respondidas', 0)
+    total_used_by_user = sum(respostas_consumidas(c) for c in visible_companies) if perm != "Analista" else (respostas_consumidas(visible_companies[0]) if visible_companies else 0)
+    credits_left = st.session_state.user_credits - total_used_by_user
+
+    menu_options = ["Visão Geral", "Links de Pesquisa", "Relatórios e Laudos", "Histórico de Evolução"]
+    if perm in ["Master", "Gestor"]:
+        menu_options.insert(1, "Clientes (Empresas)")
+        menu_options.insert(2, "Setores e Cargos")
+    if perm == "Master":
+        menu_options.append("Configurações")
+
+    icons_map = {
+        "Visão Geral": "grid", 
+        "Clientes (Empresas)": "building", 
+        "Setores e Cargos": "list-task", 
+        "Links de Pesquisa": "link-45deg", 
+        "Relatórios e Laudos": "file-text", 
+        "Histórico de Evolução": "clock-history", 
+        "Configurações": "gear"
+    }
+
+    with st.sidebar:
+        st.markdown(f"<div style='text-align:center; margin-bottom:30px; margin-top:20px;'>{get_logo_html(160)}</div>", unsafe_allow_html=True)
+        st.caption(f"Bem-vindo(a), **{curr_user}** <br> Perfil: **{perm}**", unsafe_allow_html=True)
+        
+        if perm != "Master":
+            st.info(f"💳 Avaliações Disponíveis: {credits_left}")
+
+        selected = option_menu(
+            menu_title=None, 
+            options=menu_options, 
+            icons=[icons_map[o] for o in menu_options], 
+            default_index=0, 
+            styles={"nav-link-selected": {"background-color": COR_PRIMARIA}}
+        )
+        st.markdown("---")
+        if st.button("🚪 Sair com Segurança", use_container_width=True): 
+            logout()
+
+    if selected == "Visão Geral":
+        st.title("Visão Geral do Sistema")
+        
+        lista_empresas_filtro = ["Todas as Empresas"] + [c['razao'] for c in visible_companies]
+        empresa_filtro = st.selectbox("Selecione os dados que deseja visualizar:", lista_empresas_filtro)
+        
+        if empresa_filtro != "Todas as Empresas":
+            companies_filtered = [c for c in visible_companies if c['razao'] == empresa_filtro]
+        else:
+            companies_filtered = visible_companies
+
+        # --- KPIS E ALERTAS DE RISCO, EXPIRAÇÃO E ADESÃO (lidos do índice de alertas da carga) ---
+        indice_alertas = current_alert_index(indices, companies_data)
+        if empresa_filtro != "Todas as Empresas":
+            resumo_view = indice_alertas['por_empresa'].get(str(companies_filtered[0]['id'])) if companies_filtered else None
+        else:
+            resumo_view = indice_alertas['totais'] if len(visible_companies) == len(companies_data) else None
+        if resumo_view is None:
+            resumo_view = build_alert_index(companies_filtered, indice_alertas['hoje'])['totais']
+        
+        total_resp_view = resumo_view['respostas']
+        total_vidas_view = resumo_view['vidas']
+        alertas_risco = resumo_view['risco']
+        empresas_expirando = resumo_view['expirando']
+        empresas_baixa_adesao = resumo_view['baixa_adesao']
+        
+        # --- RENDERIZAÇÃO DOS KPIS TOP ---
+        col1, col2, col3, col4 = st.columns(4)
+        if perm == "Analista":
+            with col1: kpi_card("Total de Colaboradores", total_vidas_view, "👥", "bg-blue")
+            with col2: kpi_card("Respostas Recebidas", total_resp_view, "✅", "bg-green")
+            with col3: kpi_card("Avaliações Disponíveis", credits_left, "💳", "bg-orange") 
+        else:
+            with col1: kpi_card("Empresas Ativas", resumo_view['empresas'], "🏢", "bg-blue")
+            with col2: kpi_card("Respostas Recebidas", total_resp_view, "✅", "bg-green")
+            if perm == "Master": 
+                with col3: kpi_card("Total de Vidas Mapeadas", total_vidas_view, "👥", "bg-orange") 
+            else: 
+                with col3: kpi_card("Avaliações Disponíveis", credits_left, "💳", "bg-orange")
+
+        with col4: kpi_card("Score Global Crítico", alertas_risco, "🚨", "bg-red")
+        
+        # --- POSIÇÃO NO BENCHMARK (empresa selecionada x empresas do mesmo CNAE e grau de risco) ---
+        if len(companies_filtered) == 1 and companies_filtered[0].get('respondidas', 0) > 0:
+            emp_bench = companies_filtered[0]
+            indice_bench = get_benchmark_index(companies_filtered)
+            pct_bench = benchmark_percentile(indice_bench, emp_bench)
+            if pct_bench is not None:
+                prefixo_bench, risco_bench = benchmark_group(emp_bench)
+                n_bench = indice_bench[(prefixo_bench, risco_bench)]['score']['empresas']
+                st.info(f"📈 **Benchmark (CNAE {prefixo_bench} · Grau de Risco {risco_bench}):** o score desta empresa está no **percentil {pct_bench}** entre {n_bench} empresas comparáveis.")
+        
+        # --- BANNER DE ALERTAS E PENDÊNCIAS (Inteligência RH) ---
+        if alertas_risco > 0 or empresas_expirando or empresas_baixa_adesao:
+            st.markdown("<div class='chart-container'>", unsafe_allow_html=True)
+            st.markdown("##### ⚠️ Painel de Alertas e Pendências Operacionais")
+            
+            if empresas_expirando:
+                for emp, dias in empresas_expirando:
+                    st.warning(f"⏳ **Prazo Perto de Expirar:** A pesquisa da empresa **{emp}** encerra em **{dias} dias**. Lembre-se de verificar o volume e solicitar extensão se necessário.")
+            
+            if empresas_baixa_adesao:
+                st.info(f"📊 **Amostragem Insuficiente:** **{len(empresas_baixa_adesao)} empresa(s)** estão com coletas em andamento, mas ainda não atingiram a marca de segurança estatística (**70%** de adesão da população).")
+            
+            if alertas_risco > 0:
+                st.error(f"❤️‍🩹 **Risco de Saúde Ocupacional:** Identificamos **{alertas_risco} empresa(s)** que apresentam um Score Geral na Zona Crítica (Abaixo de 3.0 na média).")
+                
+            st.markdown("</div>", unsafe_allow_html=True)
+
+        st.markdown("<br>", unsafe_allow_html=True)
+        c1, c2 = st.columns([1, 1.5])
+        
+        with c1:
+            st.markdown("<div class='chart-container'>", unsafe_allow_html=True)
+            st.markdown("##### Média Geral por Dimensão (Radar)")
+            
+            if companies_filtered and total_resp_view > 0:
+                # Uma empresa usa as próprias médias; a visão consolidada lê os radares por metodologia da carga
+                if empresa_filtro != "Todas as Empresas":
+                    emp_radar = companies_filtered[0]
+                    radares_view = {emp_radar.get('metodologia', 'HSE-IT (35 itens)'): {"empresas": 1, "respostas": emp_radar.get('respondidas', 0), "dimensoes": emp_radar.get('dimensoes', {})}}
+                elif len(visible_companies) == len(companies_data):
+                    radares_view = indices['radares_metodo']
+                else:
+                    # Gestor no modo local: a carga traz empresas de outros donos, o radar usa só as visíveis
+                    radares_view = build_methodology_radars(visible_companies, st.session_state.methodologies)
+                
+                abas_radar = st.tabs(list(radares_view.keys())) if len(radares_view) > 1 else [st.container()]
+                for aba, (metodo_radar, radar) in zip(abas_radar, radares_view.items()):
+                    with aba:
+                        categories = list(radar['dimensoes'].keys())
+                        fig_radar = go.Figure(go.Scatterpolar(r=list(radar['dimensoes'].values()), theta=categories, fill='toself', name='Média Global', line_color=COR_SECUNDARIA))
+                        fig_radar.update_layout(polar=dict(radialaxis=dict(visible=True, range=[0, 5])), height=300, margin=dict(t=20, b=20))
+                        st.plotly_chart(fig_radar, use_container_width=True)
+                        st.caption(f"Metodologia: **{metodo_radar}** · {radar['empresas']} empresa(s) · {radar['respostas']} respostas (média ponderada pelos respondentes)")
+            else: 
+                st.info("Aguardando novas respostas para gerar o gráfico.")
+            st.markdown("</div>", unsafe_allow_html=True)
+            
+        with c2:
+            st.markdown("<div class='chart-container'>", unsafe_allow_html=True)
+            st.markdown("##### Média de Saúde Ocupacional por Setor")
+            if total_resp_view > 0:
+                # Somas por setor e indicador da carga, filtradas por máscara (também no modo de agregação no servidor)
+                mascara_setor = df_setores['company_id'].isin([str(c['id']) for c in companies_filtered]) & df_setores['setor'].notna()
+                dims_disponiveis = list(dict.fromkeys(d for c in companies_filtered for d in indices['dims_setor'].get(str(c['id']), [])))
+                indicador_setor = st.selectbox("Indicador por setor:", ["Score Geral"] + dims_disponiveis, label_visibility="collapsed")
+                
+                por_setor = (
+                    df_setores.loc[mascara_setor & (df_setores['indicador'] == indicador_setor)]
+                    .groupby('setor', observed=True)[['n', 'soma']].sum()
+                )
+                por_setor = por_setor[por_setor['n'] > 0]
+                df_setor = pd.DataFrame({
+                    'setor': por_setor.index.astype(str), 
+                    'score_calculado': (por_setor['soma'] / por_setor['n']).to_numpy()
+                })
+                
+                if df_setor is not None and not df_setor.empty:
+                    fig_bar = px.bar(
+                        df_setor, 
+                        x='setor', 
+                        y='score_calculado', 
+                        title="Comparativo entre Áreas", 
+                        color='score_calculado', 
+                        color_continuous_scale='RdYlGn', 
+                        range_y=[0, 5]
+                    )
+                    st.plotly_chart(fig_bar, use_container_width=True)
+                else: 
+                    st.info("Sem dados suficientes de setores para processar.")
+            else: 
+                st.info("Aguardando as respostas dos colaboradores para formar o gráfico de barras.")
+            st.markdown("</div>", unsafe_allow_html=True)
+        
+        c3, c4 = st.columns([1.5, 1])
+        with c3:
+             st.markdown("<div class='chart-container'>", unsafe_allow_html=True)
+             st.markdown("##### Status Científico das Avaliações (Regra dos 70%)")
+             if companies_filtered:
+                 status_dist = {
+                     "Amostra Validada (≥ 70%)": resumo_view['validadas'], 
+                     "Amostra Insuficiente (< 70%)": resumo_view['empresas'] - resumo_view['validadas']
+                 }
+                 
+                 fig_pie = px.pie(names=list(status_dist.keys()), values=list(status_dist.values()), hole=0.6, color_discrete_sequence=[COR_RISCO_BAIXO, COR_RISCO_MEDIO])
+                 fig_pie.update_layout(height=250, margin=dict(t=0, b=0, l=0, r=0))
+                 st.plotly_chart(fig_pie, use_container_width=True)
+                 st.caption("Gráfico mapeia quantas empresas já atingiram a taxa de segurança estatística para emissão do Laudo final.")
+             else: 
+                 st.info("Cadastre uma empresa para visualizar este gráfico.")
+             st.markdown("</div>", unsafe_allow_html=True)
+
+    elif selected == "Clientes (Empresas)":
+        st.title("Gestão de Clientes")
+        
+        if st.session_state.edit_mode:
+            st.markdown("<div class='chart-container'>", unsafe_allow_html=True)
+            st.subheader("✏️ Editar os Dados do Cliente")
+            target_id = st.session_state.edit_id
+            emp_edit = next((c for c in visible_companies if c['id'] == target_id), None)
+            
+            if emp_edit:
+                with st.form("edit_form"):
+                    c1, c2, c3 = st.columns(3)
+                    new_razao = c1.text_input("Razão Social", value=emp_edit['razao'])
+                    new_cnpj = c2.text_input("CNPJ", value=emp_edit.get('cnpj',''))
+                    new_cnae = c3.text_input("CNAE", value=emp_edit.get('cnae',''))
+                    
+                    c4, c5, c6 = st.columns(3)
+                    risco_opts = [1, 2, 3, 4]
+                    idx_risco = risco_opts.index(emp_edit.get('risco',1)) if emp_edit.get('risco',1) in risco_opts else 0
+                    new_risco = c4.selectbox("Grau de Risco (1 a 4)", risco_opts, index=idx_risco)
+                    new_func = c5.number_input("Número de Colaboradores (Vidas)", min_value=1, value=emp_edit.get('func',100))
+                    new_limit = c6.number_input("Limite de Questionários (Cota)", min_value=1, value=emp_edit.get('limit_evals', 100))
+                    
+                    seg_opts = ["GHE", "Setor", "GES"]
+                    idx_seg = seg_opts.index(emp_edit.get('segmentacao','GHE')) if emp_edit.get('segmentacao','GHE') in seg_opts else 0
+                    new_seg = c6.selectbox("Tipo de Segmentação", seg_opts, index=idx_seg)
+                    
+                    c7, c8, c9 = st.columns(3)
+                    new_resp = c7.text_input("Nome do Responsável (RH/Líder)", value=emp_edit.get('resp',''))
+                    new_email = c8.text_input("E-mail do Responsável", value=emp_edit.get('email',''))
+                    new_tel = c9.text_input("Telefone", value=emp_edit.get('telefone',''))
+                    
+                    new_end = st.text_input("Endereço Completo", value=emp_edit.get('endereco',''))
+                    
+                    val_atual = datetime.date.today() + datetime.timedelta(days=365)
+                    if emp_edit.get('valid_until'):
+                        try: val_atual = datetime.date.fromisoformat(emp_edit['valid_until'])
+                        except: pass
+                    new_valid = st.date_input("Validade do Link de Pesquisa:", value=val_atual)
+                    
+                    # Carrega a configuração atual de CPF da empresa (se houver, senao True)
+                    current_cpf_req = emp_edit.get('org_structure', {}).get('_exigir_cpf', True) if isinstance(emp_edit.get('org_structure'), dict) else True
+                    new_exigir_cpf = st.checkbox("🔒 Exigir CPF para evitar respostas duplicadas (Recomendado)", value=current_cpf_req)
+                    
+                    if st.form_submit_button("💾 Guardar Alterações", type="primary"):
+                        updated_org = emp_edit.get('org_structure', {})
+                        if not isinstance(updated_org, dict):
+                            updated_org = {"Geral": ["Geral"]}
+                        updated_org['_exigir_cpf'] = new_exigir_cpf
+                        
+                        update_dict = {
+                            'razao': new_razao, 'cnpj': new_cnpj, 'cnae': new_cnae, 
+                            'risco': new_risco, 'func': new_func, 'segmentacao': new_seg, 
+                            'resp': new_resp, 'email': new_email, 'telefone': new_tel, 
+                            'endereco': new_end, 'limit_evals': new_limit, 'valid_until': new_valid.isoformat(),
+                            'org_structure': updated_org
+                        }
+                        
+                        if DB_CONNECTED:
+                            try: 
+                                supabase.table('companies').update(update_dict).eq('id', target_id).execute()
+                            except Exception as e: 
+                                st.warning(f"Erro ao salvar na nuvem: {e}")
+                            invalidate_data_cache()
+                            invalidate_survey_config()
+                        
+                        emp_edit.update(update_dict)
+                        st.session_state.edit_mode = False
+                        st.session_state.edit_id = None
+                        flash("✅ Os dados do cliente foram atualizados com sucesso.")
+                        st.rerun()
+                        
+                if st.button("⬅️ Cancelar e Voltar"): 
+                    st.session_state.edit_mode = False
+                    st.rerun()
+            else:
+                st.error("Desculpe, perdemos a referência deste cliente. Por favor, atualize a página.")
+        
+        else:
+            tab1, tab2 = st.tabs(["📋 Clientes Cadastrados", "➕ Cadastrar Novo Cliente"])
+            with tab1:
+                if not visible_companies: 
+                    st.info("Ainda não existem clientes na sua lista. Comece a criar adicionando no botão acima.")
+                
+                for emp in visible_companies:
+                    with st.expander(f"🏢 {emp['razao']}"):
+                        c1, c2, c3, c4 = st.columns(4)
+                        c1.write(f"**CNPJ:** {emp.get('cnpj','')}")
+                        c3.info(f"**Metodologia:** {emp.get('metodologia', 'HSE-IT (35 itens)')}")
+                        
+                        # Indicador de 70% na aba Clientes
+                        func_t = emp.get('func', 1)
+                        resp_t = emp.get('respondidas', 0)
+                        adesao_pct = (resp_t / func_t) * 100 if func_t > 0 else 0
+                        
+                        c2.write(f"**Adesão Atual:** {adesao_pct:.1f}%")
+                        if adesao_pct >= 70:
+                            c2.markdown(f"<span style='color:{COR_RISCO_BAIXO}; font-size:12px; font-weight:bold;'>✅ Amostra Válida</span>", unsafe_allow_html=True)
+                        else:
+                            c2.markdown(f"<span style='color:{COR_RISCO_MEDIO}; font-size:12px; font-weight:bold;'>⚠️ Abaixo dos 70%</span>", unsafe_allow_html=True)
+
+                        c4_1, c4_2 = c4.columns(2)
+                        if c4_1.button("✏️ Editar", key=f"ed_{emp['id']}"): 
+                             st.session_state.edit_mode = True
+                             st.session_state.edit_id = emp['id']
+                             st.rerun()
+                        
+                        if perm == "Master":
+                            if c4_2.button("🗑️ Remover", key=f"del_{emp['id']}"): 
+                                delete_company(emp['id'])
+            
+            with tab2:
+                st.markdown("<div class='chart-container'>", unsafe_allow_html=True)
+                with st.form("add_comp_form_gigante"):
+                    if credits_left <= 0 and perm != "Master":
+                        st.error("🚫 O seu plano atingiu o limite de avaliações disponíveis. Fale conosco para adquirir mais.")
+                        st.form_submit_button("Ação Bloqueada", disabled=True)
+                    else:
+                        st.write("### Dados da Empresa")
+                        c1, c2, c3 = st.columns(3)
+                        razao = c1.text_input("Razão Social")
+                        cnpj = c2.text_input("CNPJ")
+                        cnae = c3.text_input("CNAE")
+                        
+                        c4, c5, c6, c_met = st.columns(4)
+                        risco = c4.selectbox("Grau de Risco (1 a 4)", [1,2,3,4])
+                        func = c5.number_input("Número de Colaboradores (Vidas)", min_value=1)
+                        limit_evals = c6.number_input("Limite de Questionários (Cota)", min_value=1, max_value=credits_left if perm!="Master" else 99999, value=min(100, credits_left if perm!="Master" else 100))
+                        
+                        metodologia_selecionada = c_met.selectbox("Metodologia de Avaliação", list(st.session_state.methodologies.keys()), help="Escolha qual a base de perguntas que fará sentido para a realidade deste cliente.")
+
+                        st.write("### Dados de Contato e Acesso")
+                        c7, c8, c9 = st.columns(3)
+                        segmentacao = c7.selectbox("Tipo de Segmentação", ["GHE", "Setor", "GES"])
+                        resp = c8.text_input("Nome do Responsável (RH/Líder)")
+                        email = c9.text_input("E-mail do Responsável")
+                        
+                        c10, c11, c12 = st.columns(3)
+                        tel = c10.text_input("Telefone")
+                        valid_date = c11.date_input("Validade do Link de Pesquisa:", value=datetime.date.today() + datetime.timedelta(days=365))
+                        c12.info("O sistema criará um link seguro automaticamente.")
+                        
+                        end = st.text_input("Endereço Completo")
+                        logo_cliente = st.file_uploader("Logotipo do Cliente (Opcional - Formatos PNG ou JPG)", type=['png', 'jpg', 'jpeg'])
+                        
+                        st.markdown("---")
+                        st.write("### Privacidade da Pesquisa")
+                        exigir_cpf = st.checkbox("🔒 Exigir CPF do colaborador para evitar respostas duplicadas (O dado será criptografado no banco para garantir o anonimato)", value=True)
+                        
+                        st.markdown("---")
+                        st.write("### Acesso Exclusivo para o Cliente (Portal do Analista)")
+                        st.caption("Crie aqui um acesso para que a equipe de RH do cliente possa visualizar os seus próprios resultados e dashboards.")
+                        u_login = st.text_input("Usuário de Acesso")
+                        u_pass = st.text_input("Senha de Acesso", type="password")
+
+                        if st.form_submit_button("✅ Salvar Cadastro e Gerar Link", type="primary"):
+                            if not razao: 
+                                st.error("⚠️ Preencha pelo menos a Razão Social da empresa para podermos avançar.")
+                            else:
+                                cod = str(uuid.uuid4())[:8].upper()
+                                logo_str = image_to_base64(logo_cliente)
+                                
+                                org_structure_dict = {"Geral": ["Geral"], "_exigir_cpf": exigir_cpf}
+                                
+                                new_c = {
+                                    "id": cod, 
+                                    "razao": razao, 
+                                    "cnpj": cnpj, 
+                                    "cnae": cnae, 
+                                    "setor": "Geral", 
+                                    "risco": risco, 
+                                    "func": func, 
+                                    "limit_evals": limit_evals, 
+                                    "metodologia": metodologia_selecionada,
+                                    "segmentacao": segmentacao, 
+                                    "resp": resp, 
+                                    "email": email, 
+                                    "telefone": tel, 
+                                    "endereco": end, 
+                                    "valid_until": valid_date.isoformat(), 
+                                    "logo_b64": logo_str, 
+                                    "score": 0.0, 
+                                    "respondidas": 0, 
+                                    "owner": curr_user, 
+                                    "dimensoes": {}, 
+                                    "detalhe_perguntas": {}, 
+                                    "org_structure": org_structure_dict
+                                }
+                                
+                                error_msg = None
+                                if DB_CONNECTED:
+                                    try:
+                                        supabase.table('companies').insert(new_c).execute()
+                                        
+                                        if u_login and u_pass:
+                                            supabase.table('admin_users').insert({
+                                                "username": u_login, 
+                                                "password": u_pass, 
+                                                "role": "Analista", 
+                                                "credits": limit_evals, 
+                                                "valid_until": valid_date.isoformat(), 
+                                                "linked_company_id": cod
+                                            }).execute()
+                                    except Exception as e: 
+                                        error_msg = str(e)
+                                    invalidate_data_cache()
+                                
+                                st.session_state.companies_db.append(new_c)
+                                
+                                if error_msg: 
+                                    flash(f"⚠️ Atenção: Salvo apenas localmente devido a uma falha na internet: {error_msg}")
+                                else: 
+                                    flash(f"🎉 Fantástico! O cliente foi cadastrado com sucesso.")
+                                
+                                st.rerun()
+                st.markdown("</div>", unsafe_allow_html=True)
+
+    elif selected == "Setores e Cargos":
+        st.title("Gestão de Setores e Cargos")
+        if not visible_companies: 
+            st.warning("⚠️ Precisa primeiro cadastrar um cliente antes de organizar os setores."); return
+        
+        empresa_nome = st.selectbox("Selecione a empresa para configurar os setores:", [c['razao'] for c in visible_companies])
+        empresa = next((c for c in visible_companies if c['razao'] == empresa_nome), None)
+        
+        if empresa is not None:
+            if 'org_structure' not in empresa or not isinstance(empresa['org_structure'], dict): 
+                empresa['org_structure'] = {"Geral": ["Geral"]}
+            
+            # Filtra chaves de configuração invisíveis do layout
+            setores_existentes = [k for k in empresa['org_structure'].keys() if not k.startswith('_')]
+            
+            c1, c2 = st.columns(2)
+            with c1:
+                st.markdown("<div class='chart-container'>", unsafe_allow_html=True)
+                st.subheader("1. Criar ou Remover Setores")
+                new_setor = st.text_input("Nome do Novo Setor")
+                if st.button("➕ Adicionar Setor", type="primary"):
+                    if new_setor and new_setor not in empresa['org_structure']:
+                        empresa['org_structure'][new_setor] = []
+                        if DB_CONNECTED:
+                            try: 
+                                supabase.table('companies').update({"org_structure": empresa['org_structure']}).eq('id', empresa['id']).execute()
+                            except: pass
+                            invalidate_data_cache()
+                            invalidate_survey_config()
+                        flash(f"O setor '{new_setor}' foi criado!")
+                        st.rerun()
+                
+                st.markdown("---")
+                setor_remover = st.selectbox("Selecione o setor para remover", setores_existentes)
+                if st.button("🗑️ Remover Setor"):
+                    del empresa['org_structure'][setor_remover]
+                    if DB_CONNECTED:
+                         try: 
+                             supabase.table('companies').update({"org_structure": empresa['org_structure']}).eq('id', empresa['id']).execute()
+                         except: pass
+                         invalidate_data_cache()
+                         invalidate_survey_config()
+                    flash("Setor removido com sucesso.")
+                    st.rerun()
+                st.markdown("</div>", unsafe_allow_html=True)
+
+            with c2:
+                st.markdown("<div class='chart-container'>", unsafe_allow_html=True)
+                st.subheader("2. Cargos Atrelados ao Setor")
+                setor_sel = st.selectbox("Selecione o setor para configurar os cargos:", setores_existentes, key="sel_setor_cargos")
+                if setor_sel:
+                    df_cargos = pd.DataFrame({"Cargo": empresa['org_structure'][setor_sel]})
+                    edited_cargos = st.data_editor(df_cargos, num_rows="dynamic", key="editor_cargos", use_container_width=True)
+                    if st.button("💾 Salvar Lista de Cargos", type="primary"):
+                        lista_nova = edited_cargos["Cargo"].dropna().tolist()
+                        empresa['org_structure'][setor_sel] = lista_nova
+                        if DB_CONNECTED:
+                             try: 
+                                 supabase.table('companies').update({"org_structure": empresa['org_structure']}).eq('id', empresa['id']).execute()
+                             except: pass
+                             invalidate_data_cache()
+                             invalidate_survey_config()
+                        st.success("A lista de cargos foi atualizada e guardada.")
+                st.markdown("</div>", unsafe_allow_html=True)
+
+    elif selected == "Links de Pesquisa":
+        st.title("Links de Pesquisa e Convites")
+        if not visible_companies: 
+            st.warning("⚠️ Precisa primeiro cadastrar um cliente antes de gerar o link."); return
+            
+        with st.container():
+            st.markdown("<div class='chart-container'>", unsafe_allow_html=True)
+            empresa_nome = st.selectbox("Selecione a empresa:", [c['razao'] for c in visible_companies])
+            empresa = next(c for c in visible_companies if c['razao'] == empresa_nome)
+            
+            base_url = st.session_state.platform_config.get('base_url', 'https://elonr01-cris.streamlit.app').rstrip('/')
+            link_final = f"{base_url}/?cod={empresa['id']}"
+            
+            c1, c2 = st.columns([2, 1])
+            with c1:
+                st.markdown("##### Link de Acesso para os Colaboradores")
+                st.markdown(f"<div style='background-color: #f8f9fa; border: 1px dashed #dee2e6; padding: 15px; border-radius: 8px; font-family: monospace; color: #2c3e50; font-weight: bold; word-break: break-all; margin-bottom: 5px;'>{link_final}</div>", unsafe_allow_html=True)
+                
+                # BOTÃO DE CÓPIA DO LINK VIA COMPONENTE HTML
+                st.components.v1.html(get_copy_button_html(link_final, "📋 Copiar Link Oficial"), height=55)
+                
+                limit = empresa.get('limit_evals', 999999)
+                usadas = empresa.get('respondidas', 0)
+                func_t = empresa.get('func', 1)
+                
+                # Barra de Progresso visual para os 70%
+                adesao_pct = (usadas / func_t) * 100 if func_t > 0 else 0
+                st.progress(min(adesao_pct / 100.0, 1.0))
+                
+                if adesao_pct >= 70:
+                    st.success(f"✅ Amostra Estatística Validada! ({adesao_pct:.1f}% de adesão alcançada)")
+                else:
+                    faltam = max(0, int(func_t * 0.7) - usadas)
+                    st.warning(f"⚠️ Amostra Parcial: {adesao_pct:.1f}%. Faltam cerca de {faltam} respostas para atingir a margem de segurança de 70%.")
+
+                val = empresa.get('valid_until', '-')
+                try: val = datetime.date.fromisoformat(val).strftime('%d/%m/%Y')
+                except: pass
+                st.caption(f"📅 O Link será válido até: {val} | 🧠 Matriz de Pesquisa: {empresa.get('metodologia', 'HSE-IT')}")
+                
+                if st.button("👁️ Visualizar Pesquisa (Como o colaborador verá)"):
+                    st.session_state.current_company = empresa
+                    st.session_state.logged_in = True
+                    st.session_state.user_role = 'colaborador'
+                    st.rerun()
+            with c2:
+                st.markdown("##### QR Code de Acesso")
+                qr_api_url = f"https://api.qrserver.com/v1/create-qr-code/?size=300x300&data={urllib.parse.quote(link_final)}"
+                st.image(qr_api_url, width=150)
+                st.markdown(f"[📥 Baixar QR Code]({qr_api_url})")
+            st.markdown("</div>", unsafe_allow_html=True)
+            
+            st.markdown("<div class='chart-container'>", unsafe_allow_html=True)
+            st.markdown("##### 💬 Sugestão de Mensagem de Convite (WhatsApp / E-mail)")
+            texto_convite = f"""Olá, equipe da {empresa['razao']}! 👋
+
+Cuidar dos nossos resultados é muito importante, mas nada disso faz sentido se não cuidarmos, em primeiro lugar, de quem faz tudo acontecer: vocês.
+
+Para construirmos um ambiente de trabalho cada vez melhor, mais leve e saudável, precisamos muito da ajuda e transparência de vocês. Estamos lançando a nossa Pesquisa de Clima e Bem-Estar no Trabalho. 
+
+🧠 **Por que a participação de vocês é tão importante?**
+O dia a dia de vocês importa. Muitas vezes o estresse ou a sobrecarga são invisíveis. Responder a este breve questionário permite que a gente veja exatamente onde podemos melhorar, criar novas iniciativas de apoio e corrigir aquilo que não está funcionando tão bem. É a sua voz guiando o nosso trabalho.
+
+🔒 **Privacidade 100% Garantida**
+Compreendemos que falar sobre o ambiente de trabalho requer total confiança. Por isso:
+- **Anonimato Total:** Utilizamos um sistema seguro onde nenhuma resposta individual consegue ser ligada à pessoa. 
+- **Foco na Equipe:** Os resultados chegam até a gestão apenas em formato de gráficos e médias do grupo todo, nunca individuais. Sintam-se perfeitamente seguros e à vontade para serem 100% sinceros.
+
+🚀 **Como participar?**
+A avaliação leva apenas cerca de 7 minutos. Cliquem no link seguro abaixo através do seu celular ou computador:
+
+🔗 Acessar a Pesquisa: {link_final}
+
+Agradecemos imensamente o seu tempo e o seu compartilhamento. Só com a sua honestidade é que conseguiremos fazer do nosso espaço, um lugar cada vez melhor para todos.
+
+Atenciosamente,
+Equipe de Recursos Humanos e Liderança"""
+            
+            # Caixa de edição do texto, capturando sempre a versão atual
+            texto_editado = st.text_area("Você pode editar o modelo abaixo antes de copiar e enviar aos colaboradores:", value=texto_convite, height=450)
+            
+            # BOTÃO DE CÓPIA DO TEXTO VIA COMPONENTE HTML
+            st.components.v1.html(get_copy_button_html(texto_editado, "📋 Copiar Mensagem de Convite"), height=55)
+            
+            st.markdown("</div>", unsafe_allow_html=True)
+
+    elif selected == "Relatórios e Laudos":
+        st.title("Geração de Relatórios e Laudos Técnicos")
+        if not visible_companies: 
+            st.warning("É preciso ter empresas cadastradas e com respostas para emitir um relatório."); return
+            
+        c_sel, c_blank = st.columns([1, 1])
+        with c_sel:
+            empresa_sel = st.selectbox("Selecione a empresa para gerar o relatório:", [e['razao'] for e in visible_companies])
+        
+        empresa = load_response_detail(next(e for e in visible_companies if e['razao'] == empresa_sel))
+        metodo_ativo = empresa.get('metodologia', 'HSE-IT (35 itens)')
+        
+        with st.sidebar:
+            st.markdown("---")
+            st.markdown("#### Assinaturas do Relatório")
+            sig_empresa_nome = st.text_input("Nome do Responsável (Cliente)", value=empresa.get('resp',''))
+            sig_empresa_cargo = st.text_input("Cargo do Responsável", value="Direção")
+            sig_tecnico_nome = st.text_input("Nome do Consultor Técnico (Você)", value="Cristiane Cardoso Lima")
+            sig_tecnico_cargo = st.text_input("Cargo do Consultor", value="Consultoria em Saúde Mental e RH - Pessin Gestão")
+
+        if empresa.get('suspeitas', 0) > 0:
+            if st.session_state.platform_config.get('excluir_suspeitas'):
+                st.warning(f"🧹 {empresa['suspeitas']} resposta(s) com padrão suspeito (mesma opção em todos os itens ou itens invertidos contraditórios) foram excluídas das médias deste relatório.")
+            else:
+                st.warning(f"🧹 {empresa['suspeitas']} resposta(s) com padrão suspeito (mesma opção em todos os itens ou itens invertidos contraditórios) estão incluídas nas médias. Ative a exclusão em Configurações para desconsiderá-las.")
+        
+        dimensoes_atuais = empresa.get('dimensoes', {})
+        analise_auto = gerar_analise_robusta(dimensoes_atuais)
+        sugestoes_auto = gerar_banco_sugestoes(dimensoes_atuais)
+        
+        if st.session_state.acoes_list is None: 
+            st.session_state.acoes_list = []
+            
+        if not st.session_state.acoes_list and sugestoes_auto:
+            for s in sugestoes_auto: 
+                st.session_state.acoes_list.append({
+                    "acao": s['acao'], 
+                    "estrat": s['estrat'], 
+                    "area": s['area'], 
+                    "resp": "A Definir em Reunião", 
+                    "prazo": "30 a 60 dias"
+                })
+        
+        html_act = ""
+        if st.session_state.acoes_list:
+            for item in st.session_state.acoes_list:
+                html_act += f"<tr><td>{item.get('acao','')}</td><td>{item.get('estrat','')}</td><td>{item.get('area','')}</td><td>{item.get('resp','')}</td><td>{item.get('prazo','')}</td></tr>"
+        else:
+            html_act = "<tr><td colspan='5' style='text-align:center;'>Nenhuma ação definida no plano.</td></tr>"
+
+        with st.expander("📝 Personalização do Relatório e Plano de Ação", expanded=True):
+            st.markdown("##### 1. Parecer Técnico Conclusivo")
+            analise_texto = st.text_area("Adapte este texto com a sua avaliação técnica. É ele que irá constar na conclusão principal do Laudo entregue ao cliente:", value=analise_auto, height=150)
+            
+            st.markdown("---")
+            st.markdown("##### 2. Banco de Sugestões para o Plano de Ação")
+            opcoes_formatadas = [f"[{s['area']}] {s['acao']}: {s['estrat']}" for s in sugestoes_auto]
+            selecionadas = st.multiselect("Selecione ações recomendadas para adicionar ao plano do cliente:", options=opcoes_formatadas)
+            if st.button("⬇️ Adicionar Ações Selecionadas ao Plano", type="secondary"):
+                novas = []
+                for item_str in selecionadas:
+                    for s in sugestoes_auto:
+                        if f"[{s['area']}] {s['acao']}: {s['estrat']}" == item_str:
+                            novas.append({
+                                "acao": s['acao'], 
+                                "estrat": s['estrat'], 
+                                "area": s['area'], 
+                                "resp": "Liderança e RH", 
+                                "prazo": "Acompanhamento em 90 dias"
+                            })
+                st.session_state.acoes_list.extend(novas)
+                st.success("Táticas de gestão adicionadas com sucesso à lista!")
+                st.rerun()
+                
+            st.markdown("##### 3. Plano de Ação Estratégico (Editável)")
+            st.info("Edite os campos abaixo com dois cliques rápidos. Você pode alterar prazos, responsáveis, e adicionar novas linhas na última aba em branco para moldar o plano perfeitamente ao cliente. O que escrever aqui irá diretamente para o PDF.")
+            
+            edited_df = st.data_editor(
+                pd.DataFrame(st.session_state.acoes_list), 
+                num_rows="dynamic", 
+                use_container_width=True, 
+                column_config={
+                    "acao": "Título Específico da Ação Macro", 
+                    "estrat": st.column_config.TextColumn("Estratégia e Execução Desdobrada", width="large"), 
+                    "area": "Domínio ou Área Alvo", 
+                    "resp": "Ator Responsável (Líder)", 
+                    "prazo": "Marca Temporal Limite (SLA)"
+                }
+            )
+            
+            if not edited_df.empty: 
+                st.session_state.acoes_list = edited_df.to_dict('records')
+
+        exposicao_setor = empresa.get('exposicao_setor')
+        if exposicao_setor and any(setor is not None for setor in exposicao_setor['setores']):
+            with st.expander("🗺️ Mapa de Calor de Exposição por Setor e Pergunta"):
+                colunas_mapa = [i for i, setor in enumerate(exposicao_setor['setores']) if setor is not None]
+                fig_mapa = go.Figure(go.Heatmap(
+                    z=exposicao_setor['matriz'][colunas_mapa].T, 
+                    x=[exposicao_setor['setores'][i] for i in colunas_mapa], 
+                    y=[f"{i + 1}. {q[:60]}" for i, q in enumerate(exposicao_setor['perguntas'])], 
+                    colorscale='RdYlGn_r', zmin=0, zmax=100, 
+                    colorbar=dict(title="Exposição %")
+                ))
+                fig_mapa.update_layout(height=max(400, 18 * len(exposicao_setor['perguntas'])), yaxis=dict(autorange='reversed'), margin=dict(l=10, r=10, t=20, b=20))
+                st.plotly_chart(fig_mapa, use_container_width=True)
+
+        if st.button("📥 Gerar e Baixar Laudo Técnico (HTML/PDF)", type="primary"):
+            st.markdown("---")
+            logo_html = get_logo_html(150)
+            logo_cliente_html = ""
+            logo_cliente_b64 = get_company_logo(empresa['id'])
+            if logo_cliente_b64:
+                logo_cliente_html = f"<img src='data:image/png;base64,{logo_cliente_b64}' width='110' style='float:right; margin-left: 15px; border-radius:4px; box-shadow: 0px 2px 4px rgba(0,0,0,0.1);'>"
+            
+            html_dimensoes = ""
+            if empresa.get('dimensoes'):
+                for dim, nota in empresa.get('dimensoes', {}).items():
+                    cor_card = COR_RISCO_ALTO if nota < 3 else (COR_RISCO_MEDIO if nota < 4 else COR_RISCO_BAIXO)
+                    label_card = "CENÁRIO CRÍTICO" if nota < 3 else ("MOMENTO DE ATENÇÃO" if nota < 4 else "AMBIENTE SEGURO")
+                    html_dimensoes += f"""
+                    <div style="flex: 1; min-width: 85px; background-color: #fcfcfc; border: 1px solid #e0e0e0; padding: 8px; border-radius: 6px; margin: 4px; text-align: center; font-family: 'Helvetica Neue', Helvetica, sans-serif; box-shadow: inset 0 -2px 0 {cor_card};">
+                        <div style="font-size: 8px; color: #555; text-transform: uppercase; letter-spacing: 0.5px; font-weight: bold;">{dim}</div>
+                        <div style="font-size: 16px; font-weight: 800; color: {cor_card}; margin: 4px 0;">{nota:.1f}</div>
+                        <div style="font-size: 7px; color: #777; background: #eee; padding: 2px; border-radius: 2px;">{label_card}</div>
+                    </div>
+                    """
+
+            html_x = ""
+            detalhes_heatmap = empresa.get('detalhe_perguntas', {})
+            questoes_ativas = st.session_state.methodologies.get(metodo_ativo, st.session_state.methodologies['HSE-IT (35 itens)'])['questions']
+            
+            for cat, pergs in questoes_ativas.items():
+                 html_x += f"""
+                 <div style="font-weight: bold; color: {COR_PRIMARIA}; font-size: 11px; margin-top: 14px; margin-bottom: 6px; border-bottom: 2px solid #eaeaea; font-family: 'Helvetica Neue', Helvetica, sans-serif; padding-bottom: 2px;">
+                    {cat.upper()}
+                 </div>
+                 """
+                 
+                 for q in pergs:
+                     val = detalhes_heatmap.get(q['q']) 
+                     
+                     if val is None:
+                         c_bar = "#cccccc" 
+                         txt_exposicao = "Dados Insuficientes"
+                         val_width = 0
+                     else:
+                         c_bar = COR_RISCO_ALTO if val >= 55 else (COR_RISCO_MEDIO if val > 20 else COR_RISCO_BAIXO)
+                         txt_exposicao = f"{val}% Nível de Exposição ao Fator"
+                         val_width = val
+                         
+                     html_x += f"""
+                     <div style="margin-bottom: 6px; font-family: 'Helvetica Neue', Helvetica, sans-serif;">
+                        <div style="display: flex; justify-content: space-between; align-items: flex-end; font-size: 9px; margin-bottom: 2px;">
+                            <span style="color: #444; width: 85%; white-space: nowrap; overflow: hidden; text-overflow: ellipsis;" title="{q['q']}">{q['q']}</span>
+                            <span style="color: {c_bar}; font-weight: bold; font-size: 8px;">{txt_exposicao}</span>
+                        </div>
+                        <div style="width: 100%; background-color: #f0f0f0; height: 6px; border-radius: 3px; overflow: hidden; box-shadow: inset 0 1px 2px rgba(0,0,0,0.05);">
+                            <div style="width: {val_width}%; background-color: {c_bar}; height: 100%; border-radius: 3px; transition: width 0.5s ease-in-out;"></div>
+                        </div>
+                     </div>
+                     """
+
+            html_act_final = "".join([f"""
+                <tr>
+                    <td style="padding: 10px; border-bottom: 1px solid #eef0f2; font-weight: bold; color: #2c3e50;">{i.get('acao','')}</td>
+                    <td style="padding: 10px; border-bottom: 1px solid #eef0f2; color: #555;">{i.get('estrat','')}</td>
+                    <td style="padding: 10px; border-bottom: 1px solid #eef0f2; text-align: center;"><span style="background: #eef2f5; padding: 3px 6px; border-radius: 4px; font-size: 8px; color: #34495e;">{i.get('area','')}</span></td>
+                    <td style="padding: 10px; border-bottom: 1px solid #eef0f2; font-style: italic; color: #7f8c8d;">{i.get('resp','')}</td>
+                    <td style="padding: 10px; border-bottom: 1px solid #eef0f2; font-weight: bold; color: {COR_PRIMARIA};">{i.get('prazo','')}</td>
+                </tr>
+            """ for i in st.session_state.acoes_list])
+            
+            if not st.session_state.acoes_list: 
+                html_act_final = "<tr><td colspan='5' style='text-align: center; padding: 20px; color: #999;'>Não há um plano de ação formulado para esta avaliação.</td></tr>"
+
+            score_final_empresa = empresa.get('score', 0)
+            score_width_css = (score_final_empresa / 5.0) * 100
+            
+            # Intervalos de confiança por bootstrap (reaproveitados enquanto as respostas não mudarem)
+            intervalos = get_confidence_intervals(empresa, questoes_ativas)
+            txt_ic_score = f"Intervalo de confiança (95%): {intervalos['geral']['score'][0]:.2f} a {intervalos['geral']['score'][1]:.2f}" if intervalos else ""
+            
+            html_gauge_css = f"""
+            <div style="text-align: center; padding: 15px; font-family: 'Helvetica Neue', Helvetica, sans-serif;">
+                <div style="font-size: 32px; font-weight: 900; color: {COR_PRIMARIA}; text-shadow: 1px 1px 0px rgba(0,0,0,0.05);">
+                    {score_final_empresa:.2f} <span style="font-size: 14px; font-weight: normal; color: #a0a0a0;">/ de 5.00 possiveis</span>
+                </div>
+                <div style="width: 100%; background: #e0e0e0; height: 16px; border-radius: 8px; margin-top: 10px; position: relative; overflow: hidden; box-shadow: inset 0 2px 4px rgba(0,0,0,0.1);">
+                    <div style="position: absolute; left: 0; top: 0; width: {score_width_css}%; background: linear-gradient(90deg, {COR_PRIMARIA} 0%, {COR_SECUNDARIA} 100%); height: 16px; border-radius: 8px;"></div>
+                </div>
+                <div style="font-size: 10px; color: #7f8c8d; margin-top: 8px; letter-spacing: 1px; text-transform: uppercase;">
+                    Grau Global de Saúde e Bem-Estar da Equipe
+                </div>
+                <div style="font-size: 9px; color: #95a5a6; margin-top: 4px;">{txt_ic_score}</div>
+            </div>
+            """
+            
+            indice_bench = get_benchmark_index([empresa])
+            pct_bench = benchmark_percentile(indice_bench, empresa)
+            prefixo_bench, risco_bench = benchmark_group(empresa)
+            txt_bench = f"Percentil {pct_bench} entre as empresas do CNAE {prefixo_bench} com grau de risco {risco_bench}." if pct_bench is not None else "Base comparável insuficiente para o CNAE e grau de risco desta empresa."
+            
+            html_radar_rows = ""
+            for k, v in empresa.get('dimensoes', {}).items():
+                pct_dim = benchmark_percentile(indice_bench, empresa, k, v)
+                ic_dim = intervalos['geral']['dimensoes'].get(k) if intervalos else None
+                html_radar_rows += f"""
+                <tr>
+                    <td style='padding: 6px 10px; border-bottom: 1px solid #f0f0f0; color: #444; font-weight: 500;'>{k}</td>
+                    <td style='padding: 6px 10px; text-align: right; border-bottom: 1px solid #f0f0f0; font-weight: bold; color: {COR_PRIMARIA};'>{v:.1f}</td>
+                    <td style='padding: 6px 10px; text-align: right; border-bottom: 1px solid #f0f0f0; color: #777;'>{f"{ic_dim[0]:.1f} – {ic_dim[1]:.1f}" if ic_dim else "-"}</td>
+                    <td style='padding: 6px 10px; text-align: right; border-bottom: 1px solid #f0f0f0; color: #777;'>{f"P{pct_dim}" if pct_dim is not None else "-"}</td>
+                </tr>
+                """
+            
+            # Quadro setor x dimensão, lido dos agregados por setor calculados na carga
+            categorias_setor = list(empresa.get('dimensoes', {}).keys())
+            html_setores_rows = ""
+            for setor, tot in empresa.get('setores', {}).items():
+                if not tot.get('respostas') or setor is None:
+                    continue
+                html_setores_cells = ""
+                for cat in categorias_setor:
+                    nota = tot.get('dimensoes', {}).get(cat, 0.0)
+                    cor_nota = "#999" if not nota else (COR_RISCO_ALTO if nota < 3 else (COR_RISCO_MEDIO if nota < 4 else COR_RISCO_BAIXO))
+                    html_setores_cells += f"<td style='padding: 6px; text-align: center; border-bottom: 1px solid #f0f0f0; font-weight: bold; color: {cor_nota};'>{nota:.1f}</td>"
+                ic_setor = intervalos['setores'].get(setor) if intervalos else None
+                html_setores_rows += f"""
+                <tr>
+                    <td style='padding: 6px 10px; border-bottom: 1px solid #f0f0f0; color: #444; font-weight: 500;'>{setor}</td>
+                    <td style='padding: 6px; text-align: center; border-bottom: 1px solid #f0f0f0; color: #777;'>{tot['respostas']}</td>
+                    {html_setores_cells}
+                    <td style='padding: 6px; text-align: center; border-bottom: 1px solid #f0f0f0; color: #777;'>{f"{ic_setor['score'][0]:.1f} – {ic_setor['score'][1]:.1f}" if ic_setor else "-"}</td>
+                </tr>
+                """
+            
+            html_setores_table = ""
+            if html_setores_rows:
+                html_setores_header = "".join(f"<th style='padding: 8px 6px; border-bottom: 2px solid #ddd; color: #555; text-align: center;'>{cat}</th>" for cat in categorias_setor)
+                html_setores_table = f"""
+                <h4>5.1 RESULTADO MÉDIO POR SETOR E DIMENSÃO</h4>
+                <table style="width: 100%; font-size: 9px; font-family: 'Helvetica Neue', Helvetica, sans-serif; border-collapse: collapse; margin-bottom: 25px;">
+                    <thead>
+                        <tr style="background-color: #f8f9fa;">
+                            <th style="text-align: left; padding: 8px 10px; border-bottom: 2px solid #ddd; color: #555;">Setor</th>
+                            <th style="padding: 8px 6px; border-bottom: 2px solid #ddd; color: #555; text-align: center;">Respostas</th>
+                            {html_setores_header}
+                            <th style="padding: 8px 6px; border-bottom: 2px solid #ddd; color: #555; text-align: center;">IC 95% (Score)</th>
+                        </tr>
+                    </thead>
+                    <tbody>
+                        {html_setores_rows}
+                    </tbody>
+                </table>
+                """
+            
+            html_mapa_setores = sector_heatmap_html(str(empresa['id']), empresa.get('versao_dados'), empresa['exposicao_setor']) if empresa.get('exposicao_setor') else ""
+            
+            html_radar_table = f"""
+            <table style="width: 100%; font-size: 10px; font-family: 'Helvetica Neue', Helvetica, sans-serif; border-collapse: collapse; margin-top: 5px;">
+                <thead>
+                    <tr style="background-color: #f8f9fa;">
+                        <th style="text-align: left; padding: 8px 10px; border-bottom: 2px solid #ddd; color: #555;">Dimensão Psicológica Investigada</th>
+                        <th style="text-align: right; padding: 8px 10px; border-bottom: 2px solid #ddd; color: #555;">Nota Final Obtida (Média)</th>
+                        <th style="text-align: right; padding: 8px 10px; border-bottom: 2px solid #ddd; color: #555;">IC 95%</th>
+                        <th style="text-align: right; padding: 8px 10px; border-bottom: 2px solid #ddd; color: #555;">Benchmark</th>
+                    </tr>
+                </thead>
+                <tbody>
+                    {html_radar_rows}
+                </tbody>
+            </table>
+            """
+
+            lgpd_note = f"""
+            <div style="margin-top: 40px; border-top: 1px solid #ccc; padding-top: 15px; font-size: 8px; color: #888; text-align: justify; font-family: 'Helvetica Neue', Helvetica, sans-serif; line-height: 1.4;">
+                <strong>TERMO ASSINADO DE ESTREITA CONFIDENCIALIDADE E PROTEÇÃO IRREVOGÁVEL E ESTRITA DE BANCO DADOS (SISTEMAS LGPD):</strong> Este instrumento avaliativo em escala profissional e científica de saúde ocupacional focado na raiz corporativa baseou-se tecnicamente em laços criados e foi confeccionado estritamente utilizando os mais complexos e densos métodos atuais de criptografia de banco de dados e rotinas imutáveis de obfuscação algorítmica de identidades. Os resultados e gráficos apresentados garantem o total anonimato de quem participou, exibindo apenas dados e médias coletivas sem qualquer correlação de nome e respostas. (Em conformidade total com a Lei Geral de Proteção de Dados - Lei nº 13.709/2018).
+            </div>
+            """
+
+            raw_html = f"""
+            <!DOCTYPE html>
+            <html lang="pt-BR">
+            <head>
+                <meta charset="utf-8">
+                <title>Dossiê Técnico Institucional - Matriz Oficial {empresa['razao']}</title>
+                <style>
+                    body {{
+                        font-family: 'Segoe UI', 'Helvetica Neue', Helvetica, Arial, sans-serif;
+                        padding: 30mm 20mm;
+                        color: #2c3e50;
+                        background-color: #ffffff;
+                        line-height: 1.6;
+                        max-width: 210mm;
+                        margin: 0 auto;
+                    }}
+                    h4 {{
+                        color: {COR_PRIMARIA}; 
+                        border-left: 5px solid {COR_SECUNDARIA}; 
+                        padding-left: 12px; 
+                        margin-top: 40px;
+                        margin-bottom: 15px;
+                        font-size: 13px;
+                        letter-spacing: 0.5px;
+                    }}
+                    .caixa-destaque {{
+                        background: linear-gradient(135deg, #f8f9fa 0%, #ffffff 100%);
+                        padding: 20px; 
+                        border-radius: 8px; 
+                        margin-bottom: 25px; 
+                        border-left: 6px solid {COR_SECUNDARIA};
+                        box-shadow: 0 4px 6px rgba(0,0,0,0.02);
+                    }}
+                    .colunas-flex {{
+                        display: flex; 
+                        gap: 30px; 
+                        margin-top: 25px; 
+                        margin-bottom: 25px;
+                    }}
+                    .coluna-dado {{
+                        flex: 1; 
+                        border: 1px solid #eef2f5; 
+                        border-radius: 10px; 
+                        padding: 15px;
+                        background-color: #fafbfc;
+                    }}
+                    .titulo-coluna {{
+                        font-weight: 800; 
+                        font-size: 11px; 
+                        color: {COR_PRIMARIA}; 
+                        margin-bottom: 12px;
+                        text-align: center;
+                        text-transform: uppercase;
+                        letter-spacing: 1px;
+                        border-bottom: 1px solid #eef2f5;
+                        padding-bottom: 8px;
+                    }}
+                    .grid-raiox {{
+                        background: #ffffff; 
+                        border: 1px solid #eef2f5; 
+                        padding: 20px; 
+                        border-radius: 10px; 
+                        margin-bottom: 25px; 
+                        column-count: 2; 
+                        column-gap: 50px;
+                        box-shadow: 0 2px 4px rgba(0,0,0,0.01);
+                    }}
+                    @media print {{
+                        body {{
+                            padding: 0;
+                            margin: 0;
+                            -webkit-print-color-adjust: exact !important;
+                            print-color-adjust: exact !important;
+                        }}
+                        .grid-raiox {{
+                            page-break-inside: avoid;
+                        }}
+                        table {{
+                            page-break-inside: auto;
+                        }}
+                        tr {{
+                            page-break-inside: avoid;
+                            page-break-after: auto;
+                        }}
+                        h4 {{
+                            page-break-after: avoid;
+                        }}
+                    }}
+                </style>
+            </head>
+            <body>
+                <header style="display: flex; justify-content: space-between; align-items: center; border-bottom: 3px solid {COR_PRIMARIA}; padding-bottom: 20px; margin-bottom: 30px;">
+                    <div style="flex: 0 0 auto;">{logo_html}</div>
+                    <div style="text-align: right; flex: 1;">
+                        <div style="font-size: 22px; font-weight: 900; color: {COR_PRIMARIA}; letter-spacing: -0.5px;">LAUDO DE SAÚDE MENTAL E CLIMA ({metodo_ativo})</div>
+                        <div style="font-size: 12px; color: #7f8c8d; font-weight: 500; text-transform: uppercase; letter-spacing: 1px; margin-top: 4px;">Relatório Oficial de Gestão de Fatores e Riscos Psicossociais no Ambiente de Trabalho</div>
+                    </div>
+                </header>
+
+                <div class="caixa-destaque">
+                    {logo_cliente_html}
+                    <div style="font-size: 10px; color: #95a5a6; margin-bottom: 6px; text-transform: uppercase; font-weight: bold; letter-spacing: 1px;">DADOS DA EMPRESA</div>
+                    <div style="font-weight: 900; font-size: 18px; margin-bottom: 8px; color: #2c3e50;">{empresa.get('razao', '-')}</div>
+                    
+                    <div style="display: flex; gap: 40px; margin-top: 15px;">
+                        <div>
+                            <div style="font-size: 9px; color: #7f8c8d; text-transform: uppercase;">Identificação Oficial (CNPJ)</div>
+                            <div style="font-size: 11px; font-weight: 600; color: #34495e;">{empresa.get('cnpj','-')}</div>
+                        </div>
+                        <div>
+                            <div style="font-size: 9px; color: #7f8c8d; text-transform: uppercase;">Total de Participantes (Adesão)</div>
+                            <div style="font-size: 11px; font-weight: 600; color: #34495e;">O diagnóstico contou com a participação efetiva de {empresa.get('respondidas',0)} colaboradores(as).</div>
+                        </div>
+                        <div>
+                            <div style="font-size: 9px; color: #7f8c8d; text-transform: uppercase;">Posição no Benchmark Setorial</div>
+                            <div style="font-size: 11px; font-weight: 600; color: #34495e;">{txt_bench}</div>
+                        </div>
+                        <div>
+                            <div style="font-size: 9px; color: #7f8c8d; text-transform: uppercase;">Data de Emissão do Laudo</div>
+                            <div style="font-size: 11px; font-weight: 600; color: #34495e;">{datetime.datetime.now().strftime('%d/%m/%Y')}</div>
+                        </div>
+                    </div>
+                    <div style="margin-top: 15px; border-top: 1px dashed #ddd; padding-top: 10px;">
+                        <div style="font-size: 9px; color: #7f8c8d; text-transform: uppercase;">Endereço e Instalações Auditadas</div>
+                        <div style="font-size: 11px; color: #34495e;">{empresa.get('endereco','-')}</div>
+                    </div>
+                </div>
+
+                <h4>1. OBJETIVO DA AVALIAÇÃO</h4>
+                <p style="text-align: justify; font-size: 11px; color: #555;">
+                    O presente relatório executivo baseia-se nas normas e práticas validadas da metodologia <strong>{metodo_ativo}</strong>. O principal objetivo desta avaliação é identificar, com rigor, a extensão dos fatores de bem-estar ou o nível de desgaste presente no ambiente de trabalho das equipes da organização avaliada.<br><br>Através da participação anônima da equipe e de ferramentas matemáticas robustas na nuvem, conseguimos mapear a realidade da organização de uma forma que atende plenamente às diretrizes e boas práticas exigidas pelo Ministério relativas à prevenção e Gestão de Riscos Ocupacionais (GRO/PGR).
+                </p>
+
+                <div class="colunas-flex">
+                    <div class="coluna-dado">
+                        <div class="titulo-coluna">2. SCORE GERAL (VISÃO GLOBAL)</div>
+                        {html_gauge_css}
+                    </div>
+                    <div class="coluna-dado">
+                        <div class="titulo-coluna">3. RESULTADO MÉDIO CONSOLIDADO POR DIMENSÃO</div>
+                        {html_radar_table}
+                    </div>
+                </div>
+
+                <h4>4. MAPA DE DIAGNÓSTICO DETALHADO POR CADA DIMENSÃO DE SAÚDE</h4>
+                <div style="display: flex; flex-wrap: wrap; margin-bottom: 30px; gap: 8px;">
+                    {html_dimensoes}
+                </div>
+
+                <h4>5. VARREDURA RAIO-X REPASSANDO EXAUSTIVAMENTE OS FATORES AVALIADOS COM A EQUIPE</h4>
+                <p style="font-size: 10px; color: #777; margin-bottom: 15px; margin-top: -10px; font-style: italic;">
+                    Nota técnica para interpretação: As representações visuais abaixo mostram de forma simples o nível percentual de risco contínuo detectado para cada situação. Barras com porcentagens altas (cores mais quentes como laranja e vermelho) representam áreas que devem ser abordadas prioritariamente pela Gestão e pelos Recursos Humanos.
+                </p>
+                <div class="grid-raiox">
+                    {html_x}
+                </div>
+
+                {html_setores_table}
+
+                {f'<h4>5.2 MAPA DE CALOR DE EXPOSIÇÃO POR SETOR</h4>{html_mapa_setores}' if html_mapa_setores else ''}
+
+                <div style="page-break-before: always;"></div>
+
+                <h4>6. PLANO DE AÇÃO ESTRATÉGICO SUGERIDO (COMPLIANCE E PREVENÇÃO)</h4>
+                <p style="font-size: 10px; color: #777; margin-bottom: 15px; margin-top: -10px; font-style: italic;">
+                    As sugestões descritas na tabela de apoio que se segue foram refinadas sob intervenção humana e com base nos scores coletados. As estratégias procuram atacar as maiores fragilidades encontradas no radar e no mapeamento comportamental com sugestões práticas aplicáveis.
+                </p>
+                <table style="width: 100%; border-collapse: collapse; font-size: 10px; font-family: 'Helvetica Neue', Helvetica, Arial, sans-serif; box-shadow: 0 0 0 1px #eef2f5; border-radius: 8px; overflow: hidden;">
+                    <thead>
+                        <tr style="background-color: {COR_PRIMARIA}; color: #ffffff;">
+                            <th style="padding: 12px 10px; text-align: left; font-weight: 600; letter-spacing: 0.5px;">TÍTULO DO PLANO / AÇÃO MACRO</th>
+                            <th style="padding: 12px 10px; text-align: left; font-weight: 600; letter-spacing: 0.5px;">ESTRATÉGIA PRÁTICA E EXECUÇÃO</th>
+                            <th style="padding: 12px 10px; text-align: center; font-weight: 600; letter-spacing: 0.5px;">FOCO DE ÁREA</th>
+                            <th style="padding: 12px 10px; text-align: left; font-weight: 600; letter-spacing: 0.5px;">RESPONSÁVEL (LIDERANÇA)</th>
+                            <th style="padding: 12px 10px; text-align: left; font-weight: 600; letter-spacing: 0.5px;">MARCA TEMPORAL (SLA/PRAZO)</th>
+                        </tr>
+                    </thead>
+                    <tbody>
+                        {html_act_final}
+                    </tbody>
+                </table>
+
+                <h4>7. PARECER TÉCNICO FORMAL DA CONSULTORIA DE RH</h4>
+                <div style="text-align: justify; font-size: 11px; line-height: 1.8; background-color: #f8fbfc; padding: 25px; border-radius: 8px; border: 1px solid #eef2f5; color: #444; white-space: pre-wrap;">
+                    {analise_texto}
+                </div>
+
+                <div style="margin-top: 80px; display: flex; justify-content: space-around; gap: 60px;">
+                    <div style="flex: 1; text-align: center; border-top: 1px solid #2c3e50; padding-top: 12px;">
+                        <div style="font-weight: 800; font-size: 12px; color: #2c3e50; text-transform: uppercase;">{sig_empresa_nome}</div>
+                        <div style="color: #7f8c8d; font-size: 10px; margin-top: 4px;">{sig_empresa_cargo}</div>
+                        <div style="color: #95a5a6; font-size: 9px; margin-top: 2px;">Assinatura por delegação (Representante Legal)</div>
+                    </div>
+                    <div style="flex: 1; text-align: center; border-top: 1px solid #2c3e50; padding-top: 12px;">
+                        <div style="font-weight: 800; font-size: 12px; color: #2c3e50; text-transform: uppercase;">{sig_tecnico_nome}</div>
+                        <div style="color: #7f8c8d; font-size: 10px; margin-top: 4px;">{sig_tecnico_cargo}</div>
+                        <div style="color: #95a5a6; font-size: 9px; margin-top: 2px;">Chancela Técnica Eletrônica do Avaliador(a) Pericial</div>
+                    </div>
+                </div>
+                
+                {lgpd_note}
+            </body>
+            </html>
+            """
+            
+            b64_pdf = base64.b64encode(raw_html.encode('utf-8')).decode('utf-8')
+            
+            st.markdown(f"""
+            <a href="data:text/html;base64,{b64_pdf}" download="Laudo_Tecnico_Gestao_RH_{empresa["id"]}.html" style="
+                text-decoration: none; 
+                background-color: {COR_PRIMARIA}; 
+                color: #ffffff; 
+                padding: 15px 30px; 
+                border-radius: 8px; 
+                font-weight: 800; 
+                display: inline-block;
+                box-shadow: 0 4px 6px rgba(0,0,0,0.2);
+                transition: transform 0.2s;
+                text-transform: uppercase;
+                letter-spacing: 1px;
+                width: 100%;
+                text-align: center;
+                margin-bottom: 20px;
+            ">
+                ⬇️ BAIXAR LAUDO TÉCNICO CORPORATIVO (ARQUIVO HTML PARA CONVERSÃO EM PDF)
+            </a>
+            """, unsafe_allow_html=True)
+            
+            st.info("💡 **Dica de Consultoria (Como extrair um PDF perfeito):** Após o arquivo ser baixado, clique para abri-lo no seu navegador. Em seguida, pressione `Ctrl + P` (ou `Cmd + P` no Mac) e escolha a opção para **Salvar como PDF**. Desative a impressão de Cabeçalhos e Rodapés e ative sempre os **'Gráficos de Plano de Fundo'** para que todas as cores da nossa marca fiquem intactas no papel.")
+            
+            st.markdown("<hr>", unsafe_allow_html=True)
+            st.subheader("Visualização da Estrutura Final do Relatório (Preview):")
+            st.components.v1.html(raw_html, height=1000, scrolling=True)
+
+    elif selected == "Histórico de Evolução":
+        st.title("Histórico e Comparativo de Evolução")
+        if not visible_companies: 
+            st.warning("É preciso ter um histórico de empresas a ser analisado para utilizar esta função."); return
+        
+        empresa_nome = st.selectbox("Selecione a empresa:", [c['razao'] for c in visible_companies])
+        empresa = next((c for c in visible_companies if c['razao'] == empresa_nome), None)
+        
+        if empresa:
+            metodo_nome_ativo = empresa.get('metodologia', 'HSE-IT (35 itens)')
+            questoes_ativas = st.session_state.methodologies.get(metodo_nome_ativo, st.session_state.methodologies['HSE-IT (35 itens)'])['questions']
+            
+            modo_periodo = st.radio("Agrupar avaliações por:", HISTORY_BUCKETS, horizontal=True)
+            setor_hist = st.selectbox(
+                "Setor:", [HISTORY_TODOS_SETORES] + list((empresa.get('rollup_setor') or {}).keys()),
+                format_func=lambda s: "Sem setor informado" if s is None else s
+            )
+            history_data = generate_real_history(empresa, questoes_ativas, modo_periodo, setor_hist)
+            
+            if not history_data:
+                st.info("ℹ️ Ops! Ainda não temos avaliações antigas para fazer a comparação. As métricas vão aparecer aqui no próximo ciclo de avaliação desta equipe.")
+            else:
+                tab_evo, tab_comp = st.tabs(["📈 Evolução do Score Geral", "⚖️ Comparativo de Dimensões (Radar A x B)"])
+                
+                with tab_evo:
+                    st.markdown("<div class='chart-container'>", unsafe_allow_html=True)
+                    df_hist = pd.DataFrame(history_data)
+                    fig_line = px.line(
+                        df_hist, 
+                        x='periodo', 
+                        y='score', 
+                        markers=True, 
+                        title=f"Evolução do Fator de Segurança Geral - {metodo_nome_ativo}" + ("" if setor_hist == HISTORY_TODOS_SETORES else f" - Setor: {setor_hist or 'Sem setor informado'}")
+                    )
+                    fig_line.update_traces(
+                        line_color=COR_SECUNDARIA, 
+                        line_width=4, 
+                        marker=dict(size=12, color=COR_PRIMARIA, line=dict(width=2, color='white'))
+                    )
+                    fig_line.update_layout(
+                        yaxis_range=[1, 5],
+                        plot_bgcolor='#fafbfc',
+                        xaxis_title="Janela de Avaliação",
+                        yaxis_title="Score do Algoritmo (1 a 5)"
+                    )
+                    st.plotly_chart(fig_line, use_container_width=True)
+                    st.markdown("</div>", unsafe_allow_html=True)
+
+                with tab_comp:
+                    if len(history_data) < 2:
+                        st.warning("⚠️ Ainda não temos dados suficientes para ancorar um comparativo. Precisamos de avaliações em pelo menos dois períodos diferentes.")
+                    else:
+                        st.write("Defina as datas que deseja comparar para entender se o plano de ação resultou.")
+                        c1, c2 = st.columns(2)
+                        periodo_a = c1.selectbox("Período A (Referência Anterior)", [h['periodo'] for h in history_data], index=1)
+                        periodo_b = c2.selectbox("Período B (Avaliação Atual)", [h['periodo'] for h in history_data], index=0)
+                        
+                        dados_a = next((h for h in history_data if h['periodo'] == periodo_a), None)
+                        dados_b = next((h for h in history_data if h['periodo'] == periodo_b), None)
+                        
+                        if dados_a and dados_b:
+                            st.markdown("<div class='chart-container'>", unsafe_allow_html=True)
+                            categories = list(dados_a['dimensoes'].keys())
+                            fig_comp = go.Figure()
+                            
+                            fig_comp.add_trace(go.Scatterpolar(
+                                r=list(dados_a['dimensoes'].values()), 
+                                theta=categories, 
+                                fill='toself', 
+                                name=f'Referência de: {periodo_a}', 
+                                line_color=COR_COMP_A, 
+                                opacity=0.4
+                            ))
+                            
+                            fig_comp.add_trace(go.Scatterpolar(
+                                r=list(dados_b['dimensoes'].values()), 
+                                theta=categories, 
+                                fill='toself', 
+                                name=f'Resultado de: {periodo_b}', 
+                                line_color=COR_COMP_B, 
+                                opacity=0.8
+                            ))
+                            
+                            fig_comp.update_layout(
+                                polar=dict(radialaxis=dict(visible=True, range=[0, 5])),
+                                title=f"Sobreposição do Radar Comparativo ({metodo_nome_ativo})"
+                            )
+                            st.plotly_chart(fig_comp, use_container_width=True)
+                            st.markdown("</div>", unsafe_allow_html=True)
+                            
+                            if st.button("📥 Sintetizar e Baixar Documento Comparativo Oficial", type="primary"):
+                                 logo_html = get_logo_html(150)
+                                 
+                                 diff_score = dados_b['score'] - dados_a['score']
+                                 txt_evolucao = "uma melhoria clara na estabilidade mental das equipes." if diff_score > 0 else "um momento que exige muita vigilância e atuação imediata devido à queda geral nas notas das equipes."
+                                 
+                                 chart_css_viz = f"""
+                                 <div style="padding: 25px; border: 1px solid #e0e6ed; border-radius: 12px; font-family: 'Helvetica Neue', Helvetica, Arial, sans-serif; background: #ffffff; box-shadow: 0 4px 15px rgba(0,0,0,0.03);">
+                                     <div style="margin-bottom: 25px;">
+                                         <div style="display: flex; justify-content: space-between; align-items: baseline; margin-bottom: 8px;">
+                                             <strong style="color: #34495e; font-size: 12px; text-transform: uppercase; letter-spacing: 0.5px;">Nota Geral de Saúde Ocupacional no Período de [{periodo_a}]:</strong> 
+                                             <span style="font-size: 24px; font-weight: 900; color: {COR_COMP_A}">{dados_a['score']} <span style="font-size: 12px; color: #aab7b8;">/ de 5.0</span></span>
+                                         </div>
+                                         <div style="width: 100%; background: #ecf0f1; height: 18px; border-radius: 9px; overflow: hidden; box-shadow: inset 0 2px 4px rgba(0,0,0,0.06);">
+                                            <div style="width: {(dados_a['score']/5)*100}%; background: {COR_COMP_A}; height: 18px; border-radius: 9px;"></div>
+                                         </div>
+                                     </div>
+                                     <div>
+                                         <div style="display: flex; justify-content: space-between; align-items: baseline; margin-bottom: 8px;">
+                                             <strong style="color: #34495e; font-size: 12px; text-transform: uppercase; letter-spacing: 0.5px;">Nota Geral de Saúde Ocupacional no Período de [{periodo_b}]:</strong> 
+                                             <span style="font-size: 24px; font-weight: 900; color: {COR_COMP_B}">{dados_b['score']} <span style="font-size: 12px; color: #aab7b8;">/ de 5.0</span></span>
+                                         </div>
+                                         <div style="width: 100%; background: #ecf0f1; height: 18px; border-radius: 9px; overflow: hidden; box-shadow: inset 0 2px 4px rgba(0,0,0,0.06);">
+                                            <div style="width: {(dados_b['score']/5)*100}%; background: {COR_COMP_B}; height: 18px; border-radius: 9px;"></div>
+                                         </div>
+                                     </div>
+                                 </div>
+                                 """
+
+                                 html_comp = f"""
+                                 <!DOCTYPE html>
+                                 <html lang="pt-BR">
+                                 <head>
+                                     <meta charset="utf-8">
+                                     <title>Relatório Evolutivo em Dados</title>
+                                     <style>
+                                         body {{ font-family: 'Segoe UI', 'Helvetica Neue', Helvetica, Arial, sans-serif; padding: 40px 30px; color: #2c3e50; background: white; line-height: 1.6; }}
+                                         .linha-divisor {{ border-bottom: 2px solid {COR_PRIMARIA}; padding-bottom: 15px; margin-bottom: 25px; display: flex; justify-content: space-between; align-items: center; }}
+                                         .box-infos {{ background: #f8fbfc; padding: 20px; border-radius: 8px; margin-bottom: 25px; border-left: 5px solid {COR_SECUNDARIA}; }}
+                                         h4 {{ color: {COR_PRIMARIA}; border-left: 4px solid {COR_SECUNDARIA}; padding-left: 12px; margin-top: 35px; font-size: 14px; text-transform: uppercase; }}
+                                         .tabela-kpi {{ width: 100%; border-collapse: collapse; font-size: 12px; margin-bottom: 30px; box-shadow: 0 0 0 1px #eef2f5; border-radius: 6px; overflow: hidden; }}
+                                         .tabela-kpi th {{ background-color: {COR_PRIMARIA}; color: white; padding: 12px; text-align: center; font-weight: 600; letter-spacing: 0.5px; }}
+                                         .tabela-kpi td {{ padding: 12px; border-bottom: 1px solid #eef2f5; text-align: center; color: #34495e; }}
+                                         .tabela-kpi td:first-child {{ text-align: left; font-weight: 600; }}
+                                         .rodape {{ margin-top: 60px; font-size: 9px; color: #95a5a6; text-align: center; border-top: 1px dashed #e0e6ed; padding-top: 15px; letter-spacing: 0.5px; text-transform: uppercase; }}
+                                     </style>
+                                 </head>
+                                 <body>
+                                     <div class="linha-divisor">
+                                         <div>{logo_html}</div>
+                                         <div style="text-align:right;">
+                                             <div style="font-size:20px; font-weight:900; color:{COR_PRIMARIA}; letter-spacing: -0.5px;">DOSSIÊ TÉCNICO EVOLUTIVO</div>
+                                             <div style="font-size:11px; color:#7f8c8d; font-weight:600; letter-spacing: 1px;">Análise Comparativa Temporal de Saúde Ocupacional Corporativa</div>
+                                         </div>
+                                     </div>
+                                     
+                                     <div class="box-infos">
+                                         <div style="font-size:10px; color:#95a5a6; margin-bottom:6px; font-weight: 800; letter-spacing: 1px;">DADOS CADASTRAIS DA ORGANIZAÇÃO AUDITADA</div>
+                                         <div style="font-weight:900; font-size:16px; margin-bottom:8px; color:#2c3e50;">{empresa['razao']}</div>
+                                         <div style="display: flex; gap: 20px; margin-top: 10px;">
+                                             <div style="font-size:11px;"><strong>CNPJ Atrelado:</strong> <span style="color:#7f8c8d;">{empresa.get('cnpj','Não Especificado no Sistema')}</span></div>
+                                             <div style="font-size:11px;"><strong>Metodologia Aplicada:</strong> <span style="color:#7f8c8d;">{metodo_nome_ativo}</span></div>
+                                             <div style="font-size:11px;"><strong>Janelas Comparativas:</strong> <span style="color:{COR_PRIMARIA}; font-weight: bold; background: #eef2f5; padding: 2px 6px; border-radius: 4px;">{periodo_a}</span> VERSUS <span style="color:{COR_PRIMARIA}; font-weight: bold; background: #eef2f5; padding: 2px 6px; border-radius: 4px;">{periodo_b}</span></div>
+                                         </div>
+                                     </div>
+                                     
+                                     <h4>1. PAINEL DE INDICADORES DE DESEMPENHO</h4>
+                                     <table class="tabela-kpi">
+                                         <tr>
+                                             <th>SINTOMA / INDICADOR ANALISADO</th>
+                                             <th>MARCO REFERÊNCIA [{periodo_a}]</th>
+                                             <th>MARCO ATUAL [{periodo_b}]</th>
+                                             <th>VARIAÇÃO LÍQUIDA (DELTA)</th>
+                                         </tr>
+                                         <tr>
+                                             <td>Score Geral da Organização (Cálculo Composto)</td>
+                                             <td>{dados_a['score']}</td>
+                                             <td>{dados_b['score']}</td>
+                                             <td style="font-weight:900; color:{'#27ae60' if diff_score > 0 else '#c0392b'};">{diff_score:+.2f} pts</td>
+                                         </tr>
+                                         <tr>
+                                             <td>Taxa Bruta de Adesão Censitária das Equipes (%)</td>
+                                             <td>{dados_a['adesao']}%</td>
+                                             <td>{dados_b['adesao']}%</td>
+                                             <td style="font-weight:bold; color:#7f8c8d;">{(dados_b['adesao'] - dados_a['adesao']):+.1f}%</td>
+                                         </tr>
+                                     </table>
+                                     
+                                     <h4>2. EQUILÍBRIO GRÁFICO</h4>
+                                     {chart_css_viz}
+                                     
+                                     <h4>3. CONCLUSÃO E ANÁLISE TÉCNICA DOS RESULTADOS</h4>
+                                     <p style="text-align:justify; font-size:12px; line-height:1.7; background:#fbfcfd; padding:20px; border-radius:8px; border: 1px solid #eef2f5; color: #444;">A análise estruturada, resultante da comparação exata entre as duas janelas de tempo apresentadas, demonstrou <strong>{txt_evolucao}</strong> Recomendamos fortemente a direção da empresa, juntamente com o seu RH, a avaliarem com minúcia as dimensões de perigo mais salientes e a porem em prática de imediato novos planos de ações preventivas para melhoria da cultura geral de satisfação e bem-estar nas dependências da companhia.</p>
+                                     
+                                     <div class="rodape">
+                                         Plataforma Elo NR-01 Enterprise Core | Inteligência e Gestão Humanizada em Dados de Saúde Ocupacional<br>Documento Oficial e Privado
+                                     </div>
+                                 </body>
+                                 </html>
+                                 """
+                                 
+                                 b64_comp = base64.b64encode(html_comp.encode('utf-8')).decode('utf-8')
+                                 
+                                 st.markdown(f"""
+                                 <a href="data:text/html;base64,{b64_comp}" download="Dossie_Evolutivo_RH_{empresa["id"]}.html" style="
+                                     text-decoration: none; 
+                                     background-color: {COR_PRIMARIA}; 
+                                     color: white; 
+                                     padding: 12px 25px; 
+                                     border-radius: 6px; 
+                                     font-weight: 700; 
+                                     display: inline-block;
+                                     text-transform: uppercase;
+                                     box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+                                 ">
+                                     📥 DOWNLOAD DO RELATÓRIO COMPARATIVO (HTML)
+                                 </a>
+                                 """, unsafe_allow_html=True)
+                                 st.caption("Apoie os seus líderes com este dossiê. Lembre-se, pressione `Ctrl+P` no navegador para gerar em PDF e envie a eles.")
+
+    elif selected == "Configurações":
+        if perm == "Master":
+            st.title("Configurações da Plataforma")
+            t1, t2, t3 = st.tabs(["👥 Gerenciamento de Usuários", "🎨 Identidade Visual e Marca", "⚙️ Configurações de Servidor (URL)"])
+            
+            with t1:
+                st.markdown("<div class='chart-container'>", unsafe_allow_html=True)
+                st.write("### Acessos à Plataforma")
+                
+                if DB_CONNECTED:
+                    usrs_raw = supabase.table('admin_users').select("username, role, credits, linked_company_id").execute().data
+                else:
+                    usrs_raw = [{"username": k, "role": v['role'], "credits": v.get('credits',0)} for k,v in st.session_state.users_db.items()]
+                
+                if usrs_raw: 
+                    st.dataframe(pd.DataFrame(usrs_raw), use_container_width=True)
+                else:
+                    st.warning("Problema de leitura na tabela de acesso.")
+                
+                st.markdown("---")
+                c1, c2 = st.columns(2)
+                new_u = c1.text_input("Novo Usuário (Login)")
+                new_p = c2.text_input("Senha", type="password")
+                new_r = st.selectbox("Nível de Acesso", ["Master", "Gestor", "Analista"])
+                
+                if st.button("➕ Confirmar Criação do Usuário", type="primary"):
+                    if not new_u or not new_p: 
+                        st.error("Usuário e Senha são campos obrigatórios.")
+                    else:
+                        if DB_CONNECTED:
+                            try:
+                                supabase.table('admin_users').insert({"username": new_u, "password": new_p, "role": new_r, "credits": 999999 if new_r=="Master" else 500}).execute()
+                                invalidate_data_cache()
+                                flash(f"✅ Boa! O usuário [{new_u}] foi criado e já pode entrar no sistema!")
+                                st.rerun()
+                            except Exception as e: 
+                                st.error(f"Engasgo na gravação remota: {e}")
+                        else:
+                            st.session_state.users_db[new_u] = {"password": new_p, "role": new_r, "credits": 999999}
+                            flash(f"✅ Usuário [{new_u}] guardado apenas no seu modo local!")
+                            st.rerun()
+                
+                st.markdown("---")
+                st.write("### Remover Usuário")
+                users_op = [u['username'] for u in usrs_raw if u['username'] != curr_user]
+                if users_op:
+                    u_del = st.selectbox("Selecione cuidadosamente o usuário para remover:", users_op)
+                    if st.button("🗑️ REMOVER USUÁRIO SELECIONADO DA BASE", type="primary"): 
+                        delete_user(u_del)
+                else:
+                    st.info("De momento não há outros usuários elegíveis para remoção.")
+                st.markdown("</div>", unsafe_allow_html=True)
+
+            with t2:
+                st.markdown("<div class='chart-container'>", unsafe_allow_html=True)
+                st.write("### Identidade Visual e Marca")
+                nn = st.text_input("Nome da Plataforma (Mostrado no topo e relatórios)", value=st.session_state.platform_config.get('name', 'Elo NR-01'))
+                nc = st.text_input("Nome da Consultoria em RH (A sua empresa)", value=st.session_state.platform_config.get('consultancy', ''))
+                nl = st.file_uploader("Upload de Logotipo (PNG ou JPG com fundo transparente)", type=['png', 'jpg', 'jpeg'])
+                
+                if st.button("💾 Guardar Marca Personalizada", type="primary"):
+                    new_conf = st.session_state.platform_config.copy()
+                    new_conf['name'] = nn
+                    new_conf['consultancy'] = nc
+                    
+                    if nl: 
+                        b64_image = image_to_base64(nl)
+                        if b64_image:
+                            new_conf['logo_b64'] = b64_image
+                    
+                    if DB_CONNECTED:
+                        try:
+                            res = supabase.table('platform_settings').select("*").execute()
+                            if res.data: 
+                                supabase.table('platform_settings').update({"config_json": new_conf}).eq("id", res.data[0]['id']).execute()
+                            else: 
+                                supabase.table('platform_settings').insert({"config_json": new_conf}).execute()
+                            flash("✅ A sua marca foi guardada perfeitamente na base de dados!")
+                        except Exception as e: 
+                            flash(f"⚠️ Erro na tentativa de guardar (Salvo localmente): {e}")
+                    else:
+                        flash("✅ Logotipo e nome modificados.")
+                        
+                    st.session_state.platform_config = new_conf
+                    st.rerun()
+                st.markdown("</div>", unsafe_allow_html=True)
+
+            with t3:
+                st.markdown("<div class='chart-container'>", unsafe_allow_html=True)
+                st.write("### Configurações de Servidor (URL)")
+                base = st.text_input("Endereço Web Atual (Crucial para os links enviados aos colaboradores funcionarem)", value=st.session_state.platform_config.get('base_url', ''))
+                resp_compactas = st.checkbox("🗜️ Gravar novas respostas no formato compacto (um código por pergunta)", value=bool(st.session_state.platform_config.get('respostas_compactas', False)), help="Requer a coluna answers_codes na tabela responses. Respostas antigas continuam sendo lidas normalmente.")
+                ingestao_lote = st.checkbox("📥 Receber as respostas em fila e gravar no banco em lotes (recomendado para envios em massa do link)", value=bool(st.session_state.platform_config.get('ingestao_em_lote', False)), help="O colaborador recebe a confirmação na hora; as respostas ficam num arquivo de contingência no servidor até o lote ser gravado. CPF repetido e cota esgotada passam a ser tratados na gravação do lote, sem aviso ao colaborador; as respostas recusadas pelo banco ficam registradas no log e no arquivo respostas_rejeitadas.jsonl.")
+                excl_suspeitas = st.checkbox("🧹 Excluir das médias as respostas com padrão suspeito (mesma opção em tudo ou itens invertidos contraditórios)", value=bool(st.session_state.platform_config.get('excluir_suspeitas', False)), help="As respostas continuam contando como recebidas (cota e adesão). Desmarcado, elas são apenas sinalizadas nos relatórios. Com a exclusão ativa, o painel deixa de usar as somas mantidas pelo banco e pontua todas as respostas a cada recarga.")
+                
+                if st.button("🔗 Gravar e Atualizar URL do Sistema", type="primary"):
+                    new_conf = st.session_state.platform_config.copy()
+                    new_conf['base_url'] = base
+                    new_conf['respostas_compactas'] = resp_compactas
+                    new_conf['excluir_suspeitas'] = excl_suspeitas
+                    new_conf['ingestao_em_lote'] = ingestao_lote
+                    
+                    if DB_CONNECTED:
+                        try:
+                            res = supabase.table('platform_settings').select("*").execute()
+                            if res.data: 
+                                supabase.table('platform_settings').update({"config_json": new_conf}).eq("id", res.data[0]['id']).execute()
+                            else: 
+                                supabase.table('platform_settings').insert({"config_json": new_conf}).execute()
+                            flash("✅ O seu URL foi atualizado e guardado de forma permanente.")
+                        except Exception as e: 
+                            flash(f"⚠️ Erro na nuvem: {e}")
+                    else:
+                        flash("✅ Atualização gravada com sucesso.")
+
+                    st.session_state.platform_config = new_conf
+                    st.rerun()
+                    
+                st.markdown("---")
+                st.write("### O Coração da Plataforma (Base de Dados)")
+                if DB_CONNECTED: 
+                    st.info("🟢 O sistema encontra-se com ligação verde (estável e forte) ao Supabase em Nuvem. Todas as suas salvaguardas vão ficar disponíveis perenemente para si ou clientes na web sem quaisquer problemas.")
+                else: 
+                    st.error("🔴 Nota Limiar: A sua interligação ao Cofre Cloud não logrou autenticar por motivos de rede. De momento está no regime 'offline' da sua máquina. O aplicativo foi reposto e corre pela memória provisória do browser. Qualquer refresh que seja feito ou F5 poderá levar à perda definitiva do processo que está na memória.")
+                st.markdown("</div>", unsafe_allow_html=True)
+        else:
+            st.error("🚫 Apenas Administradores do nível 'Master' (Sênior) têm permissão para acessar esta página do programa.")
+
+# ==============================================================================
+# 6. MÓDULO DOS COLABORADORES (A PESQUISA DE CLIMA E SAÚDE)
+# ==============================================================================
+def survey_screen():
+    """A interface limpa e acolhedora onde as equipes respondem à avaliação de forma sigilosa e leve."""
+    cod = st.query_params.get("cod")
+    
+    comp = None
+    
+    # 1. VERIFICAÇÃO MODO PREVIEW (RH VISUALIZANDO)
+    if not cod and st.session_state.get('user_role') == 'colaborador' and st.session_state.get('current_company'):
+        comp = st.session_state.current_company
+    else:
+        # 2. ACESSO REAL (VIA LINK DO COLABORADOR)
+        if DB_CONNECTED and cod:
+            try:
+                comp = fetch_survey_company(str(cod))
+            except: pass
+            
+        if not comp and cod: 
+            comp = next((c for c in st.session_state.companies_db if str(c['id']) == str(cod)), None)
+    
+    # 3. TRATATIVA DE ERRO DE LINK INVÁLIDO
+    if not comp: 
+        st.error("❌ Código de Rastreio Inválido. Pedimos que tente acessar novamente e confirme junto ao líder de Recursos Humanos se o seu link foi bem encaminhado e enviado sem erro de digitação.")
+        # Fallback para o RH voltar caso se perca
+        if st.session_state.get('admin_permission'):
+            if st.button("⬅️ Voltar ao Painel Administrativo"):
+                st.session_state.user_role = 'admin'
+                st.rerun()
+        return
+        
+    # 4. BOTÃO DE VOLTAR EXCLUSIVO PARA O MODO PREVIEW DO RH
+    is_preview = st.session_state.get('admin_permission') is not None and st.session_state.get('user_role') == 'colaborador'
+    if is_preview:
+        st.info("👁️ **Modo Visualização Ativo:** Você está vendo esta tela exatamente como o colaborador a verá. Enviar respostas aqui afetará os gráficos da empresa.")
+        if st.button("⬅️ Sair da Visualização e Voltar ao Painel", type="secondary"):
+            st.session_state.user_role = 'admin'
+            st.session_state.current_company = None
+            st.rerun()
+        st.markdown("---")
+
+    # 5. VALIDAÇÃO DE DATA E COTA (Pula os bloqueios se for o RH visualizando)
+    if comp.get('valid_until') and not is_preview:
+        try:
+            if datetime.date.today() > datetime.date.fromisoformat(comp['valid_until']):
+                st.error("⛔ O link fornecido para a sua empresa já se encontra inativo ou expirado.")
+                return
+        except: pass
+        
+    limit_evals = comp.get('limit_evals', 999999)
+    resp_count = comp.get('respondidas', 0) if comp.get('respondidas') is not None else 0
+    if resp_count >= limit_evals and not is_preview:
+        st.error("⚠️ Pedimos desculpas. Infelizmente já foi atingido o número limite de respostas para este projeto em particular. Obrigado pela boa vontade em compartilhar e apoiar.")
+        return
+    
+    # Resgata a metodologia amarrada a empresa
+    metodo_nome = comp.get('metodologia', 'HSE-IT (35 itens)')
+    metodo_dados = st.session_state.methodologies.get(metodo_nome, st.session_state.methodologies['HSE-IT (35 itens)'])
+    perguntas = metodo_dados['questions']
+
+    # Descobre se a empresa exige CPF (Lendo de dentro do JSONB org_structure)
+    org_struct = comp.get('org_structure', {})
+    exige_cpf = org_struct.get('_exigir_cpf', True) if isinstance(org_struct, dict) else True
+
+    logo = get_logo_html(150)
+    logo_cliente_b64 = get_company_logo(comp['id'])
+    if logo_cliente_b64: logo = f"<img src='data:image/png;base64,{logo_cliente_b64}' width='180'>"
+    
+    st.markdown(f"<div style='text-align:center; margin-bottom: 20px;'>{logo}</div>", unsafe_allow_html=True)
+    st.markdown(f"<h3 style='text-align:center; color: {COR_PRIMARIA}; font-weight:800; font-family:sans-serif; text-transform:uppercase;'>Pesquisa de Clima e Riscos Psicossociais - {comp['razao']}</h3>", unsafe_allow_html=True)
+    
+    # Ajuste dinâmico do texto do alerta baseado na exigência de CPF
+    if exige_cpf:
+        texto_alerta_cpf = "<li>Pedimos a sua identificação de CPF apenas como chave de segurança anti-duplicação, mas fique totalmente tranquilo(a): assim que você clica em enviar, o sistema transforma seu número em um código criptografado, garantindo 100% de anonimato. A empresa nunca saberá quem respondeu o quê.</li>"
+    else:
+        texto_alerta_cpf = "<li>Sua empresa optou por uma pesquisa <strong>100% livre de identificação prévia</strong>. O preenchimento do CPF foi desativado para garantir a você máximo conforto e anonimato absoluto desde o início.</li>"
+
+    st.markdown(f"""
+        <div class='security-alert'>
+            <strong>🔒 A SUA PRIVACIDADE É A NOSSA PRIORIDADE</strong><br>
+            Sua chefia direta, colegas ou liderança <strong>não terão acesso</strong> a ler o que você escreve individualmente e assinala agora nesta tela.<br>
+            <ul>
+                {texto_alerta_cpf}
+                <li>As estatísticas e gráficos gerados depois serão apenas do grupo como um todo, criando bases práticas para o RH intervir e solucionar questões que afetam toda a equipe.</li>
+            </ul>
+        </div>
+    """, unsafe_allow_html=True)
+    
+    with st.form("survey_form"):
+        st.write("#### 1. Seus Dados de Perfil")
+        c1, c2 = st.columns(2)
+        
+        # Renderiza (ou oculta a necessidade) do CPF de forma dinâmica
+        if exige_cpf:
+            cpf_raw = c1.text_input("CPF (Apenas números, para validação de segurança)")
+        else:
+            cpf_raw = "N/A"
+            c1.info("🟢 A identificação por CPF foi desativada pela sua empresa para esta pesquisa. Siga direto para a escolha do setor.")
+        
+        s_keys = ["Geral"] 
+        if 'org_structure' in comp and isinstance(comp['org_structure'], dict) and comp['org_structure']:
+            s_keys = [k for k in comp['org_structure'].keys() if not k.startswith('_')]
+             
+        setor_colab = c2.selectbox("Selecione o seu setor de atuação atual", s_keys)
+        
+        st.markdown("---")
+        st.write(f"#### 2. Avaliação do Ambiente de Trabalho")
+        st.caption("Pense no seu dia a dia ao longo das últimas 4 a 6 semanas e responda de forma muito sincera ao que lhe é perguntado abaixo. Como é que as coisas realmente acontecem para você?")
+        
+        missing = False
+        answers_dict = {}
+        
+        abas_categorias = list(perguntas.keys())
+        tabs = st.tabs(abas_categorias)
+        
+        for i, (category, questions) in enumerate(perguntas.items()):
+            with tabs[i]:
+                st.markdown(f"<h5 style='color: {COR_SECUNDARIA}; font-weight:800; text-transform:uppercase; margin-top:20px; margin-bottom: 25px;'>➡️ Categoria: {category}</h5>", unsafe_allow_html=True)
+                for q in questions:
+                    st.markdown(f"<div style='font-size: 15px; color: #2c3e50; font-weight: 600; margin-bottom: 5px;'>{q['q']}</div>", unsafe_allow_html=True)
+                    if q.get('help'):
+                        st.caption(f"💡 *{q['help']}*")
+                    
+                    options = q.get('options', ["Nunca", "Raramente", "Às vezes", "Frequentemente", "Sempre"])
+                    
+                    response_value = st.radio(
+                        "Qual a sua percepção?", 
+                        options, 
+                        key=f"ans_q_{q['id']}", 
+                        horizontal=True, 
+                        index=None,
+                        label_visibility="collapsed"
+                    )
+                    
+                    if response_value is None: 
+                        missing = True
+                    else: 
+                        answers_dict[q['q']] = response_value
+                    
+                    st.markdown("<hr style='margin:25px 0; border: 0; border-top: 2px dashed #ececec;'>", unsafe_allow_html=True)
+        
+        st.markdown("---")
+        st.write("#### 3. Termo de Consentimento")
+        aceite_lgpd = st.checkbox("Compreendo que a minha participação é voluntária e que as minhas respostas são anônimas e estritamente confidenciais, sendo utilizadas única e exclusivamente para fins de melhoria de qualidade de ambiente de trabalho de acordo e amparado com as normas da base imposta pela Lei Geral de Proteção de Dados (LGPD).")
+        
+        st.markdown("<br>", unsafe_allow_html=True)
+        submit_btn = st.form_submit_button("✅ Enviar Minhas Respostas", type="primary", use_container_width=True)
+        
+        if submit_btn:
+            if exige_cpf and (not cpf_raw or len(cpf_raw) < 11 or cpf_raw == "N/A"): 
+                st.error("⚠️ Atenção: Por favor verifique e insira o seu documento CPF completo (apenas números) para que o envio seja validado e liberado.")
+            elif not aceite_lgpd: 
+                st.error("⚠️ Aviso Obrigatório: É necessário marcar a caixa aceitando os termos da garantia e do anonimato seguro (na proteção da lei) para conseguir enviar.")
+            elif missing: 
+                st.error("⚠️ Atenção: Identificamos que ainda falta preencher algumas opções nas abas acima. Recomendamos revisar cada painel e preencher as lacunas para que o envio da avaliação possa ser registrado.")
+            else:
+                
+                # Se exige CPF, o Hash é a chave antiduplicação. Senão, cria uma tag aleatória que nunca se repete.
+                if exige_cpf:
+                    hashed_cpf = hashlib.sha256(cpf_raw.encode()).hexdigest()
+                else:
+                    hashed_cpf = f"anon_livre_{uuid.uuid4().hex}"
+
+                now_str = datetime.datetime.now(datetime.timezone.utc).isoformat()
+                nova_resposta = {
+                    "company_id": comp['id'], 
+                    "cpf_hash": hashed_cpf,
+                    "setor": setor_colab, 
+                    "answers": answers_dict, 
+                    "created_at": now_str
+                }
+                
+                # Formato compacto opcional: um dígito por pergunta, na ordem dos ids da metodologia
+                if st.session_state.platform_config.get('respostas_compactas'):
+                    nova_resposta["answers"] = {}
+                    nova_resposta["answers_codes"] = codes_to_text(encode_answers(get_scoring_table(perguntas), answers_dict))
+                
+                try:
+                    gravada = submit_response(nova_resposta)
+                except QuotaExceeded:
+                    gravada = None
+                    st.error("⚠️ Pedimos desculpas. Infelizmente já foi atingido o número limite de respostas para este projeto em particular. Obrigado pela boa vontade em compartilhar e apoiar.")
+                except Exception as e: 
+                    gravada = None
+                    st.error(f"Engasgo no contato e no procedimento que aloja a base: {e}")
+
+                if gravada is False:
+                    st.error("🚫 O protocolo de trava antifraude acabou de interceptar o seu envio. Verificamos que o seu código CPF já foi registrado com sucesso nesta avaliação anteriormente. Visando a integridade estatística, a empresa permite apenas uma avaliação por colaborador.")
+                elif gravada:
+                    flash("🎉 Muito obrigado pela sua participação! Suas respostas foram enviadas com sucesso e segurança. Sua opinião é fundamental para construirmos um ambiente de trabalho cada vez melhor.", fixa=True, baloes=True)
+                    
+                    # Se for o RH em modo Preview, volta pro admin ao invés de deslogar
+                    if is_preview:
+                        st.session_state.user_role = 'admin'
+                        st.session_state.current_company = None
+                    else:
+                        st.session_state.logged_in = False 
+                        
+                    st.rerun()
+
+# ==============================================================================
+# 7. ROTAS (ROUTER PRINCIPAL DO SISTEMA)
+# ==============================================================================
+# Respostas aceitas antes de um reinício vão para o banco mesmo sem novos envios ou com a ingestão em lote desligada
+if DB_CONNECTED and has_spilled_responses():
+    get_ingestion_queue()
+
+show_flash()
+
+if not st.session_state.logged_in:
+    if "cod" in st.query_params: 
+        survey_screen()
+    else: 
+        login_screen()
+else:
+    if st.session_state.user_role == 'admin': 
+        admin_dashboard()
+    else: 
+        survey_screen()
+
+# --- FIM ABSOLUTO DO ARQUIVO APP.PY ---
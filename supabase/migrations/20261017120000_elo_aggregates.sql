@@ -0,0 +1,85 @@
+-- ==============================================================================
+-- Agregação psicossocial no servidor (leitura padrão do painel)
+-- A configuração de pontuação é espelhada do app por sync_scoring_config(),
+-- para que o banco aplique exatamente as mesmas regras de score_responses e finalize_company_analytics.
+-- ==============================================================================
+
+-- Rótulo de resposta -> pontuação direta (1 a 5). Itens invertidos usam 6 - pontos.
+create table if not exists elo_answer_scale (
+    rotulo text primary key,
+    pontos smallint not null check (pontos between 1 and 5)
+);
+
+-- Itens de cada metodologia na mesma ordem das colunas da tabela compilada no app.
+create table if not exists elo_scoring_items (
+    metodologia text not null,
+    ordem integer not null,
+    q_id text,
+    q_texto text not null,
+    categoria text not null,
+    rev boolean not null default false,
+    primary key (metodologia, ordem)
+);
+
+-- Somas e contagens por empresa, setor e pergunta (linhas com ordem preenchida)
+-- e total de respondentes e soma dos scores individuais por empresa e setor (ordem nula).
+create or replace function elo_company_aggregates(p_company_ids text[] default null)
+returns table (
+    company_id text,
+    setor text,
+    ordem integer,
+    soma bigint,
+    cont bigint,
+    respostas bigint,
+    soma_score numeric
+)
+language sql
+stable
+as $$
+    with metodo as (
+        -- Metodologia desconhecida cai no HSE-IT, como no app
+        select c.id::text as company_id, c.metodologia
+        from companies c
+        where exists (select 1 from elo_scoring_items i where i.metodologia = c.metodologia)
+    ),
+    alvo as (
+        select r.id as resposta_id,
+               r.company_id::text as company_id,
+               r.setor,
+               r.answers,
+               coalesce(m.metodologia, 'HSE-IT (35 itens)') as metodologia
+        from responses r
+        left join metodo m on m.company_id = r.company_id::text
+        where p_company_ids is null or r.company_id::text = any(p_company_ids)
+    ),
+    pontos as (
+        select a.resposta_id,
+               a.company_id,
+               a.setor,
+               i.ordem,
+               case when i.rev then 6 - e.pontos else e.pontos end as valor
+        from alvo a
+        join elo_scoring_items i on i.metodologia = a.metodologia
+        join elo_answer_scale e on e.rotulo = a.answers ->> i.q_texto
+    ),
+    por_resposta as (
+        select a.company_id,
+               a.setor,
+               a.resposta_id,
+               coalesce(avg(p.valor), 0) as score
+        from alvo a
+        left join pontos p on p.resposta_id = a.resposta_id
+        group by a.company_id, a.setor, a.resposta_id
+    )
+    select p.company_id, p.setor, p.ordem,
+           sum(p.valor)::bigint, count(*)::bigint,
+           null::bigint, null::numeric
+    from pontos p
+    group by p.company_id, p.setor, p.ordem
+    union all
+    select r.company_id, r.setor, null::integer,
+           null::bigint, null::bigint,
+           count(*)::bigint, sum(r.score)
+    from por_resposta r
+    group by r.company_id, r.setor
+$$;
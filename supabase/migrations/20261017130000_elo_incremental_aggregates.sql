@@ -0,0 +1,125 @@
+-- ==============================================================================
+-- Manutenção incremental dos agregados: cada resposta inserida ou removida aplica
+-- apenas o seu delta, e o painel lê as somas prontas em vez de varrer o histórico.
+-- ==============================================================================
+
+-- A versão anterior (varredura completa) passa a ser usada só para reconstrução
+alter function elo_company_aggregates(text[]) rename to elo_compute_aggregates;
+
+-- Setor nulo é gravado como '' para poder fazer parte da chave primária
+create table if not exists elo_response_aggregates (
+    company_id text not null,
+    setor text not null default '',
+    ordem integer not null,
+    soma bigint not null default 0,
+    cont bigint not null default 0,
+    primary key (company_id, setor, ordem)
+);
+
+create table if not exists elo_response_totals (
+    company_id text not null,
+    setor text not null default '',
+    respostas bigint not null default 0,
+    soma_score numeric not null default 0,
+    primary key (company_id, setor)
+);
+
+create or replace function elo_apply_response_delta()
+returns trigger
+language plpgsql
+as $$
+declare
+    v_row responses%rowtype;
+    v_sinal integer;
+    v_metodo text;
+    v_score numeric;
+begin
+    if tg_op = 'INSERT' then
+        v_row := new;
+        v_sinal := 1;
+    else
+        v_row := old;
+        v_sinal := -1;
+    end if;
+
+    -- Metodologia desconhecida cai no HSE-IT, como no app
+    select coalesce((
+        select c.metodologia
+        from companies c
+        where c.id::text = v_row.company_id::text
+          and exists (select 1 from elo_scoring_items i where i.metodologia = c.metodologia)
+    ), 'HSE-IT (35 itens)') into v_metodo;
+
+    insert into elo_response_aggregates as a (company_id, setor, ordem, soma, cont)
+    select v_row.company_id::text, coalesce(v_row.setor, ''), i.ordem,
+           v_sinal * (case when i.rev then 6 - e.pontos else e.pontos end), v_sinal
+    from elo_scoring_items i
+    join elo_answer_scale e on e.rotulo = v_row.answers ->> i.q_texto
+    where i.metodologia = v_metodo
+    on conflict (company_id, setor, ordem)
+    do update set soma = a.soma + excluded.soma, cont = a.cont + excluded.cont;
+
+    select coalesce(avg(case when i.rev then 6 - e.pontos else e.pontos end), 0) into v_score
+    from elo_scoring_items i
+    join elo_answer_scale e on e.rotulo = v_row.answers ->> i.q_texto
+    where i.metodologia = v_metodo;
+
+    insert into elo_response_totals as t (company_id, setor, respostas, soma_score)
+    values (v_row.company_id::text, coalesce(v_row.setor, ''), v_sinal, v_sinal * v_score)
+    on conflict (company_id, setor)
+    do update set respostas = t.respostas + excluded.respostas, soma_score = t.soma_score + excluded.soma_score;
+
+    return null;
+end;
+$$;
+
+drop trigger if exists elo_responses_aggregate_delta on responses;
+create trigger elo_responses_aggregate_delta
+after insert or delete on responses
+for each row execute function elo_apply_response_delta();
+
+-- Reconstrução completa (carga inicial ou mudança na configuração de pontuação)
+create or replace function elo_rebuild_aggregates()
+returns void
+language sql
+as $$
+    delete from elo_response_aggregates;
+    delete from elo_response_totals;
+
+    insert into elo_response_aggregates (company_id, setor, ordem, soma, cont)
+    select a.company_id, coalesce(a.setor, ''), a.ordem, a.soma, a.cont
+    from elo_compute_aggregates(null) a
+    where a.ordem is not null;
+
+    insert into elo_response_totals (company_id, setor, respostas, soma_score)
+    select a.company_id, coalesce(a.setor, ''), a.respostas, a.soma_score
+    from elo_compute_aggregates(null) a
+    where a.ordem is null;
+$$;
+
+-- Mesma assinatura lida pelo app, agora servida pelas tabelas mantidas incrementalmente
+create or replace function elo_company_aggregates(p_company_ids text[] default null)
+returns table (
+    company_id text,
+    setor text,
+    ordem integer,
+    soma bigint,
+    cont bigint,
+    respostas bigint,
+    soma_score numeric
+)
+language sql
+stable
+as $$
+    select a.company_id, nullif(a.setor, ''), a.ordem, a.soma, a.cont, null::bigint, null::numeric
+    from elo_response_aggregates a
+    where (p_company_ids is null or a.company_id = any(p_company_ids))
+      and a.cont > 0
+    union all
+    select t.company_id, nullif(t.setor, ''), null::integer, null::bigint, null::bigint, t.respostas, t.soma_score
+    from elo_response_totals t
+    where (p_company_ids is null or t.company_id = any(p_company_ids))
+      and t.respostas > 0
+$$;
+
+select elo_rebuild_aggregates();
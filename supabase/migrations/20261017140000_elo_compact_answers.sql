@@ -0,0 +1,141 @@
+-- ==============================================================================
+-- Formato compacto de respostas: answers_codes guarda um dígito por pergunta
+-- (pontuação direta 1 a 5, 0 = sem resposta) na ordem de elo_scoring_items.ordem.
+-- Linhas legadas continuam chaveadas pelo texto da pergunta em answers.
+-- ==============================================================================
+
+alter table responses add column if not exists answers_codes text;
+
+-- Código direto de um item: primeiro o formato compacto, senão o rótulo legado
+create or replace function elo_answer_code(p_codes text, p_answers jsonb, p_ordem integer, p_q_texto text)
+returns smallint
+language sql
+stable
+as $$
+    select coalesce(
+        case when substr(p_codes, p_ordem + 1, 1) between '0' and '5'
+             then substr(p_codes, p_ordem + 1, 1)::smallint end,
+        (select e.pontos from elo_answer_scale e where e.rotulo = p_answers ->> p_q_texto),
+        0::smallint
+    )
+$$;
+
+create or replace function elo_compute_aggregates(p_company_ids text[] default null)
+returns table (
+    company_id text,
+    setor text,
+    ordem integer,
+    soma bigint,
+    cont bigint,
+    respostas bigint,
+    soma_score numeric
+)
+language sql
+stable
+as $$
+    with metodo as (
+        select c.id::text as company_id, c.metodologia
+        from companies c
+        where exists (select 1 from elo_scoring_items i where i.metodologia = c.metodologia)
+    ),
+    alvo as (
+        select r.id as resposta_id,
+               r.company_id::text as company_id,
+               r.setor,
+               r.answers::jsonb as answers,
+               r.answers_codes,
+               coalesce(m.metodologia, 'HSE-IT (35 itens)') as metodologia
+        from responses r
+        left join metodo m on m.company_id = r.company_id::text
+        where p_company_ids is null or r.company_id::text = any(p_company_ids)
+    ),
+    codigos as (
+        select a.resposta_id, a.company_id, a.setor, i.ordem, i.rev,
+               elo_answer_code(a.answers_codes, a.answers, i.ordem, i.q_texto) as codigo
+        from alvo a
+        join elo_scoring_items i on i.metodologia = a.metodologia
+    ),
+    pontos as (
+        select c.resposta_id, c.company_id, c.setor, c.ordem,
+               case when c.rev then 6 - c.codigo else c.codigo end as valor
+        from codigos c
+        where c.codigo between 1 and 5
+    ),
+    por_resposta as (
+        select a.company_id,
+               a.setor,
+               a.resposta_id,
+               coalesce(avg(p.valor), 0) as score
+        from alvo a
+        left join pontos p on p.resposta_id = a.resposta_id
+        group by a.company_id, a.setor, a.resposta_id
+    )
+    select p.company_id, p.setor, p.ordem,
+           sum(p.valor)::bigint, count(*)::bigint,
+           null::bigint, null::numeric
+    from pontos p
+    group by p.company_id, p.setor, p.ordem
+    union all
+    select r.company_id, r.setor, null::integer,
+           null::bigint, null::bigint,
+           count(*)::bigint, sum(r.score)
+    from por_resposta r
+    group by r.company_id, r.setor
+$$;
+
+create or replace function elo_apply_response_delta()
+returns trigger
+language plpgsql
+as $$
+declare
+    v_row responses%rowtype;
+    v_sinal integer;
+    v_metodo text;
+    v_score numeric;
+begin
+    if tg_op = 'INSERT' then
+        v_row := new;
+        v_sinal := 1;
+    else
+        v_row := old;
+        v_sinal := -1;
+    end if;
+
+    select coalesce((
+        select c.metodologia
+        from companies c
+        where c.id::text = v_row.company_id::text
+          and exists (select 1 from elo_scoring_items i where i.metodologia = c.metodologia)
+    ), 'HSE-IT (35 itens)') into v_metodo;
+
+    insert into elo_response_aggregates as a (company_id, setor, ordem, soma, cont)
+    select v_row.company_id::text, coalesce(v_row.setor, ''), p.ordem, v_sinal * p.valor, v_sinal
+    from (
+        select i.ordem,
+               case when i.rev then 6 - x.codigo else x.codigo end as valor
+        from elo_scoring_items i
+        cross join lateral (
+            select elo_answer_code(v_row.answers_codes, v_row.answers::jsonb, i.ordem, i.q_texto) as codigo
+        ) x
+        where i.metodologia = v_metodo
+          and x.codigo between 1 and 5
+    ) p
+    on conflict (company_id, setor, ordem)
+    do update set soma = a.soma + excluded.soma, cont = a.cont + excluded.cont;
+
+    select coalesce(avg(case when i.rev then 6 - x.codigo else x.codigo end), 0) into v_score
+    from elo_scoring_items i
+    cross join lateral (
+        select elo_answer_code(v_row.answers_codes, v_row.answers::jsonb, i.ordem, i.q_texto) as codigo
+    ) x
+    where i.metodologia = v_metodo
+      and x.codigo between 1 and 5;
+
+    insert into elo_response_totals as t (company_id, setor, respostas, soma_score)
+    values (v_row.company_id::text, coalesce(v_row.setor, ''), v_sinal, v_sinal * v_score)
+    on conflict (company_id, setor)
+    do update set respostas = t.respostas + excluded.respostas, soma_score = t.soma_score + excluded.soma_score;
+
+    return null;
+end;
+$$;
@@ -0,0 +1,167 @@
+-- ==============================================================================
+-- Séries diárias por empresa para o Histórico de Evolução: somas e contagens por
+-- pergunta e total de respondentes por dia, mantidos pelo mesmo esquema de deltas.
+-- Respostas sem created_at ficam no dia '-infinity' ("Lote Anterior" no app).
+-- ==============================================================================
+
+create table if not exists elo_response_daily (
+    company_id text not null,
+    dia date not null,
+    ordem integer not null,
+    soma bigint not null default 0,
+    cont bigint not null default 0,
+    primary key (company_id, dia, ordem)
+);
+
+create table if not exists elo_response_daily_totals (
+    company_id text not null,
+    dia date not null,
+    respostas bigint not null default 0,
+    primary key (company_id, dia)
+);
+
+create or replace function elo_response_day(p_created_at timestamptz)
+returns date
+language sql
+immutable
+as $$
+    select coalesce((p_created_at at time zone 'UTC')::date, '-infinity'::date)
+$$;
+
+create or replace function elo_apply_response_daily_delta()
+returns trigger
+language plpgsql
+as $$
+declare
+    v_row responses%rowtype;
+    v_sinal integer;
+    v_metodo text;
+    v_dia date;
+begin
+    if tg_op = 'INSERT' then
+        v_row := new;
+        v_sinal := 1;
+    else
+        v_row := old;
+        v_sinal := -1;
+    end if;
+
+    v_dia := elo_response_day(v_row.created_at::timestamptz);
+
+    select coalesce((
+        select c.metodologia
+        from companies c
+        where c.id::text = v_row.company_id::text
+          and exists (select 1 from elo_scoring_items i where i.metodologia = c.metodologia)
+    ), 'HSE-IT (35 itens)') into v_metodo;
+
+    insert into elo_response_daily as d (company_id, dia, ordem, soma, cont)
+    select v_row.company_id::text, v_dia, i.ordem,
+           v_sinal * (case when i.rev then 6 - x.codigo else x.codigo end), v_sinal
+    from elo_scoring_items i
+    cross join lateral (
+        select elo_answer_code(v_row.answers_codes, v_row.answers::jsonb, i.ordem, i.q_texto) as codigo
+    ) x
+    where i.metodologia = v_metodo
+      and x.codigo between 1 and 5
+    on conflict (company_id, dia, ordem)
+    do update set soma = d.soma + excluded.soma, cont = d.cont + excluded.cont;
+
+    insert into elo_response_daily_totals as t (company_id, dia, respostas)
+    values (v_row.company_id::text, v_dia, v_sinal)
+    on conflict (company_id, dia)
+    do update set respostas = t.respostas + excluded.respostas;
+
+    return null;
+end;
+$$;
+
+drop trigger if exists elo_responses_daily_delta on responses;
+create trigger elo_responses_daily_delta
+    after insert or delete on responses
+    for each row execute function elo_apply_response_daily_delta();
+
+create or replace function elo_rebuild_daily_rollups()
+returns void
+language sql
+as $$
+    delete from elo_response_daily;
+    delete from elo_response_daily_totals;
+
+    with metodo as (
+        select c.id::text as company_id, c.metodologia
+        from companies c
+        where exists (select 1 from elo_scoring_items i where i.metodologia = c.metodologia)
+    ),
+    alvo as (
+        select r.company_id::text as company_id,
+               elo_response_day(r.created_at::timestamptz) as dia,
+               r.answers::jsonb as answers,
+               r.answers_codes,
+               coalesce(m.metodologia, 'HSE-IT (35 itens)') as metodologia
+        from responses r
+        left join metodo m on m.company_id = r.company_id::text
+    )
+    insert into elo_response_daily (company_id, dia, ordem, soma, cont)
+    select a.company_id, a.dia, i.ordem,
+           sum(case when i.rev then 6 - x.codigo else x.codigo end), count(*)
+    from alvo a
+    join elo_scoring_items i on i.metodologia = a.metodologia
+    cross join lateral (
+        select elo_answer_code(a.answers_codes, a.answers, i.ordem, i.q_texto) as codigo
+    ) x
+    where x.codigo between 1 and 5
+    group by a.company_id, a.dia, i.ordem;
+
+    insert into elo_response_daily_totals (company_id, dia, respostas)
+    select r.company_id::text, elo_response_day(r.created_at::timestamptz), count(*)
+    from responses r
+    group by 1, 2;
+$$;
+
+-- A reconstrução disparada pelo app (mudança de escala ou de itens) passa a refazer também as séries diárias
+create or replace function elo_rebuild_aggregates()
+returns void
+language sql
+as $$
+    delete from elo_response_aggregates;
+    delete from elo_response_totals;
+
+    insert into elo_response_aggregates (company_id, setor, ordem, soma, cont)
+    select a.company_id, coalesce(a.setor, ''), a.ordem, a.soma, a.cont
+    from elo_compute_aggregates(null) a
+    where a.ordem is not null;
+
+    insert into elo_response_totals (company_id, setor, respostas, soma_score)
+    select a.company_id, coalesce(a.setor, ''), a.respostas, a.soma_score
+    from elo_compute_aggregates(null) a
+    where a.ordem is null;
+
+    select elo_rebuild_daily_rollups();
+$$;
+
+-- Linhas com ordem nula trazem o total de respondentes do dia; dia '-infinity' = sem data
+create or replace function elo_company_daily_rollups(p_company_ids text[] default null)
+returns table (
+    company_id text,
+    dia text,
+    ordem integer,
+    soma bigint,
+    cont bigint,
+    respostas bigint
+)
+language sql
+stable
+as $$
+    select d.company_id, d.dia::text, d.ordem, d.soma, d.cont, null::bigint
+    from elo_response_daily d
+    where (p_company_ids is null or d.company_id = any(p_company_ids))
+      and d.cont > 0
+    union all
+    select t.company_id, t.dia::text, null::integer, null::bigint, null::bigint, t.respostas
+    from elo_response_daily_totals t
+    where (p_company_ids is null or t.company_id = any(p_company_ids))
+      and t.respostas > 0
+$$;
+
+select elo_rebuild_daily_rollups();
@@ -0,0 +1,181 @@
+-- ==============================================================================
+-- Índice de benchmark entre clientes: distribuição em percentis (0, 5, ..., 100)
+-- do score geral e de cada dimensão, por divisão do CNAE (2 primeiros dígitos) e
+-- grau de risco. Mudanças em respostas ou no cadastro marcam a empresa como
+-- pendente; elo_refresh_benchmark() recalcula só as empresas pendentes e os
+-- grupos afetados por elas.
+-- ==============================================================================
+
+create table if not exists elo_benchmark_scores (
+    company_id text primary key,
+    cnae_prefixo text not null default '',
+    risco text not null default '',
+    respostas bigint not null default 0,
+    score numeric,
+    dimensoes jsonb not null default '{}'::jsonb
+);
+
+create table if not exists elo_benchmark (
+    cnae_prefixo text not null,
+    risco text not null,
+    metrica text not null,
+    empresas integer not null,
+    percentis numeric[] not null,
+    atualizado_em timestamptz not null default now(),
+    primary key (cnae_prefixo, risco, metrica)
+);
+
+create table if not exists elo_benchmark_pendentes (
+    company_id text primary key
+);
+
+create or replace function elo_cnae_prefixo(p_cnae text)
+returns text
+language sql
+immutable
+as $$
+    select left(regexp_replace(coalesce(p_cnae, ''), '[^0-9]', '', 'g'), 2)
+$$;
+
+create or replace function elo_mark_benchmark_pending()
+returns trigger
+language plpgsql
+as $$
+begin
+    if tg_op in ('INSERT', 'UPDATE') then
+        insert into elo_benchmark_pendentes (company_id)
+        values (new.company_id::text)
+        on conflict do nothing;
+    end if;
+    if tg_op in ('UPDATE', 'DELETE') then
+        insert into elo_benchmark_pendentes (company_id)
+        values (old.company_id::text)
+        on conflict do nothing;
+    end if;
+    return null;
+end;
+$$;
+
+-- Em companies a chave é id (e não company_id)
+create or replace function elo_mark_company_benchmark_pending()
+returns trigger
+language plpgsql
+as $$
+begin
+    if tg_op in ('INSERT', 'UPDATE') then
+        insert into elo_benchmark_pendentes (company_id)
+        values (new.id::text)
+        on conflict do nothing;
+    end if;
+    if tg_op in ('UPDATE', 'DELETE') then
+        insert into elo_benchmark_pendentes (company_id)
+        values (old.id::text)
+        on conflict do nothing;
+    end if;
+    return null;
+end;
+$$;
+
+drop trigger if exists elo_totals_benchmark_pending on elo_response_totals;
+create trigger elo_totals_benchmark_pending
+    after insert or update or delete on elo_response_totals
+    for each row execute function elo_mark_benchmark_pending();
+
+drop trigger if exists elo_companies_benchmark_pending on companies;
+create trigger elo_companies_benchmark_pending
+    after insert or delete or update of cnae, risco, metodologia on companies
+    for each row execute function elo_mark_company_benchmark_pending();
+
+create or replace function elo_refresh_benchmark()
+returns integer
+language plpgsql
+as $$
+declare
+    v_ids text[];
+    v_grupo record;
+    v_fracoes float8[] := (select array_agg(g / 20.0 order by g) from generate_series(0, 20) g);
+begin
+    with pendentes as (
+        delete from elo_benchmark_pendentes returning company_id
+    )
+    select array_agg(company_id) into v_ids from pendentes;
+
+    if v_ids is null then
+        return 0;
+    end if;
+
+    -- Grupos em que as empresas pendentes estavam antes da atualização
+    create temp table if not exists elo_benchmark_grupos (cnae_prefixo text, risco text) on commit drop;
+    insert into elo_benchmark_grupos
+    select s.cnae_prefixo, s.risco from elo_benchmark_scores s where s.company_id = any(v_ids);
+
+    delete from elo_benchmark_scores where company_id = any(v_ids);
+
+    -- Mesma regra do app: média por dimensão com 1 casa e score = média das dimensões com nota
+    insert into elo_benchmark_scores (company_id, cnae_prefixo, risco, respostas, score, dimensoes)
+    with metodo as (
+        select c.id::text as company_id,
+               elo_cnae_prefixo(c.cnae::text) as cnae_prefixo,
+               coalesce(c.risco::text, '') as risco,
+               case when exists (select 1 from elo_scoring_items i where i.metodologia = c.metodologia)
+                    then c.metodologia else 'HSE-IT (35 itens)' end as metodologia
+        from companies c
+        where c.id::text = any(v_ids)
+    ),
+    dims as (
+        select m.company_id, i.categoria,
+               round(sum(a.soma)::numeric / nullif(sum(a.cont), 0), 1) as media
+        from metodo m
+        join elo_response_aggregates a on a.company_id = m.company_id
+        join elo_scoring_items i on i.metodologia = m.metodologia and i.ordem = a.ordem
+        group by m.company_id, i.categoria
+    ),
+    totais as (
+        select t.company_id, sum(t.respostas) as respostas
+        from elo_response_totals t
+        where t.company_id = any(v_ids)
+        group by t.company_id
+    )
+    select m.company_id, m.cnae_prefixo, m.risco, t.respostas,
+           round(avg(d.media) filter (where d.media > 0), 1),
+           coalesce(jsonb_object_agg(d.categoria, d.media) filter (where d.media is not null), '{}'::jsonb)
+    from metodo m
+    join totais t on t.company_id = m.company_id
+    left join dims d on d.company_id = m.company_id
+    where t.respostas > 0
+    group by m.company_id, m.cnae_prefixo, m.risco, t.respostas;
+
+    insert into elo_benchmark_grupos
+    select s.cnae_prefixo, s.risco from elo_benchmark_scores s where s.company_id = any(v_ids);
+
+    for v_grupo in select distinct g.cnae_prefixo, g.risco from elo_benchmark_grupos g loop
+        delete from elo_benchmark b
+        where b.cnae_prefixo = v_grupo.cnae_prefixo and b.risco = v_grupo.risco;
+
+        insert into elo_benchmark (cnae_prefixo, risco, metrica, empresas, percentis)
+        select v_grupo.cnae_prefixo, v_grupo.risco, 'score', count(*),
+               percentile_cont(v_fracoes) within group (order by s.score)::numeric[]
+        from elo_benchmark_scores s
+        where s.cnae_prefixo = v_grupo.cnae_prefixo and s.risco = v_grupo.risco and s.score > 0
+        having count(*) > 0;
+
+        insert into elo_benchmark (cnae_prefixo, risco, metrica, empresas, percentis)
+        select v_grupo.cnae_prefixo, v_grupo.risco, d.key, count(*),
+               percentile_cont(v_fracoes) within group (order by d.value::numeric)::numeric[]
+        from elo_benchmark_scores s
+        cross join lateral jsonb_each_text(s.dimensoes) d
+        where s.cnae_prefixo = v_grupo.cnae_prefixo and s.risco = v_grupo.risco and d.value::numeric > 0
+        group by d.key;
+    end loop;
+
+    delete from elo_benchmark_grupos;
+    return array_length(v_ids, 1);
+end;
+$$;
+
+-- Carga inicial: todas as empresas com respostas entram como pendentes
+insert into elo_benchmark_pendentes (company_id)
+select distinct t.company_id from elo_response_totals t
+on conflict do nothing;
+
+select elo_refresh_benchmark();
@@ -0,0 +1,29 @@
+-- ==============================================================================
+-- Uma resposta por CPF (hash) em cada empresa, garantida pelo banco: o app grava
+-- com insert ... on conflict do nothing e trata o conflito como envio duplicado.
+-- Respostas anônimas usam um cpf_hash aleatório e nunca conflitam.
+-- ==============================================================================
+
+-- Cópia das respostas duplicadas removidas abaixo, para auditoria; desfazer é reinserir as linhas em responses
+-- (sem a coluna removida_em) depois de decidir qual resposta do CPF deve valer
+create table if not exists responses_duplicadas (like responses);
+alter table responses_duplicadas add column if not exists removida_em timestamptz not null default now();
+
+insert into responses_duplicadas
+select r.*, now()
+from responses r
+where exists (
+    select 1 from responses d
+    where d.company_id = r.company_id
+      and d.cpf_hash = r.cpf_hash
+      and d.id < r.id
+);
+
+-- Duplicados gravados antes da restrição (checagem antiga em duas etapas): mantém a primeira resposta
+delete from responses r
+using responses d
+where r.company_id = d.company_id
+  and r.cpf_hash = d.cpf_hash
+  and r.id > d.id;
+
+create unique index if not exists responses_company_cpf_key on responses (company_id, cpf_hash);
@@ -0,0 +1,39 @@
+-- ==============================================================================
+-- Contador de respostas por empresa (companies.respondidas), mantido na mesma
+-- transação do insert. A cota (limit_evals) é verificada e consumida no mesmo
+-- update: se a empresa já atingiu o limite, o insert é desfeito com o erro
+-- elo_quota_excedida, tratado pelo app.
+-- ==============================================================================
+
+alter table companies add column if not exists respondidas bigint not null default 0;
+
+update companies c
+set respondidas = (select count(*) from responses r where r.company_id::text = c.id::text);
+
+create or replace function elo_count_response()
+returns trigger
+language plpgsql
+as $$
+begin
+    if tg_op = 'INSERT' then
+        update companies c
+        set respondidas = c.respondidas + 1
+        where c.id::text = new.company_id::text
+          and (c.limit_evals is null or c.respondidas < c.limit_evals);
+
+        if not found and exists (select 1 from companies c where c.id::text = new.company_id::text) then
+            raise exception 'elo_quota_excedida' using errcode = 'P0001';
+        end if;
+    else
+        update companies c
+        set respondidas = greatest(c.respondidas - 1, 0)
+        where c.id::text = old.company_id::text;
+    end if;
+    return null;
+end;
+$$;
+
+drop trigger if exists elo_responses_count on responses;
+create trigger elo_responses_count
+    after insert or delete on responses
+    for each row execute function elo_count_response();
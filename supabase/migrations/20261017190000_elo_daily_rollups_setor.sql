@@ -0,0 +1,131 @@
+-- ==============================================================================
+-- Séries diárias também por setor, para o Histórico de Evolução filtrar um setor.
+-- As tabelas diárias ganham a coluna setor ('' = sem setor, como nos agregados) e
+-- a série da empresa passa a ser a soma dos setores, montada no app.
+-- ==============================================================================
+
+alter table elo_response_daily add column if not exists setor text not null default '';
+alter table elo_response_daily drop constraint if exists elo_response_daily_pkey;
+alter table elo_response_daily add primary key (company_id, setor, dia, ordem);
+
+alter table elo_response_daily_totals add column if not exists setor text not null default '';
+alter table elo_response_daily_totals drop constraint if exists elo_response_daily_totals_pkey;
+alter table elo_response_daily_totals add primary key (company_id, setor, dia);
+
+create or replace function elo_apply_response_daily_delta()
+returns trigger
+language plpgsql
+as $$
+declare
+    v_row responses%rowtype;
+    v_sinal integer;
+    v_metodo text;
+    v_dia date;
+    v_setor text;
+begin
+    if tg_op = 'INSERT' then
+        v_row := new;
+        v_sinal := 1;
+    else
+        v_row := old;
+        v_sinal := -1;
+    end if;
+
+    v_dia := elo_response_day(v_row.created_at::timestamptz);
+    v_setor := coalesce(v_row.setor::text, '');
+
+    select coalesce((
+        select c.metodologia
+        from companies c
+        where c.id::text = v_row.company_id::text
+          and exists (select 1 from elo_scoring_items i where i.metodologia = c.metodologia)
+    ), 'HSE-IT (35 itens)') into v_metodo;
+
+    insert into elo_response_daily as d (company_id, setor, dia, ordem, soma, cont)
+    select v_row.company_id::text, v_setor, v_dia, i.ordem,
+           v_sinal * (case when i.rev then 6 - x.codigo else x.codigo end), v_sinal
+    from elo_scoring_items i
+    cross join lateral (
+        select elo_answer_code(v_row.answers_codes, v_row.answers::jsonb, i.ordem, i.q_texto) as codigo
+    ) x
+    where i.metodologia = v_metodo
+      and x.codigo between 1 and 5
+    on conflict (company_id, setor, dia, ordem)
+    do update set soma = d.soma + excluded.soma, cont = d.cont + excluded.cont;
+
+    insert into elo_response_daily_totals as t (company_id, setor, dia, respostas)
+    values (v_row.company_id::text, v_setor, v_dia, v_sinal)
+    on conflict (company_id, setor, dia)
+    do update set respostas = t.respostas + excluded.respostas;
+
+    return null;
+end;
+$$;
+
+create or replace function elo_rebuild_daily_rollups()
+returns void
+language sql
+as $$
+    delete from elo_response_daily;
+    delete from elo_response_daily_totals;
+
+    with metodo as (
+        select c.id::text as company_id, c.metodologia
+        from companies c
+        where exists (select 1 from elo_scoring_items i where i.metodologia = c.metodologia)
+    ),
+    alvo as (
+        select r.company_id::text as company_id,
+               coalesce(r.setor::text, '') as setor,
+               elo_response_day(r.created_at::timestamptz) as dia,
+               r.answers::jsonb as answers,
+               r.answers_codes,
+               coalesce(m.metodologia, 'HSE-IT (35 itens)') as metodologia
+        from responses r
+        left join metodo m on m.company_id = r.company_id::text
+    )
+    insert into elo_response_daily (company_id, setor, dia, ordem, soma, cont)
+    select a.company_id, a.setor, a.dia, i.ordem,
+           sum(case when i.rev then 6 - x.codigo else x.codigo end), count(*)
+    from alvo a
+    join elo_scoring_items i on i.metodologia = a.metodologia
+    cross join lateral (
+        select elo_answer_code(a.answers_codes, a.answers, i.ordem, i.q_texto) as codigo
+    ) x
+    where x.codigo between 1 and 5
+    group by a.company_id, a.setor, a.dia, i.ordem;
+
+    insert into elo_response_daily_totals (company_id, setor, dia, respostas)
+    select r.company_id::text, coalesce(r.setor::text, ''), elo_response_day(r.created_at::timestamptz), count(*)
+    from responses r
+    group by 1, 2, 3;
+$$;
+
+-- O retorno ganha a coluna setor (nulo = sem setor); mudar as colunas de saída exige recriar a função
+drop function if exists elo_company_daily_rollups(text[]);
+create function elo_company_daily_rollups(p_company_ids text[] default null)
+returns table (
+    company_id text,
+    setor text,
+    dia text,
+    ordem integer,
+    soma bigint,
+    cont bigint,
+    respostas bigint
+)
+language sql
+stable
+as $$
+    select d.company_id, nullif(d.setor, ''), d.dia::text, d.ordem, d.soma, d.cont, null::bigint
+    from elo_response_daily d
+    where (p_company_ids is null or d.company_id = any(p_company_ids))
+      and d.cont > 0
+    union all
+    select t.company_id, nullif(t.setor, ''), t.dia::text, null::integer, null::bigint, null::bigint, t.respostas
+    from elo_response_daily_totals t
+    where (p_company_ids is null or t.company_id = any(p_company_ids))
+      and t.respostas > 0
+$$;
+
+-- As linhas já gravadas ficaram todas no setor '': refaz as séries a partir das respostas
+select elo_rebuild_daily_rollups();
@@ -0,0 +1,81 @@
+-- ==============================================================================
+-- Troca atômica da configuração de pontuação e reconstrução com uma só varredura.
+-- elo_replace_scoring_config recebe a escala e os itens completos do app, compara
+-- com o que está gravado e, se algo mudou, substitui as duas tabelas (removendo as
+-- linhas que deixaram de valer) e reconstrói os agregados na mesma transação.
+-- ==============================================================================
+
+-- A varredura de elo_compute_aggregates é feita uma única vez e alimenta as duas tabelas
+create or replace function elo_rebuild_aggregates()
+returns void
+language sql
+as $$
+    delete from elo_response_aggregates;
+    delete from elo_response_totals;
+
+    with a as materialized (
+        select * from elo_compute_aggregates(null)
+    ),
+    por_pergunta as (
+        insert into elo_response_aggregates (company_id, setor, ordem, soma, cont)
+        select a.company_id, coalesce(a.setor, ''), a.ordem, a.soma, a.cont
+        from a
+        where a.ordem is not null
+    )
+    insert into elo_response_totals (company_id, setor, respostas, soma_score)
+    select a.company_id, coalesce(a.setor, ''), a.respostas, a.soma_score
+    from a
+    where a.ordem is null;
+
+    select elo_rebuild_daily_rollups();
+$$;
+
+-- Devolve true quando a configuração mudou e os agregados foram reconstruídos
+create or replace function elo_replace_scoring_config(p_escala jsonb, p_itens jsonb)
+returns boolean
+language plpgsql
+as $$
+declare
+    v_mudou boolean;
+begin
+    -- Sessões abertas ao mesmo tempo sincronizam uma de cada vez
+    perform pg_advisory_xact_lock(hashtext('elo_replace_scoring_config'));
+
+    with nova_escala as (
+        select e.rotulo, e.pontos::smallint as pontos
+        from jsonb_to_recordset(p_escala) as e(rotulo text, pontos integer)
+    ),
+    novos_itens as (
+        select i.metodologia, i.ordem, i.q_id, i.q_texto, i.categoria, coalesce(i.rev, false) as rev
+        from jsonb_to_recordset(p_itens) as i(metodologia text, ordem integer, q_id text, q_texto text, categoria text, rev boolean)
+    )
+    select exists (
+        (select rotulo, pontos from elo_answer_scale except select rotulo, pontos from nova_escala)
+        union all
+        (select rotulo, pontos from nova_escala except select rotulo, pontos from elo_answer_scale)
+    ) or exists (
+        (select metodologia, ordem, q_id, q_texto, categoria, rev from elo_scoring_items
+         except select metodologia, ordem, q_id, q_texto, categoria, rev from novos_itens)
+        union all
+        (select metodologia, ordem, q_id, q_texto, categoria, rev from novos_itens
+         except select metodologia, ordem, q_id, q_texto, categoria, rev from elo_scoring_items)
+    ) into v_mudou;
+
+    if not v_mudou then
+        return false;
+    end if;
+
+    delete from elo_answer_scale;
+    insert into elo_answer_scale (rotulo, pontos)
+    select e.rotulo, e.pontos
+    from jsonb_to_recordset(p_escala) as e(rotulo text, pontos smallint);
+
+    delete from elo_scoring_items;
+    insert into elo_scoring_items (metodologia, ordem, q_id, q_texto, categoria, rev)
+    select i.metodologia, i.ordem, i.q_id, i.q_texto, i.categoria, coalesce(i.rev, false)
+    from jsonb_to_recordset(p_itens) as i(metodologia text, ordem integer, q_id text, q_texto text, categoria text, rev boolean);
+
+    perform elo_rebuild_aggregates();
+    return true;
+end;
+$$;
@@ -0,0 +1,59 @@
+import ast
+import datetime
+import hashlib
+import json
+import logging
+import os
+import pathlib
+import threading
+import time
+import types
+
+import pytest
+
+APP_PATH = pathlib.Path(__file__).resolve().parent.parent / "app.py"
+
+
+class SessionState(dict):
+    # Mesmo acesso por atributo e por chave do st.session_state
+    __getattr__ = dict.__getitem__
+    __setattr__ = dict.__setitem__
+
+
+def is_constant_assign(node):
+    return isinstance(node, ast.Assign) and all(isinstance(t, ast.Name) and t.id.isupper() for t in node.targets)
+
+
+def is_logger_assign(node):
+    return isinstance(node, ast.Assign) and ast.unparse(node.value).startswith("logging.getLogger")
+
+
+def is_methodologies_block(node):
+    return isinstance(node, ast.If) and "'methodologies' not in st.session_state" in ast.unparse(node.test)
+
+
+def load_app_module():
+    """Carrega de app.py só as constantes, as funções (sem decoradores de cache) e as metodologias padrão,
+    sem executar a interface do Streamlit nem conectar ao Supabase. Os testes trocam dependências
+    (supabase, caminhos) com monkeypatch.setattr no módulo devolvido."""
+    np = pytest.importorskip("numpy")
+    tree = ast.parse(APP_PATH.read_text(encoding="utf-8"))
+    modulo = types.ModuleType("app")
+    modulo.__dict__.update({
+        "np": np, "st": types.SimpleNamespace(session_state=SessionState()), "datetime": datetime, "hashlib": hashlib,
+        "json": json, "logging": logging, "os": os, "threading": threading, "time": time, "__file__": str(APP_PATH)
+    })
+
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.ClassDef)):
+            node.decorator_list = []
+        elif not (is_constant_assign(node) or is_logger_assign(node) or is_methodologies_block(node) or
+                  (isinstance(node, ast.For) and "ANSWER_SCORE" in ast.unparse(node))):
+            continue
+        exec(compile(ast.Module(body=[node], type_ignores=[]), str(APP_PATH), "exec"), modulo.__dict__)
+    return modulo
+
+
+@pytest.fixture(scope="session")
+def app():
+    return load_app_module()
@@ -0,0 +1,145 @@
+"""Fila de ingestão em lote: gravação agrupada, reenvio linha a linha, descarte das recusadas e arquivo de contingência."""
+import json
+
+import pytest
+
+
+class APIError(Exception):
+    # Mesmo formato do erro do PostgREST: mensagem e SQLSTATE em .code
+    def __init__(self, message, code=None):
+        super().__init__(message)
+        self.code = code
+
+
+class FakeResponses:
+    """Tabela responses em memória: o upsert de um lote é atômico e ignora (company_id, cpf_hash) repetidos."""
+
+    def __init__(self, recusar=None, fora_do_ar=False):
+        self.linhas = {}
+        self.chamadas = []
+        self.recusar = recusar or {}
+        self.fora_do_ar = fora_do_ar
+        self._lote = None
+
+    def table(self, nome):
+        assert nome == 'responses'
+        return self
+
+    def upsert(self, rows, on_conflict=None, ignore_duplicates=False):
+        assert on_conflict == "company_id,cpf_hash" and ignore_duplicates
+        self._lote = rows if isinstance(rows, list) else [rows]
+        return self
+
+    def execute(self):
+        self.chamadas.append(len(self._lote))
+        if self.fora_do_ar:
+            raise ConnectionError("connection refused")
+        for row in self._lote:
+            if row['cpf_hash'] in self.recusar:
+                raise self.recusar[row['cpf_hash']]
+        for row in self._lote:
+            self.linhas.setdefault((row['company_id'], row['cpf_hash']), row)
+        return self
+
+
+def resposta(i, empresa="emp"):
+    return {"company_id": empresa, "cpf_hash": f"h{i}", "setor": "Geral", "answers": {"q": "Sempre"}}
+
+
+def read_jsonl(caminho):
+    if not caminho.exists():
+        return []
+    return [json.loads(linha) for linha in caminho.read_text(encoding="utf-8").splitlines() if linha]
+
+
+@pytest.fixture
+def fila(app, tmp_path, monkeypatch):
+    monkeypatch.setattr(app, "INGESTAO_SPILL_PATH", str(tmp_path / "fila.jsonl"))
+    monkeypatch.setattr(app, "INGESTAO_REJEITADAS_PATH", str(tmp_path / "rejeitadas.jsonl"))
+    monkeypatch.setattr(app, "invalidate_data_cache", lambda: None)
+    fila = app.load_ingestion_queue()
+    # enqueue_response usa a fila compartilhada do processo; aqui ela é a fila do teste, sem a thread de fundo
+    monkeypatch.setattr(app, "get_ingestion_queue", lambda: fila)
+    return fila
+
+
+def test_flush_writes_one_batch_and_clears_spill(app, fila, tmp_path, monkeypatch):
+    banco = FakeResponses()
+    monkeypatch.setattr(app, "supabase", banco, raising=False)
+    for i in range(3):
+        assert app.enqueue_response(resposta(i))
+    assert not app.enqueue_response(resposta(0))
+    assert len(read_jsonl(tmp_path / "fila.jsonl")) == 3
+
+    assert app.flush_ingestion_queue(fila) == 3
+    assert banco.chamadas == [3]
+    assert len(banco.linhas) == 3
+    assert fila['pendentes'] == [] and fila['chaves'] == set()
+    assert read_jsonl(tmp_path / "fila.jsonl") == []
+
+
+def test_row_error_is_replayed_and_dead_lettered(app, fila, tmp_path, monkeypatch):
+    # Empresa removida enquanto a resposta estava na fila: violação de chave estrangeira só nessa linha
+    banco = FakeResponses(recusar={"h1": APIError("foreign key violation", code="23503")})
+    monkeypatch.setattr(app, "supabase", banco, raising=False)
+    for i in range(3):
+        app.enqueue_response(resposta(i))
+
+    assert app.flush_ingestion_queue(fila) == 3
+    assert banco.chamadas == [3, 1, 1, 1]
+    assert set(banco.linhas) == {("emp", "h0"), ("emp", "h2")}
+    rejeitadas = read_jsonl(tmp_path / "rejeitadas.jsonl")
+    assert [r['resposta']['cpf_hash'] for r in rejeitadas] == ["h1"]
+    assert "foreign key" in rejeitadas[0]['motivo']
+    assert fila['pendentes'] == []
+
+
+def test_quota_rejection_is_kept(app, fila, tmp_path, monkeypatch):
+    banco = FakeResponses(recusar={"h0": APIError("elo_quota_excedida", code="P0001")})
+    monkeypatch.setattr(app, "supabase", banco, raising=False)
+    app.enqueue_response(resposta(0))
+    app.enqueue_response(resposta(1))
+
+    app.flush_ingestion_queue(fila)
+    rejeitadas = read_jsonl(tmp_path / "rejeitadas.jsonl")
+    assert [(r['resposta']['cpf_hash'], r['motivo']) for r in rejeitadas] == [("h0", "cota esgotada")]
+    assert set(banco.linhas) == {("emp", "h1")}
+
+
+def test_connection_error_keeps_batch_queued(app, fila, tmp_path, monkeypatch):
+    monkeypatch.setattr(app, "supabase", FakeResponses(fora_do_ar=True), raising=False)
+    app.enqueue_response(resposta(0))
+
+    with pytest.raises(ConnectionError):
+        app.flush_ingestion_queue(fila)
+    assert len(fila['pendentes']) == 1
+    assert len(read_jsonl(tmp_path / "fila.jsonl")) == 1
+    assert read_jsonl(tmp_path / "rejeitadas.jsonl") == []
+
+
+def test_failed_rewrite_keeps_spill_file(app, fila, tmp_path, monkeypatch):
+    # Falha de disco ao regravar o arquivo depois do lote: o arquivo anterior continua completo
+    monkeypatch.setattr(app, "supabase", FakeResponses(), raising=False)
+    for i in range(app.INGESTAO_LOTE_MAX + 1):
+        app.enqueue_response(resposta(i))
+    original = (tmp_path / "fila.jsonl").read_text(encoding="utf-8")
+
+    def disco_cheio(fd):
+        raise OSError("disco cheio")
+    monkeypatch.setattr(app.os, "fsync", disco_cheio)
+
+    with pytest.raises(OSError):
+        app.flush_ingestion_queue(fila)
+    assert (tmp_path / "fila.jsonl").read_text(encoding="utf-8") == original
+    assert not (tmp_path / "fila.jsonl.tmp").exists()
+
+
+def test_spilled_rows_are_reloaded(app, fila, tmp_path, monkeypatch):
+    app.enqueue_response(resposta(0))
+    app.enqueue_response(resposta(1, empresa="outra"))
+
+    recarregada = app.load_ingestion_queue()
+    assert [r['cpf_hash'] for r in recarregada['pendentes']] == ["h0", "h1"]
+    assert recarregada['chaves'] == {("emp", "h0"), ("outra", "h1")}
+    assert recarregada['desde'] is not None
+    assert app.has_spilled_responses()
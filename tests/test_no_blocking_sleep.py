@@ -0,0 +1,37 @@
+import ast
+import pathlib
+
+APP_PATH = pathlib.Path(__file__).resolve().parent.parent / "app.py"
+
+
+def find_sleep_calls(source):
+    """Linhas com chamadas a time.sleep (ou sleep importado de time) no código-fonte."""
+    tree = ast.parse(source)
+    apelidos_time = {"time"}
+    apelidos_sleep = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            apelidos_time.update(a.asname or a.name for a in node.names if a.name == "time")
+        elif isinstance(node, ast.ImportFrom) and node.module == "time":
+            apelidos_sleep.update(a.asname or a.name for a in node.names if a.name == "sleep")
+
+    linhas = []
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Call):
+            continue
+        func = node.func
+        if isinstance(func, ast.Attribute) and func.attr == "sleep" and isinstance(func.value, ast.Name) and func.value.id in apelidos_time:
+            linhas.append(node.lineno)
+        elif isinstance(func, ast.Name) and func.id in apelidos_sleep:
+            linhas.append(node.lineno)
+    return sorted(linhas)
+
+
+def test_app_has_no_blocking_sleep():
+    linhas = find_sleep_calls(APP_PATH.read_text(encoding="utf-8"))
+    assert linhas == [], f"time.sleep bloqueia a thread do Streamlit; use flash()/st.toast. Linhas: {linhas}"
+
+
+def test_detects_sleep_variants():
+    codigo = "import time\nimport time as t\nfrom time import sleep as dormir\ntime.sleep(1)\nt.sleep(2)\ndormir(3)\n"
+    assert find_sleep_calls(codigo) == [4, 5, 6]
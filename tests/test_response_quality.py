@@ -0,0 +1,78 @@
+"""Triagem de qualidade (screen_response_quality) com perfis honestos realistas e com padrões de preenchimento automático."""
+import pytest
+
+np = pytest.importorskip("numpy")
+
+HSE = "HSE-IT (35 itens)"
+COPSOQ = "COPSOQ II (Versão Média PT)"
+
+
+def build_codes(app, metodo, perfil, padrao=3):
+    """Códigos diretos (1 a 5) na ordem da tabela: perfil[categoria] é um código fixo ou {"dir": c, "rev": c}."""
+    tabela = app.get_scoring_table(app.st.session_state.methodologies[metodo]['questions'])
+    codigos = []
+    for i, (cat, q_text, q_id, lookup) in enumerate(tabela['itens']):
+        valor = perfil.get(cat, padrao)
+        if isinstance(valor, dict):
+            valor = valor['rev' if tabela['reversas'][i] else 'dir']
+        # Variação leve entre itens vizinhos, como num preenchimento real
+        codigos.append(valor if isinstance(valor, int) else valor[i % len(valor)])
+    return tabela, np.array([codigos], dtype=np.int8)
+
+
+def screen(app, metodo, perfil, padrao=(3, 4)):
+    tabela, codigos = build_codes(app, metodo, perfil, padrao)
+    return app.screen_response_quality(codigos, tabela)
+
+
+def test_hse_high_demands_with_good_support_is_not_flagged(app):
+    # Prazos e pressão sempre (itens invertidos de Demandas e Relacionamentos) com bom apoio e papel claro
+    resultado = screen(app, HSE, {
+        "Demandas": (5, 4), "Relacionamentos": (4, 5),
+        "Suporte do Gestor": (4, 5), "Suporte dos Colegas": (5, 4), "Papel na Empresa": (5, 4)
+    })
+    assert not resultado['suspeita'][0]
+    assert resultado['dims_incoerentes'][0] == 0
+
+
+def test_copsoq_high_demand_respondent_is_not_flagged(app):
+    # Exigências sempre altas, inclusive o único item direto ("propor novas ideias")
+    resultado = screen(app, COPSOQ, {
+        "Exigências Laborais (Quantidade e Ritmo)": 5,
+        "Saúde, Bem-estar e Rotina": (4, 3, 5),
+        "Atitude e Satisfação": (2, 3)
+    })
+    assert not resultado['suspeita'][0]
+
+
+def test_copsoq_clear_role_with_role_conflict_is_not_flagged(app):
+    # Papel claro (diretos altos) e conflitos de papel frequentes (invertidos altos) numa só dimensão,
+    # com respostas coerentes sobre confiança e justiça
+    resultado = screen(app, COPSOQ, {
+        "Transparência de Papel e Conflitos": {"dir": (5, 4), "rev": (5, 4)},
+        "Valores, Justiça e Confiança": {"dir": (4, 5), "rev": (1, 2)}
+    })
+    assert resultado['dims_incoerentes'][0] == 1
+    assert not resultado['suspeita'][0]
+
+
+def test_contradiction_repeated_across_dimensions_is_flagged(app):
+    # "Sempre" tanto para confiar quanto para ocultar, e para papel claro e conflitos de papel
+    resultado = screen(app, COPSOQ, {
+        "Transparência de Papel e Conflitos": {"dir": 5, "rev": 5},
+        "Valores, Justiça e Confiança": {"dir": 5, "rev": 5}
+    })
+    assert resultado['dims_incoerentes'][0] == 2
+    assert resultado['suspeita'][0]
+
+
+@pytest.mark.parametrize("metodo", [HSE, COPSOQ])
+def test_straight_lining_is_flagged(app, metodo):
+    resultado = screen(app, metodo, {}, padrao=3)
+    assert resultado['suspeita'][0]
+
+
+def test_sparse_response_is_not_evaluated(app):
+    tabela, codigos = build_codes(app, HSE, {}, padrao=3)
+    codigos[0, 5:] = 0
+    assert not app.screen_response_quality(codigos, tabela)['suspeita'][0]
@@ -0,0 +1,82 @@
+"""Tabela empresa x setor x indicador (build_sector_frame), base do gráfico por setor do painel."""
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+
+@pytest.fixture
+def sector_frame(app, monkeypatch):
+    monkeypatch.setattr(app, "pd", pd, raising=False)
+    metodos = app.st.session_state.methodologies
+    perguntas = metodos['HSE-IT (35 itens)']['questions']
+    textos = [q['q'] for qs in perguntas.values() for q in qs]
+    respostas = [
+        {"company_id": "a", "setor": "Operação", "created_at": "2026-03-02T10:00:00Z", "answers": {t: "Sempre" for t in textos[:20]}},
+        {"company_id": "a", "setor": "Operação", "created_at": "2026-05-20T08:30:00Z", "answers": {t: "Raramente" for t in textos[10:30]}},
+        {"company_id": "a", "setor": None, "created_at": "2026-05-21T09:00:00Z", "answers": {t: "Às vezes" for t in textos}},
+        {"company_id": "b", "setor": "Operação", "answers": {t: "Frequentemente" for t in textos[5:]}},
+        {"company_id": "b", "setor": "RH", "answers": {t: "Nunca/Quase Nunca" for t in textos[:25]}},
+    ]
+    companies = [{"id": "a", "metodologia": "HSE-IT (35 itens)"}, {"id": "b", "metodologia": "HSE-IT (35 itens)"}]
+    indices = app.score_companies(companies, respostas, None, metodos)
+    return companies, indices['setores']
+
+
+def test_score_geral_matches_sector_totals(sector_frame):
+    companies, df = sector_frame
+    geral = df[df['indicador'] == "Score Geral"]
+    linhas = {
+        (comp_id, None if pd.isna(setor) else setor): (n, soma)
+        for comp_id, setor, n, soma in zip(geral['company_id'], geral['setor'], geral['n'], geral['soma'])
+    }
+    esperado = {(c['id'], setor): (tot['respostas'], tot['soma_score']) for c in companies for setor, tot in c['setores'].items()}
+    assert linhas.keys() == esperado.keys()
+    for chave, (n, soma) in esperado.items():
+        assert linhas[chave][0] == n
+        assert linhas[chave][1] == pytest.approx(soma)
+
+
+def test_dimension_rows_pool_across_companies(sector_frame):
+    companies, df = sector_frame
+    mascara = df['setor'].notna() & (df['indicador'] == "Demandas")
+    por_setor = df.loc[mascara].groupby('setor', observed=True)[['n', 'soma']].sum()
+    esperado_n = sum(c['setores']['Operação']['dim_cont']['Demandas'] for c in companies)
+    esperado_soma = sum(c['setores']['Operação']['dim_soma']['Demandas'] for c in companies)
+    assert por_setor.loc['Operação', 'n'] == esperado_n
+    assert por_setor.loc['Operação', 'soma'] == esperado_soma
+
+
+def test_frame_is_typed(sector_frame):
+    companies, df = sector_frame
+    assert isinstance(df['company_id'].dtype, pd.CategoricalDtype)
+    assert isinstance(df['setor'].dtype, pd.CategoricalDtype)
+    assert df['media'].dtype == "float32"
+    assert list(df['indicador'].cat.categories)[:2] == ["Score Geral", "Demandas"]
+
+
+def test_dimension_options_are_precomputed(app, sector_frame):
+    companies, df = sector_frame
+    dims = app.build_sector_dimensions(df)
+    # A empresa "a" só tem um setor identificado; as dimensões sem nenhum ponto nele ficam de fora
+    esperado = [d for d, n in companies[0]['setores']['Operação']['dim_cont'].items() if n > 0]
+    assert dims['a'] == esperado
+    assert "Score Geral" not in dims['b']
+
+
+def test_history_by_sector(app, sector_frame):
+    companies, df = sector_frame
+    empresa = dict(companies[0], func=10)
+    questoes = app.st.session_state.methodologies['HSE-IT (35 itens)']['questions']
+    assert list(empresa['rollup_setor']) == ["Operação", None]
+
+    geral = app.generate_real_history(empresa, questoes, "Mensal")
+    operacao = app.generate_real_history(empresa, questoes, "Mensal", "Operação")
+    sem_setor = app.generate_real_history(empresa, questoes, "Mensal", None)
+    assert [h['periodo'] for h in geral] == ["03/2026", "05/2026"]
+    assert [h['periodo'] for h in operacao] == ["03/2026", "05/2026"]
+    assert [h['periodo'] for h in sem_setor] == ["05/2026"]
+    # Março só tem a resposta do setor Operação: a série do setor e a da empresa coincidem
+    assert operacao[0]['dimensoes'] == geral[0]['dimensoes']
+    assert [h['adesao'] for h in geral] == [10, 20]
+    assert [h['adesao'] for h in operacao] == [10, 10]
+    assert app.generate_real_history(empresa, questoes, "Mensal", "Inexistente") == []
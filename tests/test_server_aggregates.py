@@ -0,0 +1,360 @@
+"""Agregação no servidor (supabase/migrations) comparada com o motor de pontuação do app.
+
+Precisa do psycopg e de um Postgres local em ELO_TEST_DATABASE_URL (ex.: postgresql://postgres@127.0.0.1:5432/postgres);
+sem eles, os testes são ignorados. Cada execução cria e remove um schema próprio."""
+import os
+import pathlib
+import random
+import uuid
+
+import pytest
+
+psycopg = pytest.importorskip("psycopg")
+from psycopg.types.json import Jsonb
+
+MIGRATIONS = sorted((pathlib.Path(__file__).resolve().parent.parent / "supabase" / "migrations").glob("*.sql"))
+
+# Tabelas base do projeto Supabase (criadas pelo painel, fora das migrations), só com as colunas usadas pelas funções
+BASE_SCHEMA = """
+create table companies (
+    id text primary key,
+    razao text,
+    cnae text,
+    risco text,
+    metodologia text,
+    func integer,
+    limit_evals integer
+);
+create table responses (
+    id bigserial primary key,
+    company_id text,
+    cpf_hash text,
+    setor text,
+    answers jsonb,
+    created_at timestamptz default now()
+);
+"""
+
+EMPRESAS = [
+    {"id": "hse", "metodologia": "HSE-IT (35 itens)"},
+    {"id": "cop", "metodologia": "COPSOQ II (Versão Média PT)"},
+    # Metodologia desconhecida: banco e app caem no HSE-IT
+    {"id": "desc", "metodologia": "Metodologia Removida"},
+]
+SETORES = ["Operação", "Administrativo", None]
+
+
+@pytest.fixture(scope="module")
+def db():
+    url = os.environ.get("ELO_TEST_DATABASE_URL")
+    if not url:
+        pytest.skip("ELO_TEST_DATABASE_URL não definido (Postgres local para os testes de agregação)")
+
+    schema = "elo_test_" + uuid.uuid4().hex[:8]
+    conn = psycopg.connect(url, autocommit=True)
+    conn.execute("set client_encoding to 'UTF8'")
+    conn.execute(f"create schema {schema}")
+    conn.execute(f"set search_path to {schema}")
+    try:
+        conn.execute(BASE_SCHEMA)
+        for migration in MIGRATIONS:
+            conn.execute(migration.read_text(encoding="utf-8"))
+        yield conn
+    finally:
+        conn.execute(f"drop schema {schema} cascade")
+        conn.close()
+
+
+def seed_scoring_config(conn, app):
+    # Mesmo conteúdo que sync_scoring_config() grava no Supabase
+    conn.cursor().executemany(
+        "insert into elo_answer_scale (rotulo, pontos) values (%s, %s)",
+        list(app.ANSWER_SCORE.items())
+    )
+    itens = []
+    for metodo_nome, metodo in app.st.session_state.methodologies.items():
+        tabela = app.get_scoring_table(metodo['questions'])
+        for ordem, (cat, q_text, q_id, lookup) in enumerate(tabela['itens']):
+            itens.append((metodo_nome, ordem, q_id, q_text, cat, lookup is app.ANSWER_SCORE_REV))
+    conn.cursor().executemany(
+        "insert into elo_scoring_items (metodologia, ordem, q_id, q_texto, categoria, rev) values (%s, %s, %s, %s, %s, %s)",
+        itens
+    )
+
+
+def random_answers(rng, active_questions):
+    """Respostas com rótulos válidos, perguntas em branco e rótulos fora da escala (ignorados nos dois lados)."""
+    answers = {}
+    for qs in active_questions.values():
+        for q in qs:
+            sorteio = rng.random()
+            if sorteio < 0.1:
+                continue
+            answers[q['q']] = "Talvez" if sorteio < 0.15 else rng.choice(q['options'])
+    return answers
+
+
+@pytest.fixture(scope="module")
+def seeded(db, app):
+    seed_scoring_config(db, app)
+    metodos = app.st.session_state.methodologies
+    for c in EMPRESAS:
+        db.execute("insert into companies (id, razao, metodologia) values (%s, %s, %s)", (c['id'], c['id'], c['metodologia']))
+
+    rng = random.Random(42)
+    respostas = []
+    for c in EMPRESAS:
+        active_questions = metodos.get(c['metodologia'], metodos['HSE-IT (35 itens)'])['questions']
+        for i in range(40):
+            row = {
+                "company_id": c['id'], "cpf_hash": f"{c['id']}-{i}",
+                "setor": rng.choice(SETORES), "answers": random_answers(rng, active_questions), "answers_codes": None
+            }
+            # Parte das linhas no formato compacto (respostas_compactas)
+            if i % 4 == 0:
+                tabela = app.get_scoring_table(active_questions)
+                row['answers_codes'] = app.codes_to_text(app.encode_answers(tabela, row['answers']))
+                row['answers'] = {}
+            row['id'] = db.execute(
+                "insert into responses (company_id, cpf_hash, setor, answers, answers_codes) values (%s, %s, %s, %s, %s) returning id",
+                (row['company_id'], row['cpf_hash'], row['setor'], Jsonb(row['answers']), row['answers_codes'])
+            ).fetchone()[0]
+            respostas.append(row)
+    return respostas
+
+
+def server_rows(conn, funcao):
+    cur = conn.execute(f"select company_id, setor, ordem, soma, cont, respostas, soma_score from {funcao}(null)")
+    colunas = [d.name for d in cur.description]
+    return [dict(zip(colunas, linha)) for linha in cur.fetchall()]
+
+
+def python_aggregates(app, respostas):
+    rows = [{k: v for k, v in r.items()} for r in respostas]
+    return app.score_responses(rows, [dict(c) for c in EMPRESAS], app.st.session_state.methodologies)
+
+
+def assert_matches_python(app, rows, respostas):
+    metodos = app.st.session_state.methodologies
+    agregados = python_aggregates(app, respostas)
+    do_servidor = app.aggregates_from_server(rows, [dict(c) for c in EMPRESAS], metodos)
+    assert set(do_servidor) == set(agregados)
+
+    for comp_id, agg in agregados.items():
+        srv = do_servidor[comp_id]
+        assert srv['n'] == agg['n']
+        assert srv['q_soma'].tolist() == agg['q_soma'].tolist()
+        assert srv['q_cont'].tolist() == agg['q_cont'].tolist()
+
+        # Somas por setor e pergunta (setor nulo incluído)
+        assert srv['setor_q']['setores'] == agg['setor_q']['setores']
+        assert srv['setor_q']['n'].tolist() == agg['setor_q']['n'].tolist()
+        assert srv['setor_q']['q_soma'].tolist() == agg['setor_q']['q_soma'].tolist()
+        assert srv['setor_q']['q_cont'].tolist() == agg['setor_q']['q_cont'].tolist()
+        # O app arredonda o score individual em 2 casas antes de somar e o banco soma a média sem arredondar:
+        # a diferença fica abaixo de meio centésimo por resposta
+        for setor, totais in agg['setores'].items():
+            assert srv['setores'][setor]['respostas'] == totais['respostas']
+            assert srv['setores'][setor]['soma_score'] == pytest.approx(totais['soma_score'], abs=0.005 * totais['respostas'] + 1e-9)
+
+        # Indicadores finais do laudo a partir das duas fontes
+        metodo_nome = next(c['metodologia'] for c in EMPRESAS if c['id'] == comp_id)
+        active_questions = metodos.get(metodo_nome, metodos['HSE-IT (35 itens)'])['questions']
+        esperado = app.finalize_company_analytics({"id": comp_id}, agg, active_questions)
+        obtido = app.finalize_company_analytics({"id": comp_id}, srv, active_questions)
+        for chave in ('respondidas', 'score', 'dimensoes', 'dim_soma', 'dim_cont', 'detalhe_perguntas'):
+            assert obtido[chave] == esperado[chave], chave
+
+
+def test_incremental_aggregates_match_python(app, db, seeded):
+    assert_matches_python(app, server_rows(db, "elo_company_aggregates"), seeded)
+
+
+def test_full_scan_matches_python(app, db, seeded):
+    assert_matches_python(app, server_rows(db, "elo_compute_aggregates"), seeded)
+
+
+def test_unknown_methodology_falls_back_to_hse(app, db, seeded):
+    rows = server_rows(db, "elo_company_aggregates")
+    n_itens_hse = len(app.get_scoring_table(app.st.session_state.methodologies['HSE-IT (35 itens)']['questions'])['itens'])
+    ordens = {r['ordem'] for r in rows if r['company_id'] == 'desc' and r['ordem'] is not None}
+    assert ordens and max(ordens) < n_itens_hse
+
+
+def test_reversed_items_are_mirrored(app, db, seeded):
+    # Todas as respostas em "Sempre" (5): itens invertidos valem 1 no banco e no app
+    tabela = app.get_scoring_table(app.st.session_state.methodologies['HSE-IT (35 itens)']['questions'])
+    answers = {q_text: "Sempre" for cat, q_text, q_id, lookup in tabela['itens']}
+    db.execute("insert into companies (id, razao, metodologia) values ('rev', 'rev', 'HSE-IT (35 itens)')")
+    db.execute("insert into responses (company_id, cpf_hash, setor, answers) values ('rev', 'rev-1', null, %s)", (Jsonb(answers),))
+
+    rows = [r for r in server_rows(db, "elo_company_aggregates") if r['company_id'] == 'rev' and r['ordem'] is not None]
+    somas = {r['ordem']: r['soma'] for r in rows}
+    assert somas == {i: (1 if rev else 5) for i, rev in enumerate(tabela['reversas'].tolist())}
+
+
+def test_daily_rollups_by_sector_match_python(app, db, seeded):
+    criadas = dict(db.execute("select id, created_at::text from responses").fetchall())
+    respostas = [dict(r, created_at=criadas[r['id']]) for r in seeded]
+    agregados = python_aggregates(app, respostas)
+
+    ids = {c['id'] for c in EMPRESAS}
+    cur = db.execute("select company_id, setor, dia, ordem, soma, cont, respostas from elo_company_daily_rollups(null)")
+    colunas = [d.name for d in cur.description]
+    rows = [dict(zip(colunas, linha)) for linha in cur.fetchall() if linha[0] in ids]
+    do_servidor = app.rollups_from_server(rows, app.aggregates_from_server(
+        [r for r in server_rows(db, "elo_company_aggregates") if r['company_id'] in ids], [dict(c) for c in EMPRESAS], app.st.session_state.methodologies
+    ))
+
+    for comp_id, agg in agregados.items():
+        series = [(None, agg['rollup'], do_servidor[comp_id]['rollup'])]
+        assert list(do_servidor[comp_id]['rollup_setor']) == list(agg['rollup_setor'])
+        series += [(setor, r, do_servidor[comp_id]['rollup_setor'][setor]) for setor, r in agg['rollup_setor'].items()]
+        for setor, esperado, obtido in series:
+            assert obtido['dias'] == esperado['dias'], setor
+            for chave in ('n', 'q_soma', 'q_cont', 'acum_q_soma'):
+                assert obtido[chave].tolist() == esperado[chave].tolist(), (setor, chave)
+
+
+class RpcNoBanco:
+    """Cliente mínimo do Supabase: .rpc(nome, params).execute() chama a função no Postgres de teste com argumentos nomeados."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.resultados = []
+
+    def rpc(self, nome, params):
+        self._chamada = (nome, params)
+        return self
+
+    def execute(self):
+        nome, params = self._chamada
+        argumentos = ", ".join(f"{k} => %s" for k in params)
+        valor = self.conn.execute(f"select {nome}({argumentos})", [Jsonb(v) for v in params.values()]).fetchone()[0]
+        self.resultados.append(valor)
+        return self
+
+
+def test_scoring_config_replacement_removes_stale_rows(app, db, seeded, monkeypatch):
+    # Linhas de uma configuração anterior: metodologia renomeada e rótulo retirado da escala
+    db.execute("insert into elo_scoring_items (metodologia, ordem, q_id, q_texto, categoria, rev) values ('Metodologia Antiga', 0, 'x', 'Pergunta antiga', 'Antiga', false)")
+    db.execute("insert into elo_answer_scale (rotulo, pontos) values ('Talvez', 3)")
+    banco = RpcNoBanco(db)
+    monkeypatch.setattr(app, "supabase", banco, raising=False)
+
+    app.sync_scoring_config()
+    assert banco.resultados == [True]
+    assert db.execute("select count(*) from elo_scoring_items where metodologia = 'Metodologia Antiga'").fetchone()[0] == 0
+    assert db.execute("select count(*) from elo_answer_scale where rotulo = 'Talvez'").fetchone()[0] == 0
+    # Reconstrução completa com a configuração nova: mesmos números do app, pelas tabelas incrementais
+    rows = [r for r in server_rows(db, "elo_company_aggregates") if r['company_id'] != 'rev']
+    assert_matches_python(app, rows, seeded)
+
+    # Configuração igual à gravada: nada é reescrito nem reconstruído nas próximas sessões
+    app.sync_scoring_config()
+    assert banco.resultados == [True, False]
+
+
+class ConsultaNoBanco:
+    """Construtor de consultas do Supabase (table/rpc, eq, in_, order, range) executado no Postgres de teste."""
+
+    def __init__(self, conn, sql="", params=()):
+        self.conn, self.sql, self.params, self.filtros, self.ordem, self.fatia = conn, sql, list(params), [], [], None
+
+    def table(self, nome):
+        return ConsultaNoBanco(self.conn, f"select * from {nome}")
+
+    def rpc(self, nome, params):
+        argumentos = ", ".join(f"{k} => %s" for k in params)
+        return ConsultaNoBanco(self.conn, f"select * from {nome}({argumentos})", params.values())
+
+    def select(self, *colunas):
+        return self
+
+    def eq(self, coluna, valor):
+        self.filtros.append((f"{coluna}::text = %s", str(valor)))
+        return self
+
+    def in_(self, coluna, valores):
+        self.filtros.append((f"{coluna}::text = any(%s)", [str(v) for v in valores]))
+        return self
+
+    def order(self, coluna):
+        self.ordem.append(coluna)
+        return self
+
+    def range(self, inicio, fim):
+        self.fatia = (inicio, fim)
+        return self
+
+    def execute(self):
+        sql = f"select * from ({self.sql}) q"
+        if self.filtros:
+            sql += " where " + " and ".join(f for f, v in self.filtros)
+        if self.ordem:
+            sql += " order by " + ", ".join(f"{c} nulls first" for c in self.ordem)
+        if self.fatia:
+            sql += f" offset {self.fatia[0]} limit {self.fatia[1] - self.fatia[0] + 1}"
+        cur = self.conn.execute(sql, self.params + [v for f, v in self.filtros])
+        colunas = [d.name for d in cur.description]
+        self.data = [dict(zip(colunas, linha)) for linha in cur.fetchall()]
+        return self
+
+
+def test_default_load_reads_maintained_sums(app, db, seeded, monkeypatch):
+    pd = pytest.importorskip("pandas")
+    monkeypatch.setattr(app, "pd", pd, raising=False)
+    monkeypatch.setattr(app, "supabase", ConsultaNoBanco(db), raising=False)
+    monkeypatch.setattr(app, "DB_CONNECTED", True, raising=False)
+    monkeypatch.setitem(app.st.session_state, "scoring_config_synced", True)
+    varreduras = []
+    iter_original = app.iter_scope_responses
+    def iter_contado(company_ids):
+        varreduras.append(company_ids)
+        return iter_original(company_ids)
+    monkeypatch.setattr(app, "iter_scope_responses", iter_contado)
+    metodos = app.st.session_state.methodologies
+    db.execute("update companies set func = 50 where id = 'hse'")
+
+    companies, indices, users_raw = app.fetch_scope_data(("Analista", "hse"), False, metodos)
+    empresa = companies[0]
+    assert varreduras == []
+    assert empresa['respondidas'] == sum(1 for r in seeded if r['company_id'] == "hse")
+    assert empresa['linhas_dim'] is None
+
+    # Só o relatório pede as respostas individuais, e só as da empresa aberta
+    app.load_response_detail(empresa)
+    assert varreduras == [["hse"]]
+    assert empresa['linhas_dim']['soma'].shape[0] == empresa['respondidas']
+    app.load_response_detail(empresa)
+    assert varreduras == [["hse"]]
+
+    # A exclusão de respostas suspeitas depende da triagem no app: volta a varrer o escopo
+    companies, indices, users_raw = app.fetch_scope_data(("Analista", "hse"), True, metodos)
+    assert varreduras == [["hse"], ["hse"]]
+    assert companies[0]['linhas_dim'] is not None
+
+
+def test_delete_keeps_aggregates_in_sync(app, db, seeded):
+    removidas = seeded[::7]
+    db.execute("delete from responses where id = any(%s)", ([r['id'] for r in removidas],))
+    restantes = [r for r in seeded if r not in removidas]
+    rows = [r for r in server_rows(db, "elo_company_aggregates") if r['company_id'] != 'rev']
+    assert_matches_python(app, rows, restantes)
+
+
+def test_dedupe_keeps_a_backup_of_removed_rows(app, db, seeded):
+    # Base anterior à restrição de CPF único: o mesmo cpf_hash enviado duas vezes na mesma empresa
+    db.execute("drop index responses_company_cpf_key")
+    id_original, cpf_hash = db.execute("select id, cpf_hash from responses where company_id = 'hse' order by id limit 1").fetchone()
+    repetida = db.execute(
+        "insert into responses (company_id, cpf_hash, setor, answers) values ('hse', %s, 'Reenvio', '{}') returning id", (cpf_hash,)
+    ).fetchone()[0]
+
+    migration = next(m for m in MIGRATIONS if m.name.endswith("_elo_unique_submission.sql"))
+    db.execute(migration.read_text(encoding="utf-8"))
+
+    restantes = db.execute("select id from responses where cpf_hash = %s", (cpf_hash,)).fetchall()
+    assert restantes == [(id_original,)]
+    backup = db.execute("select id, setor, removida_em is not null from responses_duplicadas").fetchall()
+    assert backup == [(repetida, 'Reenvio', True)]